@@ -1,8 +1,22 @@
-import re
-import json
-from typing import Optional, Dict, Any
-from .prompt import PREFIX_PROMPT, LOGIC_PROMPT, SUFFIX_PROMPT
-from core.adapter import Tool_Executor
+from typing import Any, Callable, Dict, Optional
+from .prompt import PREFIX_PROMPT, LOGIC_PROMPT, PARALLEL_TOOLS_PROMPT, SUFFIX_PROMPT
+from core.runner import (Blocking, Emit, MemoryCall, ToolCall, ToolCalls, run_async, run_sync,
+                         stream_async, stream_sync, with_memory)
+from core.events import IterationStart
+from core.batch import arun_batch, run_batch
+from memory.session_manager import SessionMemoryManager
+from core.tool_calls import collect_tool_calls
+from core.tool_cache import make_tool_cache
+from core.tool_policy import make_tool_policy
+from core.tool_schema import inspect_tool
+from core.result_store import READ_RESULT_TOOL, ResultStore, make_read_result_tool
+from core.prompt_template import CompiledPromptTemplate, format_tool_list
+from core.scratchpad import Scratchpad
+from core.compaction import CompactionState, call_with_compaction, default_compaction_strategies
+from core.loop_detector import LoopDetector, LoopStats
+from core.json_extract import JSONExtractionError, extract_json, fix_json_response
+from core.tracing import Tracer, span, trace_steps
+from core.checkpoint import RunCheckpointer, agent_kind, load_checkpoint
 
 
 class Colors:
@@ -38,7 +52,22 @@ class Create_Deep_Reasoning_Tool_Calling_Agent:
         show_reasoning: bool = True,
         prompt: Optional[str] = None,
         memory = None,
-        min_confidence: float = 0.7
+        min_confidence: float = 0.7,
+        early_tool_dispatch: bool = False,
+        parallel_tool_calls: bool = False,
+        max_parallel_tools: int = 4,
+        scratchpad_token_budget: Optional[int] = None,
+        keep_recent_steps: int = 3,
+        scratchpad_summarizer: Optional[Callable] = None,
+        max_tool_output_chars: Optional[int] = None,
+        sessions: Optional[SessionMemoryManager] = None,
+        max_iterations: int = 15,
+        loop_detection: bool = True,
+        max_repeated_calls: int = 2,
+        max_stalled_steps: Optional[int] = None,
+        json_fix_attempts: int = 1,
+        tracer: Optional[Tracer] = None,
+        checkpoint_store: Optional[Any] = None
     ) -> None:
         """
         Initialize Advanced Reasoning Agent.
@@ -50,6 +79,38 @@ class Create_Deep_Reasoning_Tool_Calling_Agent:
             prompt: Custom agent introduction (optional)
             memory: Optional memory object for conversation history
             min_confidence: Minimum confidence threshold (0.0-1.0) to accept results
+            early_tool_dispatch: Stream the response (if the LLM has generate_response_stream)
+                and start the tool as soon as "Tool call" and "Tool Parameters" are complete,
+                while the model is still writing Self-Reflection and Final Response.
+                Repeated calls are not dispatched early; a call the final parse does not
+                confirm has still run, so use it only with tools safe to run speculatively
+            parallel_tool_calls: Allow several independent tools per step via a "Tool Calls" list,
+                executed concurrently with all results fed back together
+            max_parallel_tools: Maximum number of tools running at once for "Tool Calls"
+            scratchpad_token_budget: Token budget for previous actions in the prompt. When exceeded,
+                all but the most recent actions are condensed to one-line observations (None = unbounded)
+            keep_recent_steps: Most recent actions kept verbatim under the budget
+            scratchpad_summarizer: Optional function condensing an action to one line, e.g.
+                core.llm_step_summarizer(cheap_llm); rule-based by default
+            max_tool_output_chars: Output budget for every tool (None = unlimited). Longer results
+                are truncated and stored; the agent gets a read_result tool to page through them
+            sessions: SessionMemoryManager used by invoke(query, session_id=...) to keep one
+                memory per session (default: a ConversationalBufferMemory per session)
+            max_iterations: Maximum reasoning iterations per run (overridable per call)
+            loop_detection: Answer repeated tool calls (same tool, same parameters) from the
+                earlier result instead of running them again, and force a final answer once
+                the agent keeps repeating calls or getting no new information
+            max_repeated_calls: Repeated calls tolerated before a final answer is forced
+            max_stalled_steps: Consecutive steps without new information before a final
+                answer is forced (None = off; different calls may legitimately return
+                the same result)
+            json_fix_attempts: When a response is not valid JSON even after automatic repair,
+                how many times to send just the broken JSON back to the model to fix (0 = fail)
+            tracer: Optional core.tracing.Tracer recording a span tree (LLM, parse, tool and
+                memory timings, token counts) for every run
+            checkpoint_store: Optional store (core.InMemoryCheckpointStore, core.SQLiteCheckpointStore)
+                where runs invoked with a run_id save their state after every step, so an
+                interrupted run can be continued with resume(run_id)
         """
         self.tools = {}
         self.llm = llm
@@ -57,11 +118,38 @@ class Create_Deep_Reasoning_Tool_Calling_Agent:
         self.show_reasoning = show_reasoning
         self.memory = memory
         self.min_confidence = min_confidence
+        self.early_tool_dispatch = early_tool_dispatch
+        self.parallel_tool_calls = parallel_tool_calls
+        self.max_parallel_tools = max_parallel_tools
+        self.scratchpad_token_budget = scratchpad_token_budget
+        self.keep_recent_steps = keep_recent_steps
+        self.scratchpad_summarizer = scratchpad_summarizer
+        self.max_tool_output_chars = max_tool_output_chars
+        # Per-session memories for invoke(query, session_id=...); self.memory is not used then
+        self.sessions = sessions if sessions is not None else SessionMemoryManager()
+        self.max_iterations = max_iterations
+        self.loop_detection = loop_detection
+        self.max_repeated_calls = max_repeated_calls
+        self.max_stalled_steps = max_stalled_steps
+        self.json_fix_attempts = json_fix_attempts
+        # Repeated calls and iterations saved by loop detection, over all runs
+        self.loop_stats = LoopStats()
+        # Span tree of every run (None = not traced, no overhead)
+        self.tracer = tracer
+        # Loop state of runs invoked with a run_id, for resume()
+        self.checkpoint_store = checkpoint_store
+        # Full text of outputs cut to their budget, read back with the read_result tool
+        self.result_store = ResultStore()
+        # Applied in order when a prompt exceeds the model's context window
+        self.compaction_strategies = default_compaction_strategies()
         
+        logic_prompt = LOGIC_PROMPT + (PARALLEL_TOOLS_PROMPT if parallel_tool_calls else "")
         if prompt is not None:
-            self.prompt_template = prompt + "\n\n" + LOGIC_PROMPT + SUFFIX_PROMPT
+            self.prompt_template = prompt + "\n\n" + logic_prompt + SUFFIX_PROMPT
         else:
-            self.prompt_template = PREFIX_PROMPT + LOGIC_PROMPT + SUFFIX_PROMPT
+            self.prompt_template = PREFIX_PROMPT + logic_prompt + SUFFIX_PROMPT
+        # Built lazily from prompt_template and the tools; reset by add_tool()
+        self._compiled_prompt = None
     
     def _parse_response(self, response: str) -> Dict[str, Any]:
         """
@@ -69,17 +157,12 @@ class Create_Deep_Reasoning_Tool_Calling_Agent:
         
         Returns:
             Dictionary with all reasoning components
-        """
-        # Extract JSON block
-        json_match = re.search(r"```json\s*(\{.*?\})\s*```", response, re.DOTALL)
-        if not json_match:
-            json_match = re.search(r"'''json\s*(\{.*?\})\s*'''", response, re.DOTALL)
-        
-        if not json_match:
-            raise ValueError(f"Invalid response format: No JSON block found")
         
-        # Parse the comprehensive JSON structure
-        parsed = json.loads(json_match.group(1))
+        Raises:
+            JSONExtractionError: If no JSON object can be decoded from the response
+        """
+        # Extract the JSON object (fenced or not), repairing common mistakes
+        parsed = extract_json(response)
         
         return {
             "problem_understanding": parsed.get("Problem Understanding", ""),
@@ -89,9 +172,22 @@ class Create_Deep_Reasoning_Tool_Calling_Agent:
             "tool_call": parsed.get("Tool call", "None"),
             "tool_parameters": parsed.get("Tool Parameters", {}),
             "self_reflection": parsed.get("Self-Reflection", {}),
-            "final_response": parsed.get("Final Response", "None")
+            "final_response": parsed.get("Final Response", "None"),
+            "tool_calls": parsed.get("Tool Calls", [])
         }
     
+    def _parse_with_fix(self, response: str):
+        """Parse a response; if its JSON is beyond repair, ask the model to fix just that JSON."""
+        try:
+            with span("parse", "parse"):
+                return self._parse_response(response)
+        except JSONExtractionError as e:
+            if not self.json_fix_attempts:
+                raise
+            if self.verbose:
+                print(f"{Colors.YELLOW}⚠ Malformed JSON in response; asking the model to fix it{Colors.ENDC}")
+            return (yield Blocking(fix_json_response, self.llm, self._parse_response, e, self.json_fix_attempts))
+    
     def _display_reasoning(self, components: Dict[str, Any], iteration: int):
         """Display the reasoning process in a beautiful, structured format."""
         if not self.show_reasoning:
@@ -182,6 +278,12 @@ class Create_Deep_Reasoning_Tool_Calling_Agent:
                 print(f"  {Colors.CYAN}Backup Plan:{Colors.ENDC}\n    {if_fails}")
             print()
     
+    def _warn_if_forced(self, detector: LoopDetector) -> None:
+        """Tell the user once the agent is being forced to answer."""
+        already_forced = detector.forced
+        if detector.should_force_final() and not already_forced and self.verbose:
+            print(f"{Colors.YELLOW}⚠ Tool calls are repeating; asking for the final answer{Colors.ENDC}\n")
+    
     def _display_tool_execution(self, tool_name: str, params: Dict, result: str):
         """Display tool execution information."""
         if self.verbose:
@@ -191,12 +293,89 @@ class Create_Deep_Reasoning_Tool_Calling_Agent:
             print(f"  {Colors.GREEN}Result:{Colors.ENDC} {result}")
             print()
     
-    def add_tool(self, name: str, description: str, function):
-        """Add a tool that the agent can use."""
+    def add_tool(self, name: str, description: str, function, cacheable: bool = False,
+                 ttl: Optional[float] = None, max_entries: int = 1024, key_fn=None, cache=None,
+                 timeout: Optional[float] = None, run_in: str = "inline",
+                 max_concurrency: Optional[int] = None, max_output_chars: Optional[int] = None):
+        """
+        Add a tool that the agent can use.
+        
+        Args:
+            name: Tool name
+            description: Description of what the tool does
+            function: Callable function to execute
+            cacheable: Serve repeated calls with the same arguments from a cache (deterministic tools only)
+            ttl: Seconds a cached result stays valid (None = until evicted)
+            max_entries: Maximum number of cached results
+            key_fn: Optional function (args, kwargs) -> key to normalize cache keys
+            cache: Existing core.tool_cache.ToolCache to use (shared or persistent); implies cacheable
+            timeout: Seconds before a call is abandoned with a ToolError ({"error": "timeout", ...})
+            run_in: "inline", "thread" or "process" (warm process pool, picklable functions only)
+            max_concurrency: Maximum calls of this tool running at once
+            max_output_chars: Output budget for this tool (overrides max_tool_output_chars);
+                longer results are truncated and readable with the read_result tool
+        """
         self.tools[name] = {
             "description": description,
-            "function": function
+            "function": function,
+            # Parameters and type hints, inspected once: typed binding and the prompt schema
+            "signature": inspect_tool(function),
+            "cache": make_tool_cache(cacheable, ttl, max_entries, key_fn, cache),
+            "policy": make_tool_policy(timeout, run_in, max_concurrency),
+            "max_output_chars": max_output_chars,
         }
+        if (max_output_chars or self.max_tool_output_chars) and READ_RESULT_TOOL not in self.tools:
+            self.tools[READ_RESULT_TOOL] = make_read_result_tool(self.result_store)
+        self._compiled_prompt = None
+    
+    def tool_cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Get cache counters ({"hits", "misses", "evictions", "size"}) for every cached tool."""
+        return {name: info["cache"].stats() for name, info in self.tools.items()
+                if info.get("cache") is not None}
+    
+    def tool_schemas(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the JSON schema of every tool, derived from its signature and type hints.
+        
+        Returns:
+            Dict mapping tool name to {"description", "parameters"} (parameters is None
+            for tools whose signature cannot be inspected)
+        """
+        return {name: {"description": info["description"],
+                       "parameters": info["signature"].json_schema() if info.get("signature") else None}
+                for name, info in self.tools.items()}
+    
+    def _get_compiled_prompt(self) -> CompiledPromptTemplate:
+        """Prompt template with the tool list filled in, rebuilt only after add_tool() or a prompt change."""
+        compiled = self._compiled_prompt
+        if compiled is None or compiled.source is not self.prompt_template:
+            compiled = CompiledPromptTemplate(self.prompt_template, tool_list=format_tool_list(self.tools))
+            self._compiled_prompt = compiled
+        return compiled
+    
+    def add_compaction_strategy(self, strategy):
+        """Add a strategy used to shrink the prompt when it exceeds the context window."""
+        self.compaction_strategies.append(strategy)
+    
+    # Rendered once after the previous actions
+    SCRATCHPAD_FOOTER = (
+        "\n\nBased on the above result, reason about your NEXT action:\n"
+        "- What did you learn from this result?\n"
+        "- Does it match your expectation?\n"
+        "- What do you need to do NOW?\n"
+        "- Can you provide the final answer, or do you need more information?\n\n"
+    )
+    
+    def _format_step(self, step) -> str:
+        """Format one scratchpad step for the prompt."""
+        text = f"\n\n{'─' * 70}\n"
+        text += f"PREVIOUS ACTION (Iteration {step.iteration}):\n"
+        if step.tool_name and step.tool_name != "None":
+            text += f"Tool Used: {step.tool_name}\n"
+            text += f"Parameters: {step.parameters}\n"
+            text += f"Result: {step.result}\n"
+        text += f"{'─' * 70}"
+        return text
     
     def add_llm(self, llm):
         """Set or update the LLM instance."""
@@ -217,62 +396,296 @@ class Create_Deep_Reasoning_Tool_Calling_Agent:
             return self.memory.get_history()
         return []
     
-    def invoke(self, query: str) -> str:
+    def invoke(self, query: str, session_id=None, max_iterations=None, run_id=None) -> str:
         """
         Execute the agent with deep reasoning.
         
         Args:
             query: User's question or request
+            session_id: Optional session ID; the conversation is kept in that session's
+                        memory (see sessions) instead of self.memory, and concurrent
+                        calls for the same session run one at a time
+            max_iterations: Optional iteration limit for this call (default: self.max_iterations)
+            run_id: Optional run ID; with a checkpoint_store the run is checkpointed under
+                    it after every step and can be continued with resume(run_id)
+            
+        Returns:
+            Final response after reasoning and tool execution
+        """
+        if session_id is not None:
+            with self.sessions.session(session_id) as memory:
+                view = with_memory(self, memory)
+                return run_sync(view, view._steps(query, max_iterations, run_id))
+        return run_sync(self, self._steps(query, max_iterations, run_id))
+    
+    async def ainvoke(self, query: str, session_id=None, max_iterations=None, run_id=None) -> str:
+        """
+        Execute the agent with deep reasoning without blocking the event loop.
+        
+        LLM calls are awaited if the LLM has an agenerate_response(prompt) coroutine
+        (otherwise they run in a worker thread), async def tools are awaited natively,
+        sync tools run in a worker thread, and memory objects with async methods
+        are awaited.
+        
+        Args:
+            query: User's question or request
+            session_id: Optional session ID (see invoke())
+            max_iterations: Optional iteration limit for this call
+            run_id: Optional run ID to checkpoint the run under (see invoke())
             
         Returns:
             Final response after reasoning and tool execution
         """
+        if session_id is not None:
+            async with self.sessions.asession(session_id) as memory:
+                view = with_memory(self, memory)
+                return await run_async(view, view._steps(query, max_iterations, run_id))
+        return await run_async(self, self._steps(query, max_iterations, run_id))
+    
+    def invoke_stream(self, query: str, session_id=None, max_iterations=None, run_id=None):
+        """
+        Execute the agent, yielding events as the run progresses.
+        
+        Events (core.events): IterationStart, ReasoningField, ToolStart, ToolEnd
+        (with elapsed seconds), FinalResponseDelta (text of the final answer as it
+        streams, if the LLM has generate_response_stream) and finally FinalResponse.
+        
+        Args:
+            query: User's question or request
+            session_id: Optional session ID (see invoke()); the session stays locked
+                        until the stream is exhausted or closed
+            max_iterations: Optional iteration limit for this call
+            run_id: Optional run ID to checkpoint the run under (see invoke())
+            
+        Yields:
+            Agent events; the last one is FinalResponse(text)
+        
+        Example:
+            for event in agent.invoke_stream("What is 12 * 7?"):
+                if event.type == "final_response_delta":
+                    print(event.text, end="", flush=True)
+        """
+        if session_id is not None:
+            def events():
+                with self.sessions.session(session_id) as memory:
+                    view = with_memory(self, memory)
+                    yield from stream_sync(view, view._steps(query, max_iterations, run_id))
+            return events()
+        return stream_sync(self, self._steps(query, max_iterations, run_id))
+    
+    def ainvoke_stream(self, query: str, session_id=None, max_iterations=None, run_id=None):
+        """
+        Async version of invoke_stream(); use with ``async for``.
+        
+        Args:
+            query: User's question or request
+            session_id: Optional session ID (see invoke_stream())
+            max_iterations: Optional iteration limit for this call
+            run_id: Optional run ID to checkpoint the run under (see invoke())
+            
+        Returns:
+            Async iterator of agent events; the last one is FinalResponse(text)
+        """
+        if session_id is not None:
+            async def events():
+                async with self.sessions.asession(session_id) as memory:
+                    view = with_memory(self, memory)
+                    async for event in stream_async(view, view._steps(query, max_iterations, run_id)):
+                        yield event
+            return events()
+        return stream_async(self, self._steps(query, max_iterations, run_id))
+    
+    def resume(self, run_id, session_id=None) -> str:
+        """
+        Continue a checkpointed run from its last checkpoint.
+        
+        Completed iterations are not repeated: earlier tool results come from the
+        checkpoint, and an LLM response whose tool had not finished is used again
+        instead of asking the model a second time.
+        
+        Args:
+            run_id: ID the run was invoked with
+            session_id: Session ID the run was invoked with, if any
+            
+        Returns:
+            Final response from the agent (returned directly if the run had finished)
+            
+        Raises:
+            ValueError: If there is no checkpoint for run_id
+        """
+        checkpoint = load_checkpoint(self.checkpoint_store, run_id, agent_kind(self))
+        if checkpoint["status"] == "done":
+            return checkpoint["result"]
+        query, max_iterations = checkpoint["query"], checkpoint["max_iterations"]
+        if session_id is not None:
+            with self.sessions.session(session_id) as memory:
+                view = with_memory(self, memory)
+                return run_sync(view, view._steps(query, max_iterations, run_id, checkpoint))
+        return run_sync(self, self._steps(query, max_iterations, run_id, checkpoint))
+    
+    async def aresume(self, run_id, session_id=None) -> str:
+        """
+        Async version of resume().
+        
+        Args:
+            run_id: ID the run was invoked with
+            session_id: Session ID the run was invoked with, if any
+            
+        Returns:
+            Final response from the agent (returned directly if the run had finished)
+        """
+        checkpoint = load_checkpoint(self.checkpoint_store, run_id, agent_kind(self))
+        if checkpoint["status"] == "done":
+            return checkpoint["result"]
+        query, max_iterations = checkpoint["query"], checkpoint["max_iterations"]
+        if session_id is not None:
+            async with self.sessions.asession(session_id) as memory:
+                view = with_memory(self, memory)
+                return await run_async(view, view._steps(query, max_iterations, run_id, checkpoint))
+        return await run_async(self, self._steps(query, max_iterations, run_id, checkpoint))
+    
+    def batch(self, queries, max_concurrency=4, memory_factory=None, keys=None):
+        """
+        Run many independent queries concurrently through this agent.
+        
+        Each query gets its own memory from memory_factory (the agent's own memory
+        is not used), while the LLM, tools and compiled prompt are shared.
+        
+        Args:
+            queries: List of user queries
+            max_concurrency: Maximum queries running at once
+            memory_factory: Optional zero-argument callable creating a memory per query
+                            (or per key), e.g. ConversationalBufferMemory
+            keys: Optional key per query; queries with the same key share one memory
+                  and run in order, like turns of one conversation
+            
+        Returns:
+            core.batch.BatchResult: items in query order (output, error, elapsed),
+            .outputs and aggregate .stats
+        
+        Example:
+            result = agent.batch(["What is 2+2?", "What is 3*3?"], max_concurrency=8)
+            print(result.outputs, result.stats["p95_seconds"])
+        """
+        return run_batch(self, queries, max_concurrency, memory_factory, keys)
+    
+    async def abatch(self, queries, max_concurrency=4, memory_factory=None, keys=None):
+        """
+        Async version of batch(); queries run concurrently on the event loop.
+        
+        Args:
+            queries: List of user queries
+            max_concurrency: Maximum queries running at once
+            memory_factory: Optional zero-argument callable creating a memory per query (or per key)
+            keys: Optional key per query; queries with the same key share one memory and run in order
+            
+        Returns:
+            core.batch.BatchResult
+        """
+        return await arun_batch(self, queries, max_concurrency, memory_factory, keys)
+    
+    def _steps(self, query: str, max_iterations: Optional[int] = None, run_id=None, checkpoint=None):
+        """Effects of one run: the agent loop, checkpointed and traced when configured."""
+        checkpointer = None
+        if self.checkpoint_store is not None and run_id is not None:
+            checkpointer = RunCheckpointer(
+                self.checkpoint_store, run_id, query, max_iterations or self.max_iterations,
+                agent_kind(self), checkpoint,
+            )
+        steps = self._loop(query, max_iterations, checkpointer)
+        if checkpointer is not None:
+            steps = checkpointer.track(steps)
+        if self.tracer is None:
+            return steps
+        return trace_steps(self.tracer, steps, self, query=query)
+    
+    def _loop(self, query: str, max_iterations: Optional[int] = None, checkpointer=None):
+        """Agent loop shared by invoke() and ainvoke(); yields core.runner effects."""
         if self.llm is None:
             raise ValueError("LLM not set. Call add_llm() first")
         
         if not self.tools:
             raise ValueError("No tools added. Call add_tool() at least once")
         
+        # A resumed run already did this; its context comes from the checkpoint
+        resumed = checkpointer is not None and checkpointer.resumed
+        
         # Add user query to memory
-        if self.memory is not None:
-            self.memory.add_user_message(query)
+        if self.memory is not None and not resumed:
+            yield MemoryCall("add_user_message", query)
         
-        # Compile prompt
-        tool_list = "\n".join(
-            [f"        - {name}: {info['description']}" 
-             for name, info in self.tools.items()]
-        )
-        compiled_prompt = self.prompt_template.replace("{tool_list}", tool_list)
+        # Static parts are compiled once; only query and context are spliced in per iteration
+        template = self._get_compiled_prompt()
         
         # Add memory context
         memory_context = ""
-        if self.memory is not None:
-            context = self.memory.get_context()
-            if context:
-                memory_context = f"\n\n--- Previous Conversation ---\n{context}\n--- End History ---\n"
+        if self.memory is not None and not resumed:
+            memory_context = yield MemoryCall("get_context")
         
         if self.verbose:
             print(f"\n{Colors.GREEN}{'═' * 70}{Colors.ENDC}")
             print(f"{Colors.BOLD}{Colors.GREEN}🚀 Advanced Reasoning Agent Activated{Colors.ENDC}")
             print(f"{Colors.GREEN}{'═' * 70}{Colors.ENDC}")
         
-        scratchpad = ""
-        max_iterations = 15  # More iterations for complex reasoning
-        iteration = 0
-        last_confidence = 1.0
+        scratchpad = Scratchpad(
+            self._format_step,
+            self.SCRATCHPAD_FOOTER,
+            token_budget=self.scratchpad_token_budget,
+            keep_recent=self.keep_recent_steps,
+            summarize_step=self.scratchpad_summarizer,
+            model=getattr(self.llm, "model", None),
+        )
+        state = CompactionState(scratchpad, memory_context, self.llm)
+        
+        def build_prompt():
+            context = ""
+            if state.memory_context:
+                context = f"\n\n--- Previous Conversation ---\n{state.memory_context}\n--- End History ---\n"
+            context += scratchpad.render() + detector.prompt_note()
+            return template.render(user_input=query, context=context)
+        
+        def on_compact(applied):
+            if self.verbose:
+                print(f"{Colors.YELLOW}⚠ Prompt exceeded the context window; "
+                      f"compacted with {', '.join(applied)}{Colors.ENDC}")
+        
+        def may_dispatch(tool_name, params):
+            # Early dispatch must only start calls this loop would execute
+            return not detector.forced and not detector.seen(tool_name, params)
+        
+        max_iterations = max_iterations or self.max_iterations
+        detector = LoopDetector(self.max_repeated_calls, self.max_stalled_steps, enabled=self.loop_detection)
+        iteration, pending_response, restored = 0, None, {}
+        if checkpointer is not None:
+            # Restore the scratchpad, context and loop state of a resumed run
+            iteration, pending_response, restored = checkpointer.bind(state, detector)
+        last_confidence = restored.get("confidence", 1.0)
         
         while iteration < max_iterations:
             iteration += 1
+            yield Emit(IterationStart(iteration))
             
-            # Build context for this iteration
-            context = memory_context + scratchpad
-            prompt = compiled_prompt.format(user_input=query, context=context if context else "")
+            if self.scratchpad_summarizer is not None:
+                # Condense older steps (may call a model) before building the prompt
+                yield Blocking(scratchpad.prepare)
             
-            # Get LLM response
+            # Get LLM response (compacting and retrying once on context overflow)
+            response = None
             try:
-                response = self.llm.generate_response(prompt)
-                components = self._parse_response(response)
+                if pending_response is not None:
+                    # Received before the run was interrupted: not requested again
+                    response, early_dispatch, pending_response = pending_response, None, None
+                else:
+                    (response, early_dispatch), _ = yield from call_with_compaction(
+                        build_prompt, state, self.compaction_strategies, on_compact, may_dispatch
+                    )
+                    if checkpointer is not None:
+                        yield Blocking(checkpointer.save, iteration - 1, response, {"confidence": last_confidence})
+                components = yield from self._parse_with_fix(response)
             except Exception as e:
+                if checkpointer is not None and response is None:
+                    # The model could not be reached: keep the checkpoint so the run can be resumed
+                    raise
                 if self.verbose:
                     print(f"{Colors.RED}✗ Error parsing response: {str(e)}{Colors.ENDC}")
                 return f"Error in reasoning process: {str(e)}"
@@ -292,12 +705,33 @@ class Create_Deep_Reasoning_Tool_Calling_Agent:
             # Check if we have final response
             tool_name = components.get("tool_call")
             final_response = components.get("final_response")
+            params = components.get("tool_parameters", {})
+            
+            calls = collect_tool_calls(tool_name, params, components.get("tool_calls"))
+            if calls and detector.forced:
+                # Told to answer and still calling tools: stop instead of looping on
+                break
+            if len(calls) > 1:
+                # Independent calls requested together: run them concurrently
+                # Repeated calls are answered from their earlier result, not run again
+                fresh = [call for call in calls if not detector.seen(*call)]
+                fresh_results = (yield ToolCalls(fresh, self.max_parallel_tools)) if fresh else []
+                results = detector.merge(iteration, calls, fresh, fresh_results)
+                for (call_name, call_params), tool_result in zip(calls, results):
+                    self._display_tool_execution(call_name, call_params, tool_result)
+                    scratchpad.add(iteration, call_name, call_params, tool_result)
+                self._warn_if_forced(detector)
+                if checkpointer is not None:
+                    yield Blocking(checkpointer.save, iteration, None, {"confidence": last_confidence})
+                continue
+            if calls:
+                tool_name, params = calls[0]
             
             if tool_name == "None" or not tool_name:
                 if final_response and final_response != "None":
                     # Add to memory
                     if self.memory is not None:
-                        self.memory.add_ai_message(final_response)
+                        yield MemoryCall("add_ai_message", final_response)
                     
                     # Check confidence and warn if verbose
                     if confidence < self.min_confidence and self.verbose:
@@ -311,32 +745,37 @@ class Create_Deep_Reasoning_Tool_Calling_Agent:
                         print(f"{Colors.GREEN}{'═' * 70}{Colors.ENDC}")
                         print(f"\n{final_response}\n")
                     
+                    self.loop_stats.record(detector, iteration, max_iterations)
                     return final_response
             
             # Execute tool
-            params = components.get("tool_parameters", {})
-            
-            if tool_name and tool_name != "None":
-                tool_result = Tool_Executor(tool_name, params, self.tools)
+            if tool_name and tool_name != "None" and detector.seen(tool_name, params):
+                # Same tool, same parameters: reuse the earlier result
+                tool_result = detector.repeat(tool_name, params)
                 self._display_tool_execution(tool_name, params, tool_result)
+            elif tool_name and tool_name != "None":
+                if early_dispatch is not None and early_dispatch.matches(tool_name, params):
+                    tool_result = yield ToolCall(tool_name, params, early_dispatch)
+                else:
+                    tool_result = yield ToolCall(tool_name, params)
+                self._display_tool_execution(tool_name, params, tool_result)
+                detector.record(iteration, tool_name, params, tool_result)
             else:
                 tool_result = "No tool called"
+                detector.record(iteration, tool_name, params, tool_result)
             
             # Update scratchpad with detailed result
-            scratchpad += f"\n\n{'─' * 70}\n"
-            scratchpad += f"PREVIOUS ACTION (Iteration {iteration}):\n"
-            if tool_name and tool_name != "None":
-                scratchpad += f"Tool Used: {tool_name}\n"
-                scratchpad += f"Parameters: {params}\n"
-                scratchpad += f"Result: {tool_result}\n"
-            scratchpad += f"{'─' * 70}\n\n"
-            scratchpad += "Based on the above result, reason about your NEXT action:\n"
-            scratchpad += "- What did you learn from this result?\n"
-            scratchpad += "- Does it match your expectation?\n"
-            scratchpad += "- What do you need to do NOW?\n"
-            scratchpad += "- Can you provide the final answer, or do you need more information?\n\n"
-        
-        error_msg = f"Reasoning exceeded maximum iterations ({max_iterations}). Last confidence: {last_confidence}"
+            scratchpad.add(iteration, tool_name, params, tool_result)
+            self._warn_if_forced(detector)
+            if checkpointer is not None:
+                yield Blocking(checkpointer.save, iteration, None, {"confidence": last_confidence})
+        
+        self.loop_stats.record(detector, iteration, max_iterations)
+        if detector.forced:
+            error_msg = (f"Reasoning stopped: tool calls kept repeating without new information "
+                         f"after {iteration} iterations. Last confidence: {last_confidence}")
+        else:
+            error_msg = f"Reasoning exceeded maximum iterations ({max_iterations}). Last confidence: {last_confidence}"
         if self.verbose:
             print(f"{Colors.RED}✗ {error_msg}{Colors.ENDC}")
         return error_msg
@@ -180,6 +180,23 @@ Remember:
 
 """
 
+PARALLEL_TOOLS_PROMPT = """
+PARALLEL TOOL CALLS:
+When your plan needs several tool calls that do NOT depend on each other's results
+(e.g., looking up three different topics), you may request them in a single step by
+adding one extra key to your JSON:
+
+    "Tool Calls": [
+        {{"Tool call": "tool_name", "Tool Parameters": {{"param": "value"}}}},
+        {{"Tool call": "other_tool", "Tool Parameters": {{"param": "value"}}}}
+    ]
+
+- Set "Tool call" to "None" and "Final Response" to "None" when you use "Tool Calls"
+- All results come back together in the next step
+- If one call needs another's result, make them one at a time instead
+
+"""
+
 SUFFIX_PROMPT = """
 Now, apply your advanced reasoning to this query:
 
@@ -1,8 +1,22 @@
-import re
-import json
 from typing import Optional
-from .prompt import PREFIX_PROMPT, LOGIC_PROMPT, SUFFIX_PROMPT
-from core.adapter import Tool_Executor
+from .prompt import PREFIX_PROMPT, LOGIC_PROMPT, PARALLEL_TOOLS_PROMPT, SUFFIX_PROMPT
+from core.runner import (Blocking, Emit, MemoryCall, ToolCall, ToolCalls, run_async, run_sync,
+                         stream_async, stream_sync, with_memory)
+from core.events import IterationStart
+from core.batch import arun_batch, run_batch
+from memory.session_manager import SessionMemoryManager
+from core.tool_calls import collect_tool_calls
+from core.tool_cache import make_tool_cache
+from core.tool_policy import make_tool_policy
+from core.tool_schema import inspect_tool
+from core.result_store import READ_RESULT_TOOL, ResultStore, make_read_result_tool
+from core.prompt_template import CompiledPromptTemplate, format_tool_list
+from core.scratchpad import Scratchpad
+from core.compaction import CompactionState, call_with_compaction, default_compaction_strategies
+from core.loop_detector import LoopDetector, LoopStats
+from core.json_extract import JSONExtractionError, extract_json, fix_json_response
+from core.tracing import Tracer, span, trace_steps
+from core.checkpoint import RunCheckpointer, agent_kind, load_checkpoint
 
 
 class Colors:
@@ -29,6 +43,21 @@ class Create_ToolCalling_Agent:
         verbose: bool = False,
         prompt: Optional[str] = None,
         memory = None,
+        early_tool_dispatch: bool = False,
+        parallel_tool_calls: bool = False,
+        max_parallel_tools: int = 4,
+        scratchpad_token_budget: Optional[int] = None,
+        keep_recent_steps: int = 3,
+        scratchpad_summarizer = None,
+        max_tool_output_chars: Optional[int] = None,
+        sessions: Optional[SessionMemoryManager] = None,
+        max_iterations: int = 10,
+        loop_detection: bool = True,
+        max_repeated_calls: int = 2,
+        max_stalled_steps: Optional[int] = None,
+        json_fix_attempts: int = 1,
+        tracer: Optional[Tracer] = None,
+        checkpoint_store = None,
     ) -> None:
         """
         Initialize ToolCallAgent with an LLM object.
@@ -43,6 +72,39 @@ class Create_ToolCalling_Agent:
                    If not provided, uses default agent introduction.
             memory: Optional memory object (ConversationalBufferMemory, ConversationalWindowMemory, etc.)
                    from the memory module. If provided, conversation history will be maintained.
+            early_tool_dispatch: If True and the LLM has a generate_response_stream(prompt) method,
+                   stream the response and start the tool as soon as "Tool call" and
+                   "Tool Parameters" are complete, overlapping tool execution with generation.
+                   Repeated calls are not dispatched early; a call the final parse does not
+                   confirm has still run, so use it only with tools safe to run speculatively.
+            parallel_tool_calls: If True, allow the model to request several independent tools
+                   in one step with a "Tool Calls" list; they run concurrently and all results
+                   are fed back together.
+            max_parallel_tools: Maximum number of tools running at once for "Tool Calls"
+            scratchpad_token_budget: Token budget for previous tool calls in the prompt. When exceeded,
+                   all but the most recent calls are condensed to one-line observations (None = unbounded)
+            keep_recent_steps: Most recent tool calls kept verbatim under the budget
+            scratchpad_summarizer: Optional function condensing a tool call to one line, e.g.
+                   core.llm_step_summarizer(cheap_llm); rule-based by default
+            max_tool_output_chars: Output budget for every tool (None = unlimited). Longer results
+                   are truncated and stored; the agent gets a read_result tool to page through them
+            sessions: SessionMemoryManager used by invoke(query, session_id=...) to keep one
+                   memory per session (default: a ConversationalBufferMemory per session)
+            max_iterations: Maximum reasoning iterations per run (overridable per call)
+            loop_detection: Answer repeated tool calls (same tool, same parameters) from the
+                   earlier result instead of running them again, and force a final answer once
+                   the agent keeps repeating calls or getting no new information
+            max_repeated_calls: Repeated calls tolerated before a final answer is forced
+            max_stalled_steps: Consecutive steps without new information before a final
+                   answer is forced (None = off; different calls may legitimately return
+                   the same result)
+            json_fix_attempts: When a response is not valid JSON even after automatic repair,
+                   how many times to send just the broken JSON back to the model to fix (0 = fail)
+            tracer: Optional core.tracing.Tracer recording a span tree (LLM, parse, tool and
+                   memory timings, token counts) for every run
+            checkpoint_store: Optional store (core.InMemoryCheckpointStore, core.SQLiteCheckpointStore)
+                   where runs invoked with a run_id save their state after every step, so an
+                   interrupted run can be continued with resume(run_id)
         
         Example:
             # Without custom prompt (uses default)
@@ -61,6 +123,31 @@ class Create_ToolCalling_Agent:
         self.llm = llm
         self.verbose = verbose
         self.memory = memory
+        self.early_tool_dispatch = early_tool_dispatch
+        self.parallel_tool_calls = parallel_tool_calls
+        self.max_parallel_tools = max_parallel_tools
+        self.scratchpad_token_budget = scratchpad_token_budget
+        self.keep_recent_steps = keep_recent_steps
+        self.scratchpad_summarizer = scratchpad_summarizer
+        self.max_tool_output_chars = max_tool_output_chars
+        # Per-session memories for invoke(query, session_id=...); self.memory is not used then
+        self.sessions = sessions if sessions is not None else SessionMemoryManager()
+        self.max_iterations = max_iterations
+        self.loop_detection = loop_detection
+        self.max_repeated_calls = max_repeated_calls
+        self.max_stalled_steps = max_stalled_steps
+        self.json_fix_attempts = json_fix_attempts
+        # Repeated calls and iterations saved by loop detection, over all runs
+        self.loop_stats = LoopStats()
+        # Span tree of every run (None = not traced, no overhead)
+        self.tracer = tracer
+        # Loop state of runs invoked with a run_id, for resume()
+        self.checkpoint_store = checkpoint_store
+        # Full text of outputs cut to their budget, read back with the read_result tool
+        self.result_store = ResultStore()
+        logic_prompt = LOGIC_PROMPT + (PARALLEL_TOOLS_PROMPT if parallel_tool_calls else "")
+        # Applied in order when a prompt exceeds the model's context window
+        self.compaction_strategies = default_compaction_strategies()
         
         # If user provides custom prompt (agent introduction), use it instead of PREFIX
         # Otherwise use default PREFIX_PROMPT
@@ -69,39 +156,38 @@ class Create_ToolCalling_Agent:
             if verbose:
                 print(f"{Colors.YELLOW}⚠{Colors.ENDC} Using custom agent introduction. "
                       f"Only provide agent personality/role - tool instructions are added automatically.")
-            self.prompt_template = prompt + "\n\n" + LOGIC_PROMPT + SUFFIX_PROMPT
+            self.prompt_template = prompt + "\n\n" + logic_prompt + SUFFIX_PROMPT
             self.custom_prompt = True
         else:
-            self.prompt_template = PREFIX_PROMPT + LOGIC_PROMPT + SUFFIX_PROMPT
+            self.prompt_template = PREFIX_PROMPT + logic_prompt + SUFFIX_PROMPT
             self.custom_prompt = False
+        # Built lazily from prompt_template and the tools; reset by add_tool()
+        self._compiled_prompt = None
         
     def _parser(self, response):
         """
         Parse the LLM response to extract tool call, parameters, and final response.
         
         Args:
-            response: Raw response string from LLM containing JSON block
+            response: Raw response string from LLM containing a JSON object
             
         Returns:
-            tuple: (tool_call_dict, tool_parameters_dict, final_response_dict)
+            tuple: (tool_call_dict, tool_parameters_dict, final_response_dict, tool_calls_dict)
+            
+        Raises:
+            JSONExtractionError: If no JSON object can be decoded from the response
         """
-        # Extract JSON block with ```json or '''json markers
-        json_match = re.search(r"```json\s*(\{.*?\})\s*```", response, re.DOTALL)
-        if not json_match:
-            json_match = re.search(r"'''json\s*(\{.*?\})\s*'''", response, re.DOTALL)
-        
-        if not json_match:
-            raise ValueError(f"Invalid response format: No JSON block found in response: {response[:200]}")
-        
-        # Parse the single JSON object containing all three keys
-        parsed_json = json.loads(json_match.group(1))
+        # Parse the single JSON object containing all three keys (fenced or not, repairing common mistakes)
+        parsed_json = extract_json(response)
         
         # Create separate dicts for each component
         tool_call = {"Tool call": parsed_json.get("Tool call", "None")}
         tool_parameters = {"Tool Parameters": parsed_json.get("Tool Parameters", "None")}
         final_response = {"Final Response": parsed_json.get("Final Response", "None")}
+        # Optional list of independent calls (parallel_tool_calls)
+        tool_calls = {"Tool Calls": parsed_json.get("Tool Calls", [])}
         
-        return tool_call, tool_parameters, final_response
+        return tool_call, tool_parameters, final_response, tool_calls
         
     
     def add_llm(self, llm):
@@ -139,7 +225,9 @@ class Create_ToolCalling_Agent:
             return self.memory.get_history()
         return []
     
-    def add_tool(self, name, description, function):
+    def add_tool(self, name, description, function, cacheable=False, ttl=None,
+                 max_entries=1024, key_fn=None, cache=None, timeout=None,
+                 run_in="inline", max_concurrency=None, max_output_chars=None):
         """
         Add a tool that the agent can use.
         
@@ -147,11 +235,91 @@ class Create_ToolCalling_Agent:
             name: Tool name
             description: Description of what the tool does
             function: Callable function to execute
+            cacheable: Serve repeated calls with the same arguments from a cache
+                       (only for deterministic tools)
+            ttl: Seconds a cached result stays valid (None = until evicted)
+            max_entries: Maximum number of cached results (least recently used are evicted)
+            key_fn: Optional function (args, kwargs) -> key to normalize cache keys
+            cache: Existing core.tool_cache.ToolCache to use, e.g. shared between agents
+                   or persisted with ToolCache(path=...); implies cacheable
+            timeout: Seconds before a call is abandoned; the agent then receives a
+                     ToolError dict ({"error": "timeout", ...}) instead of a result
+            run_in: "inline" (default), "thread" or "process" (warm process pool for
+                    CPU-bound tools; the function must be picklable)
+            max_concurrency: Maximum calls of this tool running at once
+            max_output_chars: Output budget for this tool (overrides max_tool_output_chars);
+                              longer results are truncated and readable with the read_result tool
         """
         self.tools[name] = {
             "description": description,
-            "function": function
+            "function": function,
+            # Parameters and type hints, inspected once: typed binding and the prompt schema
+            "signature": inspect_tool(function),
+            "cache": make_tool_cache(cacheable, ttl, max_entries, key_fn, cache),
+            "policy": make_tool_policy(timeout, run_in, max_concurrency),
+            "max_output_chars": max_output_chars,
         }
+        if (max_output_chars or self.max_tool_output_chars) and READ_RESULT_TOOL not in self.tools:
+            self.tools[READ_RESULT_TOOL] = make_read_result_tool(self.result_store)
+        self._compiled_prompt = None
+    
+    def tool_cache_stats(self):
+        """
+        Get cache counters for every cached tool.
+        
+        Returns:
+            Dict mapping tool name to {"hits", "misses", "evictions", "size"}
+        """
+        return {name: info["cache"].stats() for name, info in self.tools.items()
+                if info.get("cache") is not None}
+    
+    def tool_schemas(self):
+        """
+        Get the JSON schema of every tool, derived from its signature and type hints.
+        
+        Returns:
+            Dict mapping tool name to {"description", "parameters"} (parameters is None
+            for tools whose signature cannot be inspected)
+        """
+        return {name: {"description": info["description"],
+                       "parameters": info["signature"].json_schema() if info.get("signature") else None}
+                for name, info in self.tools.items()}
+    
+    def _get_compiled_prompt(self):
+        """Prompt template with the tool list filled in, rebuilt only after add_tool() or a prompt change."""
+        compiled = self._compiled_prompt
+        if compiled is None or compiled.source is not self.prompt_template:
+            compiled = CompiledPromptTemplate(self.prompt_template, tool_list=format_tool_list(self.tools))
+            self._compiled_prompt = compiled
+        return compiled
+    
+    def add_compaction_strategy(self, strategy):
+        """
+        Add a strategy used to shrink the prompt when it exceeds the context window.
+        
+        Args:
+            strategy: Callable taking a core.compaction.CompactionState, shrinking it
+                      in place and returning True if it removed anything
+        """
+        self.compaction_strategies.append(strategy)
+    
+    # Rendered once after the previous tool calls
+    SCRATCHPAD_FOOTER = "\n\nNow provide the final response to the user based on this result."
+    
+    def _format_step(self, step):
+        """Format one scratchpad step for the prompt."""
+        return f"\n\n--- Previous Tool Call ---\nTool Used: {step.tool_name}\nResult: {step.result}"
+    
+    def _parse_with_fix(self, response):
+        """Parse a response; if its JSON is beyond repair, ask the model to fix just that JSON."""
+        try:
+            with span("parse", "parse"):
+                return self._parser(response)
+        except JSONExtractionError as e:
+            if not self.json_fix_attempts:
+                raise
+            self._log("Malformed JSON in response; asking the model to fix it", "warning")
+            return (yield Blocking(fix_json_response, self.llm, self._parser, e, self.json_fix_attempts))
     
     def _log(self, message, level="info"):
         """Print message if verbose mode is enabled with colors."""
@@ -165,40 +333,230 @@ class Create_ToolCalling_Agent:
             elif level == "warning":
                 print(f"{Colors.YELLOW}⚠{Colors.ENDC} {message}")
     
-    def invoke(self, query):
+    def invoke(self, query, session_id=None, max_iterations=None, run_id=None):
         """
         Execute the agent with a user query.
         
         Args:
             query: User's question or request
+            session_id: Optional session ID; the conversation is kept in that session's
+                        memory (see sessions) instead of self.memory, and concurrent
+                        calls for the same session run one at a time
+            max_iterations: Optional iteration limit for this call (default: self.max_iterations)
+            run_id: Optional run ID; with a checkpoint_store the run is checkpointed under
+                    it after every step and can be continued with resume(run_id)
+            
+        Returns:
+            Final response from the agent
+        """
+        if session_id is not None:
+            with self.sessions.session(session_id) as memory:
+                view = with_memory(self, memory)
+                return run_sync(view, view._steps(query, max_iterations, run_id))
+        return run_sync(self, self._steps(query, max_iterations, run_id))
+    
+    async def ainvoke(self, query, session_id=None, max_iterations=None, run_id=None):
+        """
+        Execute the agent with a user query without blocking the event loop.
+        
+        LLM calls are awaited if the LLM has an agenerate_response(prompt) coroutine
+        (otherwise they run in a worker thread), async def tools are awaited natively,
+        sync tools run in a worker thread, and memory objects with async methods
+        are awaited.
+        
+        Args:
+            query: User's question or request
+            session_id: Optional session ID (see invoke())
+            max_iterations: Optional iteration limit for this call
+            run_id: Optional run ID to checkpoint the run under (see invoke())
             
         Returns:
             Final response from the agent
         """
+        if session_id is not None:
+            async with self.sessions.asession(session_id) as memory:
+                view = with_memory(self, memory)
+                return await run_async(view, view._steps(query, max_iterations, run_id))
+        return await run_async(self, self._steps(query, max_iterations, run_id))
+    
+    def invoke_stream(self, query, session_id=None, max_iterations=None, run_id=None):
+        """
+        Execute the agent, yielding events as the run progresses.
+        
+        Events (core.events): IterationStart, ReasoningField, ToolStart, ToolEnd
+        (with elapsed seconds), FinalResponseDelta (text of the final answer as it
+        streams, if the LLM has generate_response_stream) and finally FinalResponse.
+        
+        Args:
+            query: User's question or request
+            session_id: Optional session ID (see invoke()); the session stays locked
+                        until the stream is exhausted or closed
+            max_iterations: Optional iteration limit for this call
+            run_id: Optional run ID to checkpoint the run under (see invoke())
+            
+        Yields:
+            Agent events; the last one is FinalResponse(text)
+        
+        Example:
+            for event in agent.invoke_stream("What is 12 * 7?"):
+                if event.type == "final_response_delta":
+                    print(event.text, end="", flush=True)
+        """
+        if session_id is not None:
+            def events():
+                with self.sessions.session(session_id) as memory:
+                    view = with_memory(self, memory)
+                    yield from stream_sync(view, view._steps(query, max_iterations, run_id))
+            return events()
+        return stream_sync(self, self._steps(query, max_iterations, run_id))
+    
+    def ainvoke_stream(self, query, session_id=None, max_iterations=None, run_id=None):
+        """
+        Async version of invoke_stream(); use with ``async for``.
+        
+        Args:
+            query: User's question or request
+            session_id: Optional session ID (see invoke_stream())
+            max_iterations: Optional iteration limit for this call
+            run_id: Optional run ID to checkpoint the run under (see invoke())
+            
+        Returns:
+            Async iterator of agent events; the last one is FinalResponse(text)
+        """
+        if session_id is not None:
+            async def events():
+                async with self.sessions.asession(session_id) as memory:
+                    view = with_memory(self, memory)
+                    async for event in stream_async(view, view._steps(query, max_iterations, run_id)):
+                        yield event
+            return events()
+        return stream_async(self, self._steps(query, max_iterations, run_id))
+    
+    def resume(self, run_id, session_id=None):
+        """
+        Continue a checkpointed run from its last checkpoint.
+        
+        Completed iterations are not repeated: earlier tool results come from the
+        checkpoint, and an LLM response whose tool had not finished is used again
+        instead of asking the model a second time.
+        
+        Args:
+            run_id: ID the run was invoked with
+            session_id: Session ID the run was invoked with, if any
+            
+        Returns:
+            Final response from the agent (returned directly if the run had finished)
+            
+        Raises:
+            ValueError: If there is no checkpoint for run_id
+        """
+        checkpoint = load_checkpoint(self.checkpoint_store, run_id, agent_kind(self))
+        if checkpoint["status"] == "done":
+            return checkpoint["result"]
+        query, max_iterations = checkpoint["query"], checkpoint["max_iterations"]
+        if session_id is not None:
+            with self.sessions.session(session_id) as memory:
+                view = with_memory(self, memory)
+                return run_sync(view, view._steps(query, max_iterations, run_id, checkpoint))
+        return run_sync(self, self._steps(query, max_iterations, run_id, checkpoint))
+    
+    async def aresume(self, run_id, session_id=None):
+        """
+        Async version of resume().
+        
+        Args:
+            run_id: ID the run was invoked with
+            session_id: Session ID the run was invoked with, if any
+            
+        Returns:
+            Final response from the agent (returned directly if the run had finished)
+        """
+        checkpoint = load_checkpoint(self.checkpoint_store, run_id, agent_kind(self))
+        if checkpoint["status"] == "done":
+            return checkpoint["result"]
+        query, max_iterations = checkpoint["query"], checkpoint["max_iterations"]
+        if session_id is not None:
+            async with self.sessions.asession(session_id) as memory:
+                view = with_memory(self, memory)
+                return await run_async(view, view._steps(query, max_iterations, run_id, checkpoint))
+        return await run_async(self, self._steps(query, max_iterations, run_id, checkpoint))
+    
+    def batch(self, queries, max_concurrency=4, memory_factory=None, keys=None):
+        """
+        Run many independent queries concurrently through this agent.
+        
+        Each query gets its own memory from memory_factory (the agent's own memory
+        is not used), while the LLM, tools and compiled prompt are shared.
+        
+        Args:
+            queries: List of user queries
+            max_concurrency: Maximum queries running at once
+            memory_factory: Optional zero-argument callable creating a memory per query
+                            (or per key), e.g. ConversationalBufferMemory
+            keys: Optional key per query; queries with the same key share one memory
+                  and run in order, like turns of one conversation
+            
+        Returns:
+            core.batch.BatchResult: items in query order (output, error, elapsed),
+            .outputs and aggregate .stats
+        
+        Example:
+            result = agent.batch(["What is 2+2?", "What is 3*3?"], max_concurrency=8)
+            print(result.outputs, result.stats["p95_seconds"])
+        """
+        return run_batch(self, queries, max_concurrency, memory_factory, keys)
+    
+    async def abatch(self, queries, max_concurrency=4, memory_factory=None, keys=None):
+        """
+        Async version of batch(); queries run concurrently on the event loop.
+        
+        Args:
+            queries: List of user queries
+            max_concurrency: Maximum queries running at once
+            memory_factory: Optional zero-argument callable creating a memory per query (or per key)
+            keys: Optional key per query; queries with the same key share one memory and run in order
+            
+        Returns:
+            core.batch.BatchResult
+        """
+        return await arun_batch(self, queries, max_concurrency, memory_factory, keys)
+    
+    def _steps(self, query, max_iterations=None, run_id=None, checkpoint=None):
+        """Effects of one run: the agent loop, checkpointed and traced when configured."""
+        checkpointer = None
+        if self.checkpoint_store is not None and run_id is not None:
+            checkpointer = RunCheckpointer(
+                self.checkpoint_store, run_id, query, max_iterations or self.max_iterations,
+                agent_kind(self), checkpoint,
+            )
+        steps = self._loop(query, max_iterations, checkpointer)
+        if checkpointer is not None:
+            steps = checkpointer.track(steps)
+        if self.tracer is None:
+            return steps
+        return trace_steps(self.tracer, steps, self, query=query)
+    
+    def _loop(self, query, max_iterations=None, checkpointer=None):
+        """Agent loop shared by invoke() and ainvoke(); yields core.runner effects."""
         if self.llm is None:
             raise ValueError("LLM not set. Call add_llm() first")
         
         if not self.tools:
             raise ValueError("No tools added. Call add_tool() at least once")
         
+        # A resumed run already did this; its context comes from the checkpoint
+        resumed = checkpointer is not None and checkpointer.resumed
+        
         # Add user query to memory if available
-        if self.memory is not None:
-            self.memory.add_user_message(query)
+        if self.memory is not None and not resumed:
+            yield MemoryCall("add_user_message", query)
             self._log("Added user message to memory", "info")
         
-        # Compile prompt inline
-        tool_list = "\n".join(
-            [f"        - {name}: {info['description']}" 
-             for name, info in self.tools.items()]
-        )
-        compiled_prompt = self.prompt_template.replace("{tool_list}", tool_list)
-        
         # Add memory context if available
         memory_context = ""
-        if self.memory is not None:
-            context = self.memory.get_context()
-            if context:
-                memory_context = f"\n\n--- Conversation History ---\n{context}\n--- End History ---\n"
+        if self.memory is not None and not resumed:
+            memory_context = yield MemoryCall("get_context")
+            if memory_context:
                 self._log("Including conversation history", "info")
         
         if self.verbose:
@@ -206,20 +564,60 @@ class Create_ToolCalling_Agent:
             print(f"{Colors.BOLD}{Colors.CYAN}Starting ToolCalling Agent{Colors.ENDC}")
             print(f"{Colors.CYAN}{'─' * 70}{Colors.ENDC}\n")
         
-        prompt = compiled_prompt.format(user_input=query) + memory_context
-        scratchpad = ""
-        max_iterations = 10  # Prevent infinite loops
-        iteration = 0
+        base_prompt = self._get_compiled_prompt().render(user_input=query)
+        scratchpad = Scratchpad(
+            self._format_step,
+            self.SCRATCHPAD_FOOTER,
+            token_budget=self.scratchpad_token_budget,
+            keep_recent=self.keep_recent_steps,
+            summarize_step=self.scratchpad_summarizer,
+            model=getattr(self.llm, "model", None),
+        )
+        state = CompactionState(scratchpad, memory_context, self.llm)
+        
+        def build_prompt():
+            prompt = base_prompt
+            if state.memory_context:
+                prompt += f"\n\n--- Conversation History ---\n{state.memory_context}\n--- End History ---\n"
+            steps = scratchpad.render()
+            prompt = f"{prompt}\n{steps}" if steps else prompt
+            return prompt + detector.prompt_note()
+        
+        def on_compact(applied):
+            self._log(f"Prompt exceeded the context window; compacted with {', '.join(applied)}", "warning")
+        
+        def may_dispatch(tool_name, params):
+            # Early dispatch must only start calls this loop would execute
+            return not detector.forced and not detector.seen(tool_name, params)
+        
+        max_iterations = max_iterations or self.max_iterations
+        detector = LoopDetector(self.max_repeated_calls, self.max_stalled_steps, enabled=self.loop_detection)
+        iteration, pending_response = 0, None
+        if checkpointer is not None:
+            # Restore the scratchpad, context and loop state of a resumed run
+            iteration, pending_response, _ = checkpointer.bind(state, detector)
         
         while iteration < max_iterations:
             iteration += 1
+            yield Emit(IterationStart(iteration))
             
-            # Get LLM response
-            full_prompt = f"{prompt}\n{scratchpad}" if scratchpad else prompt
-            response = self.llm.generate_response(full_prompt)
+            if self.scratchpad_summarizer is not None:
+                # Condense older steps (may call a model) before building the prompt
+                yield Blocking(scratchpad.prepare)
+            
+            # Get LLM response (compacting and retrying once on context overflow)
+            if pending_response is not None:
+                # Received before the run was interrupted: not requested again
+                response, early_dispatch, pending_response = pending_response, None, None
+            else:
+                (response, early_dispatch), _ = yield from call_with_compaction(
+                    build_prompt, state, self.compaction_strategies, on_compact, may_dispatch
+                )
+                if checkpointer is not None:
+                    yield Blocking(checkpointer.save, iteration - 1, response)
             
             try:
-                tool_call, tool_params, final_response = self._parser(response)
+                tool_call, tool_params, final_response, tool_calls = yield from self._parse_with_fix(response)
             except Exception as e:
                 error_msg = f"Error parsing response: {str(e)}"
                 self._log(error_msg, "error")
@@ -227,36 +625,82 @@ class Create_ToolCalling_Agent:
             
             # Check if agent wants to provide final response
             tool_name = tool_call.get("Tool call")
+            params = tool_params.get("Tool Parameters")
+            
+            calls = collect_tool_calls(tool_name, params, tool_calls.get("Tool Calls"))
+            if calls and detector.forced:
+                # Told to answer and still calling tools: stop instead of looping on
+                break
+            if len(calls) > 1:
+                # Independent calls requested together: run them concurrently
+                if self.verbose:
+                    for call_name, call_params in calls:
+                        print(f"{Colors.YELLOW}🔧 Tool:{Colors.ENDC} {Colors.BOLD}{call_name}{Colors.ENDC}")
+                        print(f"{Colors.YELLOW}📝 Params:{Colors.ENDC} {call_params}")
+                    self._log(f"Running {len(calls)} tool calls in parallel", "info")
+                
+                # Repeated calls are answered from their earlier result, not run again
+                fresh = [call for call in calls if not detector.seen(*call)]
+                fresh_results = (yield ToolCalls(fresh, self.max_parallel_tools)) if fresh else []
+                results = detector.merge(iteration, calls, fresh, fresh_results)
+                
+                for (call_name, call_params), tool_result in zip(calls, results):
+                    if self.verbose:
+                        print(f"{Colors.GREEN}📤 Result ({call_name}):{Colors.ENDC} {tool_result}\n")
+                    scratchpad.add(iteration, call_name, call_params, tool_result)
+                if detector.should_force_final():
+                    self._log("Tool calls are repeating; asking for the final response", "warning")
+                if checkpointer is not None:
+                    yield Blocking(checkpointer.save, iteration)
+                continue
+            if calls:
+                tool_name, params = calls[0]
             
             if tool_name == "None" or not tool_name:
                 final_answer = final_response.get("Final Response", "No response provided")
                 
                 # Add AI response to memory if available
                 if self.memory is not None:
-                    self.memory.add_ai_message(final_answer)
+                    yield MemoryCall("add_ai_message", final_answer)
                     self._log("Added AI response to memory", "info")
                 
                 if self.verbose:
                     print(f"\n{Colors.GREEN}{Colors.BOLD}Final Response:{Colors.ENDC}")
                     print(f"{Colors.GREEN}▸{Colors.ENDC} {final_answer}\n")
                 
+                self.loop_stats.record(detector, iteration, max_iterations)
                 return final_answer
             
             # Execute tool
-            params = tool_params.get("Tool Parameters")
-            
             if self.verbose:
                 print(f"{Colors.YELLOW}🔧 Tool:{Colors.ENDC} {Colors.BOLD}{tool_name}{Colors.ENDC}")
                 print(f"{Colors.YELLOW}📝 Params:{Colors.ENDC} {params}")
             
-            tool_result = Tool_Executor(tool_name, params, self.tools)
+            if detector.seen(tool_name, params):
+                tool_result = detector.repeat(tool_name, params)
+                self._log(f"Repeated call to {tool_name}; reusing the earlier result", "warning")
+            else:
+                if early_dispatch is not None and early_dispatch.matches(tool_name, params):
+                    tool_result = yield ToolCall(tool_name, params, early_dispatch)
+                    self._log("Tool was dispatched early while the response streamed", "info")
+                else:
+                    tool_result = yield ToolCall(tool_name, params)
+                detector.record(iteration, tool_name, params, tool_result)
             
             if self.verbose:
                 print(f"{Colors.GREEN}📤 Result:{Colors.ENDC} {tool_result}\n")
             
             # Update scratchpad with tool result for next iteration
-            scratchpad += f"\n\n--- Previous Tool Call ---\nTool Used: {tool_name}\nResult: {tool_result}\n\nNow provide the final response to the user based on this result."
+            scratchpad.add(iteration, tool_name, params, tool_result)
+            if detector.should_force_final():
+                self._log("Tool calls are repeating; asking for the final response", "warning")
+            if checkpointer is not None:
+                yield Blocking(checkpointer.save, iteration)
         
-        error_msg = "Error: Maximum iterations reached"
+        self.loop_stats.record(detector, iteration, max_iterations)
+        if detector.forced:
+            error_msg = "Error: Agent kept repeating tool calls without reaching a final answer"
+        else:
+            error_msg = "Error: Maximum iterations reached"
         self._log(error_msg, "error")
-        return error_msg
\ No newline at end of file
+        return error_msg
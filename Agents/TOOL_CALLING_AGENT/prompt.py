@@ -68,6 +68,32 @@ Rules:
 
 """
 
+PARALLEL_TOOLS_PROMPT = """
+Parallel tool calls:
+    When you need several tool calls that do not depend on each other's results
+    (for example, looking up three different topics), you may request them all at once
+    with one extra key:
+    "Tool Calls" — a list of objects, each with its own "Tool call" and "Tool Parameters".
+        Set "Tool call", "Tool Parameters" and "Final Response" to "None" when you use it.
+        All results are returned to you together in the next step.
+    Only use "Tool Calls" for independent calls. If a call needs the result of another,
+    make them one at a time.
+
+Example - Independent tool calls in one step:
+```json
+{{
+    "Tool call": "None",
+    "Tool Parameters": "None",
+    "Tool Calls": [
+        {{"Tool call": "wikipedia_summary", "Tool Parameters": {{"title": "Python (programming language)"}}}},
+        {{"Tool call": "wikipedia_summary", "Tool Parameters": {{"title": "Rust (programming language)"}}}}
+    ],
+    "Final Response": "None"
+}}
+```
+
+"""
+
 SUFFIX_PROMPT = """
 Let's begin!
 
@@ -192,12 +192,18 @@ class WikipediaTool:
         except Exception as e:
             return f"Error: {str(e)}"
     
-    def add_to_agent(self, agent) -> None:
+    def add_to_agent(self, agent, cache_ttl: Optional[float] = None,
+                     content_max_chars: Optional[int] = 8000) -> None:
         """
         Add all Wikipedia tools to a Codemni agent.
         
         Args:
             agent: A Codemni agent instance (ToolCallingAgent, etc.)
+            cache_ttl: If set, cache lookups for this many seconds so repeated
+                       questions about the same article skip the network
+            content_max_chars: Output budget for wikipedia_content. Longer articles are
+                       truncated and the agent pages through the rest with read_result
+                       (None = no limit)
             
         Example:
             >>> from Agents.TOOL_CALLING_AGENT import Create_ToolCalling_Agent
@@ -211,39 +217,47 @@ class WikipediaTool:
             >>> 
             >>> response = agent.invoke("Tell me about quantum computing")
         """
+        cache_options = {"cacheable": True, "ttl": cache_ttl} if cache_ttl else {}
+        
         # Add wikipedia_search tool
         agent.add_tool(
             name="wikipedia_search",
-            description="Search Wikipedia for articles. Returns a list of article titles matching the search query. Use this to find relevant Wikipedia pages. Parameters: query (str), results (int, default=10)",
-            function=self.search
+            description="Search Wikipedia for articles. Returns a list of article titles matching the search query. Use this to find relevant Wikipedia pages.",
+            function=self.search,
+            **cache_options
         )
         
         # Add wikipedia_summary tool
         agent.add_tool(
             name="wikipedia_summary",
-            description="Get a summary of a Wikipedia article. Provide the article title to get a concise summary (default 3 sentences). Use this for quick information retrieval. Parameters: title (str), sentences (int, default=3)",
-            function=self.get_summary
+            description="Get a summary of a Wikipedia article. Provide the article title to get a concise summary (default 3 sentences). Use this for quick information retrieval.",
+            function=self.get_summary,
+            **cache_options
         )
         
         # Add wikipedia_content tool
         agent.add_tool(
             name="wikipedia_content",
-            description="Get the full content of a Wikipedia article. Provide the article title to retrieve complete article text. Use this when you need detailed information. Parameters: title (str)",
-            function=self.get_page_content
+            description="Get the full content of a Wikipedia article. Provide the article title to retrieve complete article text. Use this when you need detailed information.",
+            function=self.get_page_content,
+            max_output_chars=content_max_chars,
+            **cache_options
         )
         
         # Add wikipedia_info tool
         agent.add_tool(
             name="wikipedia_info",
-            description="Get detailed information about a Wikipedia article including title, URL, summary, categories, and links. Use this to get comprehensive metadata about a page. Parameters: title (str)",
-            function=self.get_page_info
+            description="Get detailed information about a Wikipedia article including title, URL, summary, categories, and links. Use this to get comprehensive metadata about a page.",
+            function=self.get_page_info,
+            **cache_options
         )
         
         # Add wikipedia_quick_lookup tool (most convenient)
         agent.add_tool(
             name="wikipedia_quick_lookup",
-            description="Quick Wikipedia lookup that searches and returns a summary in one call. This is the most convenient method - just provide a topic or query and get a summary. Use this for general Wikipedia queries. Parameters: query (str)",
-            function=self.quick_lookup
+            description="Quick Wikipedia lookup that searches and returns a summary in one call. This is the most convenient method - just provide a topic or query and get a summary. Use this for general Wikipedia queries.",
+            function=self.quick_lookup,
+            **cache_options
         )
 
 
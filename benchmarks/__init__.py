@@ -0,0 +1,14 @@
+"""
+Microbenchmarks for the code that runs on every agent request.
+
+Covers agent response parsing, prompt compilation, Tool_Executor argument
+handling, whole agent runs and every memory class at 10, 1k and 100k
+messages. LLMs and tools are scripted fakes, so nothing touches the network.
+
+Run from the repository root:
+    python -m benchmarks                  # run and compare with benchmarks/baseline.json
+    python -m benchmarks -k memory        # only cases whose id contains "memory"
+    python -m benchmarks --save-baseline  # record a new baseline
+
+See "Benchmarks" in the README for the regression checks.
+"""
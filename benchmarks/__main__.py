@@ -0,0 +1,77 @@
+"""
+Command line entry point: ``python -m benchmarks --help``.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from . import bench_agents, bench_memory, bench_tools  # noqa: F401  (register the benchmarks)
+from .harness import BENCHMARKS, compare, format_result, load_baseline, python_info, run_benchmarks, save_baseline
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Run the Codemni microbenchmarks and compare them with a stored baseline.",
+    )
+    parser.add_argument("-k", "--filter", help="only run cases whose id contains this text")
+    parser.add_argument("--max-size", type=int, help="skip sizes above this (e.g. 1000 for a quick run)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="timing budget per case in seconds (default 0.2)")
+    parser.add_argument("--repeats", type=int, default=5, help="timing samples per case (default 5)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline file (default benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results to the baseline file")
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="flag cases whose ops/s dropped by more than this fraction (default 0.5)")
+    parser.add_argument("--alloc-threshold", type=float, default=0.5,
+                        help="flag cases whose peak allocation grew by more than this fraction (default 0.5)")
+    parser.add_argument("--scaling-factor", type=float, default=3.0,
+                        help="flag benchmarks whose large/small size cost ratio grew by more than this factor (default 3)")
+    parser.add_argument("--json", metavar="PATH", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    print(python_info())
+    results = run_benchmarks(
+        BENCHMARKS,
+        name_filter=args.filter,
+        max_size=args.max_size,
+        min_time=args.min_time,
+        repeats=args.repeats,
+        progress=lambda case_id, result: print(format_result(case_id, result), flush=True),
+    )
+    if not results["results"]:
+        print("No benchmark matches the filter")
+        return 2
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+
+    if args.save_baseline:
+        # Keep baseline entries of cases that were not run this time
+        baseline = load_baseline(args.baseline) or {"results": {}}
+        baseline["results"].update(results["results"])
+        results["results"] = baseline["results"]
+        save_baseline(results, args.baseline)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+    regressions = compare(results, baseline, args.threshold, args.alloc_threshold, args.scaling_factor)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    print(f"\nNo regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Agent hot paths: response parsing, prompt compilation and whole runs.
+"""
+
+from Agents import (
+    Create_Deep_Reasoning_Tool_Calling_Agent,
+    Create_Reasoning_ToolCalling_Agent,
+    Create_ToolCalling_Agent,
+)
+from core.prompt_template import CompiledPromptTemplate, format_tool_list
+
+from .fakes import FINAL_RESPONSE, MALFORMED_RESPONSE, TOOL_RESPONSE, ScriptedLLM, add_numbers, calculator
+from .harness import benchmark
+
+AGENTS = {
+    "tool_calling": Create_ToolCalling_Agent,
+    "reasoning": Create_Reasoning_ToolCalling_Agent,
+    "deep_reasoning": Create_Deep_Reasoning_Tool_Calling_Agent,
+}
+
+# Tools registered on every benchmarked agent; more tools mean a longer prompt
+TOOL_COUNTS = (1, 20)
+
+
+def make_agent(kind, tools=1, **kwargs):
+    """Build an agent with a scripted LLM and ``tools`` calculator tools."""
+    if kind == "deep_reasoning":
+        kwargs.setdefault("verbose", False)
+        kwargs.setdefault("show_reasoning", False)
+    agent = AGENTS[kind](llm=ScriptedLLM(), **kwargs)
+    agent.add_tool("calculator", "Evaluate an arithmetic expression", calculator)
+    for i in range(1, tools):
+        agent.add_tool(f"add_{i}", f"Add two integers (variant {i})", add_numbers)
+    return agent
+
+
+def _parse(agent):
+    return agent._parse_response if hasattr(agent, "_parse_response") else agent._parser
+
+
+for _kind in AGENTS:
+    @benchmark(f"agent.{_kind}.parse")
+    def parse(size, kind=_kind):
+        parse = _parse(make_agent(kind))
+        return (lambda: (parse(TOOL_RESPONSE), parse(FINAL_RESPONSE))), 2
+
+    @benchmark(f"agent.{_kind}.parse_repaired")
+    def parse_repaired(size, kind=_kind):
+        parse = _parse(make_agent(kind))
+        return (lambda: parse(MALFORMED_RESPONSE)), 1
+
+    @benchmark(f"agent.{_kind}.invoke", sizes=TOOL_COUNTS)
+    def invoke(tools, kind=_kind):
+        # One tool call and one final answer: two LLM calls, two prompts built and parsed
+        agent = make_agent(kind, tools)
+        return (lambda: agent.invoke("What is 125 * 48?")), 1
+
+
+@benchmark("prompt.compile", sizes=TOOL_COUNTS)
+def prompt_compile(tools):
+    agent = make_agent("tool_calling", tools)
+    template = agent.prompt_template
+
+    def run():
+        return CompiledPromptTemplate(template, tool_list=format_tool_list(agent.tools))
+    return run, 1
+
+
+@benchmark("prompt.render", sizes=TOOL_COUNTS)
+def prompt_render(tools):
+    agent = make_agent("tool_calling", tools)
+    compiled = agent._get_compiled_prompt()
+    return (lambda: compiled.render(user_input="What is 125 * 48?")), 1
@@ -0,0 +1,65 @@
+"""
+Memory classes: adding messages, building the prompt context, and pruning,
+at 10, 1k and 100k messages.
+
+Costs are reported per message, so an operation that scales linearly has
+about the same ns/op at every size.
+"""
+
+from memory import (
+    ConversationalBufferMemory,
+    ConversationalSummaryMemory,
+    ConversationalTokenBufferMemory,
+    ConversationalWindowMemory,
+)
+
+from .fakes import SummarizingLLM, message
+from .harness import benchmark
+
+SIZES = (10, 1_000, 100_000)
+
+MEMORIES = {
+    "buffer": lambda: ConversationalBufferMemory(),
+    "window": lambda: ConversationalWindowMemory(window_size=10),
+    # Small budget: every add past the first few prunes the oldest message
+    "token_buffer": lambda: ConversationalTokenBufferMemory(max_tokens=2000),
+    "summary": lambda: ConversationalSummaryMemory(llm=SummarizingLLM(), buffer_size=6),
+}
+
+MESSAGES = [message(i) for i in range(max(SIZES))]
+
+
+def fill(memory, size):
+    """Add ``size`` alternating user and AI messages."""
+    for i in range(0, size - 1, 2):
+        memory.add_user_message(MESSAGES[i])
+        memory.add_ai_message(MESSAGES[i + 1])
+    if size % 2:
+        memory.add_user_message(MESSAGES[size - 1])
+    return memory
+
+
+for _kind, _factory in MEMORIES.items():
+    @benchmark(f"memory.{_kind}.add", sizes=SIZES, fresh=True)
+    def add(size, factory=_factory):
+        memory = factory()
+        return (lambda: fill(memory, size)), size
+
+    @benchmark(f"memory.{_kind}.get_context", sizes=SIZES)
+    def get_context(size, factory=_factory):
+        memory = fill(factory(), size)
+        # Per message held (the window and token buffer keep only the most recent ones)
+        return memory.get_context, max(len(memory.get_history()), 1)
+
+
+@benchmark("memory.token_buffer.prune", sizes=SIZES, fresh=True)
+def token_buffer_prune(size):
+    # Lowering the limit drops almost the whole history in one call
+    memory = fill(ConversationalTokenBufferMemory(max_tokens=10 ** 9), size)
+    return (lambda: memory.set_max_tokens(100)), size
+
+
+@benchmark("memory.window.prune", sizes=SIZES, fresh=True)
+def window_prune(size):
+    memory = fill(ConversationalWindowMemory(window_size=size), size)
+    return (lambda: memory.set_window_size(5)), size
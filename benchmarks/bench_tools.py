@@ -0,0 +1,47 @@
+"""
+Tool_Executor argument handling for every parameter format models produce.
+"""
+
+from core.adapter import Tool_Executor
+
+from .bench_agents import make_agent
+from .fakes import add_numbers, join_values
+from .harness import benchmark
+
+PARAMETERS = {
+    "kwargs": ("calculator", {"expression": "125 * 48"}),
+    "json_string": ("calculator", '{"expression": "125 * 48"}'),
+    "positional_set": ("join", {"125, 48, 7"}),
+    "typed": ("add", {"a": "125", "b": "48"}),
+    "invalid": ("add", {"a": "not a number"}),
+    "unknown_tool": ("missing", {"x": "1"}),
+}
+
+
+def _tools():
+    agent = make_agent("tool_calling")
+    agent.add_tool("join", "Join values", join_values)
+    agent.add_tool("add", "Add two integers", add_numbers)
+    return agent.tools
+
+
+for _case, (_tool, _parameters) in PARAMETERS.items():
+    @benchmark(f"tools.execute.{_case}")
+    def execute(size, tool=_tool, parameters=_parameters):
+        tools = _tools()
+        return (lambda: Tool_Executor(tool, parameters, tools)), 1
+
+
+@benchmark("tools.execute.untyped")
+def execute_untyped(size):
+    # Tools registered without an inspected signature take the legacy binding path
+    tools = {"calculator": {"function": _tools()["calculator"]["function"]}}
+    return (lambda: Tool_Executor("calculator", {"expression": "125 * 48"}, tools)), 1
+
+
+@benchmark("tools.execute.cached")
+def execute_cached(size):
+    agent = make_agent("tool_calling")
+    agent.add_tool("cached_calculator", "Cached calculator", agent.tools["calculator"]["function"], cacheable=True)
+    tools = agent.tools
+    return (lambda: Tool_Executor("cached_calculator", {"expression": "125 * 48"}, tools)), 1
@@ -0,0 +1,95 @@
+"""
+Scripted stand-ins for LLMs and tools, so benchmarks never touch the network.
+"""
+
+from typing import List, Sequence
+
+TOOL_RESPONSE = """```json
+{
+    "Thinking": "The user wants a calculation, so I will use the calculator tool.",
+    "Problem Understanding": "Compute an arithmetic expression.",
+    "Current Situation": "No tool has been called yet.",
+    "Deep Reasoning": {"Step 1": "Use the calculator", "Step 2": "Report the result"},
+    "Tool Decision": {"Tool": "calculator", "Reason": "Exact arithmetic"},
+    "Tool call": "calculator",
+    "Tool Parameters": {"expression": "125 * 48"},
+    "Self-Reflection": {"Confidence": "0.9"},
+    "self_reflection": {"Confidence": "0.9"},
+    "Final Response": "None"
+}
+```"""
+
+FINAL_RESPONSE = """```json
+{
+    "Thinking": "The calculator returned the result, so I can answer.",
+    "Problem Understanding": "Compute an arithmetic expression.",
+    "Current Situation": "The calculator returned 6000.",
+    "Deep Reasoning": {"Step 1": "Read the result"},
+    "Tool Decision": {"Tool": "None", "Reason": "Result available"},
+    "Tool call": "None",
+    "Tool Parameters": "None",
+    "Self-Reflection": {"Confidence": "0.95"},
+    "self_reflection": {"Confidence": "0.95"},
+    "Final Response": "125 * 48 = 6000"
+}
+```"""
+
+# Typical model mistakes that extract_json() repairs: prose around the
+# object, single quotes, trailing commas and a positional parameter set
+MALFORMED_RESPONSE = """Sure! Here is my answer:
+{'Tool call': 'calculator', 'Tool Parameters': {"125 * 48"}, 'Final Response': 'None',}
+Let me know if you need anything else."""
+
+
+class ScriptedLLM:
+    """
+    LLM returning a fixed sequence of responses, then starting over.
+
+    Agent benchmarks use it with [TOOL_RESPONSE, FINAL_RESPONSE]: one tool
+    call and one final answer per invoke().
+    """
+
+    model = "scripted"
+
+    def __init__(self, responses: Sequence[str] = (TOOL_RESPONSE, FINAL_RESPONSE)):
+        self.responses: List[str] = list(responses)
+        self.calls = 0
+        self.last_usage = None
+
+    def generate_response(self, prompt: str) -> str:
+        response = self.responses[self.calls % len(self.responses)]
+        self.calls += 1
+        return response
+
+
+class SummarizingLLM:
+    """LLM answering every summarization request with a short fixed summary."""
+
+    model = "scripted"
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_response(self, prompt: str) -> str:
+        self.calls += 1
+        return "The user asked about arithmetic and got results."
+
+
+def calculator(expression: str) -> str:
+    """Benchmark tool: answers instantly, so only the framework's overhead is measured."""
+    return "6000"
+
+
+def add_numbers(a: int, b: int = 0) -> int:
+    """Add two integers (benchmark tool with typed parameters)."""
+    return a + b
+
+
+def join_values(*values):
+    """Join positional values (benchmark tool for comma-separated parameters)."""
+    return ",".join(values)
+
+
+def message(i: int) -> str:
+    """Message text of realistic length for memory benchmarks."""
+    return f"Message {i}: what is {i} * 48, and can you also explain how you computed it step by step?"
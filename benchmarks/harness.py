@@ -0,0 +1,321 @@
+"""
+Timing, allocation tracking and baseline comparison for the benchmarks.
+
+A benchmark is a setup function registered with ``@benchmark``. It is
+called with one size (or None) and returns ``(run, ops)``: a callable doing
+the measured work and the number of operations one call performs. Each
+result reports operations per second and memory allocated while running:
+
+- ``peak_bytes``: peak memory allocated during one ``run()`` call
+- ``bytes_per_op``: memory still allocated afterwards, per operation
+
+``compare`` flags three kinds of regression against a stored baseline:
+lower throughput, higher peak allocation, and worse scaling. The scaling
+check compares cost per operation at the two largest sizes (1k and 100k
+messages for the memory benchmarks). It does not depend on the machine, so a change that turns a linear
+operation (e.g. ``ConversationalTokenBufferMemory`` pruning) quadratic is
+flagged even when the baseline was recorded on faster hardware.
+"""
+
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+Setup = Callable[[Any], Tuple[Callable[[], Any], int]]
+
+BASELINE_VERSION = 1
+
+# Upper bound on timing samples of a fast ``fresh`` benchmark
+MAX_FRESH_SAMPLES = 1000
+
+# Registered benchmarks, in definition order
+BENCHMARKS: List["Benchmark"] = []
+
+
+class Benchmark:
+    """A registered benchmark (see ``benchmark``)."""
+
+    def __init__(self, name: str, setup: Setup, sizes: Sequence[Any], fresh: bool):
+        self.name = name
+        self.setup = setup
+        self.sizes = list(sizes)
+        self.fresh = fresh
+
+    def cases(self, max_size: Optional[int] = None) -> List[Tuple[str, Any]]:
+        """
+        Get the (id, size) pairs to run.
+
+        Args:
+            max_size: Skip sizes above this
+
+        Returns:
+            e.g. [("memory.buffer.add[10]", 10), ...]
+        """
+        return [
+            (self.name if size is None else f"{self.name}[{size}]", size)
+            for size in self.sizes
+            if size is None or max_size is None or size <= max_size
+        ]
+
+
+def benchmark(name: str, sizes: Sequence[Any] = (None,), fresh: bool = False) -> Callable[[Setup], Setup]:
+    """
+    Register a benchmark.
+
+    Args:
+        name: Dotted benchmark name, e.g. "memory.token_buffer.prune"
+        sizes: Sizes to run the setup function with (None = unsized)
+        fresh: Call the setup before every measured ``run()`` (for work that
+            consumes its state, like pruning); setup time is not measured
+
+    Returns:
+        Decorator registering the setup function
+    """
+    def decorator(setup: Setup) -> Setup:
+        BENCHMARKS.append(Benchmark(name, setup, sizes, fresh))
+        return setup
+    return decorator
+
+
+def _time_calls(run: Callable[[], Any], loops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(loops):
+        run()
+    return time.perf_counter() - start
+
+
+def measure(bench: Benchmark, size: Any, min_time: float = 0.2, repeats: int = 5) -> Dict[str, Any]:
+    """
+    Run one benchmark case.
+
+    Timing takes the best of ``repeats`` samples. Each sample loops ``run()``
+    until it lasts at least ``min_time / repeats`` seconds. ``fresh``
+    benchmarks run once per sample and take samples until they add up to
+    ``min_time``: many for fast cases, a single one for cases that take
+    seconds. Allocations are measured in a separate,
+    untimed call with tracemalloc enabled.
+
+    Args:
+        bench: The benchmark
+        size: Size to run it with
+        min_time: Approximate total timing budget in seconds
+        repeats: Timing samples
+
+    Returns:
+        Dict with size, ops_per_sec, ns_per_op, peak_bytes and bytes_per_op
+    """
+    target = min_time / repeats
+    gc_enabled = gc.isenabled()
+    best = float("inf")
+    try:
+        if bench.fresh:
+            spent, samples = 0.0, 0
+            while samples == 0 or (spent < min_time and samples < MAX_FRESH_SAMPLES):
+                run, ops = bench.setup(size)
+                gc.collect()
+                gc.disable()
+                elapsed = _time_calls(run, 1)
+                if gc_enabled:
+                    gc.enable()
+                best = min(best, elapsed / ops)
+                spent += elapsed
+                samples += 1
+        else:
+            run, ops = bench.setup(size)
+            run()  # warm up (lazy compilation, caches)
+            loops = 1
+            while True:
+                elapsed = _time_calls(run, loops)
+                if elapsed >= target or loops >= 1 << 24:
+                    break
+                loops *= 2 if elapsed == 0 else max(2, min(10, int(target / elapsed) + 1))
+            gc.collect()
+            gc.disable()
+            for _ in range(repeats):
+                best = min(best, _time_calls(run, loops) / (loops * ops))
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    run, ops = bench.setup(size)
+    if not bench.fresh:
+        run()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = run()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+
+    return {
+        "size": size,
+        "ops_per_sec": 1.0 / best if best > 0 else float("inf"),
+        "ns_per_op": best * 1e9,
+        "peak_bytes": max(peak - before, 0),
+        "bytes_per_op": max(current - before, 0) / ops,
+    }
+
+
+def run_benchmarks(
+    benchmarks: Sequence[Benchmark],
+    name_filter: Optional[str] = None,
+    max_size: Optional[int] = None,
+    min_time: float = 0.2,
+    repeats: int = 5,
+    progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Run benchmarks.
+
+    Args:
+        benchmarks: Benchmarks to run
+        name_filter: Only run cases whose id contains this text
+        max_size: Skip sizes above this
+        min_time: Timing budget per case (see ``measure``)
+        repeats: Timing samples per case
+        progress: Called with (case id, result) after each case
+
+    Returns:
+        Results document: {"version", "python", "platform", "results": {case id: result}}
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    for bench in benchmarks:
+        for case_id, size in bench.cases(max_size):
+            if name_filter and name_filter not in case_id:
+                continue
+            result = measure(bench, size, min_time, repeats)
+            result["name"] = bench.name
+            results[case_id] = result
+            if progress is not None:
+                progress(case_id, result)
+    return {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "platform": f"{platform.system()} {platform.machine()}",
+        "results": results,
+    }
+
+
+def _cost_by_size(results: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[Any, float]]:
+    """ns/op per size, per benchmark name (sized benchmarks only)."""
+    costs: Dict[str, Dict[Any, float]] = {}
+    for result in results.values():
+        if result.get("size") is not None:
+            costs.setdefault(result["name"], {})[result["size"]] = result["ns_per_op"]
+    return costs
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = 0.5,
+    alloc_threshold: float = 0.5,
+    scaling_factor: float = 3.0,
+) -> List[str]:
+    """
+    Find regressions against a baseline.
+
+    Only cases present in both documents are compared. The scaling check
+    uses the two largest sizes that were run, and needs both in the baseline.
+
+    Args:
+        current: Results from run_benchmarks()
+        baseline: Stored results from run_benchmarks()
+        threshold: Flag cases whose ops/s dropped by more than this fraction
+        alloc_threshold: Flag cases whose peak allocation grew by more than
+            this fraction (and by more than 1 KiB)
+        scaling_factor: Flag benchmarks whose cost-per-op ratio between the
+            two largest sizes grew by more than this factor
+
+    Returns:
+        One message per regression (empty if none)
+    """
+    regressions = []
+    old_results = baseline.get("results", {})
+    for case_id, new in current["results"].items():
+        old = old_results.get(case_id)
+        if old is None:
+            continue
+        if new["ops_per_sec"] < old["ops_per_sec"] * (1 - threshold):
+            regressions.append(
+                f"{case_id}: {new['ops_per_sec']:,.0f} ops/s, baseline {old['ops_per_sec']:,.0f} "
+                f"({new['ops_per_sec'] / old['ops_per_sec'] - 1:+.0%})"
+            )
+        if new["peak_bytes"] > old["peak_bytes"] * (1 + alloc_threshold) + 1024:
+            regressions.append(
+                f"{case_id}: peak allocation {new['peak_bytes']:,} B, baseline {old['peak_bytes']:,} B"
+            )
+
+    old_costs = _cost_by_size(old_results)
+    for name, costs in _cost_by_size(current["results"]).items():
+        if len(costs) < 2:
+            continue
+        # The two largest sizes: small sizes are dominated by fixed per-call overhead
+        small, large = sorted(costs)[-2:]
+        old = old_costs.get(name, {})
+        if small not in old or large not in old:
+            continue
+        ratio = costs[large] / max(costs[small], 1e-9)
+        old_ratio = old[large] / max(old[small], 1e-9)
+        if ratio > old_ratio * scaling_factor:
+            regressions.append(
+                f"{name}: cost per op grows {ratio:,.1f}x from size {small} to {large}, "
+                f"baseline {old_ratio:,.1f}x (worse than linear scaling?)"
+            )
+    return regressions
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read a baseline file.
+
+    Args:
+        path: JSON file written by save_baseline()
+
+    Returns:
+        The baseline, or None if the file does not exist
+
+    Raises:
+        ValueError: If the file has another format version
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    if data.get("version") != BASELINE_VERSION:
+        raise ValueError(f"{path} has unsupported baseline version {data.get('version')}")
+    return data
+
+
+def save_baseline(results: Dict[str, Any], path: str) -> None:
+    """
+    Write results as the baseline.
+
+    Args:
+        results: Results from run_benchmarks()
+        path: JSON file to write
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=1, sort_keys=True)
+        f.write("\n")
+
+
+def format_result(case_id: str, result: Dict[str, Any]) -> str:
+    """Format one result as a table row."""
+    return (
+        f"{case_id:<48} {result['ops_per_sec']:>14,.0f} ops/s {result['ns_per_op']:>12,.0f} ns/op "
+        f"{result['peak_bytes']:>12,} B peak {result['bytes_per_op']:>10,.0f} B/op"
+    )
+
+
+def python_info() -> str:
+    """Describe the interpreter the benchmarks run on."""
+    return f"Python {platform.python_version()} ({sys.implementation.name}) on {platform.system()} {platform.machine()}"
@@ -2,6 +2,160 @@
 Core utilities for Codemni framework
 """
 
-from .adapter import Tool_Executor
+from .adapter import Tool_Executor, Async_Tool_Executor
+from .json_stream import IncrementalJSONParser
+from .json_extract import (
+    JSONExtractionError, SetLiteral, extract_json, repair_json, loads_lenient, fix_json_response,
+    encode_sets, decode_sets,
+)
+from .early_dispatch import EarlyToolDispatch, stream_with_early_dispatch
+from .tokenizer import TokenizerService, get_tokenizer, count_tokens, report_usage, set_usage_listener, reset_usage_listener
+from .context_overflow import ContextOverflowError, is_context_overflow
+from .scratchpad import Scratchpad, ScratchpadStep, condense_step, llm_step_summarizer
+from .compaction import (
+    CompactionState,
+    truncate_tool_outputs,
+    drop_oldest_steps,
+    summarize_memory,
+    default_compaction_strategies,
+)
+from .prompt_template import CompiledPromptTemplate, format_tool_list
+from .tool_policy import ToolPolicy, ToolError, make_tool_policy
+from .tool_cache import ToolCache, default_cache_key, make_tool_cache
+from .tool_schema import ToolSignature, ToolArgumentError, inspect_tool
+from .result_store import ErrorText, ResultStore, serialize_result, limit_tool_output
+from .tool_calls import collect_tool_calls, execute_tool_calls, aexecute_tool_calls
+from .events import (
+    AgentEvent,
+    IterationStart,
+    ReasoningField,
+    FinalResponseDelta,
+    ToolStart,
+    ToolEnd,
+    FinalResponse,
+    ResponseEventParser,
+)
+from .runner import (
+    LLMCall,
+    ToolCall,
+    ToolCalls,
+    MemoryCall,
+    Blocking,
+    Emit,
+    run_sync,
+    run_async,
+    stream_sync,
+    stream_async,
+    with_memory,
+)
+from .batch import BatchItem, BatchResult, run_batch, arun_batch
+from .loop_detector import LoopDetector, LoopStats, call_key
+from .tracing import (
+    Span,
+    Trace,
+    Tracer,
+    JSONLinesExporter,
+    OpenTelemetryExporter,
+    span,
+    add_event,
+    current_span,
+    trace_steps,
+)
+from .checkpoint import (
+    InMemoryCheckpointStore,
+    SQLiteCheckpointStore,
+    RunCheckpointer,
+    agent_kind,
+    load_checkpoint,
+)
 
-__all__ = ["Tool_Executor"]
+__all__ = [
+    "Tool_Executor",
+    "Async_Tool_Executor",
+    "IncrementalJSONParser",
+    "JSONExtractionError",
+    "extract_json",
+    "repair_json",
+    "loads_lenient",
+    "fix_json_response",
+    "SetLiteral",
+    "encode_sets",
+    "decode_sets",
+    "EarlyToolDispatch",
+    "stream_with_early_dispatch",
+    "TokenizerService",
+    "get_tokenizer",
+    "count_tokens",
+    "report_usage",
+    "set_usage_listener",
+    "reset_usage_listener",
+    "ContextOverflowError",
+    "is_context_overflow",
+    "Scratchpad",
+    "ScratchpadStep",
+    "condense_step",
+    "llm_step_summarizer",
+    "CompactionState",
+    "truncate_tool_outputs",
+    "drop_oldest_steps",
+    "summarize_memory",
+    "default_compaction_strategies",
+    "CompiledPromptTemplate",
+    "format_tool_list",
+    "ToolPolicy",
+    "ToolError",
+    "make_tool_policy",
+    "ToolCache",
+    "default_cache_key",
+    "make_tool_cache",
+    "ToolSignature",
+    "ToolArgumentError",
+    "inspect_tool",
+    "ResultStore",
+    "serialize_result",
+    "limit_tool_output",
+    "ErrorText",
+    "collect_tool_calls",
+    "execute_tool_calls",
+    "aexecute_tool_calls",
+    "LLMCall",
+    "ToolCall",
+    "ToolCalls",
+    "MemoryCall",
+    "Blocking",
+    "Emit",
+    "run_sync",
+    "run_async",
+    "stream_sync",
+    "stream_async",
+    "with_memory",
+    "BatchItem",
+    "BatchResult",
+    "run_batch",
+    "arun_batch",
+    "LoopDetector",
+    "LoopStats",
+    "call_key",
+    "Span",
+    "Trace",
+    "Tracer",
+    "JSONLinesExporter",
+    "OpenTelemetryExporter",
+    "span",
+    "add_event",
+    "current_span",
+    "trace_steps",
+    "InMemoryCheckpointStore",
+    "SQLiteCheckpointStore",
+    "RunCheckpointer",
+    "agent_kind",
+    "load_checkpoint",
+    "AgentEvent",
+    "IterationStart",
+    "ReasoningField",
+    "FinalResponseDelta",
+    "ToolStart",
+    "ToolEnd",
+    "FinalResponse",
+    "ResponseEventParser",
+]
@@ -1,58 +1,162 @@
+import asyncio
+import inspect
 import json
 
-def Tool_Executor(tool_name, tool_parameters, available_tools):
+from .executors import get_thread_pool
+from .json_extract import SetLiteral
+from .tool_cache import MISSING, lookup
+from .tool_schema import ToolArgumentError
+
+
+def _bind_tool_call(tool_name, tool_parameters, available_tools):
     """
-    Execute a tool function with the provided parameters.
-    
+    Resolve a tool call to the function and the arguments to call it with.
+
     Args:
         tool_name: Name of the tool to execute
         tool_parameters: Parameters in format {"value1,value2,..."} or {"key": "value"} or "None"
         available_tools: Dictionary of available tools with their functions
-        
+
     Returns:
-        Result from tool execution or error message
+        tuple: (function, args, kwargs), or (None, error_message, None) if the call is invalid
     """
     if tool_name not in available_tools:
-        return f"Error: Tool '{tool_name}' not found"
-    
+        return None, f"Error: Tool '{tool_name}' not found", None
+
     tool_function = available_tools[tool_name]["function"]
-    
+
+    # Tools registered with a signature are bound by it (typed, validated)
+    signature = available_tools[tool_name].get("signature")
+    if signature is not None:
+        try:
+            args, kwargs = signature.bind(tool_parameters)
+        except ToolArgumentError as e:
+            return None, f"Error: Invalid parameters for tool '{tool_name}': {e}", None
+        return tool_function, args, kwargs
+
     # Handle no parameters case
     if not tool_parameters or tool_parameters == "None":
-        return tool_function()
-    
+        return tool_function, (), {}
+
     # Parse parameters if string
     if isinstance(tool_parameters, str):
         try:
             tool_parameters = json.loads(tool_parameters)
         except json.JSONDecodeError:
-            return f"Error: Invalid parameter format"
-    
+            return None, f"Error: Invalid parameter format", None
+
     # Extract and handle parameters
-    try:
-        if isinstance(tool_parameters, dict):
-            # Check if it's a key-value dict (like {"expression": "125 * 48"})
-            if len(tool_parameters) > 0:
-                first_key = list(tool_parameters.keys())[0]
-                first_value = tool_parameters[first_key]
-                
-                # If the key looks like a parameter name (contains letters), treat as kwargs
-                if first_key and any(c.isalpha() for c in first_key):
-                    # Key-value parameters like {"expression": "125 * 48"}
-                    return tool_function(**tool_parameters)
-                else:
-                    # Comma-separated parameters like {"125 * 48"} or {"value1,value2"}
-                    param_string = first_value if first_value else first_key
-                    params = [p.strip() for p in str(param_string).split(',')]
-                    return tool_function(*params)
+    if isinstance(tool_parameters, dict):
+        # Check if it's a key-value dict (like {"expression": "125 * 48"})
+        if len(tool_parameters) > 0:
+            first_key = list(tool_parameters.keys())[0]
+            first_value = tool_parameters[first_key]
+
+            # If the key looks like a parameter name (contains letters), treat as kwargs
+            if first_key and any(c.isalpha() for c in first_key):
+                # Key-value parameters like {"expression": "125 * 48"}
+                return tool_function, (), tool_parameters
             else:
-                return tool_function()
-        elif isinstance(tool_parameters, set):
-            param_string = list(tool_parameters)[0]
-            params = [p.strip() for p in str(param_string).split(',')]
-            return tool_function(*params)
+                # Comma-separated parameters like {"125 * 48"} or {"value1,value2"}
+                param_string = first_value if first_value else first_key
+                params = [p.strip() for p in str(param_string).split(',')]
+                return tool_function, tuple(params), {}
+        else:
+            return tool_function, (), {}
+    elif isinstance(tool_parameters, (SetLiteral, set)):
+        # Set literal {"value1,value2"} or {"value1", "value2"}, in the order written
+        params = [p.strip() for element in tool_parameters for p in str(element).split(',')]
+        return tool_function, tuple(params), {}
+    else:
+        return None, f"Error: Unexpected parameter type", None
+
+
+def Tool_Executor(tool_name, tool_parameters, available_tools):
+    """
+    Execute a tool function with the provided parameters.
+
+    Tools registered with a cache (see core.tool_cache) are served from it
+    when the same call was made before within the TTL; tools with an
+    execution policy (see core.tool_policy) run under its timeout, pool and
+    concurrency limit.
+
+    Args:
+        tool_name: Name of the tool to execute
+        tool_parameters: Parameters in format {"value1,value2,..."} or {"key": "value"} or "None"
+        available_tools: Dictionary of available tools with their functions
+
+    Returns:
+        Result from tool execution or error message
+    """
+    tool_function, args, kwargs = _bind_tool_call(tool_name, tool_parameters, available_tools)
+    if tool_function is None:
+        return args
+
+    cache, key, cached = lookup(available_tools[tool_name], tool_name, args, kwargs)
+    if cached is not MISSING:
+        return cached
+
+    policy = available_tools[tool_name].get("policy")
+
+    try:
+        if policy is not None:
+            result = policy.run(tool_name, tool_function, args, kwargs)
+        else:
+            result = tool_function(*args, **kwargs)
+            if inspect.isawaitable(result):
+                # async def tool called from synchronous code
+                result = asyncio.run(_await(result))
+        if cache is not None:
+            cache.set(key, result)
+        return result
+    except Exception as e:
+        return f"Error executing tool '{tool_name}': {str(e)}"
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+async def Async_Tool_Executor(tool_name, tool_parameters, available_tools):
+    """
+    Execute a tool function from async code.
+
+    ``async def`` tools are awaited on the running event loop; regular
+    functions run in the shared thread pool so they never block the loop.
+    Parameters, caching and execution policies work exactly like ``Tool_Executor``.
+
+    Args:
+        tool_name: Name of the tool to execute
+        tool_parameters: Parameters in format {"value1,value2,..."} or {"key": "value"} or "None"
+        available_tools: Dictionary of available tools with their functions
+
+    Returns:
+        Result from tool execution or error message
+    """
+    tool_function, args, kwargs = _bind_tool_call(tool_name, tool_parameters, available_tools)
+    if tool_function is None:
+        return args
+
+    cache, key, cached = lookup(available_tools[tool_name], tool_name, args, kwargs)
+    if cached is not MISSING:
+        return cached
+
+    policy = available_tools[tool_name].get("policy")
+
+    try:
+        if policy is not None:
+            result = await policy.arun(tool_name, tool_function, args, kwargs)
+        elif inspect.iscoroutinefunction(tool_function):
+            result = await tool_function(*args, **kwargs)
         else:
-            return f"Error: Unexpected parameter type"
-            
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                get_thread_pool(), lambda: tool_function(*args, **kwargs)
+            )
+            if inspect.isawaitable(result):
+                result = await result
+        if cache is not None:
+            cache.set(key, result)
+        return result
     except Exception as e:
-        return f"Error executing tool '{tool_name}': {str(e)}"
\ No newline at end of file
+        return f"Error executing tool '{tool_name}': {str(e)}"
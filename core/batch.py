@@ -0,0 +1,231 @@
+"""
+Batch agent invocation for the Codemni framework.
+
+``agent.batch(queries)`` runs many independent queries through one agent
+concurrently. Each query gets its own memory (or none), so conversations
+never mix, while the LLM, tool registry, compiled prompt and tool caches
+are shared (see ``core.runner.with_memory``).
+
+- ``memory_factory``: called to create a fresh memory for each query, or
+  for each distinct key when ``keys`` are given
+- ``keys``: queries with the same key share one memory and run one after
+  another in the given order (e.g. the turns of one conversation); other
+  keys still run concurrently
+
+Results come back in the order of ``queries``; a query that raised does not
+stop the batch, its exception is kept on its item.
+
+Example:
+    >>> from memory import ConversationalBufferMemory
+    >>> result = agent.batch(questions, max_concurrency=8,
+    ...                      memory_factory=ConversationalBufferMemory)
+    >>> result.outputs[:2]
+    ['The answer is 42', 'Paris']
+    >>> result.stats["failed"], result.stats["p95_seconds"]
+    (0, 3.1)
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Sequence
+
+from .runner import run_async, run_sync, with_memory
+
+MemoryFactory = Callable[[], Any]
+
+
+class BatchItem:
+    """Outcome of one query of a batch."""
+
+    __slots__ = ("index", "query", "key", "output", "error", "elapsed")
+
+    def __init__(self, index: int, query: str, key: Optional[Hashable] = None):
+        self.index = index
+        self.query = query
+        self.key = key
+        self.output: Any = None
+        self.error: Optional[BaseException] = None
+        self.elapsed = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """True if the query finished without raising."""
+        return self.error is None
+
+    def __repr__(self) -> str:
+        outcome = f"error={self.error!r}" if self.error is not None else f"output={self.output!r}"
+        return f"BatchItem(index={self.index}, {outcome}, elapsed={self.elapsed:.3f})"
+
+
+class BatchResult:
+    """Items of a batch in query order, with aggregate statistics."""
+
+    def __init__(self, items: List[BatchItem], wall_time: float):
+        self.items = items
+        self.wall_time = wall_time
+
+    @property
+    def outputs(self) -> List[Any]:
+        """Agent outputs in query order (None for failed queries)."""
+        return [item.output for item in self.items]
+
+    @property
+    def errors(self) -> Dict[int, BaseException]:
+        """Exceptions of failed queries by index."""
+        return {item.index: item.error for item in self.items if item.error is not None}
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """
+        Aggregate statistics.
+
+        Returns:
+            Dict with total, succeeded, failed, wall_seconds, queries_per_second,
+            and mean/p50/p95/max latency in seconds
+        """
+        latencies = sorted(item.elapsed for item in self.items)
+        count = len(latencies)
+
+        def percentile(fraction: float) -> float:
+            return latencies[min(count - 1, int(fraction * count))] if count else 0.0
+
+        failed = sum(1 for item in self.items if item.error is not None)
+        return {
+            "total": count,
+            "succeeded": count - failed,
+            "failed": failed,
+            "wall_seconds": self.wall_time,
+            "queries_per_second": count / self.wall_time if self.wall_time > 0 else 0.0,
+            "mean_seconds": sum(latencies) / count if count else 0.0,
+            "p50_seconds": percentile(0.5),
+            "p95_seconds": percentile(0.95),
+            "max_seconds": latencies[-1] if count else 0.0,
+        }
+
+    def __iter__(self) -> Iterator[BatchItem]:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __getitem__(self, index: int) -> BatchItem:
+        return self.items[index]
+
+    def __repr__(self) -> str:
+        stats = self.stats
+        return f"BatchResult(total={stats['total']}, failed={stats['failed']}, wall_seconds={self.wall_time:.3f})"
+
+
+def _plan(
+    queries: Sequence[str],
+    keys: Optional[Sequence[Hashable]],
+    memory_factory: Optional[MemoryFactory],
+):
+    """Split a batch into chains of items that share a memory and run in order."""
+    if keys is not None and len(keys) != len(queries):
+        raise ValueError("keys must have one entry per query")
+
+    items = [BatchItem(index, query, keys[index] if keys is not None else None)
+             for index, query in enumerate(queries)]
+    if keys is None:
+        chains = [[item] for item in items]
+    else:
+        by_key: Dict[Hashable, List[BatchItem]] = {}
+        for item in items:
+            by_key.setdefault(item.key, []).append(item)
+        chains = list(by_key.values())
+
+    memories = [memory_factory() if memory_factory is not None else None for _ in chains]
+    return items, list(zip(chains, memories))
+
+
+def run_batch(
+    agent: Any,
+    queries: Sequence[str],
+    max_concurrency: int = 4,
+    memory_factory: Optional[MemoryFactory] = None,
+    keys: Optional[Sequence[Hashable]] = None,
+) -> BatchResult:
+    """
+    Run independent queries through an agent concurrently.
+
+    Queries run on a thread pool owned by the batch, not the shared pool, so
+    a batch can never starve the LLM and tool work its own queries wait on.
+
+    Args:
+        agent: Agent with a ``_steps(query)`` loop
+        queries: Queries to run
+        max_concurrency: Maximum queries running at once
+        memory_factory: Zero-argument callable creating a memory per query
+            (or per key); None runs every query without memory
+        keys: Optional key per query; queries with the same key share a
+            memory and run sequentially in order
+
+    Returns:
+        BatchResult with items in query order
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be >= 1")
+    items, chains = _plan(queries, keys, memory_factory)
+
+    def run_chain(chain: List[BatchItem], memory: Any) -> None:
+        view = with_memory(agent, memory)
+        for item in chain:
+            started = time.perf_counter()
+            try:
+                item.output = run_sync(view, view._steps(item.query))
+            except Exception as exc:
+                item.error = exc
+            item.elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if chains:
+        workers = min(max_concurrency, len(chains))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="codemni-batch") as pool:
+            for future in [pool.submit(run_chain, chain, memory) for chain, memory in chains]:
+                future.result()
+    return BatchResult(items, time.perf_counter() - started)
+
+
+async def arun_batch(
+    agent: Any,
+    queries: Sequence[str],
+    max_concurrency: int = 4,
+    memory_factory: Optional[MemoryFactory] = None,
+    keys: Optional[Sequence[Hashable]] = None,
+) -> BatchResult:
+    """
+    Run independent queries through an agent concurrently on the event loop.
+
+    Args:
+        agent: Agent with a ``_steps(query)`` loop
+        queries: Queries to run
+        max_concurrency: Maximum queries running at once
+        memory_factory: Zero-argument callable creating a memory per query
+            (or per key); None runs every query without memory
+        keys: Optional key per query; queries with the same key share a
+            memory and run sequentially in order
+
+    Returns:
+        BatchResult with items in query order
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be >= 1")
+    items, chains = _plan(queries, keys, memory_factory)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_chain(chain: List[BatchItem], memory: Any) -> None:
+        view = with_memory(agent, memory)
+        async with semaphore:
+            for item in chain:
+                started = time.perf_counter()
+                try:
+                    item.output = await run_async(view, view._steps(item.query))
+                except Exception as exc:
+                    item.error = exc
+                item.elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run_chain(chain, memory) for chain, memory in chains))
+    return BatchResult(items, time.perf_counter() - started)
@@ -0,0 +1,360 @@
+"""
+Checkpoint and resume for agent runs.
+
+A long run that dies halfway (worker restart, provider outage) normally
+loses every LLM call and tool result it already paid for. With a
+checkpoint store on the agent, the loop state of a run is saved after each
+step:
+
+- after every LLM call: the response, before its tool runs
+- after every tool call: iteration, scratchpad (tool calls and results),
+  loop-detection state, conversation context and agent-specific values
+  such as the deep reasoning agent's last confidence
+
+``agent.resume(run_id)`` rebuilds that state and continues: completed
+iterations are not repeated, and a response whose tool had not finished is
+used again instead of asking the model a second time. When the run ends its
+checkpoint is replaced by the final answer, so resuming a finished run just
+returns it.
+
+Stores only need ``save(run_id, data)``, ``load(run_id)`` and
+``delete(run_id)``. ``InMemoryCheckpointStore`` keeps checkpoints in the
+process; ``SQLiteCheckpointStore`` writes them to a SQLite file so another
+process can resume them after a restart.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .json_extract import decode_sets, encode_sets
+from .runner import AgentSteps, Blocking
+
+CHECKPOINT_VERSION = 1
+
+
+class InMemoryCheckpointStore:
+    """Thread-safe checkpoint store living in the current process."""
+
+    def __init__(self):
+        self._checkpoints: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def save(self, run_id: str, data: Dict[str, Any]) -> None:
+        """
+        Store the checkpoint of a run, replacing the previous one.
+
+        Args:
+            run_id: Run identifier
+            data: JSON-serializable checkpoint
+        """
+        # Stored as text so later changes to the caller's objects do not leak in
+        text = json.dumps(data)
+        with self._lock:
+            self._checkpoints[run_id] = text
+
+    def load(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the checkpoint of a run.
+
+        Args:
+            run_id: Run identifier
+
+        Returns:
+            The checkpoint, or None if there is none
+        """
+        with self._lock:
+            text = self._checkpoints.get(run_id)
+        return json.loads(text) if text is not None else None
+
+    def delete(self, run_id: str) -> bool:
+        """
+        Remove the checkpoint of a run.
+
+        Args:
+            run_id: Run identifier
+
+        Returns:
+            True if there was one
+        """
+        with self._lock:
+            return self._checkpoints.pop(run_id, None) is not None
+
+    def run_ids(self) -> List[str]:
+        """Get the IDs of all stored runs."""
+        with self._lock:
+            return list(self._checkpoints)
+
+
+class SQLiteCheckpointStore:
+    """Checkpoint store in a SQLite file, shared by processes and surviving restarts."""
+
+    def __init__(self, path: str):
+        """
+        Initialize SQLiteCheckpointStore.
+
+        Args:
+            path: SQLite database file (created if missing)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS agent_checkpoints ("
+            "run_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def save(self, run_id: str, data: Dict[str, Any]) -> None:
+        """
+        Store the checkpoint of a run, replacing the previous one.
+
+        Args:
+            run_id: Run identifier
+            data: JSON-serializable checkpoint
+        """
+        text = json.dumps(data)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO agent_checkpoints (run_id, data, updated) VALUES (?, ?, ?)",
+                (run_id, text, time.time()),
+            )
+
+    def load(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the checkpoint of a run.
+
+        Args:
+            run_id: Run identifier
+
+        Returns:
+            The checkpoint, or None if there is none
+        """
+        with self._lock:
+            row = self._db.execute("SELECT data FROM agent_checkpoints WHERE run_id = ?", (run_id,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def delete(self, run_id: str) -> bool:
+        """
+        Remove the checkpoint of a run.
+
+        Args:
+            run_id: Run identifier
+
+        Returns:
+            True if there was one
+        """
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM agent_checkpoints WHERE run_id = ?", (run_id,))
+        return cursor.rowcount > 0
+
+    def run_ids(self) -> List[str]:
+        """Get the IDs of all stored runs, least recently updated first."""
+        with self._lock:
+            rows = self._db.execute("SELECT run_id FROM agent_checkpoints ORDER BY updated").fetchall()
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
+
+
+def agent_kind(agent: Any) -> str:
+    """
+    Identify the kind of agent that checkpointed a run.
+
+    The class name alone is not enough: the standard and reasoning agents
+    are both ``Create_ToolCalling_Agent``, in different packages.
+
+    Args:
+        agent: Agent instance
+
+    Returns:
+        e.g. "REASONING_TOOL_CALLING_AGENT.Create_ToolCalling_Agent"
+    """
+    cls = type(agent)
+    package = cls.__module__.split(".")
+    return f"{package[-2] if len(package) > 1 else package[0]}.{cls.__qualname__}"
+
+
+class RunCheckpointer:
+    """
+    Saves the loop state of one agent run to a checkpoint store.
+
+    The agent loop calls ``bind`` once its scratchpad, loop detector and
+    compaction state exist (restoring them when resuming), then ``save``
+    after each step. ``track`` wraps the run so its final answer replaces
+    the checkpoint.
+    """
+
+    def __init__(
+        self,
+        store: Any,
+        run_id: str,
+        query: str,
+        max_iterations: int,
+        agent_name: str = "",
+        checkpoint: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Initialize RunCheckpointer.
+
+        Args:
+            store: Checkpoint store (save / load / delete)
+            run_id: Run identifier
+            query: The run's query
+            max_iterations: The run's iteration limit
+            agent_name: ``agent_kind`` of the agent, checked on resume
+            checkpoint: Checkpoint to resume from (None = new run)
+        """
+        self.store = store
+        self.run_id = run_id
+        self.query = query
+        self.max_iterations = max_iterations
+        self.agent_name = agent_name
+        self.checkpoint = checkpoint
+        self.saves = 0
+        self._state: Any = None
+        self._detector: Any = None
+
+    @property
+    def resumed(self) -> bool:
+        """True if the run continues from a checkpoint."""
+        return self.checkpoint is not None
+
+    def bind(self, state: Any, detector: Any) -> Tuple[int, Optional[str], Dict[str, Any]]:
+        """
+        Attach the run's state; when resuming, restore it from the checkpoint.
+
+        Args:
+            state: core.compaction.CompactionState (scratchpad and memory context)
+            detector: The run's LoopDetector
+
+        Returns:
+            Tuple of (completed iterations, LLM response of the next iteration
+            if it was already received, agent-specific values)
+        """
+        self._state = state
+        self._detector = detector
+        if self.checkpoint is None:
+            return 0, None, {}
+        data = self.checkpoint
+        scratchpad = state.scratchpad
+        for item in data["steps"]:
+            step = scratchpad.add(item["iteration"], item["tool_name"], decode_sets(item["parameters"]), item["result"])
+            step.summary = item["summary"]
+        scratchpad.omitted = data["omitted"]
+        state.memory_context = data["memory_context"]
+        detector.restore(data["detector"])
+        return data["iteration"], data["pending_response"], data["extra"]
+
+    def snapshot(
+        self, iteration: int, pending_response: Optional[str] = None, extra: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the checkpoint of the current state.
+
+        Args:
+            iteration: Completed iterations
+            pending_response: LLM response of the next iteration whose tool
+                has not finished yet
+            extra: Agent-specific values to restore (JSON-serializable)
+
+        Returns:
+            Checkpoint dict
+        """
+        return {
+            "version": CHECKPOINT_VERSION,
+            "status": "running",
+            "run_id": self.run_id,
+            "agent": self.agent_name,
+            "query": self.query,
+            "max_iterations": self.max_iterations,
+            "iteration": iteration,
+            "pending_response": pending_response,
+            "steps": [
+                {
+                    "iteration": step.iteration,
+                    "tool_name": step.tool_name,
+                    "parameters": encode_sets(step.parameters),
+                    "result": encode_sets(step.result),
+                    "summary": step.summary,
+                }
+                for step in self._state.scratchpad.steps
+            ],
+            "omitted": self._state.scratchpad.omitted,
+            "memory_context": self._state.memory_context,
+            "detector": encode_sets(self._detector.state()),
+            "extra": encode_sets(extra or {}),
+            "updated": time.time(),
+        }
+
+    def save(
+        self, iteration: int, pending_response: Optional[str] = None, extra: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Write the current state to the store (see ``snapshot``).
+
+        Use as a blocking effect: ``yield Blocking(checkpointer.save, iteration)``.
+        """
+        self.store.save(self.run_id, self.snapshot(iteration, pending_response, extra))
+        self.saves += 1
+
+    def finish(self, result: Any) -> None:
+        """Replace the checkpoint with the run's final answer."""
+        self.store.save(self.run_id, {
+            "version": CHECKPOINT_VERSION,
+            "status": "done",
+            "run_id": self.run_id,
+            "agent": self.agent_name,
+            "query": self.query,
+            "result": encode_sets(result),
+            "updated": time.time(),
+        })
+
+    def track(self, steps: AgentSteps) -> AgentSteps:
+        """
+        Wrap an agent's step generator so a finished run records its answer.
+
+        A run that raises keeps its last checkpoint, so it can be resumed.
+
+        Args:
+            steps: The agent's step generator
+
+        Returns:
+            Step generator with the same effects and result
+        """
+        result = yield from steps
+        yield Blocking(self.finish, result)
+        return result
+
+
+def load_checkpoint(store: Any, run_id: str, agent_name: str) -> Dict[str, Any]:
+    """
+    Load a run's checkpoint for ``resume``.
+
+    Args:
+        store: Checkpoint store
+        run_id: Run identifier
+        agent_name: ``agent_kind`` of the resuming agent
+
+    Returns:
+        The checkpoint
+
+    Raises:
+        ValueError: If there is no store, the run is unknown, or it was
+            checkpointed by another kind of agent or format version
+    """
+    if store is None:
+        raise ValueError("No checkpoint store set. Pass checkpoint_store= when creating the agent")
+    data = store.load(run_id)
+    if data is None:
+        raise ValueError(f"No checkpoint found for run '{run_id}'")
+    if data.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Checkpoint of run '{run_id}' has unsupported version {data.get('version')}")
+    if data.get("agent") and data["agent"] != agent_name:
+        raise ValueError(f"Run '{run_id}' was checkpointed by {data['agent']}, not {agent_name}")
+    return data
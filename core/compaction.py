@@ -0,0 +1,213 @@
+"""
+Prompt compaction for context-window overflow recovery.
+
+When a prompt does not fit the model's context window, the LLM wrappers
+raise an error derived from ``ContextOverflowError`` instead of retrying the
+same payload. The agents then run their compaction strategies over the
+current run state and retry once with the smaller prompt.
+
+A strategy is any callable ``strategy(state) -> bool`` that shrinks the
+``CompactionState`` in place and returns True if it removed anything. The
+built-in strategies, applied in this order by default, are:
+
+- ``truncate_tool_outputs``: shorten long tool results
+- ``drop_oldest_steps``: drop the oldest scratchpad entries
+- ``summarize_memory``: condense the conversation history with the LLM
+
+Example:
+    >>> from core.compaction import drop_oldest_steps
+    >>> agent.add_compaction_strategy(drop_oldest_steps(keep=1))
+"""
+
+from typing import Any, Callable, Generator, List, Optional, Sequence, Tuple
+
+from .context_overflow import ContextOverflowError
+from .runner import Blocking, LLMCall
+from .scratchpad import Scratchpad
+from .tracing import span
+
+
+class CompactionState:
+    """Parts of an agent prompt that compaction strategies may shrink."""
+
+    def __init__(self, scratchpad: Scratchpad, memory_context: str = "", llm: Any = None):
+        """
+        Initialize CompactionState.
+
+        Args:
+            scratchpad: Tool-call history of the current run
+            memory_context: Conversation history text included in the prompt
+            llm: The agent's LLM (used by summarizing strategies)
+        """
+        self.scratchpad = scratchpad
+        self.memory_context = memory_context
+        self.llm = llm
+
+
+CompactionStrategy = Callable[[CompactionState], bool]
+
+
+def truncate_tool_outputs(max_chars: int = 2000) -> CompactionStrategy:
+    """
+    Build a strategy that shortens tool results longer than ``max_chars``.
+
+    Args:
+        max_chars: Maximum characters kept per tool result
+
+    Returns:
+        Compaction strategy
+    """
+    if max_chars < 1:
+        raise ValueError("max_chars must be >= 1")
+
+    def strategy(state: CompactionState) -> bool:
+        changed = False
+        for step in state.scratchpad.steps:
+            text = str(step.result)
+            if len(text) > max_chars:
+                step.result = f"{text[:max_chars]}... [truncated {len(text) - max_chars} characters]"
+                changed = True
+        return changed
+
+    strategy.__name__ = f"truncate_tool_outputs({max_chars})"
+    return strategy
+
+
+def drop_oldest_steps(keep: int = 2) -> CompactionStrategy:
+    """
+    Build a strategy that keeps only the ``keep`` most recent scratchpad steps.
+
+    Args:
+        keep: Number of recent tool calls to keep
+
+    Returns:
+        Compaction strategy
+    """
+    if keep < 0:
+        raise ValueError("keep must be >= 0")
+
+    def strategy(state: CompactionState) -> bool:
+        return state.scratchpad.drop_oldest(keep) > 0
+
+    strategy.__name__ = f"drop_oldest_steps({keep})"
+    return strategy
+
+
+def summarize_memory(max_chars: int = 1500) -> CompactionStrategy:
+    """
+    Build a strategy that condenses conversation history longer than ``max_chars``.
+
+    The history is summarized with the agent's LLM; if that fails (or the
+    history itself is too long to summarize) only its most recent
+    ``max_chars`` characters are kept. The memory object is not modified,
+    only the text included in the current run's prompts.
+
+    Args:
+        max_chars: History length that triggers summarization
+
+    Returns:
+        Compaction strategy
+    """
+    if max_chars < 1:
+        raise ValueError("max_chars must be >= 1")
+
+    def strategy(state: CompactionState) -> bool:
+        context = state.memory_context
+        if len(context) <= max_chars:
+            return False
+
+        summary = None
+        if state.llm is not None:
+            prompt = (
+                "Summarize the following conversation concisely, preserving names, "
+                "facts, decisions and open questions:\n\n"
+                f"{context}\n\nSummary:"
+            )
+            try:
+                summary = state.llm.generate_response(prompt)
+            except Exception:
+                summary = None
+
+        if summary and len(summary) < len(context):
+            state.memory_context = f"Summary of earlier conversation: {summary.strip()}"
+        else:
+            state.memory_context = "..." + context[-max_chars:]
+        return True
+
+    strategy.__name__ = f"summarize_memory({max_chars})"
+    return strategy
+
+
+def default_compaction_strategies() -> List[CompactionStrategy]:
+    """
+    Get a fresh list of the built-in strategies in their default order.
+
+    Returns:
+        List of compaction strategies
+    """
+    return [truncate_tool_outputs(), drop_oldest_steps(), summarize_memory()]
+
+
+def compact(state: CompactionState, strategies: Sequence[CompactionStrategy]) -> List[str]:
+    """
+    Run every strategy over ``state``.
+
+    Args:
+        state: Run state to shrink
+        strategies: Strategies to apply, in order
+
+    Returns:
+        Names of the strategies that removed something (empty if nothing could be removed)
+    """
+    applied = []
+    for strategy in strategies:
+        if strategy(state):
+            applied.append(getattr(strategy, "__name__", repr(strategy)))
+    return applied
+
+
+def call_with_compaction(
+    build_prompt: Callable[[], str],
+    state: CompactionState,
+    strategies: Sequence[CompactionStrategy],
+    on_compact: Optional[Callable[[List[str]], None]] = None,
+    allow_dispatch: Optional[Callable[[str, Any], bool]] = None,
+) -> Generator[Any, Any, Tuple[Any, str]]:
+    """
+    Call the LLM, compacting and retrying once if the prompt overflows.
+
+    This is an agent step (see ``core.runner``); use it with ``yield from``
+    inside an agent's step generator.
+
+    Args:
+        build_prompt: Function rendering the prompt from the current state
+        state: Run state the strategies may shrink
+        strategies: Compaction strategies to apply on overflow
+        on_compact: Optional callback receiving the names of the applied strategies
+        allow_dispatch: Optional check a tool call must pass to be dispatched
+            early while the response streams (see core.early_dispatch)
+
+    Returns:
+        Tuple of (LLM call result, prompt that was sent)
+
+    Raises:
+        ContextOverflowError: If the prompt overflows and cannot be compacted,
+            or still overflows after compaction
+    """
+    with span("build_prompt", "prompt"):
+        prompt = build_prompt()
+    try:
+        result = yield LLMCall(prompt, allow_dispatch)
+        return result, prompt
+    except ContextOverflowError:
+        # Strategies may call the LLM (summarize_memory), so run them as blocking work
+        applied = yield Blocking(compact, state, strategies)
+        if not applied:
+            raise
+        if on_compact is not None:
+            on_compact(applied)
+
+    with span("build_prompt", "prompt"):
+        prompt = build_prompt()
+    result = yield LLMCall(prompt, allow_dispatch)
+    return result, prompt
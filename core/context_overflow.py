@@ -0,0 +1,77 @@
+"""
+Context-window overflow detection for the Codemni framework.
+
+A prompt that is longer than the model's context window fails the same way
+on every attempt, so the LLM wrappers must not retry it. Each wrapper checks
+failures with ``is_context_overflow()`` and raises its own
+``<Provider>LLMContextLengthError``, which also derives from
+``ContextOverflowError`` so agents can catch it for any provider and shrink
+the prompt instead (see ``core.compaction``).
+"""
+
+import re
+from typing import Any
+
+
+class ContextOverflowError(Exception):
+    """Marker base for errors caused by a prompt exceeding the context window."""
+
+
+# Provider error codes that mean "prompt too long"
+_OVERFLOW_CODES = frozenset({
+    "context_length_exceeded",
+    "string_above_max_length",
+    "request_too_large",
+})
+
+# Messages used by the providers and local servers for the same condition:
+# OpenAI / Groq / vLLM, Anthropic, Gemini, llama.cpp (binding and server),
+# Ollama and TGI.
+_OVERFLOW_RE = re.compile(
+    r"maximum context length"
+    r"|context[_ ]length[_ ]exceeded"
+    r"|context window"
+    r"|exceeds? (?:the )?(?:available )?context"
+    r"|prompt is too long"
+    r"|input is too long"
+    r"|too many (?:input )?tokens"
+    r"|reduce the length of the (?:messages|prompt|input)"
+    r"|input token count .*exceeds"
+    r"|exceeds the maximum number of tokens"
+    r"|input validation error: `inputs` tokens \+ `max_new_tokens`"
+    r"|requested tokens \(\d+\) exceed",
+    re.IGNORECASE,
+)
+
+
+def _error_code(exc: Any) -> str:
+    """Read a provider error code from an SDK exception, if present."""
+    code = getattr(exc, "code", None)
+    if isinstance(code, str):
+        return code
+    body = getattr(exc, "body", None)
+    if isinstance(body, dict):
+        error = body.get("error", body)
+        if isinstance(error, dict):
+            code = error.get("code") or error.get("type")
+            if isinstance(code, str):
+                return code
+    return ""
+
+
+def is_context_overflow(error: Any) -> bool:
+    """
+    Check whether an exception (or error message) means the prompt is too long.
+
+    Args:
+        error: Exception raised by a provider SDK or server, or its message
+
+    Returns:
+        True if retrying the same prompt cannot succeed because it does not
+        fit the model's context window
+    """
+    if isinstance(error, ContextOverflowError):
+        return True
+    if isinstance(error, BaseException) and _error_code(error) in _OVERFLOW_CODES:
+        return True
+    return bool(_OVERFLOW_RE.search(str(error)))
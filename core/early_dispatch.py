@@ -0,0 +1,130 @@
+"""
+Early tool dispatch for streamed agent responses.
+
+When the LLM streams its answer, the "Tool call" and "Tool Parameters" keys
+are complete long before the model finishes writing the remaining fields.
+``stream_with_early_dispatch`` starts the tool on a background thread as
+soon as both are known, so slow tools overlap with generation instead of
+following it.
+
+A call is only started early if the agent would run it anyway: the agent
+passes an ``allow`` check (e.g. not a repeated call, not after the run was
+told to answer), and with parallel tool calls the dispatch waits until the
+"Tool Calls" list is known to be empty. A response whose final parse fails
+or asks for a different call still leaves the early call executed, so
+enable early dispatch only for tools that are safe to run speculatively.
+"""
+
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from .adapter import Tool_Executor
+from .executors import get_thread_pool
+from .json_stream import IncrementalJSONParser
+
+
+class EarlyToolDispatch:
+    """A tool execution started before the LLM response finished streaming."""
+
+    def __init__(self, tool_name: str, tool_parameters: Any, future: Future):
+        self.tool_name = tool_name
+        self.tool_parameters = tool_parameters
+        self.future = future
+
+    def matches(self, tool_name: str, tool_parameters: Any) -> bool:
+        """
+        Check that the fully parsed response asks for the same tool call.
+
+        Args:
+            tool_name: Tool name from the final parse
+            tool_parameters: Tool parameters from the final parse
+
+        Returns:
+            True if the early result can be used as-is
+        """
+        return tool_name == self.tool_name and tool_parameters == self.tool_parameters
+
+    def result(self) -> Any:
+        """Wait for and return the tool result."""
+        return self.future.result()
+
+
+def stream_with_early_dispatch(
+    chunks: Iterable[str],
+    available_tools: Dict[str, Dict[str, Any]],
+    on_chunk: Optional[Callable[[str], None]] = None,
+    tool_key: str = "Tool call",
+    params_key: str = "Tool Parameters",
+    allow: Optional[Callable[[str, Any], bool]] = None,
+    wait_for: Optional[str] = None,
+) -> Tuple[str, Optional[EarlyToolDispatch]]:
+    """
+    Consume a streamed LLM response, dispatching the tool call early.
+
+    Args:
+        chunks: Iterable of text chunks from the LLM
+        available_tools: Agent tool registry (name -> {"function", ...})
+        on_chunk: Optional callback invoked with every chunk (display/tracing)
+        tool_key: JSON key holding the tool name
+        params_key: JSON key holding the tool parameters
+        allow: Optional check (tool_name, tool_parameters) -> bool; see dispatch_if_ready()
+        wait_for: Optional key that may request other calls; see dispatch_if_ready()
+
+    Returns:
+        tuple: (full_response_text, EarlyToolDispatch or None)
+    """
+    parser = IncrementalJSONParser()
+    dispatch: Optional[EarlyToolDispatch] = None
+
+    for chunk in chunks:
+        if on_chunk is not None:
+            on_chunk(chunk)
+        completed = parser.feed(chunk)
+        if dispatch is None and (completed or parser.done):
+            dispatch = dispatch_if_ready(parser, available_tools, tool_key, params_key, allow, wait_for)
+
+    return parser.text, dispatch
+
+
+def dispatch_if_ready(
+    parser: IncrementalJSONParser,
+    available_tools: Dict[str, Dict[str, Any]],
+    tool_key: str = "Tool call",
+    params_key: str = "Tool Parameters",
+    allow: Optional[Callable[[str, Any], bool]] = None,
+    wait_for: Optional[str] = None,
+) -> Optional[EarlyToolDispatch]:
+    """
+    Start the tool call once its name and parameters have been parsed.
+
+    Args:
+        parser: Parser fed with the response so far
+        available_tools: Agent tool registry (name -> {"function", ...})
+        tool_key: JSON key holding the tool name
+        params_key: JSON key holding the tool parameters
+        allow: Optional check (tool_name, tool_parameters) -> bool; the call is
+            not started if it returns False (e.g. a repeated call the agent
+            answers from its earlier result)
+        wait_for: Optional key that may still request other calls (e.g. "Tool
+            Calls"): the call is only started once that key is complete and
+            empty, or the object ended without it
+
+    Returns:
+        EarlyToolDispatch if the call was started, else None
+    """
+    if not parser.has(tool_key, params_key):
+        return None
+    if wait_for is not None:
+        if wait_for in parser.values:
+            if parser.values[wait_for] not in (None, "None", "", []):
+                return None
+        elif not parser.done:
+            return None
+    tool_name = parser.values[tool_key]
+    params = parser.values[params_key]
+    if not isinstance(tool_name, str) or tool_name not in available_tools:
+        return None
+    if allow is not None and not allow(tool_name, params):
+        return None
+    future = get_thread_pool().submit(Tool_Executor, tool_name, params, available_tools)
+    return EarlyToolDispatch(tool_name, params, future)
@@ -0,0 +1,199 @@
+"""
+Agent run events for the Codemni framework.
+
+``invoke_stream`` / ``ainvoke_stream`` report an agent run as it happens
+instead of returning only the final answer:
+
+- ``IterationStart``: a new reasoning iteration begins
+- ``ReasoningField``: a reasoning field of the model's JSON response is
+  complete (e.g. "Thinking", "Reasoning", "Self-Reflection")
+- ``FinalResponseDelta``: new text of the "Final Response" field, extracted
+  while the response streams (only once "Tool call" is known to be "None")
+- ``ToolStart`` / ``ToolEnd``: a tool call starts / finishes, with its
+  wall time in seconds
+- ``FinalResponse``: the run finished; ``text`` is what ``invoke`` returns
+
+Deltas come from the LLM's ``generate_response_stream`` when it has one,
+otherwise the whole response arrives as a single delta. ``FinalResponse``
+is authoritative: deltas of a response the agent then rejects (e.g. one
+that fails to parse) are not retracted.
+
+Example:
+    >>> for event in agent.invoke_stream("What is 12 * 7?"):
+    ...     if event.type == "final_response_delta":
+    ...         print(event.text, end="", flush=True)
+"""
+
+from typing import Any, Dict, List, Optional
+
+from .json_stream import IncrementalJSONParser
+
+TOOL_KEY = "Tool call"
+PARAMS_KEY = "Tool Parameters"
+TOOL_CALLS_KEY = "Tool Calls"
+FINAL_RESPONSE_KEY = "Final Response"
+_CONTROL_KEYS = (TOOL_KEY, PARAMS_KEY, TOOL_CALLS_KEY, FINAL_RESPONSE_KEY)
+_NO_TOOL = (None, "", "None")
+
+
+class AgentEvent:
+    """Base class of agent run events."""
+
+    __slots__ = ()
+    type = "event"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the event to a plain dict (e.g. for JSON / server-sent events).
+
+        Returns:
+            Dict with "type" and the event fields
+        """
+        data = {"type": self.type}
+        data.update((name, getattr(self, name)) for name in self.__slots__)
+        return data
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class IterationStart(AgentEvent):
+    """A new reasoning iteration begins."""
+
+    __slots__ = ("iteration",)
+    type = "iteration_start"
+
+    def __init__(self, iteration: int):
+        self.iteration = iteration
+
+
+class ReasoningField(AgentEvent):
+    """A reasoning field of the model's response is complete."""
+
+    __slots__ = ("iteration", "name", "value")
+    type = "reasoning"
+
+    def __init__(self, iteration: int, name: str, value: Any):
+        self.iteration = iteration
+        self.name = name
+        self.value = value
+
+
+class FinalResponseDelta(AgentEvent):
+    """New text of the final response."""
+
+    __slots__ = ("iteration", "text")
+    type = "final_response_delta"
+
+    def __init__(self, iteration: int, text: str):
+        self.iteration = iteration
+        self.text = text
+
+
+class ToolStart(AgentEvent):
+    """A tool call starts."""
+
+    __slots__ = ("iteration", "tool_name", "parameters")
+    type = "tool_start"
+
+    def __init__(self, iteration: int, tool_name: str, parameters: Any):
+        self.iteration = iteration
+        self.tool_name = tool_name
+        self.parameters = parameters
+
+
+class ToolEnd(AgentEvent):
+    """A tool call finished."""
+
+    __slots__ = ("iteration", "tool_name", "parameters", "result", "elapsed")
+    type = "tool_end"
+
+    def __init__(self, iteration: int, tool_name: str, parameters: Any, result: Any, elapsed: float):
+        self.iteration = iteration
+        self.tool_name = tool_name
+        self.parameters = parameters
+        self.result = result
+        self.elapsed = elapsed
+
+
+class FinalResponse(AgentEvent):
+    """The run finished."""
+
+    __slots__ = ("text",)
+    type = "final_response"
+
+    def __init__(self, text: Any):
+        self.text = text
+
+
+class ResponseEventParser:
+    """
+    Turn a (streamed) LLM response into ``ReasoningField`` and
+    ``FinalResponseDelta`` events.
+
+    Example:
+        >>> events = ResponseEventParser(iteration=1)
+        >>> events.feed('{"Thinking": "easy", "Tool call": "None", "Final Response": "Hel')
+        [ReasoningField(iteration=1, name='Thinking', value='easy'), FinalResponseDelta(iteration=1, text='Hel')]
+    """
+
+    def __init__(self, iteration: int, parser: Optional[IncrementalJSONParser] = None):
+        """
+        Initialize ResponseEventParser.
+
+        Args:
+            iteration: Agent iteration the response belongs to
+            parser: Parser to read from; if given, the caller feeds it and
+                passes the completed keys to ``update``
+        """
+        self.iteration = iteration
+        self.parser = parser or IncrementalJSONParser()
+        self._sent = ""
+
+    def feed(self, chunk: str) -> List[AgentEvent]:
+        """
+        Consume the next chunk of the response.
+
+        Args:
+            chunk: Newly received text
+
+        Returns:
+            Events produced by this chunk
+        """
+        return self.update(self.parser.feed(chunk))
+
+    def update(self, completed: List[str]) -> List[AgentEvent]:
+        """
+        Produce events after the parser was fed.
+
+        Args:
+            completed: Keys completed by the last feed
+
+        Returns:
+            Events produced by the last feed
+        """
+        events: List[AgentEvent] = [
+            ReasoningField(self.iteration, key, self.parser.values.get(key, self.parser.raw_values[key]))
+            for key in completed if key not in _CONTROL_KEYS
+        ]
+        delta = self._final_delta()
+        if delta:
+            events.append(FinalResponseDelta(self.iteration, delta))
+        return events
+
+    def _final_delta(self) -> Optional[str]:
+        values = self.parser.values
+        if TOOL_KEY not in values or values[TOOL_KEY] not in _NO_TOOL or values.get(TOOL_CALLS_KEY):
+            return None
+        text = self.parser.partial_string(FINAL_RESPONSE_KEY)
+        if text is None:
+            return None
+        if not self._sent:
+            complete = FINAL_RESPONSE_KEY in self.parser.raw_values
+            # "None" means no answer yet; wait until the text cannot be that
+            if text == "None" or (not complete and "None".startswith(text)):
+                return None
+        delta = text[len(self._sent):]
+        self._sent = text
+        return delta
@@ -0,0 +1,84 @@
+"""
+Shared worker pools for the Codemni framework.
+
+Pools are created lazily on first use and shared by every agent in the
+process, so running work in the background never pays thread start-up
+cost more than once.
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_tool_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """
+    Get the shared thread pool, creating it on first use.
+
+    Returns:
+        Process-wide ThreadPoolExecutor
+    """
+    global _thread_pool
+    if _thread_pool is None:
+        with _lock:
+            if _thread_pool is None:
+                _thread_pool = ThreadPoolExecutor(thread_name_prefix="codemni")
+    return _thread_pool
+
+
+def get_tool_pool() -> ThreadPoolExecutor:
+    """
+    Get the thread pool for tools run with an execution policy.
+
+    It is separate from ``get_thread_pool()`` because a tool that times out
+    keeps its thread until it returns; hung tools then only use up this
+    pool, never the one the agents rely on for LLM calls and dispatch.
+
+    Returns:
+        Process-wide ThreadPoolExecutor
+    """
+    global _tool_pool
+    if _tool_pool is None:
+        with _lock:
+            if _tool_pool is None:
+                _tool_pool = ThreadPoolExecutor(
+                    max_workers=min(64, (os.cpu_count() or 1) * 8),
+                    thread_name_prefix="codemni-tool",
+                )
+    return _tool_pool
+
+
+def _noop() -> None:
+    return None
+
+
+def get_process_pool(max_workers: Optional[int] = None, warm: bool = True) -> ProcessPoolExecutor:
+    """
+    Get the shared process pool for CPU-bound tools, creating it on first use.
+
+    Args:
+        max_workers: Worker processes (defaults to the CPU count); only used
+            when the pool is created
+        warm: Start every worker immediately so the first tool calls do not
+            pay process start-up cost
+
+    Returns:
+        Process-wide ProcessPoolExecutor
+    """
+    global _process_pool
+    if _process_pool is None:
+        with _lock:
+            if _process_pool is None:
+                workers = max_workers or os.cpu_count() or 1
+                pool = ProcessPoolExecutor(max_workers=workers)
+                if warm:
+                    for future in [pool.submit(_noop) for _ in range(workers)]:
+                        future.result()
+                _process_pool = pool
+    return _process_pool
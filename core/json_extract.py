@@ -0,0 +1,409 @@
+"""
+Tolerant JSON extraction for LLM responses.
+
+The agents ask the model for one JSON object, usually inside a ```json
+fence. Models do not always comply: the fence may be missing or use
+'''json, the object may be surrounded by prose, or the JSON itself may be
+slightly off. ``extract_json`` handles all of this in three steps:
+
+1. One pass over the response finds every top-level ``{...}`` span,
+   skipping braces inside strings. Spans after a fence marker are tried
+   first, then the others in order. A span left open at the end of the
+   response is included too, so a cut-off answer can be sent for fixing.
+2. Each span is decoded with the fast backend (``orjson`` when installed,
+   ``pip install orjson``, otherwise ``json``).
+3. A span that does not decode is repaired and decoded again: single-quoted
+   strings, trailing commas, Python ``True``/``False``/``None``, unquoted
+   keys, raw newlines in strings, and the set-literal style ``{"25 * 4"}``
+   the prompts use for positional tool parameters (decoded to a
+   ``SetLiteral``, which keeps the order the model wrote the values in).
+   A span that ends inside a string or with brackets still open was cut
+   off (e.g. by ``max_tokens``) and is rejected rather than closed, so a
+   partial "Final Response" is never returned as the answer.
+
+If nothing decodes, ``JSONExtractionError`` carries the broken fragment so
+the caller can ask the model to fix just that (``fix_json_response``)
+instead of failing the run.
+"""
+
+import json
+import re
+from typing import Any, Callable, List, Optional, Tuple
+
+try:
+    import orjson  # type: ignore
+    _ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None  # type: ignore
+    _ORJSON_AVAILABLE = False
+
+# Key a repaired set literal is decoded under before it becomes a SetLiteral
+_SET_KEY = "\u0000set"
+_FENCE = re.compile(r"(?:```|''')\s*json", re.IGNORECASE)
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_VALID_ESCAPES = '"\\/bfnrtu'
+
+FIX_JSON_PROMPT = """The following JSON is invalid: {error}
+
+```
+{fragment}
+```
+
+Return the same content as one valid JSON object inside a ```json block, with double quotes \
+around keys and strings and every bracket closed. If it was cut off, complete it. Do not change \
+anything else."""
+
+
+class JSONExtractionError(ValueError):
+    """No JSON object could be decoded from an LLM response."""
+
+    def __init__(self, message: str, fragment: str = ""):
+        """
+        Initialize JSONExtractionError.
+
+        Args:
+            message: Error description
+            fragment: The text that looked most like the intended JSON object
+        """
+        super().__init__(message)
+        self.fragment = fragment
+
+
+def loads(text: str) -> Any:
+    """
+    Decode strict JSON with the fastest available backend.
+
+    Args:
+        text: JSON text
+
+    Returns:
+        Decoded value
+
+    Raises:
+        ValueError: If the text is not valid JSON
+    """
+    if _ORJSON_AVAILABLE:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def find_json_objects(text: str) -> List[Tuple[int, int]]:
+    """
+    Find the top-level ``{...}`` spans of a text in one pass.
+
+    Braces inside double-quoted strings are skipped; single-quoted strings
+    are recognised where a key or value starts. An object still open at the
+    end of the text is returned with ``end == len(text)``.
+
+    Args:
+        text: LLM response
+
+    Returns:
+        List of (start, end) spans in order of appearance
+    """
+    spans: List[Tuple[int, int]] = []
+    depth = 0
+    start = 0
+    quote: Optional[str] = None
+    escape = False
+    previous = ""  # last non-space character outside strings
+    for i, c in enumerate(text):
+        if quote is not None:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == quote:
+                quote = None
+                previous = c
+            continue
+        if c == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif depth == 0:
+            continue
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                spans.append((start, i + 1))
+        elif c == '"' or (c == "'" and previous in "{[,:"):
+            quote = c
+        if not c.isspace():
+            previous = c
+    if depth > 0:
+        spans.append((start, len(text)))
+    return spans
+
+
+def repair_json(fragment: str) -> str:
+    """
+    Rewrite almost-JSON into valid JSON in one pass.
+
+    An unterminated string and unclosed brackets are closed; use
+    ``loads_lenient(..., allow_truncated=False)`` to reject such text.
+
+    Args:
+        fragment: Text of one object as written by a model
+
+    Returns:
+        Repaired JSON text (not guaranteed to be valid if the damage is
+        beyond the supported fixes)
+    """
+    return _repair(fragment)[0]
+
+
+def _repair(fragment: str) -> Tuple[str, bool]:
+    """repair_json(), also reporting whether the fragment was cut off."""
+    out: List[str] = []
+    # Per open bracket: (bracket, index in out, saw a ':' at this level)
+    stack: List[List[Any]] = []
+    quote: Optional[str] = None
+    i, n = 0, len(fragment)
+    while i < n:
+        c = fragment[i]
+        if quote is not None:
+            if c == "\\" and i + 1 < n:
+                nxt = fragment[i + 1]
+                if nxt == "'" and quote == "'":
+                    out.append("'")
+                elif nxt in _VALID_ESCAPES:
+                    out.append(c + nxt)
+                else:
+                    out.append("\\\\" + nxt)
+                i += 2
+                continue
+            if c == quote:
+                out.append('"')
+                quote = None
+            elif c == '"':
+                out.append('\\"')
+            elif c == "\n":
+                out.append("\\n")
+            elif c == "\r":
+                out.append("\\r")
+            elif c == "\t":
+                out.append("\\t")
+            else:
+                out.append(c)
+            i += 1
+            continue
+
+        if c in "\"'":
+            quote = c
+            out.append('"')
+        elif c in "{[":
+            stack.append([c, len(out), False])
+            out.append(c)
+        elif c in "}]":
+            _strip_trailing_comma(out)
+            if stack:
+                _close(out, stack.pop())
+        elif c == ":":
+            if stack:
+                stack[-1][2] = True
+            out.append(c)
+        elif c.isalpha() or c == "_":
+            j = i
+            while j < n and (fragment[j].isalnum() or fragment[j] == "_"):
+                j += 1
+            word = fragment[i:j]
+            k = j
+            while k < n and fragment[k].isspace():
+                k += 1
+            if k < n and fragment[k] == ":" and stack and stack[-1][0] == "{":
+                out.append(f'"{word}"')  # unquoted key
+            else:
+                out.append(_LITERALS.get(word, word))
+            i = j
+            continue
+        else:
+            out.append(c)
+        i += 1
+
+    # Truncated response: close the open string and brackets
+    truncated = quote is not None or bool(stack)
+    if quote is not None:
+        out.append('"')
+    while stack:
+        _strip_trailing_comma(out)
+        if out and out[-1].rstrip().endswith(":"):
+            out.append("null")
+        _close(out, stack.pop())
+    return "".join(out), truncated
+
+
+def _strip_trailing_comma(out: List[str]) -> None:
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def _close(out: List[str], frame: List[Any]) -> None:
+    bracket, index, keyed = frame
+    if bracket == "[":
+        out.append("]")
+    elif keyed or len(out) == index + 1:
+        out.append("}")
+    else:
+        # {"a", "b"}: a set literal, decoded to a SetLiteral by decode_sets
+        out[index] = '{"\\u0000set": ['
+        out.append("]}")
+
+
+class SetLiteral(tuple):
+    """
+    Values written as a set literal, e.g. ``{"2", "10"}`` for positional tool parameters.
+
+    A tuple rather than a set: the tool executor binds the values as
+    positional arguments, so the order the model wrote them in must be kept
+    (a set would order them by string hash, which changes between runs).
+    """
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "{" + ", ".join(map(repr, self)) + "}"
+
+
+def encode_sets(value: Any) -> Any:
+    """
+    Convert a value to plain JSON data in which sets survive the round trip.
+
+    Set literals keep their order; Python sets are sorted by repr. Other
+    values that JSON cannot represent are stored as their repr.
+
+    Args:
+        value: Value to convert (e.g. tool parameters)
+
+    Returns:
+        JSON-serializable data; decode_sets() restores the sets
+    """
+    if isinstance(value, SetLiteral):
+        # In the order the model wrote them: they bind as positional arguments
+        return {_SET_KEY: [encode_sets(item) for item in value]}
+    if isinstance(value, (set, frozenset)):
+        return {_SET_KEY: [encode_sets(item) for item in sorted(value, key=repr)]}
+    if isinstance(value, dict):
+        return {str(key): encode_sets(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_sets(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return repr(value)
+
+
+def decode_sets(value: Any) -> Any:
+    """
+    Turn the encoded sets in decoded JSON data back into SetLiteral values.
+
+    Args:
+        value: Data produced by encode_sets() (or by repairing a set literal)
+
+    Returns:
+        The data with every encoded set replaced by a SetLiteral
+    """
+    if isinstance(value, dict):
+        if len(value) == 1 and _SET_KEY in value:
+            return SetLiteral(decode_sets(item) for item in value[_SET_KEY])
+        return {key: decode_sets(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode_sets(item) for item in value]
+    return value
+
+
+def loads_lenient(text: str, allow_truncated: bool = True) -> Any:
+    """
+    Decode JSON, repairing it if strict decoding fails.
+
+    Args:
+        text: JSON or almost-JSON text
+        allow_truncated: Close an unterminated string or unclosed brackets
+            (e.g. a partial streamed object); if False, text that was cut
+            off is an error
+
+    Returns:
+        Decoded value
+
+    Raises:
+        ValueError: If the text cannot be decoded even after repair, or is
+            cut off and allow_truncated is False
+    """
+    try:
+        return loads(text)
+    except ValueError:
+        repaired, truncated = _repair(text)
+        if truncated and not allow_truncated:
+            raise ValueError("JSON is cut off (unterminated string or unclosed object)") from None
+        return decode_sets(loads(repaired))
+
+
+def extract_json(response: str) -> dict:
+    """
+    Extract the JSON object from an LLM response.
+
+    Args:
+        response: Raw LLM response, fenced or not
+
+    Returns:
+        The decoded object
+
+    Raises:
+        JSONExtractionError: If no object could be decoded, with the most
+            likely fragment attached (also when the object was cut off, so
+            a partial answer is fixed instead of returned)
+    """
+    spans = find_json_objects(response)
+    if not spans:
+        raise JSONExtractionError(f"No JSON object found in response: {response[:200]}", response.strip())
+
+    fence = _FENCE.search(response)
+    if fence is not None:
+        spans.sort(key=lambda span: span[0] < fence.end())
+
+    error: Optional[ValueError] = None
+    for start, end in spans:
+        try:
+            value = loads_lenient(response[start:end], allow_truncated=False)
+        except ValueError as exc:
+            error = error or exc
+            continue
+        if isinstance(value, dict):
+            return value
+
+    start, end = spans[0]
+    raise JSONExtractionError(f"Invalid JSON in response: {error or 'not an object'}", response[start:end])
+
+
+def fix_json_response(
+    llm: Any,
+    parse: Callable[[str], Any],
+    error: JSONExtractionError,
+    attempts: int = 1,
+) -> Any:
+    """
+    Ask the model to fix a malformed JSON fragment, then parse its answer.
+
+    Only the broken fragment is sent, not the agent prompt, so the re-ask
+    is a fraction of the cost of repeating the iteration.
+
+    Args:
+        llm: LLM with a generate_response(prompt) method
+        parse: Parser applied to the model's answer (e.g. the agent's parser)
+        error: The extraction error to fix
+        attempts: Maximum fix requests
+
+    Returns:
+        Result of ``parse`` on the first answer that parses
+
+    Raises:
+        JSONExtractionError: If no answer could be parsed
+    """
+    for _ in range(attempts):
+        prompt = FIX_JSON_PROMPT.format(error=error, fragment=error.fragment)
+        try:
+            return parse(llm.generate_response(prompt))
+        except JSONExtractionError as exc:
+            error = exc
+    raise error
@@ -0,0 +1,184 @@
+"""
+Incremental JSON parsing for streamed LLM responses.
+
+The agents ask the model for a single JSON object. When the model is
+streamed, the top-level keys of that object become available one by one
+long before the whole response is finished. ``IncrementalJSONParser``
+consumes the stream chunk by chunk and reports each top-level key as soon
+as its value is complete, without re-scanning text it has already seen.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+from .json_extract import loads_lenient
+
+
+class IncrementalJSONParser:
+    """
+    Parse the top-level keys of a JSON object from a stream of text chunks.
+
+    Text before the first ``{`` (such as a ```json fence) is ignored. Values
+    that cannot be decoded are kept verbatim in ``raw_values`` so callers can
+    still fall back to parsing the full response at the end.
+
+    Example:
+        >>> parser = IncrementalJSONParser()
+        >>> parser.feed('```json\\n{"Tool call": "calc", ')
+        ['Tool call']
+        >>> parser.values["Tool call"]
+        'calc'
+    """
+
+    def __init__(self, loads: Optional[Callable[[str], Any]] = None):
+        """
+        Initialize the parser.
+
+        Args:
+            loads: Function used to decode each completed value
+                   (defaults to json_extract.loads_lenient)
+        """
+        self.text = ""
+        self.values: Dict[str, Any] = {}
+        self.raw_values: Dict[str, str] = {}
+        self.done = False
+        self._loads = loads or loads_lenient
+        self._pos = 0
+        self._depth = 0
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._state = "key"
+        self._token_start: Optional[int] = None
+        self._key: Optional[str] = None
+
+    def feed(self, chunk: str) -> List[str]:
+        """
+        Consume the next chunk of the stream.
+
+        Args:
+            chunk: Newly received text
+
+        Returns:
+            List of top-level keys whose values completed in this chunk
+        """
+        completed: List[str] = []
+        if not chunk or self.done:
+            self.text += chunk or ""
+            return completed
+
+        self.text += chunk
+        text = self.text
+        i = self._pos
+        n = len(text)
+
+        while i < n and not self.done:
+            c = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        if self._state == "key":
+                            try:
+                                self._key = json.loads(text[self._token_start:i + 1])
+                            except ValueError:
+                                self._key = text[self._token_start + 1:i]
+                            self._state = "colon"
+                        elif self._state == "value":
+                            self._finish(text[self._token_start:i + 1], completed)
+            elif not self._started:
+                if c == "{":
+                    self._started = True
+                    self._depth = 1
+                    self._state = "key"
+            elif c == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    if self._state == "key":
+                        self._token_start = i
+                    elif self._state == "value" and self._token_start is None:
+                        self._token_start = i
+            elif c in "{[":
+                if self._depth == 1 and self._state == "value" and self._token_start is None:
+                    self._token_start = i
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    if self._state == "value" and self._token_start is not None:
+                        self._finish(text[self._token_start:i], completed)
+                    self.done = True
+                elif self._depth == 1 and self._state == "value" and self._token_start is not None:
+                    self._finish(text[self._token_start:i + 1], completed)
+            elif self._depth == 1:
+                if c == ":" and self._state == "colon":
+                    self._state = "value"
+                    self._token_start = None
+                elif c == ",":
+                    if self._state == "value" and self._token_start is not None:
+                        self._finish(text[self._token_start:i], completed)
+                    self._state = "key"
+                elif not c.isspace() and self._state == "value" and self._token_start is None:
+                    # Scalar value (number, true, false, null)
+                    self._token_start = i
+
+            i += 1
+
+        self._pos = i
+        return completed
+
+    def _finish(self, raw: str, completed: List[str]) -> None:
+        """Record a completed top-level value."""
+        key = self._key
+        raw = raw.strip()
+        if key is not None:
+            self.raw_values[key] = raw
+            try:
+                self.values[key] = self._loads(raw)
+            except Exception:
+                pass
+            completed.append(key)
+        self._key = None
+        self._token_start = None
+        self._state = "after"
+
+    def partial_string(self, key: str) -> Optional[str]:
+        """
+        Decoded text of a string value, including while it is still streaming.
+
+        Args:
+            key: Top-level key
+
+        Returns:
+            The value received so far (the full value once complete), or
+            None if the key has not started or its value is not a string
+        """
+        if key in self.raw_values:
+            value = self.values.get(key)
+            return value if isinstance(value, str) else None
+        if (self._key != key or self._state != "value" or self._token_start is None
+                or self.text[self._token_start] != '"'):
+            return None
+
+        body = self.text[self._token_start + 1:self._pos]
+        # Hold back an escape sequence that is not complete yet
+        escape = body.rfind("\\")
+        if escape != -1:
+            backslashes = len(body[:escape + 1]) - len(body[:escape + 1].rstrip("\\"))
+            if backslashes % 2 == 1:
+                sequence = body[escape:]
+                if len(sequence) < 2 or (sequence[1] == "u" and len(sequence) < 6):
+                    body = body[:escape]
+        try:
+            return json.loads(f'"{body}"')
+        except ValueError:
+            return None
+
+    def has(self, *keys: str) -> bool:
+        """Return True if every given key has a successfully decoded value."""
+        return all(key in self.values for key in keys)
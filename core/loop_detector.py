@@ -0,0 +1,283 @@
+"""
+Loop detection for agent runs.
+
+Models sometimes call the same tool with the same parameters again and
+again until ``max_iterations`` is reached, paying for a full LLM call every
+time. ``LoopDetector`` watches the tool calls of one run:
+
+- a repeated (tool, parameters) pair is not executed again; the agent gets
+  the previous result back with a hint to use it or change course
+- after ``max_repeats`` repeats the agent is told to stop calling tools
+  and give its final answer now
+- optionally (``max_stalled``), the same happens after that many
+  consecutive steps that only returned results already seen. This is off
+  by default: different calls legitimately return the same text (e.g.
+  "not found", "0"), so it can cut a healthy run short
+
+Calls whose previous result was an error are executed again, since
+retrying may succeed.
+
+``LoopStats`` accumulates what the detectors of an agent's runs did,
+including the iterations saved by forcing an answer early.
+"""
+
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .result_store import ErrorText
+from .tool_cache import is_error_result
+
+ToolCallSpec = Tuple[str, Any]
+
+REPEAT_HINT = (
+    "\n\n[Note: you already called {tool} with these exact parameters in iteration {iteration}; "
+    "this is that result again, the tool was not run. Do not repeat the call: use this result, "
+    "try different parameters or another tool, or give your Final Response.]"
+)
+
+FORCE_FINAL_NOTE = (
+    "\n\nIMPORTANT: You are repeating tool calls without getting new information. "
+    "Do NOT call any tool. Set \"Tool call\" to \"None\" and give your Final Response now, "
+    "based on the results above."
+)
+
+
+def call_key(tool_name: str, parameters: Any) -> str:
+    """
+    Build a canonical key for a tool call.
+
+    Args:
+        tool_name: Name of the tool
+        parameters: Tool parameters (dict, JSON string, ...)
+
+    Returns:
+        String identifying the call regardless of key order or JSON formatting
+    """
+    if isinstance(parameters, str):
+        try:
+            parameters = json.loads(parameters)
+        except ValueError:
+            parameters = parameters.strip()
+    if isinstance(parameters, (set, frozenset)):
+        parameters = sorted(map(str, parameters))
+    return json.dumps([tool_name, parameters], sort_keys=True, default=repr)
+
+
+class LoopDetector:
+    """Repeated-call and stall detection for one agent run."""
+
+    def __init__(self, max_repeats: int = 2, max_stalled: Optional[int] = None, enabled: bool = True):
+        """
+        Initialize LoopDetector.
+
+        Args:
+            max_repeats: Repeated calls answered from the previous result before
+                the agent is forced to answer
+            max_stalled: Consecutive steps returning only already-seen results
+                before the agent is forced to answer (None = no stall detection)
+            enabled: If False, nothing is detected and every call is executed
+        """
+        if max_repeats < 1:
+            raise ValueError("max_repeats must be >= 1")
+        if max_stalled is not None and max_stalled < 1:
+            raise ValueError("max_stalled must be >= 1 or None")
+
+        self.enabled = enabled
+        self.max_repeats = max_repeats
+        self.max_stalled = max_stalled
+        self.repeats = 0
+        self.stalled = 0
+        self.forced = False
+        # call key -> (iteration, result, failed)
+        self._calls: Dict[str, Tuple[int, Any, bool]] = {}
+        self._results = set()
+
+    def seen(self, tool_name: str, parameters: Any) -> bool:
+        """
+        Check whether a call was already made in this run with a usable result.
+
+        Args:
+            tool_name: Name of the tool
+            parameters: Tool parameters
+
+        Returns:
+            True if the call should not be executed again
+        """
+        if not self.enabled:
+            return False
+        previous = self._calls.get(call_key(tool_name, parameters))
+        return previous is not None and not previous[2]
+
+    def repeat(self, tool_name: str, parameters: Any) -> str:
+        """
+        Answer a repeated call with its previous result and a hint.
+
+        Args:
+            tool_name: Name of the tool
+            parameters: Tool parameters
+
+        Returns:
+            Previous result followed by a note not to repeat the call
+        """
+        iteration, result, _ = self._calls[call_key(tool_name, parameters)]
+        self.repeats += 1
+        self._stall(True)
+        return f"{result}{REPEAT_HINT.format(tool=tool_name, iteration=iteration)}"
+
+    def record(self, iteration: int, tool_name: str, parameters: Any, result: Any,
+               is_error: Optional[bool] = None) -> None:
+        """
+        Record an executed call.
+
+        Args:
+            iteration: Agent iteration of the call
+            tool_name: Name of the tool
+            parameters: Tool parameters
+            result: Tool result (raw, or the prompt text the runner made of it)
+            is_error: Whether the call failed (None = detect it from the result:
+                a ToolError, "Error..." text, or ErrorText from limit_tool_output)
+        """
+        if not self.enabled:
+            return
+        if is_error is None:
+            is_error = isinstance(result, ErrorText) or is_error_result(result)
+        self._calls[call_key(tool_name, parameters)] = (iteration, result, is_error)
+        text = str(result)
+        self._stall(text in self._results)
+        self._results.add(text)
+
+    def merge(self, iteration: int, calls: List[ToolCallSpec], fresh: List[ToolCallSpec], results: List[Any]) -> List[Any]:
+        """
+        Combine the results of a parallel step in which repeated calls were skipped.
+
+        Args:
+            iteration: Agent iteration of the step
+            calls: All requested calls
+            fresh: The calls that were executed (items of ``calls``)
+            results: Results of ``fresh``
+
+        Returns:
+            Results for every call in ``calls``, repeats answered with ``repeat()``
+        """
+        executed = dict(zip(map(id, fresh), results))
+        merged = []
+        for call in calls:
+            if id(call) in executed:
+                result = executed[id(call)]
+                self.record(iteration, call[0], call[1], result)
+            else:
+                result = self.repeat(call[0], call[1])
+            merged.append(result)
+        return merged
+
+    def _stall(self, stale: bool) -> None:
+        self.stalled = self.stalled + 1 if stale else 0
+
+    def should_force_final(self) -> bool:
+        """
+        Check whether the agent should stop calling tools.
+
+        Returns:
+            True once the repeat or stall limit is reached (and stays True)
+        """
+        if not self.enabled:
+            return self.forced
+        stalled = self.max_stalled is not None and self.stalled >= self.max_stalled
+        if self.repeats >= self.max_repeats or stalled:
+            self.forced = True
+        return self.forced
+
+    def prompt_note(self) -> str:
+        """Text appended to the prompt once the agent must answer."""
+        return FORCE_FINAL_NOTE if self.forced else ""
+
+    def state(self) -> Dict[str, Any]:
+        """
+        Get the detector's state (for checkpoints).
+
+        Returns:
+            Dict with repeats, stalled, forced, calls and results
+        """
+        return {
+            "repeats": self.repeats,
+            "stalled": self.stalled,
+            "forced": self.forced,
+            "calls": {key: list(value) for key, value in self._calls.items()},
+            "results": list(self._results),
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """
+        Restore a state returned by ``state()``.
+
+        Args:
+            state: Saved state
+        """
+        self.repeats = state["repeats"]
+        self.stalled = state["stalled"]
+        self.forced = state["forced"]
+        self._calls = {
+            key: (value[0], value[1], value[2] if len(value) > 2 else is_error_result(value[1]))
+            for key, value in state["calls"].items()
+        }
+        self._results = set(state["results"])
+
+
+class LoopStats:
+    """Thread-safe totals of the loop detection of an agent's runs."""
+
+    def __init__(self):
+        self.runs = 0
+        self.repeated_calls = 0
+        self.forced_finals = 0
+        self.iterations_saved = 0
+        # Report of the most recent run
+        self.last: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    def record(self, detector: LoopDetector, iterations: int, max_iterations: int) -> Dict[str, Any]:
+        """
+        Record the end of a run.
+
+        Args:
+            detector: The run's LoopDetector
+            iterations: Iterations the run used
+            max_iterations: Iteration limit of the run
+
+        Returns:
+            Report of the run: iterations, max_iterations, repeated_calls,
+            forced_final and iterations_saved
+        """
+        forced = detector.forced
+        report = {
+            "iterations": iterations,
+            "max_iterations": max_iterations,
+            "repeated_calls": detector.repeats,
+            "forced_final": forced,
+            # Iterations a looping run would still have spent before hitting the limit
+            "iterations_saved": max(max_iterations - iterations, 0) if forced else 0,
+        }
+        with self._lock:
+            self.runs += 1
+            self.repeated_calls += report["repeated_calls"]
+            self.forced_finals += int(forced)
+            self.iterations_saved += report["iterations_saved"]
+            self.last = report
+        return report
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Get the totals.
+
+        Returns:
+            Dict with runs, repeated_calls, forced_finals, iterations_saved and last
+        """
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "repeated_calls": self.repeated_calls,
+                "forced_finals": self.forced_finals,
+                "iterations_saved": self.iterations_saved,
+                "last": self.last,
+            }
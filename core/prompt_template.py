@@ -0,0 +1,107 @@
+"""
+Compiled prompt templates for the Codemni framework.
+
+Agent prompt templates are written as ``str.format`` strings with a
+``{tool_list}`` placeholder and per-call placeholders such as
+``{user_input}`` and ``{context}``. Formatting the whole template on every
+call is wasteful, and substituting the tool list with ``replace()`` before
+``format()`` breaks as soon as a tool description contains a brace.
+
+``CompiledPromptTemplate`` parses the template once, fills in the static
+values (the tool list), joins the static text between the remaining
+placeholders, and then only splices per-call values into those slots.
+Values are inserted verbatim, never parsed as format strings.
+"""
+
+from string import Formatter
+from typing import Dict, List, Tuple
+
+
+class CompiledPromptTemplate:
+    """
+    Prompt template split into static text and named slots.
+
+    Example:
+        >>> template = CompiledPromptTemplate("Tools:\\n{tool_list}\\nquery: {user_input}",
+        ...                                   tool_list="- calc: evaluates {math}")
+        >>> template.slots
+        ('user_input',)
+        >>> template.render(user_input="2+2")
+        'Tools:\\n- calc: evaluates {math}\\nquery: 2+2'
+    """
+
+    def __init__(self, template: str, **static: str):
+        """
+        Compile a template.
+
+        Args:
+            template: ``str.format``-style template (``{{`` / ``}}`` for literal braces)
+            **static: Values substituted once at compile time (e.g. tool_list)
+
+        Raises:
+            ValueError: If the template is not a valid format string, or uses
+                positional, attribute, index or format-spec placeholders
+        """
+        self.source = template
+        self.static = dict(static)
+
+        # Alternating [text, slot, text, slot, ..., text]
+        segments: List[str] = []
+        slots: List[str] = []
+        text = ""
+        for literal, field, format_spec, conversion in Formatter().parse(template):
+            text += literal
+            if field is None:
+                continue
+            if not field.isidentifier() or format_spec or conversion:
+                raise ValueError(f"Unsupported placeholder in prompt template: {{{field}}}")
+            if field in self.static:
+                text += str(self.static[field])
+            else:
+                segments.append(text)
+                slots.append(field)
+                text = ""
+        segments.append(text)
+
+        self._segments: Tuple[str, ...] = tuple(segments)
+        self.slots: Tuple[str, ...] = tuple(slots)
+
+    def render(self, **values: str) -> str:
+        """
+        Fill the slots.
+
+        Args:
+            **values: Text for every slot; inserted verbatim (braces are safe)
+
+        Returns:
+            The full prompt
+
+        Raises:
+            KeyError: If a slot has no value
+        """
+        parts = [self._segments[0]]
+        for slot, segment in zip(self.slots, self._segments[1:]):
+            parts.append(str(values[slot]))
+            parts.append(segment)
+        return "".join(parts)
+
+
+def format_tool_list(tools: Dict[str, Dict[str, object]]) -> str:
+    """
+    Format the agent's tool registry for the ``{tool_list}`` placeholder.
+
+    Args:
+        tools: Agent tool registry (name -> {"description", ...})
+
+    Returns:
+        One indented "- name: description" line per tool, followed by the
+        parameters of tools registered with a signature
+    """
+    lines = []
+    for name, info in tools.items():
+        signature = info.get("signature")
+        if signature is not None:
+            lines.append(f"        - {name}: {info['description']} Parameters: {signature.prompt_hint()}")
+        else:
+            lines.append(f"        - {name}: {info['description']}")
+    return "\n".join(lines)
@@ -0,0 +1,293 @@
+"""
+Tool output budgets for the Codemni framework.
+
+Tool results are rendered into every later prompt of a run, so one large
+result (e.g. a full Wikipedia article) is paid for on each iteration. With
+an output budget (``max_tool_output_chars`` on the agent, or
+``max_output_chars`` per tool in ``add_tool``) an oversized result is cut
+to the budget and the full text is kept in a ``ResultStore`` under a
+handle. The truncation note tells the model how to continue with the
+built-in ``read_result`` tool, which pages through the stored text by
+character offset or by section heading.
+
+Dict and list results are serialized as compact JSON rather than with
+Python ``repr``.
+
+Example:
+    >>> agent = Create_ToolCalling_Agent(llm=llm, max_tool_output_chars=4000)
+    >>> agent.add_tool("wikipedia_content", "Full article text", wiki.get_page_content,
+    ...                max_output_chars=8000)
+"""
+
+import itertools
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .tool_cache import is_error_result
+from .tool_schema import inspect_tool
+
+READ_RESULT_TOOL = "read_result"
+READ_RESULT_DESCRIPTION = (
+    "Read more of a tool result that was truncated. Pass the handle from the truncation "
+    "note and either offset (character position to continue from) or section (one of the "
+    "section headings listed in the note)."
+)
+
+# "== History ==" (Wikipedia), "## History" (Markdown)
+_HEADING = re.compile(r"^[ \t]*(?:(=+)[ \t]*(.+?)[ \t]*=+|(#+)[ \t]+(.+?))[ \t]*$", re.MULTILINE)
+_MAX_LISTED_SECTIONS = 15
+
+
+class ErrorText(str):
+    """
+    Prompt text of a failed tool call (e.g. a serialized ToolError).
+
+    Serializing drops the ToolError type; this marker keeps the failure
+    visible to loop detection, so a failed call is run again when repeated
+    instead of being answered from its earlier result.
+    """
+
+    __slots__ = ()
+
+
+def serialize_result(result: Any) -> str:
+    """
+    Convert a tool result to prompt text.
+
+    Args:
+        result: Tool result
+
+    Returns:
+        Strings unchanged, dicts and lists as compact JSON, anything else via str()
+    """
+    if isinstance(result, str):
+        return result
+    if isinstance(result, (dict, list, tuple)):
+        try:
+            return json.dumps(result, ensure_ascii=False, separators=(",", ":"), default=str)
+        except (TypeError, ValueError):
+            pass
+    return str(result)
+
+
+def find_sections(text: str) -> List[str]:
+    """
+    List the section headings of a text.
+
+    Args:
+        text: Stored tool output
+
+    Returns:
+        Heading titles in order of appearance
+    """
+    return [match.group(2) or match.group(4) for match in _HEADING.finditer(text)]
+
+
+class ResultStore:
+    """
+    Thread-safe LRU store of full tool outputs, addressed by handle.
+
+    Handles look like ``"wikipedia_content-3"``; the oldest outputs are
+    forgotten once ``max_results`` are stored. Runs with their own memory
+    (sessions, batch items) get their own store (see ``scoped``), so they
+    cannot read or evict each other's outputs.
+    """
+
+    def __init__(self, max_results: int = 64, page_chars: int = 4000):
+        """
+        Initialize ResultStore.
+
+        Args:
+            max_results: Maximum outputs kept (least recently used are dropped)
+            page_chars: Default characters returned per read
+        """
+        if max_results < 1:
+            raise ValueError("max_results must be >= 1")
+        if page_chars < 1:
+            raise ValueError("page_chars must be >= 1")
+
+        self.max_results = max_results
+        self.page_chars = page_chars
+        self._results: "OrderedDict[str, str]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def scoped(self) -> "ResultStore":
+        """
+        Create an empty store with the same limits, for one conversation.
+
+        Returns:
+            New ResultStore
+        """
+        return ResultStore(self.max_results, self.page_chars)
+
+    def put(self, tool_name: str, text: str) -> str:
+        """
+        Store a full output.
+
+        Args:
+            tool_name: Tool that produced it
+            text: Output text
+
+        Returns:
+            Handle for read()
+        """
+        with self._lock:
+            handle = f"{tool_name}-{next(self._ids)}"
+            self._results[handle] = text
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+            return handle
+
+    def get(self, handle: str) -> Optional[str]:
+        """
+        Get a stored output.
+
+        Args:
+            handle: Handle from put()
+
+        Returns:
+            Full text, or None if the handle is unknown or was dropped
+        """
+        with self._lock:
+            text = self._results.get(handle)
+            if text is not None:
+                self._results.move_to_end(handle)
+            return text
+
+    def spill(self, tool_name: str, text: str, max_chars: int) -> str:
+        """
+        Store an oversized output and return its head with a truncation note.
+
+        Args:
+            tool_name: Tool that produced it
+            text: Full output text
+            max_chars: Output budget
+
+        Returns:
+            At most ``max_chars`` characters of the output followed by a note
+            with the handle, the offset to continue from and the sections
+        """
+        handle = self.put(tool_name, text)
+        # Prefer to cut at a line break near the budget
+        cut = text.rfind("\n", max_chars * 4 // 5, max_chars)
+        if cut <= 0:
+            cut = max_chars
+
+        note = (f"\n\n[Output truncated: showing {cut} of {len(text)} characters. "
+                f"Call {READ_RESULT_TOOL} with handle=\"{handle}\" and offset={cut} to continue")
+        sections = find_sections(text)
+        if sections:
+            listed = ", ".join(sections[:_MAX_LISTED_SECTIONS])
+            more = f" (+{len(sections) - _MAX_LISTED_SECTIONS} more)" if len(sections) > _MAX_LISTED_SECTIONS else ""
+            note += f", or with section=<name> for one of: {listed}{more}"
+        return text[:cut] + note + "]"
+
+    def read(self, handle: str, offset: Any = 0, section: Optional[str] = None, length: Any = None) -> str:
+        """
+        Read part of a stored output (the ``read_result`` tool).
+
+        Args:
+            handle: Handle from the truncation note
+            offset: Character position to start at
+            section: Section heading to start at (overrides offset)
+            length: Characters to return (defaults to ``page_chars``)
+
+        Returns:
+            The requested text followed by a note with the next offset,
+            or an error message
+        """
+        text = self.get(str(handle).strip().strip("\"'"))
+        if text is None:
+            return f"Error: Unknown or expired result handle '{handle}'"
+        try:
+            start = int(offset or 0)
+            length = int(length) if length not in (None, "", "None") else self.page_chars
+        except (TypeError, ValueError):
+            return "Error: offset and length must be integers"
+        if length < 1:
+            return "Error: length must be positive"
+
+        if section not in (None, "", "None"):
+            start = self._find_section(text, str(section))
+            if start is None:
+                listed = ", ".join(find_sections(text)) or "none"
+                return f"Error: Section '{section}' not found. Sections: {listed}"
+
+        start = max(0, min(start, len(text)))
+        end = min(start + length, len(text))
+        if end < len(text):
+            note = (f"\n\n[Characters {start}-{end} of {len(text)}. Call {READ_RESULT_TOOL} "
+                    f"with handle=\"{handle}\" and offset={end} to continue]")
+        else:
+            note = f"\n\n[Characters {start}-{end} of {len(text)}. End of result]"
+        return text[start:end] + note
+
+    @staticmethod
+    def _find_section(text: str, section: str) -> Optional[int]:
+        wanted = section.strip().strip("=#").strip().lower()
+        partial = None
+        for match in _HEADING.finditer(text):
+            title = (match.group(2) or match.group(4)).lower()
+            if title == wanted:
+                return match.start()
+            if partial is None and wanted in title:
+                partial = match.start()
+        return partial
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._results)
+
+
+def make_read_result_tool(store: ResultStore) -> Dict[str, Any]:
+    """
+    Build the registry entry of the built-in ``read_result`` tool.
+
+    Args:
+        store: Store the agent spills oversized outputs to
+
+    Returns:
+        Tool registry entry
+    """
+    return {
+        "description": READ_RESULT_DESCRIPTION,
+        "function": store.read,
+        "signature": inspect_tool(store.read),
+        "cache": None,
+        "policy": None,
+        "max_output_chars": None,
+    }
+
+
+def limit_tool_output(
+    tool_name: str,
+    result: Any,
+    tool_info: Optional[Dict[str, Any]],
+    store: Optional[ResultStore],
+    max_chars: Optional[int] = None,
+) -> str:
+    """
+    Serialize a tool result and apply its output budget.
+
+    Args:
+        tool_name: Name of the tool
+        result: Tool result
+        tool_info: Tool registry entry (its ``max_output_chars`` overrides ``max_chars``)
+        store: Store for oversized outputs (None = no budget)
+        max_chars: Global output budget (None = unlimited)
+
+    Returns:
+        Result text, truncated with a read_result note if over budget
+        (ErrorText if the tool failed)
+    """
+    text = serialize_result(result)
+    if is_error_result(result):
+        return ErrorText(text)
+    limit = (tool_info or {}).get("max_output_chars") or max_chars
+    if store is None or limit is None or tool_name == READ_RESULT_TOOL or len(text) <= limit:
+        return text
+    return store.spill(tool_name, text, limit)
@@ -0,0 +1,485 @@
+"""
+Sync and async execution of agent runs.
+
+Each agent writes its reasoning loop once, as a generator that *yields* the
+work it needs done (an LLM call, one or more tool calls, a memory
+operation) and receives the result back. ``run_sync`` performs that work
+with blocking calls, which is what ``invoke`` does; ``run_async`` awaits it,
+which is what ``ainvoke`` does:
+
+- LLM calls use the LLM's ``agenerate_response(prompt)`` coroutine if it has
+  one, otherwise ``generate_response`` runs in the shared thread pool
+- ``async def`` tools are awaited natively, other tools run in the thread pool
+- memory methods use an ``a``-prefixed coroutine variant (``aget_context``)
+  if the memory has one, or are awaited if they are coroutine functions
+
+Exceptions raised while performing an effect are thrown back into the
+generator at the ``yield``, so the loop handles them exactly as if the call
+had been made inline.
+
+``stream_sync`` / ``stream_async`` drive the same generator but also yield
+``core.events`` events as the run progresses (``invoke_stream`` /
+``ainvoke_stream``): the ones the agent reports with ``Emit``, reasoning
+fields and final-response text parsed from the (streamed) LLM response, and
+the start and end of every tool call.
+
+Tool results are returned as prompt text: serialized, and cut to the agent's
+output budget if it has one (see ``core.result_store``).
+"""
+
+import asyncio
+import contextvars
+import copy
+import inspect
+import time
+from typing import Any, AsyncIterator, Callable, Generator, Iterator, List, Optional
+
+from .adapter import Async_Tool_Executor, Tool_Executor
+from .early_dispatch import dispatch_if_ready, stream_with_early_dispatch
+from .events import AgentEvent, FinalResponse, IterationStart, ResponseEventParser, ToolEnd, ToolStart
+from .executors import get_thread_pool
+from .result_store import READ_RESULT_TOOL, limit_tool_output, make_read_result_tool
+from .tool_calls import TOOL_CALLS_KEY, ToolCallSpec, aexecute_tool_calls, execute_tool_calls
+
+
+class LLMCall:
+    """Effect: send ``prompt`` to the agent's LLM; resolves to (response, early_dispatch)."""
+
+    __slots__ = ("prompt", "allow_dispatch")
+
+    def __init__(self, prompt: str, allow_dispatch: Optional[Callable[[str, Any], bool]] = None):
+        self.prompt = prompt
+        # Check (tool_name, parameters) -> bool a call must pass to be dispatched early
+        self.allow_dispatch = allow_dispatch
+
+
+class ToolCall:
+    """Effect: run a tool; resolves to the tool result (or error string)."""
+
+    __slots__ = ("tool_name", "parameters", "early_dispatch")
+
+    def __init__(self, tool_name: str, parameters: Any, early_dispatch: Any = None):
+        self.tool_name = tool_name
+        self.parameters = parameters
+        # An EarlyToolDispatch for this exact call, if it was already started
+        self.early_dispatch = early_dispatch
+
+
+class ToolCalls:
+    """Effect: run several independent tools concurrently; resolves to their results in order."""
+
+    __slots__ = ("calls", "max_concurrency")
+
+    def __init__(self, calls: List[ToolCallSpec], max_concurrency: int = 4):
+        self.calls = calls
+        self.max_concurrency = max_concurrency
+
+
+class MemoryCall:
+    """Effect: call a method of the agent's memory; resolves to its return value."""
+
+    __slots__ = ("method", "args")
+
+    def __init__(self, method: str, *args: Any):
+        self.method = method
+        self.args = args
+
+
+class Blocking:
+    """Effect: run a blocking function; resolves to its return value."""
+
+    __slots__ = ("function", "args")
+
+    def __init__(self, function: Callable[..., Any], *args: Any):
+        self.function = function
+        self.args = args
+
+
+class Emit:
+    """Effect: report an event to invoke_stream() consumers; resolves to None."""
+
+    __slots__ = ("event",)
+
+    def __init__(self, event: AgentEvent):
+        self.event = event
+
+
+AgentSteps = Generator[Any, Any, Any]
+
+
+def with_memory(agent: Any, memory: Any) -> Any:
+    """
+    Get a view of an agent that uses a different memory.
+
+    The view is a shallow copy: the LLM, tools, compiled prompt and caches
+    are shared with ``agent``. Besides ``memory`` it only has its own
+    ``result_store`` (and ``read_result`` tool bound to it), so truncated
+    outputs of one conversation are not readable from another. Used to run
+    independent conversations (batch items, sessions) through one agent.
+
+    Args:
+        agent: Agent instance
+        memory: Memory for the view (None = no conversation history)
+
+    Returns:
+        New agent view
+    """
+    # Build the shared prompt once instead of once per view
+    if hasattr(agent, "_get_compiled_prompt") and agent.tools:
+        agent._get_compiled_prompt()
+    # A new view even for the agent's own memory (e.g. None in a batch):
+    # each conversation needs its own result store
+    view = copy.copy(agent)
+    view.memory = memory
+    store = getattr(agent, "result_store", None)
+    if store is not None:
+        view.result_store = store.scoped()
+        if READ_RESULT_TOOL in agent.tools:
+            view.tools = dict(agent.tools)
+            view.tools[READ_RESULT_TOOL] = make_read_result_tool(view.result_store)
+    return view
+
+
+def _dispatch_wait_for(agent: Any) -> Optional[str]:
+    # With parallel calls a "Tool Calls" list may still follow the single call
+    return TOOL_CALLS_KEY if getattr(agent, "parallel_tool_calls", False) else None
+
+
+def _call_llm(agent: Any, effect: LLMCall):
+    """Blocking LLM call, streaming with early tool dispatch when enabled."""
+    llm = agent.llm
+    if getattr(agent, "early_tool_dispatch", False) and hasattr(llm, "generate_response_stream"):
+        return stream_with_early_dispatch(
+            llm.generate_response_stream(effect.prompt), agent.tools,
+            allow=effect.allow_dispatch, wait_for=_dispatch_wait_for(agent),
+        )
+    return llm.generate_response(effect.prompt), None
+
+
+def _limit_output(agent: Any, tool_name: str, result: Any) -> str:
+    """Serialize a tool result and apply the agent's output budget."""
+    return limit_tool_output(
+        tool_name,
+        result,
+        agent.tools.get(tool_name),
+        getattr(agent, "result_store", None),
+        getattr(agent, "max_tool_output_chars", None),
+    )
+
+
+def _limit_outputs(agent: Any, calls: List[ToolCallSpec], results: List[Any]) -> List[str]:
+    return [_limit_output(agent, name, result) for (name, _), result in zip(calls, results)]
+
+
+def _perform_sync(agent: Any, effect: Any) -> Any:
+    if isinstance(effect, LLMCall):
+        return _call_llm(agent, effect)
+    if isinstance(effect, ToolCall):
+        if effect.early_dispatch is not None:
+            result = effect.early_dispatch.result()
+        else:
+            result = Tool_Executor(effect.tool_name, effect.parameters, agent.tools)
+        return _limit_output(agent, effect.tool_name, result)
+    if isinstance(effect, ToolCalls):
+        results = execute_tool_calls(effect.calls, agent.tools, effect.max_concurrency)
+        return _limit_outputs(agent, effect.calls, results)
+    if isinstance(effect, MemoryCall):
+        return getattr(agent.memory, effect.method)(*effect.args)
+    if isinstance(effect, Blocking):
+        return effect.function(*effect.args)
+    if isinstance(effect, Emit):
+        return None
+    raise TypeError(f"Unknown agent effect: {effect!r}")
+
+
+async def _in_thread(function: Callable[..., Any], *args: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    # Run in a copy of the caller's context so tracing spans nest under the current one
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_thread_pool(), lambda: context.run(function, *args))
+
+
+async def _perform_async(agent: Any, effect: Any) -> Any:
+    if isinstance(effect, LLMCall):
+        llm = agent.llm
+        streaming = getattr(agent, "early_tool_dispatch", False) and hasattr(llm, "generate_response_stream")
+        if not streaming and hasattr(llm, "agenerate_response"):
+            return await llm.agenerate_response(effect.prompt), None
+        return await _in_thread(_call_llm, agent, effect)
+    if isinstance(effect, ToolCall):
+        if effect.early_dispatch is not None:
+            result = await asyncio.wrap_future(effect.early_dispatch.future)
+        else:
+            result = await Async_Tool_Executor(effect.tool_name, effect.parameters, agent.tools)
+        return _limit_output(agent, effect.tool_name, result)
+    if isinstance(effect, ToolCalls):
+        results = await aexecute_tool_calls(effect.calls, agent.tools, effect.max_concurrency)
+        return _limit_outputs(agent, effect.calls, results)
+    if isinstance(effect, MemoryCall):
+        memory = agent.memory
+        method = getattr(memory, "a" + effect.method, None)
+        if method is None:
+            method = getattr(memory, effect.method)
+        result = method(*effect.args)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+    if isinstance(effect, Blocking):
+        return await _in_thread(effect.function, *effect.args)
+    if isinstance(effect, Emit):
+        return None
+    raise TypeError(f"Unknown agent effect: {effect!r}")
+
+
+def run_sync(agent: Any, steps: AgentSteps) -> Any:
+    """
+    Drive an agent run with blocking calls.
+
+    Args:
+        agent: Agent providing ``llm``, ``tools``, ``memory`` and ``early_tool_dispatch``
+        steps: Generator yielding effects
+
+    Returns:
+        The generator's return value (the agent's final answer)
+    """
+    value, error = None, None
+    while True:
+        try:
+            effect = steps.throw(error) if error is not None else steps.send(value)
+        except StopIteration as stop:
+            return stop.value
+        value, error = None, None
+        try:
+            value = _perform_sync(agent, effect)
+        except Exception as exc:
+            error = exc
+
+
+async def run_async(agent: Any, steps: AgentSteps) -> Any:
+    """
+    Drive an agent run without blocking the event loop.
+
+    Args:
+        agent: Agent providing ``llm``, ``tools``, ``memory`` and ``early_tool_dispatch``
+        steps: Generator yielding effects
+
+    Returns:
+        The generator's return value (the agent's final answer)
+    """
+    value, error = None, None
+    while True:
+        try:
+            effect = steps.throw(error) if error is not None else steps.send(value)
+        except StopIteration as stop:
+            return stop.value
+        value, error = None, None
+        try:
+            value = await _perform_async(agent, effect)
+        except Exception as exc:
+            error = exc
+
+
+def _tool_specs(effect: Any) -> List[ToolCallSpec]:
+    if isinstance(effect, ToolCall):
+        return [(effect.tool_name, effect.parameters)]
+    return effect.calls
+
+
+def _stream_llm_sync(agent: Any, effect: LLMCall, iteration: int):
+    """Blocking LLM call yielding response events; returns (response, early_dispatch)."""
+    llm, prompt = agent.llm, effect.prompt
+    events = ResponseEventParser(iteration)
+    if not hasattr(llm, "generate_response_stream"):
+        response = llm.generate_response(prompt)
+        yield from events.feed(response)
+        return response, None
+
+    early = getattr(agent, "early_tool_dispatch", False)
+    dispatch = None
+    for chunk in llm.generate_response_stream(prompt):
+        completed = events.parser.feed(chunk)
+        if early and dispatch is None and (completed or events.parser.done):
+            dispatch = dispatch_if_ready(
+                events.parser, agent.tools, allow=effect.allow_dispatch, wait_for=_dispatch_wait_for(agent)
+            )
+        yield from events.update(completed)
+    return events.parser.text, dispatch
+
+
+def _stream_tools_sync(agent: Any, effect: Any, iteration: int):
+    """Run a ToolCall / ToolCalls effect yielding ToolStart and ToolEnd events."""
+    calls = _tool_specs(effect)
+    for name, params in calls:
+        yield ToolStart(iteration, name, params)
+
+    started = time.perf_counter()
+    elapsed = [0.0] * len(calls)
+    if isinstance(effect, ToolCall):
+        results = [_perform_sync(agent, effect)]
+        elapsed[0] = time.perf_counter() - started
+    else:
+        def on_result(index: int, _: Any) -> None:
+            elapsed[index] = time.perf_counter() - started
+
+        results = execute_tool_calls(calls, agent.tools, effect.max_concurrency, on_result)
+        results = _limit_outputs(agent, calls, results)
+
+    for (name, params), result, seconds in zip(calls, results, elapsed):
+        yield ToolEnd(iteration, name, params, result, seconds)
+    return results[0] if isinstance(effect, ToolCall) else results
+
+
+def stream_sync(agent: Any, steps: AgentSteps) -> Iterator[AgentEvent]:
+    """
+    Drive an agent run with blocking calls, yielding events as they happen.
+
+    Args:
+        agent: Agent providing ``llm``, ``tools``, ``memory`` and ``early_tool_dispatch``
+        steps: Generator yielding effects
+
+    Yields:
+        core.events events, ending with FinalResponse (the agent's final answer)
+    """
+    iteration = 0
+    value, error = None, None
+    try:
+        while True:
+            try:
+                effect = steps.throw(error) if error is not None else steps.send(value)
+            except StopIteration as stop:
+                yield FinalResponse(stop.value)
+                return
+            value, error = None, None
+            try:
+                if isinstance(effect, Emit):
+                    if isinstance(effect.event, IterationStart):
+                        iteration = effect.event.iteration
+                    yield effect.event
+                elif isinstance(effect, LLMCall):
+                    value = yield from _stream_llm_sync(agent, effect, iteration)
+                elif isinstance(effect, (ToolCall, ToolCalls)):
+                    value = yield from _stream_tools_sync(agent, effect, iteration)
+                else:
+                    value = _perform_sync(agent, effect)
+            except Exception as exc:
+                error = exc
+    finally:
+        steps.close()
+
+
+async def _iterate_in_thread(function: Callable[[], Any]) -> AsyncIterator[Any]:
+    """Iterate a blocking iterator in the shared thread pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue" = asyncio.Queue()
+    end = object()
+
+    def pump() -> None:
+        try:
+            for item in function():
+                loop.call_soon_threadsafe(queue.put_nowait, (item, None))
+            loop.call_soon_threadsafe(queue.put_nowait, (end, None))
+        except BaseException as exc:
+            loop.call_soon_threadsafe(queue.put_nowait, (end, exc))
+
+    pumping = loop.run_in_executor(get_thread_pool(), pump)
+    while True:
+        item, exc = await queue.get()
+        if item is end:
+            await pumping
+            if exc is not None:
+                raise exc
+            return
+        yield item
+
+
+async def _stream_llm_async(agent: Any, effect: LLMCall, iteration: int, out: List[Any]) -> AsyncIterator[AgentEvent]:
+    """LLM call yielding response events; stores (response, early_dispatch) in ``out``."""
+    llm, prompt = agent.llm, effect.prompt
+    events = ResponseEventParser(iteration)
+    if not hasattr(llm, "generate_response_stream"):
+        if hasattr(llm, "agenerate_response"):
+            response = await llm.agenerate_response(prompt)
+        else:
+            response = await _in_thread(llm.generate_response, prompt)
+        for event in events.feed(response):
+            yield event
+        out.append((response, None))
+        return
+
+    early = getattr(agent, "early_tool_dispatch", False)
+    dispatch = None
+    async for chunk in _iterate_in_thread(lambda: llm.generate_response_stream(prompt)):
+        completed = events.parser.feed(chunk)
+        if early and dispatch is None and (completed or events.parser.done):
+            dispatch = dispatch_if_ready(
+                events.parser, agent.tools, allow=effect.allow_dispatch, wait_for=_dispatch_wait_for(agent)
+            )
+        for event in events.update(completed):
+            yield event
+    out.append((events.parser.text, dispatch))
+
+
+async def _stream_tools_async(agent: Any, effect: Any, iteration: int, out: List[Any]) -> AsyncIterator[AgentEvent]:
+    """Run a ToolCall / ToolCalls effect yielding ToolStart and ToolEnd events."""
+    calls = _tool_specs(effect)
+    for name, params in calls:
+        yield ToolStart(iteration, name, params)
+
+    started = time.perf_counter()
+    elapsed = [0.0] * len(calls)
+    if isinstance(effect, ToolCall):
+        results = [await _perform_async(agent, effect)]
+        elapsed[0] = time.perf_counter() - started
+    else:
+        def on_result(index: int, _: Any) -> None:
+            elapsed[index] = time.perf_counter() - started
+
+        results = await aexecute_tool_calls(calls, agent.tools, effect.max_concurrency, on_result)
+        results = _limit_outputs(agent, calls, results)
+
+    for (name, params), result, seconds in zip(calls, results, elapsed):
+        yield ToolEnd(iteration, name, params, result, seconds)
+    out.append(results[0] if isinstance(effect, ToolCall) else results)
+
+
+async def stream_async(agent: Any, steps: AgentSteps) -> AsyncIterator[AgentEvent]:
+    """
+    Drive an agent run without blocking the event loop, yielding events as they happen.
+
+    Args:
+        agent: Agent providing ``llm``, ``tools``, ``memory`` and ``early_tool_dispatch``
+        steps: Generator yielding effects
+
+    Yields:
+        core.events events, ending with FinalResponse (the agent's final answer)
+    """
+    iteration = 0
+    value, error = None, None
+    try:
+        while True:
+            try:
+                effect = steps.throw(error) if error is not None else steps.send(value)
+            except StopIteration as stop:
+                yield FinalResponse(stop.value)
+                return
+            value, error = None, None
+            try:
+                if isinstance(effect, Emit):
+                    if isinstance(effect.event, IterationStart):
+                        iteration = effect.event.iteration
+                    yield effect.event
+                elif isinstance(effect, (LLMCall, ToolCall, ToolCalls)):
+                    out: List[Any] = []
+                    if isinstance(effect, LLMCall):
+                        events = _stream_llm_async(agent, effect, iteration, out)
+                    else:
+                        events = _stream_tools_async(agent, effect, iteration, out)
+                    async for event in events:
+                        yield event
+                    value = out[0]
+                else:
+                    value = await _perform_async(agent, effect)
+            except Exception as exc:
+                error = exc
+    finally:
+        steps.close()
@@ -0,0 +1,259 @@
+"""
+Agent scratchpad for the Codemni framework.
+
+The scratchpad records the tool calls an agent made during one ``invoke``
+and renders them into the next prompt. Keeping the steps as records rather
+than one growing string lets them be trimmed or shortened later, e.g. when
+the prompt no longer fits the model's context window (see
+``core.compaction``).
+
+Instructions that follow the tool results (e.g. "reason about your next
+action") are passed as ``footer`` and rendered once after the last step
+instead of after every step.
+
+With a ``token_budget`` the scratchpad stays bounded on long runs: the
+``keep_recent`` most recent steps are rendered verbatim and older ones are
+condensed to one-line observations (rule-based by default, or with
+``summarize_step``, e.g. a cheap model via ``llm_step_summarizer``). If that
+is still over budget, fewer steps are kept verbatim and the oldest
+observations are left out.
+"""
+
+from typing import Any, Callable, List, Optional
+
+from .tokenizer import count_tokens
+
+
+class ScratchpadStep:
+    """One tool call recorded in the scratchpad."""
+
+    __slots__ = ("iteration", "tool_name", "parameters", "result", "summary")
+
+    def __init__(self, iteration: int, tool_name: str, parameters: Any, result: Any):
+        self.iteration = iteration
+        self.tool_name = tool_name
+        self.parameters = parameters
+        self.result = result
+        # One-line observation, filled in when the step is first condensed
+        self.summary: Optional[str] = None
+
+    def __repr__(self) -> str:
+        return f"ScratchpadStep(iteration={self.iteration}, tool_name={self.tool_name!r})"
+
+
+def _one_line(value: Any, limit: int) -> str:
+    text = " ".join(str(value).split())
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+def condense_step(step: ScratchpadStep, max_chars: int = 160) -> str:
+    """
+    Rule-based one-line observation for a step.
+
+    Args:
+        step: Step to condense
+        max_chars: Maximum characters kept from the result
+
+    Returns:
+        e.g. "calculator({'expression': '2+2'}) -> 4"
+    """
+    return f"{step.tool_name}({_one_line(step.parameters, 80)}) -> {_one_line(step.result, max_chars)}"
+
+
+def llm_step_summarizer(llm: Any, max_chars: int = 200) -> Callable[[ScratchpadStep], str]:
+    """
+    Build a ``summarize_step`` function that condenses steps with an LLM.
+
+    Use a small, cheap model. If the call fails the rule-based
+    ``condense_step`` is used instead.
+
+    Args:
+        llm: LLM object with a generate_response(prompt) method
+        max_chars: Maximum characters of the tool result sent for summarization
+
+    Returns:
+        Function step -> one-line observation
+    """
+
+    def summarize(step: ScratchpadStep) -> str:
+        prompt = (
+            "Summarize what this tool call found in ONE short line, keeping any "
+            "numbers, names and facts needed later.\n\n"
+            f"Tool: {step.tool_name}\nParameters: {step.parameters}\n"
+            f"Result: {str(step.result)[: max_chars * 20]}\n\nOne-line summary:"
+        )
+        try:
+            summary = llm.generate_response(prompt)
+        except Exception:
+            summary = None
+        if not summary:
+            return condense_step(step, max_chars)
+        return f"{step.tool_name}({_one_line(step.parameters, 80)}) -> {_one_line(summary, max_chars)}"
+
+    return summarize
+
+
+class Scratchpad:
+    """
+    Ordered tool-call history of one agent run.
+
+    Example:
+        >>> pad = Scratchpad(lambda step: f"\\nTool Used: {step.tool_name}\\nResult: {step.result}")
+        >>> pad.add(1, "calculator", {"expression": "2+2"}, 4)
+        >>> pad.render()
+        '\\nTool Used: calculator\\nResult: 4'
+    """
+
+    OMITTED_NOTE = "\n\n[{count} earlier tool call(s) omitted to fit the context window]"
+    CONDENSED_HEADER = "\n\n--- Earlier tool calls (condensed) ---\n"
+
+    def __init__(
+        self,
+        render_step: Callable[[ScratchpadStep], str],
+        footer: str = "",
+        token_budget: Optional[int] = None,
+        keep_recent: int = 3,
+        summarize_step: Optional[Callable[[ScratchpadStep], str]] = None,
+        model: Optional[str] = None,
+    ):
+        """
+        Initialize Scratchpad.
+
+        Args:
+            render_step: Function formatting one step for the prompt
+            footer: Text rendered once after the steps (omitted while there are none)
+            token_budget: Maximum tokens for the rendered scratchpad (None = unbounded)
+            keep_recent: Steps kept verbatim when a budget is set
+            summarize_step: Function condensing an older step to one line
+                (defaults to the rule-based ``condense_step``)
+            model: Model name used to count tokens
+        """
+        if token_budget is not None and token_budget < 1:
+            raise ValueError("token_budget must be >= 1 or None")
+        if keep_recent < 1:
+            raise ValueError("keep_recent must be >= 1")
+
+        self.render_step = render_step
+        self.footer = footer
+        self.token_budget = token_budget
+        self.keep_recent = keep_recent
+        self.summarize_step = summarize_step
+        self.model = model
+        self.steps: List[ScratchpadStep] = []
+        self.omitted = 0
+
+    def add(self, iteration: int, tool_name: str, parameters: Any, result: Any) -> ScratchpadStep:
+        """
+        Record a tool call.
+
+        Args:
+            iteration: Agent iteration the call was made in
+            tool_name: Name of the tool
+            parameters: Parameters the tool was called with
+            result: Tool result
+
+        Returns:
+            The recorded step
+        """
+        step = ScratchpadStep(iteration, tool_name, parameters, result)
+        self.steps.append(step)
+        return step
+
+    def drop_oldest(self, keep: int) -> int:
+        """
+        Remove all but the ``keep`` most recent steps.
+
+        Args:
+            keep: Number of recent steps to keep
+
+        Returns:
+            Number of steps removed
+        """
+        excess = len(self.steps) - max(keep, 0)
+        if excess <= 0:
+            return 0
+        del self.steps[:excess]
+        self.omitted += excess
+        return excess
+
+    def prepare(self) -> None:
+        """
+        Condense the steps that will not be rendered verbatim.
+
+        Summaries are computed once per step. Agents call this as blocking
+        work after each tool step when ``summarize_step`` may call a model,
+        so rendering never waits on it.
+        """
+        if self.token_budget is None:
+            return
+        for step in self.steps[: -self.keep_recent]:
+            if step.summary is None:
+                step.summary = (self.summarize_step or condense_step)(step)
+
+    @staticmethod
+    def _summary(step: ScratchpadStep) -> str:
+        # Never calls summarize_step: steps prepare() has not condensed (e.g.
+        # recent ones squeezed out of the verbatim window) get the rule-based line
+        return step.summary if step.summary is not None else condense_step(step)
+
+    def _render(self, verbatim: int, skip: int) -> str:
+        """Render with the last ``verbatim`` steps in full and the first ``skip`` left out."""
+        split = len(self.steps) - verbatim
+        condensed = self.steps[skip:split]
+        omitted = self.omitted + skip
+
+        text = ""
+        if omitted:
+            text += self.OMITTED_NOTE.format(count=omitted)
+        if condensed:
+            text += self.CONDENSED_HEADER
+            text += "\n".join(f"[{step.iteration}] {self._summary(step)}" for step in condensed)
+        text += "".join(self.render_step(step) for step in self.steps[split:])
+        if self.steps and self.footer:
+            text += self.footer
+        return text
+
+    def render(self) -> str:
+        """
+        Render the scratchpad for the prompt.
+
+        Returns:
+            Formatted steps (older ones condensed if over budget), preceded
+            by a note if steps were left out and followed by the footer
+        """
+        count = len(self.steps)
+        if self.token_budget is None or count == 0:
+            return self._render(count, 0)
+
+        text = self._render(count, 0)
+        if count_tokens(text, self.model) <= self.token_budget:
+            return text
+
+        # Condense older steps, then keep fewer verbatim, then leave out the oldest observations
+        verbatim = min(self.keep_recent, count)
+        while True:
+            text = self._render(verbatim, 0)
+            if verbatim == 1 or count_tokens(text, self.model) <= self.token_budget:
+                break
+            verbatim -= 1
+
+        # Leave out the oldest observations, estimated from per-line token
+        # counts rather than re-rendering the whole scratchpad for each one
+        skip = 0
+        excess = count_tokens(text, self.model) - self.token_budget
+        if excess <= 0:
+            return text
+        for step in self.steps[: count - verbatim]:
+            if excess <= 0:
+                break
+            excess -= count_tokens(f"\n[{step.iteration}] {self._summary(step)}", self.model)
+            skip += 1
+        text = self._render(verbatim, skip)
+        # Token counts are not exactly additive; correct the estimate if needed
+        while skip < count - verbatim and count_tokens(text, self.model) > self.token_budget:
+            skip += 1
+            text = self._render(verbatim, skip)
+        return text
+
+    def __len__(self) -> int:
+        return len(self.steps)
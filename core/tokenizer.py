@@ -0,0 +1,341 @@
+"""
+Token counting service for the Codemni framework.
+
+Counts tokens with a real tokenizer when one is available and falls back
+to a calibrated estimate otherwise:
+
+- OpenAI and Groq models use a tiktoken BPE encoding (``pip install tiktoken``)
+- Any model prefix can be mapped to a provider tokenizer with ``register()``
+- Everything else uses a characters-per-token ratio that is learned from the
+  ``usage`` numbers the providers report back (see ``observe()``)
+
+Exact counts are memoized per string hash, so segments that repeat on every
+call (system prompt, tool list) are only tokenized once.
+"""
+
+import contextvars
+import math
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    import tiktoken  # type: ignore
+    _TIKTOKEN_AVAILABLE = True
+except ImportError:
+    tiktoken = None  # type: ignore
+    _TIKTOKEN_AVAILABLE = False
+
+
+# Model prefixes that are tokenized with a tiktoken encoding. Groq serves
+# open models whose own tokenizers are not on PyPI as tiktoken encodings,
+# so cl100k_base is used as the closest BPE approximation.
+_TIKTOKEN_PREFIXES: Tuple[Tuple[str, str], ...] = (
+    ("gpt-4o", "o200k_base"),
+    ("gpt-4.1", "o200k_base"),
+    ("gpt-5", "o200k_base"),
+    ("o1", "o200k_base"),
+    ("o3", "o200k_base"),
+    ("o4", "o200k_base"),
+    ("gpt-4", "cl100k_base"),
+    ("gpt-3.5", "cl100k_base"),
+    ("text-embedding", "cl100k_base"),
+    ("llama", "cl100k_base"),
+    ("meta-llama", "cl100k_base"),
+    ("mixtral", "cl100k_base"),
+    ("gemma", "cl100k_base"),
+    ("qwen", "cl100k_base"),
+    ("deepseek", "cl100k_base"),
+)
+
+
+class _CalibratedEstimator:
+    """Characters-per-token estimate refined from observed usage."""
+
+    def __init__(self, chars_per_token: float, smoothing: float):
+        self.chars_per_token = chars_per_token
+        self.smoothing = smoothing
+        self.observations = 0
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return int(math.ceil(len(text) / self.chars_per_token))
+
+    def observe(self, chars: int, tokens: int) -> None:
+        if chars <= 0 or tokens <= 0:
+            return
+        ratio = min(max(chars / tokens, 1.0), 10.0)
+        if self.observations == 0:
+            self.chars_per_token = ratio
+        else:
+            self.chars_per_token += self.smoothing * (ratio - self.chars_per_token)
+        self.observations += 1
+
+
+class TokenizerService:
+    """
+    Count tokens per model with memoization and calibrated fallback.
+
+    Example:
+        >>> tokenizer = TokenizerService()
+        >>> tokenizer.count("Hello world", model="gpt-4")
+        2
+        >>> tokenizer.observe(prompt_text, prompt_tokens=812, model="claude-3-haiku")
+        >>> tokenizer.count("Hello world", model="claude-3-haiku")  # calibrated estimate
+    """
+
+    def __init__(
+        self,
+        cache_size: int = 4096,
+        default_chars_per_token: float = 4.0,
+        smoothing: float = 0.2,
+    ):
+        """
+        Initialize TokenizerService.
+
+        Args:
+            cache_size: Maximum number of memoized exact counts
+            default_chars_per_token: Starting ratio for models without a tokenizer
+            smoothing: Weight of each new observation in the calibrated ratio (0.0-1.0)
+        """
+        if cache_size < 0:
+            raise ValueError("cache_size must be >= 0")
+        if default_chars_per_token <= 0:
+            raise ValueError("default_chars_per_token must be positive")
+
+        self.cache_size = cache_size
+        self.default_chars_per_token = default_chars_per_token
+        self.smoothing = smoothing
+        self._counters: Dict[str, Callable[[str], int]] = {}
+        self._resolved: Dict[str, Optional[Callable[[str], int]]] = {}
+        self._estimators: Dict[str, _CalibratedEstimator] = {}
+        self._cache: "OrderedDict[Tuple[str, int, int], int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, model_prefix: str, counter: Callable[[str], int]) -> None:
+        """
+        Use a custom tokenizer for every model starting with ``model_prefix``.
+
+        Args:
+            model_prefix: Model name prefix (e.g. "claude-", "mistral")
+            counter: Function returning the token count of a string
+        """
+        with self._lock:
+            self._counters[model_prefix] = counter
+            self._resolved.clear()
+            self._cache.clear()
+
+    def _resolve(self, model: str) -> Optional[Callable[[str], int]]:
+        """Find the exact tokenizer for a model, or None to estimate."""
+        if model in self._resolved:
+            return self._resolved[model]
+
+        counter = None
+        name = model.lower().split("/")[-1]
+        matches = [p for p in self._counters if model.startswith(p) or name.startswith(p)]
+        if matches:
+            counter = self._counters[max(matches, key=len)]
+        elif _TIKTOKEN_AVAILABLE:
+            for prefix, encoding_name in _TIKTOKEN_PREFIXES:
+                if name.startswith(prefix):
+                    try:
+                        encoding = tiktoken.encoding_for_model(name)
+                    except KeyError:
+                        encoding = tiktoken.get_encoding(encoding_name)
+                    counter = _encoding_counter(encoding)
+                    break
+
+        self._resolved[model] = counter
+        return counter
+
+    def _estimator(self, model: Optional[str]) -> _CalibratedEstimator:
+        key = model or ""
+        estimator = self._estimators.get(key)
+        if estimator is None:
+            estimator = _CalibratedEstimator(self.default_chars_per_token, self.smoothing)
+            self._estimators[key] = estimator
+        return estimator
+
+    def count(self, text: str, model: Optional[str] = None) -> int:
+        """
+        Count the tokens in ``text`` for ``model``.
+
+        Args:
+            text: Text to count
+            model: Model identifier (None uses the generic calibrated estimate)
+
+        Returns:
+            Token count (exact when a tokenizer is available)
+        """
+        if not text:
+            return 0
+
+        counter = self._resolve(model) if model else None
+        if counter is None:
+            return self._estimator(model).count(text)
+
+        key = (model, hash(text), len(text))
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+
+        tokens = counter(text)
+
+        with self._lock:
+            self.misses += 1
+            if self.cache_size:
+                self._cache[key] = tokens
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return tokens
+
+    def observe(self, text: str, prompt_tokens: int, model: Optional[str] = None) -> None:
+        """
+        Calibrate the estimate from a provider-reported token count.
+
+        Observations only affect models without an exact tokenizer.
+
+        Args:
+            text: Prompt text that was sent
+            prompt_tokens: Input token count reported by the provider
+            model: Model identifier the usage belongs to
+        """
+        if not text or not prompt_tokens:
+            return
+        if model and self._resolve(model) is not None:
+            return
+        with self._lock:
+            self._estimator(model).observe(len(text), prompt_tokens)
+            if model:
+                # Unknown models also refine the generic estimate
+                self._estimator(None).observe(len(text), prompt_tokens)
+
+    def chars_per_token(self, model: Optional[str] = None) -> float:
+        """
+        Get the current calibrated characters-per-token ratio.
+
+        Args:
+            model: Model identifier (None for the generic ratio)
+
+        Returns:
+            Learned ratio, or the default if nothing was observed yet
+        """
+        return self._estimator(model).chars_per_token
+
+    def is_exact(self, model: Optional[str]) -> bool:
+        """Return True if counts for ``model`` come from a real tokenizer."""
+        return bool(model) and self._resolve(model) is not None
+
+    def clear_cache(self) -> None:
+        """Drop all memoized counts."""
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def _encoding_counter(encoding) -> Callable[[str], int]:
+    """Wrap a tiktoken encoding into a count function."""
+    def count(text: str) -> int:
+        return len(encoding.encode(text, disallowed_special=()))
+    return count
+
+
+_default_tokenizer: Optional[TokenizerService] = None
+
+
+def get_tokenizer() -> TokenizerService:
+    """
+    Get the process-wide TokenizerService shared by memories and LLM wrappers.
+
+    Returns:
+        The default TokenizerService instance
+    """
+    global _default_tokenizer
+    if _default_tokenizer is None:
+        _default_tokenizer = TokenizerService()
+    return _default_tokenizer
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count tokens with the default TokenizerService.
+
+    Args:
+        text: Text to count
+        model: Model identifier (optional)
+
+    Returns:
+        Token count
+    """
+    return get_tokenizer().count(text, model)
+
+
+UsageListener = Callable[[Dict[str, int]], None]
+
+# Receives the usage of LLM calls made in the current context (e.g. one traced run)
+_usage_listener: "contextvars.ContextVar[Optional[UsageListener]]" = contextvars.ContextVar(
+    "codemni_usage_listener", default=None
+)
+
+
+def set_usage_listener(listener: Optional[UsageListener]) -> contextvars.Token:
+    """
+    Receive the usage reported by LLM calls made in the current context.
+
+    Unlike ``last_usage`` on an LLM object shared by concurrent runs, the
+    listener only sees the calls of the run (task, thread) that set it.
+
+    Args:
+        listener: Called with each usage dict (None = stop listening)
+
+    Returns:
+        Token for reset_usage_listener()
+    """
+    return _usage_listener.set(listener)
+
+
+def reset_usage_listener(token: contextvars.Token) -> None:
+    """Restore the listener that was active before set_usage_listener()."""
+    _usage_listener.reset(token)
+
+
+def report_usage(usage: Dict[str, int]) -> None:
+    """
+    Pass provider-reported usage to the current context's listener, if any.
+
+    Args:
+        usage: Dict with "prompt_tokens" and "completion_tokens"
+    """
+    listener = _usage_listener.get()
+    if listener is not None:
+        listener(usage)
+
+
+def usage_recorder(owner, prompt: str, model: Optional[str]) -> Callable[[Dict[str, int]], None]:
+    """
+    Build a usage callback for the LLM wrapper classes.
+
+    The callback stores the reported usage on ``owner.last_usage``, passes it
+    to the current usage listener (see ``set_usage_listener``) and feeds
+    the prompt token count into the default tokenizer's calibration.
+
+    Args:
+        owner: Object to store ``last_usage`` on (usually the LLM wrapper)
+        prompt: Prompt text the usage belongs to
+        model: Model identifier
+
+    Returns:
+        Callback accepting a usage dict with "prompt_tokens" and "completion_tokens"
+    """
+    def record(usage: Dict[str, int]) -> None:
+        owner.last_usage = usage
+        report_usage(usage)
+        get_tokenizer().observe(prompt, usage.get("prompt_tokens", 0), model=model)
+    return record
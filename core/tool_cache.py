@@ -0,0 +1,278 @@
+"""
+Tool result caching for the Codemni framework.
+
+Tools registered with ``add_tool(..., cacheable=True)`` get a ``ToolCache``
+in their registry entry. ``Tool_Executor`` and ``Async_Tool_Executor`` look
+the call up before running the tool and store successful results, so a
+deterministic tool is never recomputed within its TTL - across iterations,
+conversations, and (with a ``path``) processes.
+
+Keys are built from the tool name and the *bound* arguments, so
+``{"title": "Python"}`` and ``'{"title": "Python"}'`` hit the same entry.
+Pass ``key_fn`` to normalize further (e.g. case-insensitive titles).
+
+Example:
+    >>> agent.add_tool("wikipedia_summary", "Summarize an article", wiki.get_summary,
+    ...                cacheable=True, ttl=3600, key_fn=lambda args, kwargs: str(kwargs).lower())
+    >>> agent.invoke("Tell me about Python")
+    >>> agent.tools["wikipedia_summary"]["cache"].stats()
+    {'hits': 1, 'misses': 1, 'evictions': 0, 'size': 1}
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .tool_policy import ToolError
+
+KeyFunction = Callable[[Tuple[Any, ...], Dict[str, Any]], Any]
+
+# Returned by lookup() on a cache miss (None is a valid tool result)
+MISSING = object()
+
+
+def default_cache_key(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+    """
+    Build a canonical key from bound tool arguments.
+
+    Args:
+        args: Positional arguments the tool is called with
+        kwargs: Keyword arguments the tool is called with
+
+    Returns:
+        JSON string with keyword arguments sorted
+    """
+    return json.dumps([list(args), kwargs], sort_keys=True, default=repr)
+
+
+def is_error_result(result: Any) -> bool:
+    """Check whether a tool returned an error (string or ToolError) instead of a result."""
+    return isinstance(result, ToolError) or (isinstance(result, str) and result.startswith("Error"))
+
+
+class ToolCache:
+    """
+    Thread-safe LRU cache with per-entry TTL and hit counters.
+
+    Entries live in memory; with ``path`` they are also written to a SQLite
+    file, so they survive restarts and can be shared by several processes.
+    Only JSON-serializable results are written to disk.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        max_entries: int = 1024,
+        key_fn: Optional[KeyFunction] = None,
+        path: Optional[str] = None,
+        should_cache: Callable[[Any], bool] = lambda result: not is_error_result(result),
+    ):
+        """
+        Initialize ToolCache.
+
+        Args:
+            ttl: Seconds an entry stays valid (None = until evicted)
+            max_entries: Maximum entries kept in memory (least recently used are evicted)
+            key_fn: Function (args, kwargs) -> key; defaults to ``default_cache_key``
+            path: Optional SQLite file for a persistent second level
+            should_cache: Predicate deciding whether a result is stored
+                (by default error strings are not)
+        """
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive or None")
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.key_fn = key_fn or default_cache_key
+        self.should_cache = should_cache
+        self.path = path
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries: "OrderedDict[Any, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS tool_cache ("
+                "tool TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires REAL, "
+                "PRIMARY KEY (tool, key))"
+            )
+
+    def make_key(self, tool_name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        """
+        Build the cache key for a call.
+
+        Args:
+            tool_name: Name of the tool
+            args: Positional arguments
+            kwargs: Keyword arguments
+
+        Returns:
+            Hashable key
+        """
+        return (tool_name, self.key_fn(args, kwargs))
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """
+        Look up a key, counting the hit or miss.
+
+        Args:
+            key: Key from make_key()
+            default: Value returned on a miss
+
+        Returns:
+            Cached result, or ``default``
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires is None or expires > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            value = self._load(key, now)
+            if value is MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        """
+        Store a result (ignored if ``should_cache`` rejects it).
+
+        Args:
+            key: Key from make_key()
+            value: Tool result
+        """
+        if not self.should_cache(value):
+            return
+        expires = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._remember(key, expires, value)
+            self._store(key, expires, value)
+
+    def clear(self) -> None:
+        """Remove every entry (memory and disk) and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM tool_cache")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dict with hits, misses, evictions and size (entries in memory)
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
+
+    def _remember(self, key: Any, expires: Optional[float], value: Any) -> None:
+        self._entries[key] = (expires, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _load(self, key: Any, now: float) -> Any:
+        if self._db is None:
+            return MISSING
+        tool, text_key = key[0], str(key[1])
+        row = self._db.execute(
+            "SELECT value, expires FROM tool_cache WHERE tool = ? AND key = ?", (tool, text_key)
+        ).fetchone()
+        if row is None:
+            return MISSING
+        text, expires = row
+        if expires is not None and expires <= now:
+            self._db.execute("DELETE FROM tool_cache WHERE tool = ? AND key = ?", (tool, text_key))
+            return MISSING
+        value = json.loads(text)
+        self._remember(key, expires, value)
+        return value
+
+    def _store(self, key: Any, expires: Optional[float], value: Any) -> None:
+        if self._db is None:
+            return
+        try:
+            text = json.dumps(value)
+        except (TypeError, ValueError):
+            return
+        self._db.execute(
+            "INSERT OR REPLACE INTO tool_cache (tool, key, value, expires) VALUES (?, ?, ?, ?)",
+            (key[0], str(key[1]), text, expires),
+        )
+
+
+def lookup(tool_info: Dict[str, Any], tool_name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]):
+    """
+    Look up a call in a tool's cache.
+
+    Args:
+        tool_info: Tool registry entry ({"function", "cache", ...})
+        tool_name: Name of the tool
+        args: Positional arguments
+        kwargs: Keyword arguments
+
+    Returns:
+        tuple: (cache or None, key or None, cached value or the ``MISSING`` sentinel)
+    """
+    cache = tool_info.get("cache")
+    if cache is None:
+        return None, None, MISSING
+    try:
+        key = cache.make_key(tool_name, args, kwargs)
+        hash(key)
+    except Exception:
+        # Unhashable / unserializable arguments: run the tool uncached
+        return None, None, MISSING
+    return cache, key, cache.get(key, MISSING)
+
+
+def make_tool_cache(
+    cacheable: bool = False,
+    ttl: Optional[float] = None,
+    max_entries: int = 1024,
+    key_fn: Optional[KeyFunction] = None,
+    cache: Optional[ToolCache] = None,
+) -> Optional[ToolCache]:
+    """
+    Build the cache for a tool from ``add_tool`` caching arguments.
+
+    Args:
+        cacheable: Cache the tool's results
+        ttl: Seconds a result stays valid (None = until evicted)
+        max_entries: Maximum cached results
+        key_fn: Optional key normalization function (args, kwargs) -> key
+        cache: Existing ToolCache to use (e.g. one shared by several agents)
+
+    Returns:
+        ToolCache, or None if the tool is not cached
+    """
+    if cache is not None:
+        return cache
+    if not cacheable:
+        return None
+    return ToolCache(ttl=ttl, max_entries=max_entries, key_fn=key_fn)
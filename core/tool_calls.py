@@ -0,0 +1,134 @@
+"""
+Parallel tool calls for the Codemni framework.
+
+Agents created with ``parallel_tool_calls=True`` tell the model it may
+return several independent calls at once under a "Tool Calls" key::
+
+    "Tool Calls": [
+        {"Tool call": "wikipedia_summary", "Tool Parameters": {"title": "Python"}},
+        {"Tool call": "wikipedia_summary", "Tool Parameters": {"title": "Rust"}}
+    ]
+
+The calls run concurrently (at most ``max_concurrency`` at a time) and all
+results go back to the model in the next prompt, so fan-out questions take
+one LLM round trip instead of one per lookup.
+"""
+
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .adapter import Async_Tool_Executor, Tool_Executor
+from .executors import get_thread_pool
+
+TOOL_CALLS_KEY = "Tool Calls"
+
+ToolCallSpec = Tuple[str, Any]
+
+
+def _is_tool_name(name: Any) -> bool:
+    return isinstance(name, str) and bool(name.strip()) and name != "None"
+
+
+def collect_tool_calls(tool_name: Any, tool_parameters: Any, tool_calls: Optional[Any]) -> List[ToolCallSpec]:
+    """
+    Gather every tool call requested by one parsed response.
+
+    Args:
+        tool_name: Value of the "Tool call" key
+        tool_parameters: Value of the "Tool Parameters" key
+        tool_calls: Value of the "Tool Calls" key (list of {"Tool call", "Tool Parameters"} dicts), if any
+
+    Returns:
+        List of (tool_name, tool_parameters) in request order; empty if no tool was requested
+    """
+    calls: List[ToolCallSpec] = []
+    if _is_tool_name(tool_name):
+        calls.append((tool_name, tool_parameters))
+
+    if isinstance(tool_calls, list):
+        for entry in tool_calls:
+            if not isinstance(entry, dict):
+                continue
+            name = entry.get("Tool call")
+            if _is_tool_name(name):
+                calls.append((name, entry.get("Tool Parameters", "None")))
+    return calls
+
+
+def execute_tool_calls(
+    calls: List[ToolCallSpec],
+    available_tools: Dict[str, Dict[str, Any]],
+    max_concurrency: int = 4,
+    on_result: Optional[Callable[[int, Any], None]] = None,
+) -> List[Any]:
+    """
+    Run tool calls concurrently in the shared thread pool.
+
+    Args:
+        calls: List of (tool_name, tool_parameters)
+        available_tools: Agent tool registry (name -> {"function", ...})
+        max_concurrency: Maximum number of tools running at once
+        on_result: Optional callback (index, result) invoked as each call finishes
+
+    Returns:
+        Tool results (or error strings) in the order of ``calls``
+    """
+    if max_concurrency <= 1 or len(calls) <= 1:
+        results = []
+        for index, (name, params) in enumerate(calls):
+            results.append(Tool_Executor(name, params, available_tools))
+            if on_result is not None:
+                on_result(index, results[-1])
+        return results
+
+    pool = get_thread_pool()
+    results: List[Any] = [None] * len(calls)
+    running = {}
+    queue = list(enumerate(calls))
+    queue.reverse()
+
+    while queue or running:
+        while queue and len(running) < max_concurrency:
+            index, (name, params) = queue.pop()
+            running[pool.submit(Tool_Executor, name, params, available_tools)] = index
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            index = running.pop(future)
+            results[index] = future.result()
+            if on_result is not None:
+                on_result(index, results[index])
+    return results
+
+
+async def aexecute_tool_calls(
+    calls: List[ToolCallSpec],
+    available_tools: Dict[str, Dict[str, Any]],
+    max_concurrency: int = 4,
+    on_result: Optional[Callable[[int, Any], None]] = None,
+) -> List[Any]:
+    """
+    Run tool calls concurrently on the event loop.
+
+    ``async def`` tools are awaited and sync tools run in the shared thread
+    pool (see ``Async_Tool_Executor``).
+
+    Args:
+        calls: List of (tool_name, tool_parameters)
+        available_tools: Agent tool registry (name -> {"function", ...})
+        max_concurrency: Maximum number of tools running at once
+        on_result: Optional callback (index, result) invoked as each call finishes
+
+    Returns:
+        Tool results (or error strings) in the order of ``calls``
+    """
+    semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+
+    async def run(index: int, name: str, params: Any) -> Any:
+        async with semaphore:
+            result = await Async_Tool_Executor(name, params, available_tools)
+        if on_result is not None:
+            on_result(index, result)
+        return result
+
+    return list(await asyncio.gather(*(run(index, name, params) for index, (name, params) in enumerate(calls))))
@@ -0,0 +1,263 @@
+"""
+Per-tool execution policies for the Codemni framework.
+
+By default a tool runs inline on the agent's thread. A ``ToolPolicy``
+changes how ``Tool_Executor`` / ``Async_Tool_Executor`` run it:
+
+- ``timeout``: give up after this many seconds and return a ``ToolError``
+  the model can read and react to (the call itself cannot be killed; a
+  thread keeps running in the background until the tool returns)
+- ``run_in``: ``"inline"``, ``"thread"`` (a dedicated tool thread pool) or
+  ``"process"`` (a warm process pool, for CPU-bound tools that would
+  otherwise hold the GIL; the function and its arguments must be picklable,
+  e.g. a module-level function)
+- ``max_concurrency``: maximum calls of this tool running at once across all
+  sessions in the process
+
+Example:
+    >>> agent.add_tool("fetch_url", "Fetch a web page", fetch_url, timeout=10)
+    >>> agent.add_tool("parse_pdf", "Extract text from a PDF", parse_pdf,
+    ...                run_in="process", timeout=60, max_concurrency=2)
+"""
+
+import asyncio
+import inspect
+import threading
+from collections import deque
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .executors import get_process_pool, get_tool_pool
+
+RUN_MODES = ("inline", "thread", "process")
+
+
+class ToolError(dict):
+    """
+    Structured tool failure returned to the agent instead of a result.
+
+    It is a dict, so it renders in the prompt as e.g.
+    ``{'error': 'timeout', 'tool': 'fetch_url', 'message': '...', 'timeout': 10}``.
+    """
+
+    def __init__(self, tool_name: str, error: str, message: str, **details: Any):
+        super().__init__(error=error, tool=tool_name, message=message, **details)
+
+
+def _call(function: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+    """Run a tool function, including ``async def`` tools (module-level so it pickles)."""
+    result = function(*args, **kwargs)
+    if inspect.isawaitable(result):
+        result = asyncio.run(_await(result))
+    return result
+
+
+async def _await(awaitable: Any) -> Any:
+    return await awaitable
+
+
+def _wake(waiter: "asyncio.Future") -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class ToolPolicy:
+    """How, and for how long, one tool is allowed to run."""
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        run_in: str = "inline",
+        max_concurrency: Optional[int] = None,
+    ):
+        """
+        Initialize ToolPolicy.
+
+        Args:
+            timeout: Seconds before the call is abandoned with a ToolError (None = no limit).
+                An inline tool with a timeout runs in the tool thread pool.
+            run_in: "inline", "thread" or "process"
+            max_concurrency: Maximum concurrent calls of this tool (None = unlimited)
+        """
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout must be positive or None")
+        if run_in not in RUN_MODES:
+            raise ValueError(f"run_in must be one of {RUN_MODES}")
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1 or None")
+
+        self.timeout = timeout
+        self.run_in = run_in
+        self.max_concurrency = max_concurrency
+        # Shared by run() and arun() on every thread and event loop
+        self._semaphore = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        # arun() calls waiting for a slot: (event loop, future), woken by _release()
+        self._waiters: "deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]" = deque()
+        self._waiters_lock = threading.Lock()
+
+    async def _acquire(self) -> None:
+        """Take a slot of the shared semaphore; waiting costs no thread."""
+        loop = asyncio.get_running_loop()
+        while not self._semaphore.acquire(blocking=False):
+            waiter = loop.create_future()
+            entry = (loop, waiter)
+            with self._waiters_lock:
+                self._waiters.append(entry)
+                # A slot freed before we were queued would not wake us
+                if self._semaphore.acquire(blocking=False):
+                    self._waiters.remove(entry)
+                    return
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._waiters_lock:
+                    woken = entry not in self._waiters
+                    if not woken:
+                        self._waiters.remove(entry)
+                if woken:
+                    # Hand the wake-up on to the next waiter
+                    self._wake_next()
+                raise
+
+    def _release(self) -> None:
+        self._semaphore.release()
+        self._wake_next()
+
+    def _wake_next(self) -> None:
+        """Wake the longest-waiting arun() call, if any, to retry the semaphore."""
+        while True:
+            with self._waiters_lock:
+                if not self._waiters:
+                    return
+                loop, waiter = self._waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+                return
+            except RuntimeError:
+                continue  # its event loop is closed
+
+    def _pool(self):
+        return get_process_pool() if self.run_in == "process" else get_tool_pool()
+
+    def _timeout_error(self, tool_name: str) -> ToolError:
+        return ToolError(
+            tool_name,
+            "timeout",
+            f"Tool '{tool_name}' did not finish within {self.timeout} seconds. "
+            "Try simpler parameters, a different tool, or answer without it.",
+            timeout=self.timeout,
+        )
+
+    def run(self, tool_name: str, function: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        """
+        Run a tool call under this policy, blocking until it finishes or times out.
+
+        Args:
+            tool_name: Name of the tool (for error messages)
+            function: Tool function
+            args: Positional arguments
+            kwargs: Keyword arguments
+
+        Returns:
+            Tool result, or a ToolError on timeout
+
+        Raises:
+            Exception: Whatever the tool raised
+        """
+        if self._semaphore is not None:
+            self._semaphore.acquire()
+
+        if self.run_in == "inline" and self.timeout is None:
+            try:
+                return _call(function, args, kwargs)
+            finally:
+                if self._semaphore is not None:
+                    self._release()
+
+        try:
+            future = self._pool().submit(_call, function, args, kwargs)
+        except BaseException:
+            if self._semaphore is not None:
+                self._release()
+            raise
+        if self._semaphore is not None:
+            # Released when the call really ends, even if we stop waiting for it
+            future.add_done_callback(lambda _: self._release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            return self._timeout_error(tool_name)
+
+    async def arun(self, tool_name: str, function: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        """
+        Run a tool call under this policy without blocking the event loop.
+
+        ``async def`` tools run on the loop unless ``run_in="process"``;
+        sync tools always run in a pool.
+
+        Args:
+            tool_name: Name of the tool (for error messages)
+            function: Tool function
+            args: Positional arguments
+            kwargs: Keyword arguments
+
+        Returns:
+            Tool result, or a ToolError on timeout
+
+        Raises:
+            Exception: Whatever the tool raised
+        """
+        if self._semaphore is not None:
+            await self._acquire()
+
+        if inspect.iscoroutinefunction(function) and self.run_in != "process":
+            # wait_for() cancels the coroutine on timeout, so it has ended by the time we release
+            try:
+                return await asyncio.wait_for(function(*args, **kwargs), self.timeout)
+            except asyncio.TimeoutError:
+                return self._timeout_error(tool_name)
+            finally:
+                if self._semaphore is not None:
+                    self._release()
+
+        try:
+            future = self._pool().submit(_call, function, args, kwargs)
+        except BaseException:
+            if self._semaphore is not None:
+                self._release()
+            raise
+        if self._semaphore is not None:
+            # Released when the call really ends, even if we stop waiting for it
+            future.add_done_callback(lambda _: self._release())
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            return self._timeout_error(tool_name)
+
+
+def make_tool_policy(
+    timeout: Optional[float] = None,
+    run_in: str = "inline",
+    max_concurrency: Optional[int] = None,
+    policy: Optional[ToolPolicy] = None,
+) -> Optional[ToolPolicy]:
+    """
+    Build the execution policy for a tool from ``add_tool`` arguments.
+
+    Args:
+        timeout: Seconds before the call is abandoned (None = no limit)
+        run_in: "inline", "thread" or "process"
+        max_concurrency: Maximum concurrent calls (None = unlimited)
+        policy: Existing ToolPolicy to use instead
+
+    Returns:
+        ToolPolicy, or None if the tool runs inline without limits
+    """
+    if policy is not None:
+        return policy
+    if timeout is None and run_in == "inline" and max_concurrency is None:
+        return None
+    return ToolPolicy(timeout=timeout, run_in=run_in, max_concurrency=max_concurrency)
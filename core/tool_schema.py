@@ -0,0 +1,387 @@
+"""
+Signature-derived tool schemas for the Codemni framework.
+
+A tool is a plain Python function, and models send its parameters in
+several shapes: ``{"expression": "25 * 4"}``, ``{"25 * 4"}``,
+``"25 * 4"``, ``["Python", 10]``. ``ToolSignature`` inspects the
+function's signature and type hints once, when the tool is added, and
+precomputes how to bind each of those shapes to the function:
+
+- named parameters are matched by name; a single value under an unknown
+  name goes to a tool's only parameter
+- positional text is split on commas only into as many parts as the tool
+  has positional parameters, so "Hello, world" reaches a one-parameter
+  tool intact
+- every value is converted to its annotated type (``int``, ``float``,
+  ``bool``, ``str``, ``list``/``List[X]``, ``dict``, ``Optional[X]``,
+  ``Literal[...]``); parameters without a hint use the type of their
+  default value, if any
+
+Calls that do not fit the signature fail with a ``ToolArgumentError``
+naming the expected parameters, before the tool runs. The same analysis
+gives the JSON schema of the tool (``json_schema()``) and a compact
+parameter list for the agent prompt (``prompt_hint()``).
+
+Example:
+    >>> def power(base: float, exponent: int = 2) -> float: ...
+    >>> signature = ToolSignature(power)
+    >>> signature.bind({"3, 4"})
+    ((3.0, 4), {})
+    >>> signature.prompt_hint()
+    '{"base": "number", "exponent": "integer, default 2"}'
+"""
+
+import inspect
+import json
+import types
+import typing
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .json_extract import SetLiteral, loads_lenient
+
+_NO_PARAMETERS = (None, "", "None", "none")
+_TRUE = ("true", "yes", "y", "1", "on")
+_FALSE = ("false", "no", "n", "0", "off", "none", "")
+_SCALAR_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean"}
+_POSITIONAL = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+# typing.Optional[X] and, on Python 3.10+, X | None
+_UNIONS = (typing.Union, getattr(types, "UnionType", typing.Union))
+
+
+class ToolArgumentError(ValueError):
+    """Tool parameters that do not fit the tool's signature."""
+
+
+def _convert_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in _TRUE + _FALSE:
+        return value.strip().lower() in _TRUE
+    raise ValueError(f"expected a boolean, got {value!r}")
+
+
+def _convert_int(value: Any) -> int:
+    if isinstance(value, bool):
+        raise ValueError(f"expected an integer, got {value!r}")
+    if isinstance(value, int):
+        return value
+    number = float(value.strip().replace("_", "")) if isinstance(value, str) else float(value)
+    if not number.is_integer():
+        raise ValueError(f"expected an integer, got {value!r}")
+    return int(number)
+
+
+def _convert_float(value: Any) -> float:
+    if isinstance(value, bool):
+        raise ValueError(f"expected a number, got {value!r}")
+    return float(value.strip()) if isinstance(value, str) else float(value)
+
+
+def _convert_str(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+def _as_sequence(value: Any) -> List[Any]:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return list(value)
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith("["):
+            parsed = loads_lenient(text)
+            if isinstance(parsed, list):
+                return parsed
+        return [part.strip() for part in text.split(",")] if text else []
+    return [value]
+
+
+def _as_mapping(value: Any) -> Dict[str, Any]:
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, str):
+        parsed = loads_lenient(value)
+        if isinstance(parsed, dict):
+            return parsed
+    raise ValueError(f"expected an object, got {value!r}")
+
+
+class _Converter:
+    """Type conversion and schema of one annotation, built once."""
+
+    __slots__ = ("convert", "schema", "label")
+
+    def __init__(self, annotation: Any):
+        origin = typing.get_origin(annotation)
+        args = [arg for arg in typing.get_args(annotation)]
+        self.schema: Dict[str, Any] = {}
+        self.label = "value"
+        self.convert: Optional[Callable[[Any], Any]] = None
+
+        if origin in _UNIONS:
+            options = [arg for arg in args if arg is not type(None)]
+            if len(options) == 1:
+                inner = _Converter(options[0])
+                self.convert, self.schema, self.label = inner.convert, inner.schema, inner.label
+            return
+        if origin is typing.Literal:
+            choices = tuple(args)
+            self.schema = {"enum": list(choices)}
+            self.label = "one of " + ", ".join(map(str, choices))
+            by_text = {str(choice).lower(): choice for choice in choices}
+
+            def convert_literal(value: Any) -> Any:
+                if value in choices:
+                    return value
+                key = str(value).strip().lower()
+                if key in by_text:
+                    return by_text[key]
+                raise ValueError(f"expected one of {list(choices)}, got {value!r}")
+
+            self.convert = convert_literal
+            return
+        if annotation in _SCALAR_TYPES:
+            self.schema = {"type": _SCALAR_TYPES[annotation]}
+            self.label = _SCALAR_TYPES[annotation]
+            self.convert = {bool: _convert_bool, int: _convert_int,
+                            float: _convert_float, str: _convert_str}[annotation]
+            return
+        if annotation in (list, tuple, set) or origin in (list, tuple, set):
+            container = origin or annotation
+            item = _Converter(args[0]) if args and args[0] is not Ellipsis else None
+            self.schema = {"type": "array"}
+            self.label = "array"
+            if item is not None and item.schema:
+                self.schema["items"] = item.schema
+                self.label = f"array of {item.label}"
+
+            def convert_sequence(value: Any) -> Any:
+                items = _as_sequence(value)
+                if item is not None and item.convert is not None:
+                    items = [item.convert(element) for element in items]
+                return items if container is list else container(items)
+
+            self.convert = convert_sequence
+            return
+        if annotation is dict or origin is dict:
+            self.schema = {"type": "object"}
+            self.label = "object"
+            self.convert = _as_mapping
+
+
+class _Parameter:
+    """One parameter of a tool, with its converter."""
+
+    __slots__ = ("name", "kind", "default", "required", "converter")
+
+    def __init__(self, parameter: inspect.Parameter, annotation: Any):
+        self.name = parameter.name
+        self.kind = parameter.kind
+        self.default = parameter.default
+        self.required = parameter.default is inspect.Parameter.empty and parameter.kind in (
+            *_POSITIONAL, inspect.Parameter.KEYWORD_ONLY)
+        if annotation in (inspect.Parameter.empty, Any) and not self.required and self.default is not None:
+            # Untyped parameter: convert to the type of its default value
+            annotation = type(self.default)
+        self.converter = _Converter(annotation)
+
+    def convert(self, value: Any) -> Any:
+        if value is None and not self.required:
+            return None
+        if self.converter.convert is None:
+            return value
+        try:
+            return self.converter.convert(value)
+        except (TypeError, ValueError) as e:
+            raise ToolArgumentError(f"parameter '{self.name}': {e}") from None
+
+
+class ToolSignature:
+    """Precomputed argument binding and schema of a tool function."""
+
+    def __init__(self, function: Callable[..., Any]):
+        """
+        Inspect a tool function.
+
+        Args:
+            function: The tool function (plain, bound method, partial or callable object)
+
+        Raises:
+            ValueError / TypeError: If the signature cannot be inspected
+                (use ``inspect_tool`` to get None instead)
+        """
+        self.signature = inspect.signature(function)
+        try:
+            hints = typing.get_type_hints(function)
+        except Exception:
+            hints = {}
+
+        self.parameters: List[_Parameter] = []
+        self.var_positional: Optional[_Parameter] = None
+        self.accepts_kwargs = False
+        for parameter in self.signature.parameters.values():
+            annotation = hints.get(parameter.name, parameter.annotation)
+            if isinstance(annotation, str):
+                annotation = inspect.Parameter.empty  # unresolvable forward reference
+            if parameter.kind is inspect.Parameter.VAR_KEYWORD:
+                self.accepts_kwargs = True
+            elif parameter.kind is inspect.Parameter.VAR_POSITIONAL:
+                self.var_positional = _Parameter(parameter, annotation)
+            else:
+                self.parameters.append(_Parameter(parameter, annotation))
+
+        self.by_name = {parameter.name: parameter for parameter in self.parameters
+                        if parameter.kind is not inspect.Parameter.POSITIONAL_ONLY}
+        self.positional = [parameter for parameter in self.parameters if parameter.kind in _POSITIONAL]
+        self.required = [parameter for parameter in self.parameters if parameter.required]
+
+    def _split(self, text: str) -> List[str]:
+        """Split positional text on commas into at most one part per positional parameter."""
+        if self.var_positional is not None:
+            return [part.strip() for part in text.split(",")]
+        if len(self.positional) <= 1:
+            return [text.strip()]
+        return [part.strip() for part in text.split(",", len(self.positional) - 1)]
+
+    def _from_mapping(self, values: Dict[Any, Any]) -> Tuple[List[Any], Dict[str, Any]]:
+        unknown = [key for key in values if key not in self.by_name]
+        if not unknown or self.accepts_kwargs:
+            return [], {str(key): value for key, value in values.items()}
+        if len(values) == 1:
+            # {"25 * 4": ""} or a value under a wrong name: positional text
+            key, value = next(iter(values.items()))
+            if value in _NO_PARAMETERS:
+                return self._split(str(key)), {}
+            if len(self.positional) == 1 or len(self.required) == 1:
+                return [value], {}
+        expected = ", ".join(parameter.name for parameter in self.parameters) or "none"
+        raise ToolArgumentError(f"unexpected parameter(s) {', '.join(map(str, unknown))}; expected: {expected}")
+
+    def bind(self, parameters: Any) -> Tuple[Tuple[Any, ...], Dict[str, Any]]:
+        """
+        Bind model-supplied parameters to the function.
+
+        Args:
+            parameters: "Tool Parameters" value from the model's response
+
+        Returns:
+            Tuple of (args, kwargs), converted to the annotated types
+
+        Raises:
+            ToolArgumentError: If the parameters do not fit the signature
+        """
+        args: List[Any] = []
+        kwargs: Dict[str, Any] = {}
+        if isinstance(parameters, str):
+            text = parameters.strip()
+            if text in _NO_PARAMETERS:
+                parameters = None
+            elif text[:1] in "{[":
+                try:
+                    parameters = loads_lenient(text)
+                except ValueError:
+                    parameters = text
+            else:
+                parameters = text
+
+        if parameters is None or (isinstance(parameters, (dict, list, tuple, set)) and not parameters):
+            pass
+        elif isinstance(parameters, dict):
+            args, kwargs = self._from_mapping(parameters)
+        elif isinstance(parameters, (SetLiteral, set, frozenset)):
+            for element in parameters:
+                args.extend(self._split(str(element)) if isinstance(element, str) else [element])
+        elif isinstance(parameters, (list, tuple)):
+            args = list(parameters)
+        elif isinstance(parameters, str):
+            args = self._split(parameters)
+        else:
+            args = [parameters]
+
+        try:
+            bound = self.signature.bind(*args, **kwargs)
+        except TypeError as e:
+            expected = ", ".join(parameter.name for parameter in self.parameters) or "none"
+            raise ToolArgumentError(f"{e}; expected: {expected}") from None
+
+        arguments = bound.arguments
+        for parameter in self.parameters:
+            if parameter.name in arguments:
+                arguments[parameter.name] = parameter.convert(arguments[parameter.name])
+        if self.var_positional is not None and self.var_positional.name in arguments:
+            arguments[self.var_positional.name] = tuple(
+                self.var_positional.convert(value) for value in arguments[self.var_positional.name])
+        return bound.args, bound.kwargs
+
+    def json_schema(self) -> Dict[str, Any]:
+        """
+        Get the JSON schema of the tool's parameters.
+
+        Returns:
+            JSON schema object (``{"type": "object", "properties": ..., "required": ...}``)
+        """
+        properties = {}
+        for parameter in self.parameters:
+            if parameter.kind is inspect.Parameter.POSITIONAL_ONLY:
+                continue
+            schema = dict(parameter.converter.schema)
+            if not parameter.required and parameter.default is not None:
+                try:
+                    schema["default"] = json.loads(json.dumps(parameter.default))
+                except (TypeError, ValueError):
+                    pass
+            properties[parameter.name] = schema
+        return {
+            "type": "object",
+            "properties": properties,
+            "required": [parameter.name for parameter in self.required if parameter.name in properties],
+            "additionalProperties": self.accepts_kwargs,
+        }
+
+    def prompt_hint(self) -> str:
+        """
+        Describe the parameters compactly for the agent prompt.
+
+        Returns:
+            JSON-like text such as ``{"title": "string", "sentences": "integer, default 3"}``
+        """
+        fields = []
+        for parameter in self.parameters:
+            label = parameter.converter.label
+            if not parameter.required:
+                label += f", default {_default_text(parameter.default)}" if parameter.default is not None else ", optional"
+            fields.append(f"{json.dumps(parameter.name)}: {json.dumps(label)}")
+        if self.var_positional is not None:
+            fields.append(f"{json.dumps('*' + self.var_positional.name)}: "
+                          f"{json.dumps('any number of ' + self.var_positional.converter.label)}")
+        return "{" + ", ".join(fields) + "}" if fields else "none"
+
+
+def _default_text(value: Any) -> str:
+    if isinstance(value, str) and value:
+        return value
+    try:
+        return json.dumps(value)
+    except (TypeError, ValueError):
+        return repr(value)
+
+
+def inspect_tool(function: Callable[..., Any]) -> Optional[ToolSignature]:
+    """
+    Build the ToolSignature of a tool, if its signature can be inspected.
+
+    Args:
+        function: The tool function
+
+    Returns:
+        ToolSignature, or None (some builtins) in which case calls are bound
+        with the untyped fallback rules
+    """
+    try:
+        return ToolSignature(function)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,568 @@
+"""
+Per-run tracing for agents.
+
+A slow run can spend its time in the LLM (including the retries inside the
+LLM wrapper), a tool, memory summarization or the agent's own prompt
+building and parsing. With a ``Tracer`` on the agent, every run records a
+span tree showing where the time went:
+
+    invoke                      query, output size, iterations
+    ├── memory:add_user_message
+    ├── memory:get_context
+    ├── iteration 1
+    │   ├── build_prompt
+    │   ├── llm                 prompt/completion tokens, sizes, retries
+    │   ├── parse
+    │   └── tool:search         parameters, result size
+    └── iteration 2 ...
+
+Spans of effects (LLM, tool, memory and blocking calls) are recorded by
+``trace_steps``, which wraps the agent's step generator, so the sync, async
+and streaming drivers are all covered. Code running inside a run adds its
+own spans with ``span("name")``, which is a no-op outside a traced run:
+the agents time prompt building and parsing this way, and
+``ConversationalSummaryMemory`` its summarization calls. Without a tracer
+the agent's steps are not wrapped at all, so tracing costs nothing.
+
+Finished traces are kept in ``Tracer.traces`` and passed to exporters:
+``JSONLinesExporter`` appends them to a file, ``OpenTelemetryExporter``
+replays them as OpenTelemetry spans (``pip install opentelemetry-sdk``).
+"""
+
+import contextvars
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from .events import IterationStart
+from .runner import AgentSteps, Blocking, Emit, LLMCall, MemoryCall, ToolCall, ToolCalls
+from .tokenizer import count_tokens, reset_usage_listener, set_usage_listener
+from .tool_cache import is_error_result
+
+try:
+    from opentelemetry import trace as otel_trace  # type: ignore
+    _OTEL_AVAILABLE = True
+except ImportError:
+    otel_trace = None  # type: ignore
+    _OTEL_AVAILABLE = False
+
+# Longest parameter text recorded on a tool span
+MAX_ATTRIBUTE_CHARS = 500
+
+_current: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("codemni_span", default=None)
+
+
+class Span:
+    """One timed operation of a run, with attributes and child spans."""
+
+    __slots__ = ("name", "kind", "attributes", "children", "events", "error", "start_time", "_start", "_end")
+
+    def __init__(self, name: str, kind: str = "internal", attributes: Optional[Dict[str, Any]] = None):
+        """
+        Initialize Span and start its clock.
+
+        Args:
+            name: Span name (e.g. "llm", "tool:search")
+            kind: Phase the span belongs to: invoke, iteration, prompt, llm,
+                parse, tool, memory, blocking or internal
+            attributes: Initial attributes
+        """
+        self.name = name
+        self.kind = kind
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.children: List["Span"] = []
+        # Point-in-time occurrences inside the span, e.g. a retried request
+        self.events: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self._end: Optional[float] = None
+
+    def child(self, name: str, kind: str = "internal", **attributes: Any) -> "Span":
+        """Start a child span."""
+        span = Span(name, kind, attributes)
+        self.children.append(span)
+        return span
+
+    def set(self, **attributes: Any) -> None:
+        """Add or replace attributes."""
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        """Record an event at the current time."""
+        self.events.append({"name": name, "time": time.time(), "attributes": attributes})
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        """Stop the clock (only the first call counts)."""
+        if self._end is None:
+            self._end = time.perf_counter()
+            if error is not None:
+                self.error = f"{type(error).__name__}: {error}"
+
+    @property
+    def duration(self) -> float:
+        """Seconds the span took (so far, if still open)."""
+        end = self._end if self._end is not None else time.perf_counter()
+        return end - self._start
+
+    @property
+    def end_time(self) -> float:
+        """Wall-clock end time (epoch seconds)."""
+        return self.start_time + self.duration
+
+    def walk(self) -> Iterator["Span"]:
+        """Iterate over this span and all its descendants, depth first."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the span tree to plain data.
+
+        Returns:
+            Dict with name, kind, start_time, duration_ms, attributes, error,
+            events and children
+        """
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+            "events": self.events,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+    def __repr__(self) -> str:
+        return f"Span({self.name!r}, {self.duration * 1000:.1f}ms, children={len(self.children)})"
+
+
+class Trace:
+    """The span tree of one agent run."""
+
+    def __init__(self, name: str, **attributes: Any):
+        """
+        Initialize Trace.
+
+        Args:
+            name: Name of the root span (e.g. "invoke")
+            **attributes: Attributes of the root span
+        """
+        self.trace_id = uuid.uuid4().hex
+        self.root = Span(name, "invoke", attributes)
+
+    @property
+    def duration(self) -> float:
+        """Seconds the run took."""
+        return self.root.duration
+
+    def spans(self, kind: Optional[str] = None) -> List[Span]:
+        """
+        Get the spans of the trace.
+
+        Args:
+            kind: Only spans of this kind (None = all)
+
+        Returns:
+            Spans in depth-first order
+        """
+        return [span for span in self.root.walk() if kind is None or span.kind == kind]
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Sum the time and tokens of the run per phase.
+
+        Each span counts its own time only, without its children, so a
+        summarization LLM call made while adding a message to memory counts
+        as ``llm`` and not also as ``memory``. Time of the invoke and
+        iteration spans themselves (the agent's code outside any span) is
+        ``other_ms``.
+
+        Returns:
+            Dict with total_ms, phases (per kind: ``ms`` and ``count``),
+            prompt_tokens, completion_tokens, retries (LLM requests retried
+            by the LLM wrappers) and other_ms
+        """
+        phases: Dict[str, Dict[str, float]] = {}
+        prompt_tokens = completion_tokens = retries = 0
+        other = 0.0
+        for span in self.root.walk():
+            retries += sum(1 for event in span.events if event["name"] == "retry")
+            own = span.duration - sum(child.duration for child in span.children)
+            if span.kind in ("invoke", "iteration"):
+                other += own
+                continue
+            phase = phases.setdefault(span.kind, {"ms": 0.0, "count": 0})
+            phase["ms"] += own * 1000
+            phase["count"] += 1
+            prompt_tokens += span.attributes.get("prompt_tokens") or 0
+            completion_tokens += span.attributes.get("completion_tokens") or 0
+        for phase in phases.values():
+            phase["ms"] = round(phase["ms"], 3)
+        return {
+            "total_ms": round(self.duration * 1000, 3),
+            "phases": phases,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "retries": retries,
+            "other_ms": round(max(other, 0.0) * 1000, 3),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the trace to plain data (trace_id plus the root span tree)."""
+        return {"trace_id": self.trace_id, **self.root.to_dict()}
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        """
+        Serialize the trace to JSON.
+
+        Args:
+            indent: JSON indentation (None = compact)
+
+        Returns:
+            JSON text
+        """
+        return json.dumps(self.to_dict(), indent=indent, default=repr)
+
+    def __repr__(self) -> str:
+        return f"Trace({self.root.name!r}, {self.duration * 1000:.1f}ms, spans={len(self.spans())})"
+
+
+class Tracer:
+    """
+    Records a trace for every run of the agents it is given to.
+
+    Example:
+        >>> tracer = Tracer(exporters=[JSONLinesExporter("traces.jsonl")])
+        >>> agent = Create_ToolCalling_Agent(llm=llm, tracer=tracer)
+        >>> agent.invoke("What is 25 * 4?")
+        >>> tracer.last.summary()
+        {'total_ms': 1840.2, 'phases': {'llm': {'ms': 1795.0, 'count': 2}, ...}, ...}
+    """
+
+    def __init__(self, max_traces: int = 100, exporters: Optional[Sequence[Callable[[Trace], None]]] = None):
+        """
+        Initialize Tracer.
+
+        Args:
+            max_traces: Finished traces kept in memory (oldest dropped first)
+            exporters: Callables receiving every finished Trace, e.g.
+                JSONLinesExporter or OpenTelemetryExporter
+        """
+        if max_traces < 1:
+            raise ValueError("max_traces must be >= 1")
+        self.traces: "deque[Trace]" = deque(maxlen=max_traces)
+        self.exporters: List[Callable[[Trace], None]] = list(exporters or [])
+        self.export_errors = 0
+        self._lock = threading.Lock()
+
+    @property
+    def last(self) -> Optional[Trace]:
+        """The most recently finished trace."""
+        with self._lock:
+            return self.traces[-1] if self.traces else None
+
+    def add_exporter(self, exporter: Callable[[Trace], None]) -> None:
+        """Add an exporter for traces finished from now on."""
+        self.exporters.append(exporter)
+
+    def finish(self, trace: Trace) -> None:
+        """
+        Store a finished trace and export it.
+
+        Exporter failures are counted in ``export_errors`` and never fail the run.
+
+        Args:
+            trace: The finished trace
+        """
+        with self._lock:
+            self.traces.append(trace)
+        for exporter in self.exporters:
+            try:
+                exporter(trace)
+            except Exception:
+                self.export_errors += 1
+
+    def clear(self) -> None:
+        """Drop the stored traces."""
+        with self._lock:
+            self.traces.clear()
+
+
+class JSONLinesExporter:
+    """Exporter appending each trace to a file as one line of JSON."""
+
+    def __init__(self, path: str):
+        """
+        Initialize JSONLinesExporter.
+
+        Args:
+            path: File to append to
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, trace: Trace) -> None:
+        line = trace.to_json()
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class OpenTelemetryExporter:
+    """
+    Exporter replaying each trace as OpenTelemetry spans.
+
+    Span times are the recorded ones, so the spans show up in any
+    OpenTelemetry backend exactly as the run happened. Attributes that are
+    not strings, numbers or booleans are exported as JSON text.
+    """
+
+    def __init__(self, tracer_provider: Any = None, instrumentation_name: str = "codemni"):
+        """
+        Initialize OpenTelemetryExporter.
+
+        Args:
+            tracer_provider: OpenTelemetry TracerProvider (None = the global one)
+            instrumentation_name: Instrumentation scope name of the spans
+
+        Raises:
+            ImportError: If opentelemetry is not installed
+        """
+        if not _OTEL_AVAILABLE:
+            raise ImportError(
+                "opentelemetry is required for OpenTelemetryExporter. "
+                "Install it with: pip install opentelemetry-sdk"
+            )
+        self._tracer = otel_trace.get_tracer(instrumentation_name, tracer_provider=tracer_provider)
+
+    def __call__(self, trace: Trace) -> None:
+        self._export(trace.root, None, {"codemni.trace_id": trace.trace_id})
+
+    def _export(self, span: Span, context: Any, extra: Optional[Dict[str, Any]] = None) -> None:
+        attributes = {key: _otel_value(value) for key, value in span.attributes.items() if value is not None}
+        attributes["codemni.kind"] = span.kind
+        attributes.update(extra or {})
+        otel_span = self._tracer.start_span(
+            span.name, context=context, attributes=attributes, start_time=int(span.start_time * 1e9)
+        )
+        for event in span.events:
+            otel_span.add_event(
+                event["name"],
+                {key: _otel_value(value) for key, value in event["attributes"].items()},
+                timestamp=int(event["time"] * 1e9),
+            )
+        if span.error is not None:
+            otel_span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, span.error))
+        child_context = otel_trace.set_span_in_context(otel_span)
+        for child in span.children:
+            self._export(child, child_context)
+        otel_span.end(end_time=int(span.end_time * 1e9))
+
+
+def _otel_value(value: Any) -> Any:
+    if isinstance(value, (str, bool, int, float)):
+        return value
+    return json.dumps(value, default=repr)
+
+
+def current_span() -> Optional[Span]:
+    """The innermost open span of the current traced run (None outside one)."""
+    return _current.get()
+
+
+def add_event(name: str, **attributes: Any) -> None:
+    """
+    Record an event on the current span; a no-op outside a traced run.
+
+    The LLM wrappers record a "retry" event (attempt, error, backoff) for
+    every request they retry, so retries show up on the ``llm`` span.
+
+    Args:
+        name: Event name
+        **attributes: Event attributes
+    """
+    current = _current.get()
+    if current is not None:
+        current.add_event(name, **attributes)
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Time a block as a child of the current span.
+
+    Outside a traced run this does nothing and yields None.
+
+    Args:
+        name: Span name
+        kind: Phase the span belongs to
+        **attributes: Initial attributes
+
+    Yields:
+        The new span, or None when not tracing
+    """
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = parent.child(name, kind, **attributes)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.end(exc)
+        raise
+    finally:
+        child.end()
+        _current.reset(token)
+
+
+def _clip(value: Any) -> str:
+    text = value if isinstance(value, str) else repr(value)
+    return text if len(text) <= MAX_ATTRIBUTE_CHARS else text[:MAX_ATTRIBUTE_CHARS] + "..."
+
+
+def _start_effect(parent: Span, effect: Any, agent: Any) -> Optional[Span]:
+    """Open the span of an effect (None for Emit)."""
+    if isinstance(effect, LLMCall):
+        llm = getattr(agent, "llm", None)
+        model = getattr(llm, "model", None)
+        return parent.child(
+            "llm", "llm",
+            model=model,
+            prompt_chars=len(effect.prompt),
+            prompt_tokens=count_tokens(effect.prompt, model),
+        )
+    if isinstance(effect, ToolCall):
+        return parent.child(
+            f"tool:{effect.tool_name}", "tool",
+            tool=effect.tool_name,
+            parameters=_clip(effect.parameters),
+            early_dispatch=effect.early_dispatch is not None,
+        )
+    if isinstance(effect, ToolCalls):
+        return parent.child(
+            "tools", "tool",
+            tools=[name for name, _ in effect.calls],
+            parameters=[_clip(params) for _, params in effect.calls],
+        )
+    if isinstance(effect, MemoryCall):
+        return parent.child(f"memory:{effect.method}", "memory")
+    if isinstance(effect, Blocking):
+        name = getattr(effect.function, "__name__", type(effect.function).__name__)
+        return parent.child(f"blocking:{name}", "blocking")
+    return None
+
+
+def _end_effect(span: Span, effect: Any, value: Any, error: Optional[BaseException], usage: Any) -> None:
+    """Record the outcome of an effect and close its span (``usage``: reported by the LLM call)."""
+    if error is None:
+        if isinstance(effect, LLMCall):
+            response, early_dispatch = value
+            text = str(response)
+            model = span.attributes.get("model")
+            span.set(
+                response_chars=len(text),
+                completion_tokens=count_tokens(text, model),
+                tool_dispatched_early=early_dispatch is not None,
+            )
+            if isinstance(usage, dict):
+                # Provider-reported counts replace the local estimates
+                span.set(usage=dict(usage))
+                for key in ("prompt_tokens", "completion_tokens"):
+                    if usage.get(key) is not None:
+                        span.attributes[key] = usage[key]
+        elif isinstance(effect, ToolCall):
+            span.set(result_chars=len(str(value)), error_result=is_error_result(value))
+        elif isinstance(effect, ToolCalls):
+            span.set(
+                result_chars=[len(str(result)) for result in value],
+                error_results=sum(1 for result in value if is_error_result(result)),
+            )
+    span.end(error)
+
+
+def trace_steps(tracer: Tracer, steps: AgentSteps, agent: Any, name: str = "invoke", **attributes: Any) -> AgentSteps:
+    """
+    Wrap an agent's step generator so its run is traced.
+
+    Every effect the agent yields is timed as a span; ``IterationStart``
+    events open a new iteration span. The current span is set while the
+    agent's code runs and while an effect is performed, so ``span()``
+    blocks inside either (prompt building, parsing, memory summarization)
+    nest in the right place. The finished trace is handed to ``tracer``.
+
+    Args:
+        tracer: Tracer receiving the trace
+        steps: The agent's step generator
+        agent: Agent performing the effects (for the LLM's model and usage)
+        name: Root span name
+        **attributes: Attributes of the root span (the agent's class name is
+            added as ``agent``)
+
+    Returns:
+        Step generator driving ``steps`` with the same effects and results
+    """
+    trace = Trace(name, agent=type(agent).__name__, **attributes)
+    root = parent = trace.root
+    span: Optional[Span] = None
+    iterations = 0
+    value: Any = None
+    error: Optional[BaseException] = None
+    try:
+        while True:
+            token = _current.set(parent)
+            try:
+                effect = steps.throw(error) if error is not None else steps.send(value)
+            except StopIteration as stop:
+                root.set(output_chars=len(str(stop.value)))
+                return stop.value
+            finally:
+                _current.reset(token)
+            value, error = None, None
+
+            if isinstance(effect, Emit) and isinstance(effect.event, IterationStart):
+                if parent is not root:
+                    parent.end()
+                iterations = effect.event.iteration
+                parent = root.child(f"iteration {iterations}", "iteration", iteration=iterations)
+            span = _start_effect(parent, effect, agent)
+            # Usage reported by this run's LLM call (llm.last_usage is shared by concurrent runs)
+            usages: List[Dict[str, int]] = []
+            listening = set_usage_listener(usages.append) if isinstance(effect, LLMCall) else None
+            token = _current.set(span or parent)
+            try:
+                value = yield effect
+            except Exception as exc:
+                error = exc
+            finally:
+                try:
+                    _current.reset(token)
+                    if listening is not None:
+                        reset_usage_listener(listening)
+                except ValueError:
+                    pass  # resumed in another context (abandoned stream)
+            if span is not None:
+                _end_effect(span, effect, value, error, usages[-1] if usages else None)
+                span = None
+    except GeneratorExit:
+        root.set(abandoned=True)
+        raise
+    except BaseException as exc:
+        root.end(exc)
+        raise
+    finally:
+        steps.close()
+        for open_span in (span, parent):
+            if open_span is not None:
+                open_span.end()
+        root.set(iterations=iterations)
+        root.end()
+        tracer.finish(trace)
@@ -22,13 +22,18 @@ Example usage:
     ...     print(f"Error: {e}")
 """
 
-from typing import Optional, Any
+from typing import Optional, Any, Callable, Dict, Iterator
+import asyncio
 import os
 import time
 import warnings
 import sys
 from contextlib import contextmanager
 
+from core.context_overflow import ContextOverflowError, is_context_overflow
+from core.tokenizer import usage_recorder
+from core.tracing import add_event
+
 # Suppress gRPC and other warnings
 os.environ['GRPC_VERBOSITY'] = 'ERROR'
 os.environ['GLOG_minloglevel'] = '2'
@@ -81,11 +86,12 @@ def suppress_stderr():
 # Import the Anthropic client at module level to reduce import overhead
 try:
     with suppress_stderr():
-        from anthropic import Anthropic
+        from anthropic import Anthropic, AsyncAnthropic
     _ANTHROPIC_AVAILABLE = True
 except ImportError:
     _ANTHROPIC_AVAILABLE = False
     Anthropic = None  # type: ignore
+    AsyncAnthropic = None  # type: ignore
 
 
 class AnthropicLLMError(Exception):
@@ -104,6 +110,106 @@ class AnthropicLLMResponseError(AnthropicLLMError):
     """Raised when the response from the API cannot be interpreted."""
 
 
+class AnthropicLLMContextLengthError(AnthropicLLMAPIError, ContextOverflowError):
+    """Raised when the prompt does not fit the model's context window (never retried)."""
+
+
+def _create_client(
+    prompt: str,
+    model: str,
+    api_key: Optional[str],
+    max_retries: int,
+    timeout: Optional[float],
+    temperature: Optional[float],
+    max_tokens: int,
+    asynchronous: bool = False,
+    client: Any = None,
+) -> Any:
+    """Validate request arguments and return an initialized Anthropic client (``client`` if given)."""
+    # Basic validation
+    if not isinstance(prompt, str) or not prompt.strip():
+        raise ValueError("prompt must be a non-empty string")
+    if not isinstance(model, str) or not model.strip():
+        raise ValueError("model must be a non-empty string")
+    if not isinstance(max_retries, int) or max_retries < 1:
+        raise ValueError("max_retries must be an integer >= 1")
+    if temperature is not None and not (0.0 <= temperature <= 1.0):
+        raise ValueError("temperature must be between 0.0 and 1.0")
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be positive")
+
+    if client is not None:
+        return client
+    return _new_client(api_key, timeout, asynchronous)
+
+
+def _new_client(api_key: Optional[str], timeout: Optional[float], asynchronous: bool = False) -> Any:
+    """Resolve the API key and return an initialized Anthropic (or AsyncAnthropic) client."""
+    api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise AnthropicLLMImportError(
+            "No API key provided and environment variable ANTHROPIC_API_KEY is not set"
+        )
+
+    # Check if Anthropic client is available
+    if not _ANTHROPIC_AVAILABLE or Anthropic is None:
+        raise AnthropicLLMImportError(
+            "Anthropic package not installed. Install with: pip install anthropic"
+        )
+
+    # Initialize client
+    try:
+        client_class = AsyncAnthropic if asynchronous else Anthropic
+        return client_class(api_key=api_key, timeout=timeout)
+    except Exception as exc:
+        raise AnthropicLLMImportError(
+            "Failed to initialize Anthropic client"
+        ) from exc
+
+
+def _build_request(
+    prompt: str,
+    model: str,
+    temperature: Optional[float],
+    max_tokens: int,
+) -> dict:
+    """Build the keyword arguments for a messages request."""
+    kwargs: dict = {
+        "model": model,
+        "max_tokens": max_tokens,
+        "messages": [{"role": "user", "content": prompt}]
+    }
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    return kwargs
+
+
+def _response_text(response: Any) -> str:
+    """Concatenate the text blocks of a messages response."""
+    if not response.content:
+        raise AnthropicLLMResponseError("No content in response")
+
+    text_parts = []
+    for block in response.content:
+        if hasattr(block, 'text'):
+            text_parts.append(block.text)
+
+    if not text_parts:
+        raise AnthropicLLMResponseError("No text content in response")
+    return "".join(text_parts).strip()
+
+
+def _extract_usage(response: Any) -> Optional[Dict[str, int]]:
+    """Read token usage from a messages response, if reported."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None
+    return {
+        "prompt_tokens": getattr(usage, "input_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "output_tokens", 0) or 0,
+    }
+
+
 def anthropic_llm(
     prompt: str,
     model: str,
@@ -114,6 +220,7 @@ def anthropic_llm(
     backoff_factor: float = 0.5,
     temperature: Optional[float] = None,
     max_tokens: int = 4096,
+    usage_callback: Optional[Callable[[Dict[str, int]], None]] = None,
 ) -> str:
     """Call an Anthropic Claude model and return the generated text.
 
@@ -126,6 +233,8 @@ def anthropic_llm(
         backoff_factor: Base factor for exponential backoff between retries.
         temperature: Sampling temperature (0.0 to 1.0, optional).
         max_tokens: Maximum tokens in response (default: 4096, required by Anthropic).
+        usage_callback: Optional function called with the reported token usage
+            (``prompt_tokens`` / ``completion_tokens``) after a successful call.
 
     Returns:
         The generated text from the model.
@@ -134,76 +243,40 @@ def anthropic_llm(
         ValueError: If required arguments are missing or invalid.
         AnthropicLLMImportError: If the Anthropic client is not installed.
         AnthropicLLMAPIError: If all retry attempts fail.
+        AnthropicLLMContextLengthError: If the prompt does not fit the model's context window.
         AnthropicLLMResponseError: If a response is returned but contains no text.
     """
 
-    # Basic validation
-    if not isinstance(prompt, str) or not prompt.strip():
-        raise ValueError("prompt must be a non-empty string")
-    if not isinstance(model, str) or not model.strip():
-        raise ValueError("model must be a non-empty string")
-    if not isinstance(max_retries, int) or max_retries < 1:
-        raise ValueError("max_retries must be an integer >= 1")
-    if temperature is not None and not (0.0 <= temperature <= 1.0):
-        raise ValueError("temperature must be between 0.0 and 1.0")
-    if max_tokens <= 0:
-        raise ValueError("max_tokens must be positive")
-
-    api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
-    if not api_key:
-        raise AnthropicLLMImportError(
-            "No API key provided and environment variable ANTHROPIC_API_KEY is not set"
-        )
-
-    # Check if Anthropic client is available
-    if not _ANTHROPIC_AVAILABLE or Anthropic is None:
-        raise AnthropicLLMImportError(
-            "Anthropic package not installed. Install with: pip install anthropic"
-        )
-
-    # Initialize client
-    try:
-        client = Anthropic(api_key=api_key, timeout=timeout)
-    except Exception as exc:
-        raise AnthropicLLMImportError(
-            "Failed to initialize Anthropic client"
-        ) from exc
+    client = _create_client(
+        prompt, model, api_key, max_retries, timeout, temperature, max_tokens
+    )
 
     last_exc: Optional[BaseException] = None
 
     for attempt in range(1, max_retries + 1):
         try:
-            # Prepare kwargs
-            kwargs: dict = {
-                "model": model,
-                "max_tokens": max_tokens,
-                "messages": [{"role": "user", "content": prompt}]
-            }
-            if temperature is not None:
-                kwargs["temperature"] = temperature
-
             # Make API request
+            kwargs = _build_request(prompt, model, temperature, max_tokens)
             response = client.messages.create(**kwargs)
 
-            # Extract text
-            if not response.content:
-                raise AnthropicLLMResponseError("No content in response")
-            
-            # Concatenate all text blocks
-            text_parts = []
-            for block in response.content:
-                if hasattr(block, 'text'):
-                    text_parts.append(block.text)
-            
-            if not text_parts:
-                raise AnthropicLLMResponseError("No text content in response")
+            # Extract text (all text blocks concatenated)
+            text = _response_text(response)
 
-            return "".join(text_parts).strip()
+            if usage_callback is not None:
+                usage = _extract_usage(response)
+                if usage is not None:
+                    usage_callback(usage)
+
+            return text
 
         except AnthropicLLMError:
             raise
         except Exception as exc:
             last_exc = exc
+            if is_context_overflow(exc):
+                raise AnthropicLLMContextLengthError(
+                    f"Prompt exceeds the model's context window: {exc}"
+                ) from exc
             if attempt == max_retries:
                 raise AnthropicLLMAPIError(
                     f"Anthropic LLM request failed after {max_retries} attempts: {exc}"
@@ -211,11 +284,146 @@ def anthropic_llm(
 
             # Backoff before next retry
             sleep_for = backoff_factor * (2 ** (attempt - 1))
+            add_event("retry", attempt=attempt, error=str(exc), backoff=sleep_for)
             time.sleep(sleep_for)
 
     raise AnthropicLLMAPIError("Anthropic LLM request failed") from last_exc
 
 
+async def anthropic_llm_async(
+    prompt: str,
+    model: str,
+    api_key: Optional[str] = None,
+    *,
+    max_retries: int = 3,
+    timeout: Optional[float] = 30.0,
+    backoff_factor: float = 0.5,
+    temperature: Optional[float] = None,
+    max_tokens: int = 4096,
+    usage_callback: Optional[Callable[[Dict[str, int]], None]] = None,
+    client: Any = None,
+) -> str:
+    """Call an Anthropic Claude model with the async client and return the generated text.
+
+    Takes the same arguments and raises the same exceptions as ``anthropic_llm``;
+    waiting for the response (and backing off between retries) does not
+    block the event loop. Pass ``client`` (an ``AsyncAnthropic``) to reuse its
+    connection pool across calls; it stays open afterwards.
+    """
+
+    client = _create_client(
+        prompt, model, api_key, max_retries, timeout, temperature, max_tokens,
+        asynchronous=True, client=client,
+    )
+
+    last_exc: Optional[BaseException] = None
+
+    for attempt in range(1, max_retries + 1):
+        try:
+            kwargs = _build_request(prompt, model, temperature, max_tokens)
+            response = await client.messages.create(**kwargs)
+            text = _response_text(response)
+
+            if usage_callback is not None:
+                usage = _extract_usage(response)
+                if usage is not None:
+                    usage_callback(usage)
+
+            return text
+
+        except AnthropicLLMError:
+            raise
+        except Exception as exc:
+            last_exc = exc
+            if is_context_overflow(exc):
+                raise AnthropicLLMContextLengthError(
+                    f"Prompt exceeds the model's context window: {exc}"
+                ) from exc
+            if attempt == max_retries:
+                raise AnthropicLLMAPIError(
+                    f"Anthropic LLM request failed after {max_retries} attempts: {exc}"
+                ) from exc
+
+            # Backoff before next retry
+            sleep_for = backoff_factor * (2 ** (attempt - 1))
+            add_event("retry", attempt=attempt, error=str(exc), backoff=sleep_for)
+            await asyncio.sleep(sleep_for)
+
+    raise AnthropicLLMAPIError("Anthropic LLM request failed") from last_exc
+
+
+def anthropic_llm_stream(
+    prompt: str,
+    model: str,
+    api_key: Optional[str] = None,
+    *,
+    max_retries: int = 3,
+    timeout: Optional[float] = 30.0,
+    backoff_factor: float = 0.5,
+    temperature: Optional[float] = None,
+    max_tokens: int = 4096,
+) -> Iterator[str]:
+    """Call an Anthropic Claude model and yield the generated text as it streams in.
+
+    Takes the same arguments as ``anthropic_llm``. Failures are only retried
+    before the first chunk arrives; once text has been yielded it cannot be
+    taken back, so a later failure is raised immediately.
+
+    Yields:
+        Chunks of generated text, in order.
+
+    Raises:
+        ValueError: If required arguments are missing or invalid.
+        AnthropicLLMImportError: If the Anthropic client is not installed.
+        AnthropicLLMAPIError: If the stream cannot be completed.
+        AnthropicLLMResponseError: If the stream ends without any text.
+    """
+
+    client = _create_client(
+        prompt, model, api_key, max_retries, timeout, temperature, max_tokens
+    )
+
+    last_exc: Optional[BaseException] = None
+
+    for attempt in range(1, max_retries + 1):
+        received = False
+        try:
+            kwargs = _build_request(prompt, model, temperature, max_tokens)
+            stream = client.messages.create(stream=True, **kwargs)
+
+            for event in stream:
+                if getattr(event, "type", None) != "content_block_delta":
+                    continue
+                text = getattr(event.delta, "text", None)
+                if text:
+                    received = True
+                    yield text
+
+            if not received:
+                raise AnthropicLLMResponseError("No text content in response")
+            return
+
+        except AnthropicLLMError:
+            raise
+        except Exception as exc:
+            last_exc = exc
+            if is_context_overflow(exc):
+                raise AnthropicLLMContextLengthError(
+                    f"Prompt exceeds the model's context window: {exc}"
+                ) from exc
+            if received or attempt == max_retries:
+                raise AnthropicLLMAPIError(
+                    f"Anthropic LLM stream failed after {attempt} attempts: {exc}"
+                ) from exc
+
+            # Backoff before next retry
+            sleep_for = backoff_factor * (2 ** (attempt - 1))
+            add_event("retry", attempt=attempt, error=str(exc), backoff=sleep_for)
+            time.sleep(sleep_for)
+
+    raise AnthropicLLMAPIError("Anthropic LLM stream failed") from last_exc
+
+
 class AnthropicLLM:
     """
     Class-based wrapper for Anthropic Claude LLM with generate_response method.
@@ -260,6 +468,11 @@ class AnthropicLLM:
         self.backoff_factor = backoff_factor
         self.temperature = temperature
         self.max_tokens = max_tokens
+        # Token usage reported by the most recent generate_response() call
+        self.last_usage: Optional[Dict[str, int]] = None
+        # AsyncAnthropic client reused by agenerate_response(), and the event loop it was opened on
+        self._async_client: Any = None
+        self._async_client_loop: Optional[asyncio.AbstractEventLoop] = None
     
     def generate_response(self, prompt: str) -> str:
         """
@@ -286,14 +499,90 @@ class AnthropicLLM:
             backoff_factor=self.backoff_factor,
             temperature=self.temperature,
             max_tokens=self.max_tokens,
+            usage_callback=usage_recorder(self, prompt, self.model),
+        )
+
+    async def agenerate_response(self, prompt: str) -> str:
+        """
+        Generate a response from the Anthropic Claude model without blocking the event loop.
+        
+        Args:
+            prompt: The input prompt text
+            
+        Returns:
+            Generated response text
+            
+        Raises:
+            Same exceptions as generate_response()
+        """
+        return await anthropic_llm_async(
+            prompt=prompt,
+            model=self.model,
+            api_key=self.api_key,
+            max_retries=self.max_retries,
+            timeout=self.timeout,
+            backoff_factor=self.backoff_factor,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            usage_callback=usage_recorder(self, prompt, self.model),
+            client=self._get_async_client(),
+        )
+
+    def _get_async_client(self) -> Any:
+        """Return the async client for the running event loop, opening it on first use."""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            # Connections belong to the loop that opened them, so a new loop
+            # (e.g. another asyncio.run()) gets a new client
+            self._async_client = _new_client(self.api_key, self.timeout, asynchronous=True)
+            self._async_client_loop = loop
+        return self._async_client
+
+    async def aclose(self) -> None:
+        """
+        Close the async client used by agenerate_response().
+        
+        Await it on the event loop that made the requests, e.g. at the end of
+        the coroutine passed to asyncio.run(). A later agenerate_response()
+        call opens a new client.
+        """
+        client, self._async_client, self._async_client_loop = self._async_client, None, None
+        if client is not None:
+            await client.close()
+
+    def generate_response_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Stream a response from the Anthropic Claude model chunk by chunk.
+        
+        Args:
+            prompt: The input prompt text
+            
+        Yields:
+            Chunks of generated text
+            
+        Raises:
+            Same exceptions as generate_response()
+        """
+        return anthropic_llm_stream(
+            prompt=prompt,
+            model=self.model,
+            api_key=self.api_key,
+            max_retries=self.max_retries,
+            timeout=self.timeout,
+            backoff_factor=self.backoff_factor,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
         )
 
 
 __all__ = [
     "anthropic_llm",
+    "anthropic_llm_stream",
+    "anthropic_llm_async",
     "AnthropicLLM",
     "AnthropicLLMError",
     "AnthropicLLMAPIError",
     "AnthropicLLMImportError",
     "AnthropicLLMResponseError",
+    "AnthropicLLMContextLengthError",
 ]
@@ -9,6 +9,9 @@ Notes:
 - The function prefers the official ``google.generativeai`` package when
   available but has defensive code to handle different shapes of response
   objects used across minor client versions.
+- The installed SDK flavour, client and model objects are resolved once per
+  API key (and per generation config) and reused by later calls;
+  ``GoogleLLM`` does this when it is constructed.
 
 Example usage:
     >>> from Codemni.llm import google_llm, GoogleLLMError
@@ -24,13 +27,19 @@ Example usage:
     ...     print(f"Error: {e}")
 """
 
-from typing import Optional, Any
+from typing import Optional, Any, Callable, Dict, Iterator, List, Sequence, Tuple
 import os
+import threading
 import time
 import warnings
 import sys
 from contextlib import contextmanager
 
+from core.context_overflow import ContextOverflowError, is_context_overflow
+from core.tokenizer import usage_recorder
+from core.tracing import add_event
+from .embeddings import embed_in_batches, require_numpy, validate_texts
+
 # Suppress gRPC ALTS warnings at environment level
 os.environ['GRPC_VERBOSITY'] = 'ERROR'
 os.environ['GLOG_minloglevel'] = '2'
@@ -112,6 +121,10 @@ class GoogleLLMResponseError(GoogleLLMError):
     """Raised when the response from the API cannot be interpreted."""
 
 
+class GoogleLLMContextLengthError(GoogleLLMAPIError, ContextOverflowError):
+    """Raised when the prompt does not fit the model's context window (never retried)."""
+
+
 def _extract_text_from_response(resp: Any) -> Optional[str]:
     """Try several patterns to extract the generated text from a response.
 
@@ -197,53 +210,50 @@ def _extract_text_from_response(resp: Any) -> Optional[str]:
     return None
 
 
-def google_llm(
-    prompt: str,
-    model: str,
-    api_key: Optional[str] = None,
-    *,
-    temperature: Optional[float] = None,
-    top_p: Optional[float] = None,
-    top_k: Optional[int] = None,
-    max_tokens: Optional[int] = None,
-    max_retries: int = 3,
-    timeout: Optional[float] = 30.0,
-    backoff_factor: float = 0.5,
-) -> str:
-    """Call a Google generative model and return the generated text.
-
-    Args:
-        prompt: The prompt / input text to send to the model. Must be non-empty.
-        model: Model identifier (e.g. "gemini-pro" or other supported model name).
-        api_key: API key to use. If omitted, the function will try the
-            environment variable ``GOOGLE_API_KEY``.
-        temperature: Controls randomness (0.0-2.0). Higher = more random.
-        top_p: Nucleus sampling threshold (0.0-1.0). Alternative to temperature.
-        top_k: Top-k sampling. Limits to k most likely tokens.
-        max_tokens: Maximum tokens to generate (max_output_tokens).
-        max_retries: Number of attempts to make on transient failures.
-        timeout: Optional timeout (seconds) to pass to the underlying client.
-        backoff_factor: Base factor for exponential backoff between retries.
-
-    Returns:
-        The generated text from the model.
-
-    Raises:
-        ValueError: If required arguments are missing or invalid.
-        GoogleLLMImportError: If the Google client is not installed.
-        GoogleLLMAPIError: If all retry attempts fail.
-        GoogleLLMResponseError: If a response is returned but contains no text.
-    """
-
-    # Basic validation
+def _extract_usage(resp: Any) -> Optional[Dict[str, int]]:
+    """Read token usage (usage_metadata) from a response, if reported."""
+    meta = getattr(resp, "usage_metadata", None)
+    if meta is None and isinstance(resp, dict):
+        meta = resp.get("usage_metadata")
+    if meta is None:
+        return None
+    if isinstance(meta, dict):
+        prompt_tokens = meta.get("prompt_token_count")
+        completion_tokens = meta.get("candidates_token_count")
+    else:
+        prompt_tokens = getattr(meta, "prompt_token_count", None)
+        completion_tokens = getattr(meta, "candidates_token_count", None)
+    return {
+        "prompt_tokens": prompt_tokens or 0,
+        "completion_tokens": completion_tokens or 0,
+    }
+
+
+def _report_usage(resp: Any, usage_callback: Optional[Callable[[Dict[str, int]], None]]) -> None:
+    """Pass the response usage to ``usage_callback`` when both are available."""
+    if usage_callback is not None:
+        usage = _extract_usage(resp)
+        if usage is not None:
+            usage_callback(usage)
+
+
+def _validate_request(prompt: str, model: str, max_retries: int) -> None:
+    """Validate the per-call request arguments."""
     if not isinstance(prompt, str) or not prompt.strip():
         raise ValueError("prompt must be a non-empty string")
     if not isinstance(model, str) or not model.strip():
         raise ValueError("model must be a non-empty string")
     if not isinstance(max_retries, int) or max_retries < 1:
         raise ValueError("max_retries must be an integer >= 1")
-    
-    # Validate generation parameters
+
+
+def _make_generation_config(
+    temperature: Optional[float],
+    top_p: Optional[float],
+    top_k: Optional[int],
+    max_tokens: Optional[int],
+) -> Dict[str, Any]:
+    """Validate the generation parameters and return the generation config dict."""
     if temperature is not None and not (0.0 <= temperature <= 2.0):
         raise ValueError("temperature must be between 0.0 and 2.0")
     if top_p is not None and not (0.0 <= top_p <= 1.0):
@@ -264,6 +274,28 @@ def google_llm(
     if max_tokens is not None:
         generation_config["max_output_tokens"] = max_tokens
 
+    return generation_config
+
+
+def _build_generation_config(
+    prompt: str,
+    model: str,
+    max_retries: int,
+    temperature: Optional[float],
+    top_p: Optional[float],
+    top_k: Optional[int],
+    max_tokens: Optional[int],
+) -> Dict[str, Any]:
+    """Validate request arguments and return the generation config dict."""
+    _validate_request(prompt, model, max_retries)
+    return _make_generation_config(temperature, top_p, top_k, max_tokens)
+
+
+def _configure_client(api_key: Optional[str]) -> Tuple[Any, Any]:
+    """Configure the Google SDK and return ``(genai_module, client)``.
+
+    ``client`` is None when the installed SDK has no ``Client`` class.
+    """
     api_key = api_key or os.environ.get("GOOGLE_API_KEY")
     if not api_key:
         raise GoogleLLMImportError(
@@ -308,60 +340,186 @@ def google_llm(
         # Non-fatal: client may not be needed
         pass
 
+    return genai, client
+
+
+
+def _extract_text_fast(resp: Any) -> Optional[str]:
+    """Extract text from the SDK response objects that expose ``.text``.
+
+    Both current SDKs return an object with a ``text`` property, so the
+    reflective fallback only runs when that is empty (e.g. blocked output).
+    """
+    try:
+        text = resp.text
+    except Exception:
+        text = None
+    if isinstance(text, str) and text.strip():
+        return text
+    return _extract_text_from_response(resp)
+
+
+class _GeminiBackend:
+    """SDK entry points for one API key, resolved once.
+
+    The installed SDK flavour decides how requests are made:
+
+    - ``"client"``: ``google.genai`` style ``Client().models.generate_content``
+    - ``"generative_model"``: ``google.generativeai`` style ``GenerativeModel``
+    - ``"helper"``: older top-level ``generate_text`` style helpers
+
+    ``GenerativeModel`` instances are cached per (model, generation config).
+    """
+
+    _MAX_MODELS = 32
+
+    def __init__(self, api_key: Optional[str]):
+        self.api_key = api_key or os.environ.get("GOOGLE_API_KEY")
+        self.genai, self.client = _configure_client(api_key)
+
+        models_attr = getattr(self.client, "models", None) if self.client is not None else None
+        client_generate = getattr(models_attr, "generate_content", None) if models_attr else None
+        generative_model = getattr(self.genai, "GenerativeModel", None)
+
+        self.client_generate = None
+        self.client_stream = None
+        self.generative_model = None
+        self.helper = None
+
+        if callable(client_generate):
+            self.flavour = "client"
+            self.client_generate = client_generate
+            stream_fn = getattr(models_attr, "generate_content_stream", None)
+            self.client_stream = stream_fn if callable(stream_fn) else None
+            self.extract = _extract_text_fast
+        elif callable(generative_model):
+            global _configured_key
+            # _configure_client() has just configured this key
+            _configured_key = self.api_key
+            self.flavour = "generative_model"
+            self.generative_model = generative_model
+            self.extract = _extract_text_fast
+        else:
+            for helper_name in ("generate_text", "generate", "model_generate"):
+                helper = getattr(self.genai, helper_name, None)
+                if callable(helper):
+                    self.helper = helper
+                    break
+            if self.helper is None:
+                raise GoogleLLMImportError(
+                    "Installed Google client exposes no supported generation entry point"
+                )
+            self.flavour = "helper"
+            self.extract = _extract_text_from_response
+
+        self._models: Dict[Tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    def _model(self, model: str, generation_config: Dict[str, Any]) -> Any:
+        """Return the cached GenerativeModel for a model and generation config."""
+        key = (model, tuple(sorted(generation_config.items())))
+        model_obj = self._models.get(key)
+        if model_obj is None:
+            with self._lock:
+                model_obj = self._models.get(key)
+                if model_obj is None:
+                    with suppress_stderr():
+                        if generation_config:
+                            model_obj = self.generative_model(model, generation_config=generation_config)
+                        else:
+                            model_obj = self.generative_model(model)
+                    if len(self._models) >= self._MAX_MODELS:
+                        self._models.pop(next(iter(self._models)))
+                    self._models[key] = model_obj
+        return model_obj
+
+    def _ensure_configured(self) -> None:
+        """Re-point ``genai.configure`` at this key if another key was configured since."""
+        global _configured_key
+        if _configured_key != self.api_key:
+            with _configure_lock:
+                configure = getattr(self.genai, "configure", None)
+                if callable(configure):
+                    configure(api_key=self.api_key)
+                _configured_key = self.api_key
+
+    def generate(self, prompt: str, model: str, generation_config: Dict[str, Any], timeout: Optional[float]) -> Any:
+        """Make one generation request and return the raw response."""
+        with suppress_stderr():
+            if self.flavour == "client":
+                if generation_config:
+                    return self.client_generate(model=model, contents=prompt, config=generation_config)
+                return self.client_generate(model=model, contents=prompt)
+            if self.flavour == "generative_model":
+                # The google.generativeai API key is process-global
+                self._ensure_configured()
+                return self._model(model, generation_config).generate_content(prompt)
+            return self.helper(model=model, prompt=prompt, timeout=timeout)
+
+    def stream(self, prompt: str, model: str, generation_config: Dict[str, Any]) -> Optional[Iterator[Any]]:
+        """Start a streaming request, or return None if the SDK cannot stream."""
+        with suppress_stderr():
+            if self.flavour == "client" and self.client_stream is not None:
+                if generation_config:
+                    return self.client_stream(model=model, contents=prompt, config=generation_config)
+                return self.client_stream(model=model, contents=prompt)
+            if self.flavour == "generative_model":
+                self._ensure_configured()
+                return self._model(model, generation_config).generate_content(prompt, stream=True)
+        return None
+
+
+# Backends per API key, and the key google.generativeai is configured with
+_backends: Dict[Optional[str], _GeminiBackend] = {}
+_backends_lock = threading.Lock()
+_configured_key: Optional[str] = None
+_configure_lock = threading.Lock()
+
+
+def _get_backend(api_key: Optional[str]) -> _GeminiBackend:
+    """Return the shared backend for an API key, resolving the SDK on first use."""
+    api_key = api_key or os.environ.get("GOOGLE_API_KEY")
+    backend = _backends.get(api_key)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(api_key)
+            if backend is None:
+                backend = _GeminiBackend(api_key)
+                _backends[api_key] = backend
+    return backend
+
+
+def _generate(
+    backend: _GeminiBackend,
+    prompt: str,
+    model: str,
+    generation_config: Dict[str, Any],
+    max_retries: int,
+    timeout: Optional[float],
+    backoff_factor: float,
+    usage_callback: Optional[Callable[[Dict[str, int]], None]],
+) -> str:
+    """Run a generation request with retries and return the text."""
     last_exc: Optional[BaseException] = None
 
     for attempt in range(1, max_retries + 1):
         try:
-            # Try several calling patterns in order of preference
-            # Wrap API calls in stderr suppression to hide gRPC warnings
-            with suppress_stderr():
-                # 1) If the client has models.generate_content (client.models.generate_content)
-                if client is not None:
-                    models_attr = getattr(client, "models", None)
-                    gen_fn = getattr(models_attr, "generate_content", None) if models_attr else None
-                    if callable(gen_fn):
-                        resp = gen_fn(model=model, contents=prompt, timeout=timeout)
-                        text = _extract_text_from_response(resp)
-                        if text:
-                            return text
-
-                # 2) If package exposes GenerativeModel and it has generate_content
-                GenerativeModel = getattr(genai, "GenerativeModel", None)
-                if callable(GenerativeModel):
-                    try:
-                        # Create model with generation config if provided
-                        if generation_config:
-                            model_obj = GenerativeModel(model, generation_config=generation_config)
-                        else:
-                            model_obj = GenerativeModel(model)
-                        gen_fn = getattr(model_obj, "generate_content", None)
-                        if callable(gen_fn):
-                            resp = gen_fn(prompt)  # GenerativeModel doesn't support timeout parameter
-                            text = _extract_text_from_response(resp)
-                            if text:
-                                return text
-                    except Exception:
-                        # Be tolerant: fall through to other options
-                        pass
-
-                # 3) Top-level convenience helpers (generate_text / generate)
-                for helper_name in ("generate_text", "generate", "model_generate"):
-                    helper = getattr(genai, helper_name, None)
-                    if callable(helper):
-                        try:
-                            resp = helper(model=model, prompt=prompt, timeout=timeout)
-                            text = _extract_text_from_response(resp)
-                            if text:
-                                return text
-                        except Exception:
-                            pass
-
-            # If none of the above returned text, raise a response error to
-            # trigger retry / final failure handling.
+            resp = backend.generate(prompt, model, generation_config, timeout)
+            text = backend.extract(resp)
+            if text:
+                _report_usage(resp, usage_callback)
+                return text
+
+            # No text: raise a response error to trigger retry / final
+            # failure handling.
             raise GoogleLLMResponseError("No text could be extracted from the API response")
 
         except Exception as exc:  # catch network/errors from client
             last_exc = exc
+            if is_context_overflow(exc):
+                raise GoogleLLMContextLengthError(
+                    f"Prompt exceeds the model's context window: {exc}"
+                ) from exc
             if attempt == max_retries:
                 # Exhausted retries; surface a clear error to the caller.
                 raise GoogleLLMAPIError(
@@ -370,13 +528,240 @@ def google_llm(
 
             # Backoff before the next retry (no logging per user request)
             sleep_for = backoff_factor * (2 ** (attempt - 1))
-            # Ensure minimum sleep to avoid tight loop
+            add_event("retry", attempt=attempt, error=str(exc), backoff=sleep_for)
             time.sleep(sleep_for)
 
     # If the loop exits without returning, raise the last observed exception
     raise GoogleLLMAPIError("Google LLM request failed") from last_exc
 
 
+def _generate_stream(
+    backend: _GeminiBackend,
+    prompt: str,
+    model: str,
+    generation_config: Dict[str, Any],
+    max_retries: int,
+    timeout: Optional[float],
+    backoff_factor: float,
+) -> Iterator[str]:
+    """Run a streaming request with retries before the first chunk."""
+    last_exc: Optional[BaseException] = None
+
+    for attempt in range(1, max_retries + 1):
+        received = False
+        try:
+            stream = backend.stream(prompt, model, generation_config)
+            if stream is None:
+                yield _generate(
+                    backend, prompt, model, generation_config,
+                    max_retries, timeout, backoff_factor, None,
+                )
+                return
+
+            for chunk in stream:
+                text = backend.extract(chunk)
+                if text:
+                    received = True
+                    yield text
+
+            if not received:
+                raise GoogleLLMResponseError("No text could be extracted from the API response")
+            return
+
+        except GoogleLLMError:
+            raise
+        except Exception as exc:
+            last_exc = exc
+            if is_context_overflow(exc):
+                raise GoogleLLMContextLengthError(
+                    f"Prompt exceeds the model's context window: {exc}"
+                ) from exc
+            if received or attempt == max_retries:
+                raise GoogleLLMAPIError(
+                    f"Google LLM stream failed after {attempt} attempts: {exc}"
+                ) from exc
+
+            # Backoff before the next retry
+            sleep_for = backoff_factor * (2 ** (attempt - 1))
+            add_event("retry", attempt=attempt, error=str(exc), backoff=sleep_for)
+            time.sleep(sleep_for)
+
+    raise GoogleLLMAPIError("Google LLM stream failed") from last_exc
+
+
+def google_llm(
+    prompt: str,
+    model: str,
+    api_key: Optional[str] = None,
+    *,
+    temperature: Optional[float] = None,
+    top_p: Optional[float] = None,
+    top_k: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    max_retries: int = 3,
+    timeout: Optional[float] = 30.0,
+    backoff_factor: float = 0.5,
+    usage_callback: Optional[Callable[[Dict[str, int]], None]] = None,
+) -> str:
+    """Call a Google generative model and return the generated text.
+
+    Args:
+        prompt: The prompt / input text to send to the model. Must be non-empty.
+        model: Model identifier (e.g. "gemini-pro" or other supported model name).
+        api_key: API key to use. If omitted, the function will try the
+            environment variable ``GOOGLE_API_KEY``.
+        temperature: Controls randomness (0.0-2.0). Higher = more random.
+        top_p: Nucleus sampling threshold (0.0-1.0). Alternative to temperature.
+        top_k: Top-k sampling. Limits to k most likely tokens.
+        max_tokens: Maximum tokens to generate (max_output_tokens).
+        max_retries: Number of attempts to make on transient failures.
+        timeout: Optional timeout (seconds) to pass to the underlying client.
+        backoff_factor: Base factor for exponential backoff between retries.
+        usage_callback: Optional function called with the reported token usage
+            (``prompt_tokens`` / ``completion_tokens``) after a successful call.
+
+    Returns:
+        The generated text from the model.
+
+    Raises:
+        ValueError: If required arguments are missing or invalid.
+        GoogleLLMImportError: If the Google client is not installed.
+        GoogleLLMAPIError: If all retry attempts fail.
+        GoogleLLMContextLengthError: If the prompt does not fit the model's context window.
+        GoogleLLMResponseError: If a response is returned but contains no text.
+    """
+
+    generation_config = _build_generation_config(
+        prompt, model, max_retries, temperature, top_p, top_k, max_tokens
+    )
+    backend = _get_backend(api_key)
+    return _generate(
+        backend, prompt, model, generation_config,
+        max_retries, timeout, backoff_factor, usage_callback,
+    )
+
+
+def google_llm_stream(
+    prompt: str,
+    model: str,
+    api_key: Optional[str] = None,
+    *,
+    temperature: Optional[float] = None,
+    top_p: Optional[float] = None,
+    top_k: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    max_retries: int = 3,
+    timeout: Optional[float] = 30.0,
+    backoff_factor: float = 0.5,
+) -> Iterator[str]:
+    """Call a Google generative model and yield the generated text as it streams in.
+
+    Takes the same arguments as ``google_llm``. Failures are only retried
+    before the first chunk arrives; once text has been yielded it cannot be
+    taken back, so a later failure is raised immediately. If the installed
+    SDK offers no streaming entry point, the full response is yielded as a
+    single chunk.
+
+    Yields:
+        Chunks of generated text, in order.
+
+    Raises:
+        ValueError: If required arguments are missing or invalid.
+        GoogleLLMImportError: If the Google client is not installed.
+        GoogleLLMAPIError: If the stream cannot be completed.
+    """
+
+    generation_config = _build_generation_config(
+        prompt, model, max_retries, temperature, top_p, top_k, max_tokens
+    )
+    backend = _get_backend(api_key)
+    return _generate_stream(
+        backend, prompt, model, generation_config,
+        max_retries, timeout, backoff_factor,
+    )
+
+
+def google_embed(
+    texts: Sequence[str],
+    model: str = "text-embedding-004",
+    api_key: Optional[str] = None,
+    *,
+    task_type: Optional[str] = None,
+    batch_size: int = 100,
+    max_concurrency: int = 4,
+    max_retries: int = 3,
+    backoff_factor: float = 0.5,
+) -> Any:
+    """Embed texts with a Google embedding model.
+
+    Sends up to ``batch_size`` texts per request (100 is the batch limit
+    of the embedding endpoint) with up to ``max_concurrency`` requests in
+    parallel.
+
+    Args:
+        texts: Texts to embed.
+        model: Embedding model identifier (e.g. "text-embedding-004").
+        api_key: API key to use. If omitted, will try GOOGLE_API_KEY env var.
+        task_type: Optional task hint (e.g. "RETRIEVAL_DOCUMENT", "RETRIEVAL_QUERY").
+        batch_size: Maximum texts per request.
+        max_concurrency: Number of requests to run in parallel.
+        max_retries: Number of attempts per request on transient failures.
+        backoff_factor: Base factor for exponential backoff between retries.
+
+    Returns:
+        Contiguous numpy.float32 array of shape (len(texts), dimensions).
+
+    Raises:
+        ValueError: If required arguments are missing or invalid.
+        GoogleLLMImportError: If the Google client or NumPy is not installed.
+        GoogleLLMAPIError: If a request fails after all retries.
+    """
+    require_numpy(GoogleLLMImportError)
+    texts = validate_texts(texts)
+    if not isinstance(model, str) or not model.strip():
+        raise ValueError("model must be a non-empty string")
+    if not isinstance(max_retries, int) or max_retries < 1:
+        raise ValueError("max_retries must be an integer >= 1")
+
+    backend = _get_backend(api_key)
+    genai, client = backend.genai, backend.client
+    models_attr = getattr(client, "models", None) if client is not None else None
+    client_embed = getattr(models_attr, "embed_content", None) if models_attr else None
+    module_embed = getattr(genai, "embed_content", None)
+    if not callable(client_embed) and not callable(module_embed):
+        raise GoogleLLMImportError("Installed Google client does not support embeddings")
+
+    def request(batch: List[str]) -> List[Any]:
+        with suppress_stderr():
+            if callable(client_embed):
+                kwargs: dict = {"model": model, "contents": batch}
+                if task_type is not None:
+                    kwargs["config"] = {"task_type": task_type}
+                resp = client_embed(**kwargs)
+                return [item.values for item in resp.embeddings]
+
+            name = model if model.startswith("models/") else f"models/{model}"
+            kwargs = {"model": name, "content": batch}
+            if task_type is not None:
+                kwargs["task_type"] = task_type
+            resp = module_embed(**kwargs)
+            return resp["embedding"]
+
+    def embed_batch(batch: List[str]) -> List[Any]:
+        for attempt in range(1, max_retries + 1):
+            try:
+                return request(batch)
+            except Exception as exc:
+                if attempt == max_retries:
+                    raise GoogleLLMAPIError(
+                        f"Google embedding request failed after {max_retries} attempts: {exc}"
+                    ) from exc
+                time.sleep(backoff_factor * (2 ** (attempt - 1)))
+        return []
+
+    return embed_in_batches(texts, batch_size, embed_batch, max_concurrency)
+
+
 class GoogleLLM:
     """
     Class-based wrapper for Google Gemini LLM with generate_response method.
@@ -407,6 +792,9 @@ class GoogleLLM:
         """
         Initialize Google Gemini LLM wrapper.
         
+        The installed SDK is inspected and the client configured here, once,
+        rather than on every call.
+        
         Args:
             model: Model identifier (e.g. "gemini-1.5-pro", "gemini-pro")
             api_key: API key (optional if GOOGLE_API_KEY env var is set)
@@ -417,6 +805,10 @@ class GoogleLLM:
             max_retries: Number of retry attempts on failure
             timeout: Request timeout in seconds
             backoff_factor: Exponential backoff factor for retries
+            
+        Raises:
+            ValueError: If a generation parameter is invalid
+            GoogleLLMImportError: If the Google client is not installed or no API key is set
         """
         self.model = model
         self.api_key = api_key
@@ -427,6 +819,13 @@ class GoogleLLM:
         self.max_retries = max_retries
         self.timeout = timeout
         self.backoff_factor = backoff_factor
+        # Token usage reported by the most recent generate_response() call
+        self.last_usage: Optional[Dict[str, int]] = None
+
+        # Resolve the SDK flavour, client and generation config once; the
+        # backend also caches the model objects per generation config.
+        self._generation_config = _make_generation_config(temperature, top_p, top_k, max_tokens)
+        self._backend = _get_backend(api_key)
     
     def generate_response(self, prompt: str) -> str:
         """
@@ -444,25 +843,80 @@ class GoogleLLM:
             GoogleLLMAPIError: If API request fails
             GoogleLLMResponseError: If response is invalid
         """
-        return google_llm(
-            prompt=prompt,
-            model=self.model,
+        _validate_request(prompt, self.model, self.max_retries)
+        return _generate(
+            self._backend,
+            prompt,
+            self.model,
+            self._generation_config,
+            self.max_retries,
+            self.timeout,
+            self.backoff_factor,
+            usage_recorder(self, prompt, self.model),
+        )
+
+    def generate_response_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Stream a response from the Google Gemini model chunk by chunk.
+        
+        Args:
+            prompt: The input prompt text
+            
+        Yields:
+            Chunks of generated text
+            
+        Raises:
+            Same exceptions as generate_response()
+        """
+        _validate_request(prompt, self.model, self.max_retries)
+        return _generate_stream(
+            self._backend,
+            prompt,
+            self.model,
+            self._generation_config,
+            self.max_retries,
+            self.timeout,
+            self.backoff_factor,
+        )
+
+    def embed(
+        self,
+        texts: Sequence[str],
+        model: str = "text-embedding-004",
+        task_type: Optional[str] = None,
+        batch_size: int = 100,
+    ) -> Any:
+        """
+        Embed texts with a Google embedding model.
+        
+        Args:
+            texts: Texts to embed
+            model: Embedding model identifier
+            task_type: Optional task hint (e.g. "RETRIEVAL_DOCUMENT")
+            batch_size: Maximum texts per request
+            
+        Returns:
+            Contiguous numpy.float32 array of shape (len(texts), dimensions)
+        """
+        return google_embed(
+            texts,
+            model=model,
             api_key=self.api_key,
-            temperature=self.temperature,
-            top_p=self.top_p,
-            top_k=self.top_k,
-            max_tokens=self.max_tokens,
+            task_type=task_type,
+            batch_size=batch_size,
             max_retries=self.max_retries,
-            timeout=self.timeout,
             backoff_factor=self.backoff_factor,
         )
 
 
 __all__ = [
     "google_llm",
+    "google_llm_stream",
+    "google_embed",
     "GoogleLLM",
     "GoogleLLMError",
     "GoogleLLMAPIError",
     "GoogleLLMImportError",
     "GoogleLLMResponseError",
+    "GoogleLLMContextLengthError",
 ]
\ No newline at end of file
@@ -22,13 +22,18 @@ Example usage:
     ...     print(f"Error: {e}")
 """
 
-from typing import Optional, Any
+from typing import Optional, Any, Callable, Dict, Iterator
+import asyncio
 import os
 import time
 import warnings
 import sys
 from contextlib import contextmanager
 
+from core.context_overflow import ContextOverflowError, is_context_overflow
+from core.tokenizer import usage_recorder
+from core.tracing import add_event
+
 # Suppress gRPC and other warnings
 os.environ['GRPC_VERBOSITY'] = 'ERROR'
 os.environ['GLOG_minloglevel'] = '2'
@@ -81,11 +86,12 @@ def suppress_stderr():
 # Import the Groq client at module level to reduce import overhead
 try:
     with suppress_stderr():
-        from groq import Groq
+        from groq import AsyncGroq, Groq
     _GROQ_AVAILABLE = True
 except ImportError:
     _GROQ_AVAILABLE = False
     Groq = None  # type: ignore
+    AsyncGroq = None  # type: ignore
 
 
 class GroqLLMError(Exception):
@@ -104,6 +110,100 @@ class GroqLLMResponseError(GroqLLMError):
     """Raised when the response from the API cannot be interpreted."""
 
 
+class GroqLLMContextLengthError(GroqLLMAPIError, ContextOverflowError):
+    """Raised when the prompt does not fit the model's context window (never retried)."""
+
+
+def _create_client(
+    prompt: str,
+    model: str,
+    api_key: Optional[str],
+    max_retries: int,
+    timeout: Optional[float],
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+    asynchronous: bool = False,
+    client: Any = None,
+) -> Any:
+    """Validate request arguments and return an initialized Groq client (``client`` if given)."""
+    # Basic validation
+    if not isinstance(prompt, str) or not prompt.strip():
+        raise ValueError("prompt must be a non-empty string")
+    if not isinstance(model, str) or not model.strip():
+        raise ValueError("model must be a non-empty string")
+    if not isinstance(max_retries, int) or max_retries < 1:
+        raise ValueError("max_retries must be an integer >= 1")
+    if temperature is not None and not (0.0 <= temperature <= 2.0):
+        raise ValueError("temperature must be between 0.0 and 2.0")
+    if max_tokens is not None and max_tokens <= 0:
+        raise ValueError("max_tokens must be positive")
+
+    if client is not None:
+        return client
+    return _new_client(api_key, timeout, asynchronous)
+
+
+def _new_client(api_key: Optional[str], timeout: Optional[float], asynchronous: bool = False) -> Any:
+    """Resolve the API key and return an initialized Groq (or AsyncGroq) client."""
+    api_key = api_key or os.environ.get("GROQ_API_KEY")
+    if not api_key:
+        raise GroqLLMImportError(
+            "No API key provided and environment variable GROQ_API_KEY is not set"
+        )
+
+    # Check if Groq client is available
+    if not _GROQ_AVAILABLE or Groq is None:
+        raise GroqLLMImportError(
+            "Groq package not installed. Install with: pip install groq"
+        )
+
+    # Initialize client
+    try:
+        client_class = AsyncGroq if asynchronous else Groq
+        return client_class(api_key=api_key, timeout=timeout)
+    except Exception as exc:
+        raise GroqLLMImportError(
+            "Failed to initialize Groq client"
+        ) from exc
+
+
+def _build_request(
+    prompt: str,
+    model: str,
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+) -> dict:
+    """Build the keyword arguments for a chat completion request."""
+    kwargs: dict = {"model": model, "messages": [{"role": "user", "content": prompt}]}
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    if max_tokens is not None:
+        kwargs["max_tokens"] = max_tokens
+    return kwargs
+
+
+def _response_text(response: Any) -> str:
+    """Extract the generated text from a chat completion response."""
+    if not response.choices:
+        raise GroqLLMResponseError("No choices in response")
+
+    text = response.choices[0].message.content
+    if not text or not isinstance(text, str):
+        raise GroqLLMResponseError("No valid text content in response")
+    return text.strip()
+
+
+def _extract_usage(response: Any) -> Optional[Dict[str, int]]:
+    """Read token usage from a chat completion response, if reported."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+    }
+
+
 def groq_llm(
     prompt: str,
     model: str,
@@ -114,6 +214,7 @@ def groq_llm(
     backoff_factor: float = 0.5,
     temperature: Optional[float] = None,
     max_tokens: Optional[int] = None,
+    usage_callback: Optional[Callable[[Dict[str, int]], None]] = None,
 ) -> str:
     """Call a Groq model and return the generated text.
 
@@ -126,6 +227,8 @@ def groq_llm(
         backoff_factor: Base factor for exponential backoff between retries.
         temperature: Sampling temperature (0.0 to 2.0, optional).
         max_tokens: Maximum tokens in response (optional).
+        usage_callback: Optional function called with the reported token usage
+            (``prompt_tokens`` / ``completion_tokens``) after a successful call.
 
     Returns:
         The generated text from the model.
@@ -134,69 +237,40 @@ def groq_llm(
         ValueError: If required arguments are missing or invalid.
         GroqLLMImportError: If the Groq client is not installed.
         GroqLLMAPIError: If all retry attempts fail.
+        GroqLLMContextLengthError: If the prompt does not fit the model's context window.
         GroqLLMResponseError: If a response is returned but contains no text.
     """
 
-    # Basic validation
-    if not isinstance(prompt, str) or not prompt.strip():
-        raise ValueError("prompt must be a non-empty string")
-    if not isinstance(model, str) or not model.strip():
-        raise ValueError("model must be a non-empty string")
-    if not isinstance(max_retries, int) or max_retries < 1:
-        raise ValueError("max_retries must be an integer >= 1")
-    if temperature is not None and not (0.0 <= temperature <= 2.0):
-        raise ValueError("temperature must be between 0.0 and 2.0")
-    if max_tokens is not None and max_tokens <= 0:
-        raise ValueError("max_tokens must be positive")
-
-    api_key = api_key or os.environ.get("GROQ_API_KEY")
-    if not api_key:
-        raise GroqLLMImportError(
-            "No API key provided and environment variable GROQ_API_KEY is not set"
-        )
-
-    # Check if Groq client is available
-    if not _GROQ_AVAILABLE or Groq is None:
-        raise GroqLLMImportError(
-            "Groq package not installed. Install with: pip install groq"
-        )
-
-    # Initialize client
-    try:
-        client = Groq(api_key=api_key, timeout=timeout)
-    except Exception as exc:
-        raise GroqLLMImportError(
-            "Failed to initialize Groq client"
-        ) from exc
+    client = _create_client(
+        prompt, model, api_key, max_retries, timeout, temperature, max_tokens
+    )
 
     last_exc: Optional[BaseException] = None
 
     for attempt in range(1, max_retries + 1):
         try:
-            # Prepare kwargs
-            kwargs: dict = {"model": model, "messages": [{"role": "user", "content": prompt}]}
-            if temperature is not None:
-                kwargs["temperature"] = temperature
-            if max_tokens is not None:
-                kwargs["max_tokens"] = max_tokens
-
             # Make API request
+            kwargs = _build_request(prompt, model, temperature, max_tokens)
             response = client.chat.completions.create(**kwargs)
 
             # Extract text
-            if not response.choices:
-                raise GroqLLMResponseError("No choices in response")
-            
-            text = response.choices[0].message.content
-            if not text or not isinstance(text, str):
-                raise GroqLLMResponseError("No valid text content in response")
+            text = _response_text(response)
+
+            if usage_callback is not None:
+                usage = _extract_usage(response)
+                if usage is not None:
+                    usage_callback(usage)
 
-            return text.strip()
+            return text
 
         except GroqLLMError:
             raise
         except Exception as exc:
             last_exc = exc
+            if is_context_overflow(exc):
+                raise GroqLLMContextLengthError(
+                    f"Prompt exceeds the model's context window: {exc}"
+                ) from exc
             if attempt == max_retries:
                 raise GroqLLMAPIError(
                     f"Groq LLM request failed after {max_retries} attempts: {exc}"
@@ -204,11 +278,146 @@ def groq_llm(
 
             # Backoff before next retry
             sleep_for = backoff_factor * (2 ** (attempt - 1))
+            add_event("retry", attempt=attempt, error=str(exc), backoff=sleep_for)
             time.sleep(sleep_for)
 
     raise GroqLLMAPIError("Groq LLM request failed") from last_exc
 
 
+async def groq_llm_async(
+    prompt: str,
+    model: str,
+    api_key: Optional[str] = None,
+    *,
+    max_retries: int = 3,
+    timeout: Optional[float] = 30.0,
+    backoff_factor: float = 0.5,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    usage_callback: Optional[Callable[[Dict[str, int]], None]] = None,
+    client: Any = None,
+) -> str:
+    """Call a Groq model with the async client and return the generated text.
+
+    Takes the same arguments and raises the same exceptions as ``groq_llm``;
+    waiting for the response (and backing off between retries) does not
+    block the event loop. Pass ``client`` (an ``AsyncGroq``) to reuse its
+    connection pool across calls; it stays open afterwards.
+    """
+
+    client = _create_client(
+        prompt, model, api_key, max_retries, timeout, temperature, max_tokens,
+        asynchronous=True, client=client,
+    )
+
+    last_exc: Optional[BaseException] = None
+
+    for attempt in range(1, max_retries + 1):
+        try:
+            kwargs = _build_request(prompt, model, temperature, max_tokens)
+            response = await client.chat.completions.create(**kwargs)
+            text = _response_text(response)
+
+            if usage_callback is not None:
+                usage = _extract_usage(response)
+                if usage is not None:
+                    usage_callback(usage)
+
+            return text
+
+        except GroqLLMError:
+            raise
+        except Exception as exc:
+            last_exc = exc
+            if is_context_overflow(exc):
+                raise GroqLLMContextLengthError(
+                    f"Prompt exceeds the model's context window: {exc}"
+                ) from exc
+            if attempt == max_retries:
+                raise GroqLLMAPIError(
+                    f"Groq LLM request failed after {max_retries} attempts: {exc}"
+                ) from exc
+
+            # Backoff before next retry
+            sleep_for = backoff_factor * (2 ** (attempt - 1))
+            add_event("retry", attempt=attempt, error=str(exc), backoff=sleep_for)
+            await asyncio.sleep(sleep_for)
+
+    raise GroqLLMAPIError("Groq LLM request failed") from last_exc
+
+
+def groq_llm_stream(
+    prompt: str,
+    model: str,
+    api_key: Optional[str] = None,
+    *,
+    max_retries: int = 3,
+    timeout: Optional[float] = 30.0,
+    backoff_factor: float = 0.5,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+) -> Iterator[str]:
+    """Call a Groq model and yield the generated text as it streams in.
+
+    Takes the same arguments as ``groq_llm``. Failures are only retried
+    before the first chunk arrives; once text has been yielded it cannot be
+    taken back, so a later failure is raised immediately.
+
+    Yields:
+        Chunks of generated text, in order.
+
+    Raises:
+        ValueError: If required arguments are missing or invalid.
+        GroqLLMImportError: If the Groq client is not installed.
+        GroqLLMAPIError: If the stream cannot be completed.
+        GroqLLMResponseError: If the stream ends without any text.
+    """
+
+    client = _create_client(
+        prompt, model, api_key, max_retries, timeout, temperature, max_tokens
+    )
+
+    last_exc: Optional[BaseException] = None
+
+    for attempt in range(1, max_retries + 1):
+        received = False
+        try:
+            kwargs = _build_request(prompt, model, temperature, max_tokens)
+            stream = client.chat.completions.create(stream=True, **kwargs)
+
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                text = getattr(chunk.choices[0].delta, "content", None)
+                if text:
+                    received = True
+                    yield text
+
+            if not received:
+                raise GroqLLMResponseError("No valid text content in response")
+            return
+
+        except GroqLLMError:
+            raise
+        except Exception as exc:
+            last_exc = exc
+            if is_context_overflow(exc):
+                raise GroqLLMContextLengthError(
+                    f"Prompt exceeds the model's context window: {exc}"
+                ) from exc
+            if received or attempt == max_retries:
+                raise GroqLLMAPIError(
+                    f"Groq LLM stream failed after {attempt} attempts: {exc}"
+                ) from exc
+
+            # Backoff before next retry
+            sleep_for = backoff_factor * (2 ** (attempt - 1))
+            add_event("retry", attempt=attempt, error=str(exc), backoff=sleep_for)
+            time.sleep(sleep_for)
+
+    raise GroqLLMAPIError("Groq LLM stream failed") from last_exc
+
+
 class GroqLLM:
     """
     Class-based wrapper for Groq LLM with generate_response method.
@@ -253,6 +462,11 @@ class GroqLLM:
         self.backoff_factor = backoff_factor
         self.temperature = temperature
         self.max_tokens = max_tokens
+        # Token usage reported by the most recent generate_response() call
+        self.last_usage: Optional[Dict[str, int]] = None
+        # AsyncGroq client reused by agenerate_response(), and the event loop it was opened on
+        self._async_client: Any = None
+        self._async_client_loop: Optional[asyncio.AbstractEventLoop] = None
     
     def generate_response(self, prompt: str) -> str:
         """
@@ -279,14 +493,90 @@ class GroqLLM:
             backoff_factor=self.backoff_factor,
             temperature=self.temperature,
             max_tokens=self.max_tokens,
+            usage_callback=usage_recorder(self, prompt, self.model),
+        )
+
+    async def agenerate_response(self, prompt: str) -> str:
+        """
+        Generate a response from the Groq model without blocking the event loop.
+        
+        Args:
+            prompt: The input prompt text
+            
+        Returns:
+            Generated response text
+            
+        Raises:
+            Same exceptions as generate_response()
+        """
+        return await groq_llm_async(
+            prompt=prompt,
+            model=self.model,
+            api_key=self.api_key,
+            max_retries=self.max_retries,
+            timeout=self.timeout,
+            backoff_factor=self.backoff_factor,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            usage_callback=usage_recorder(self, prompt, self.model),
+            client=self._get_async_client(),
+        )
+
+    def _get_async_client(self) -> Any:
+        """Return the async client for the running event loop, opening it on first use."""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            # Connections belong to the loop that opened them, so a new loop
+            # (e.g. another asyncio.run()) gets a new client
+            self._async_client = _new_client(self.api_key, self.timeout, asynchronous=True)
+            self._async_client_loop = loop
+        return self._async_client
+
+    async def aclose(self) -> None:
+        """
+        Close the async client used by agenerate_response().
+        
+        Await it on the event loop that made the requests, e.g. at the end of
+        the coroutine passed to asyncio.run(). A later agenerate_response()
+        call opens a new client.
+        """
+        client, self._async_client, self._async_client_loop = self._async_client, None, None
+        if client is not None:
+            await client.close()
+
+    def generate_response_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Stream a response from the Groq model chunk by chunk.
+        
+        Args:
+            prompt: The input prompt text
+            
+        Yields:
+            Chunks of generated text
+            
+        Raises:
+            Same exceptions as generate_response()
+        """
+        return groq_llm_stream(
+            prompt=prompt,
+            model=self.model,
+            api_key=self.api_key,
+            max_retries=self.max_retries,
+            timeout=self.timeout,
+            backoff_factor=self.backoff_factor,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
         )
 
 
 __all__ = [
     "groq_llm",
+    "groq_llm_stream",
+    "groq_llm_async",
     "GroqLLM",
     "GroqLLMError",
     "GroqLLMAPIError",
     "GroqLLMImportError",
     "GroqLLMResponseError",
+    "GroqLLMContextLengthError",
 ]
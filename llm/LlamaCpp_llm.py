@@ -0,0 +1,471 @@
+"""Small, robust wrapper around in-process llama.cpp inference.
+
+This module provides a single function, ``llamacpp_llm``, which runs a
+GGUF model inside the current process through the ``llama-cpp-python``
+binding, with input validation and clear exceptions suitable for
+production integration. There is no server, no HTTP hop and no JSON
+serialization between the agent and the model.
+
+Notes:
+- No logging is performed by this module (per project requirement).
+- Each model file is loaded once per process and shared by every caller
+  using the same load settings.
+- Calls to the same model are serialized (a llama.cpp context is not
+  thread-safe); use several processes to serve requests in parallel.
+- The evaluated prompt prefix is reused between calls, so agent iterations
+  that resend the same system prompt only evaluate the new tokens. A RAM
+  prompt cache keeps prefixes of earlier, different prompts as well.
+
+Example usage:
+    >>> from Codemni.llm import llamacpp_llm, LlamaCppLLMError
+    >>>
+    >>> try:
+    ...     response = llamacpp_llm(
+    ...         prompt="Explain Python in one sentence",
+    ...         model_path="/models/llama-3-8b-instruct.Q4_K_M.gguf",
+    ...         n_threads=8,
+    ...     )
+    ...     print(response)
+    ... except LlamaCppLLMError as e:
+    ...     print(f"Error: {e}")
+"""
+
+from typing import Optional, Any, Callable, Dict, Iterator, Tuple
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+from core.context_overflow import ContextOverflowError, is_context_overflow
+from core.tokenizer import get_tokenizer, usage_recorder
+
+
+@contextmanager
+def suppress_stderr():
+    """Temporarily suppress stderr output using low-level file descriptor redirection."""
+    import io
+
+    # Save original stderr
+    original_stderr = sys.stderr
+    original_stderr_fd = None
+
+    try:
+        # Save the original file descriptor
+        try:
+            original_stderr_fd = os.dup(2)
+        except:
+            pass
+
+        # Redirect stderr to devnull
+        try:
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, 2)
+            os.close(devnull)
+        except:
+            pass
+
+        # Also redirect Python's sys.stderr
+        sys.stderr = io.StringIO()
+
+        yield
+
+    finally:
+        # Restore stderr
+        try:
+            if original_stderr_fd is not None:
+                os.dup2(original_stderr_fd, 2)
+                os.close(original_stderr_fd)
+        except:
+            pass
+
+        sys.stderr = original_stderr
+
+# Import the llama.cpp binding at module level to reduce import overhead
+try:
+    with suppress_stderr():
+        from llama_cpp import Llama, LlamaRAMCache
+    _LLAMA_CPP_AVAILABLE = True
+except ImportError:
+    _LLAMA_CPP_AVAILABLE = False
+    Llama = None  # type: ignore
+    LlamaRAMCache = None  # type: ignore
+
+
+class LlamaCppLLMError(Exception):
+    """Base exception for errors raised by this module."""
+
+
+class LlamaCppLLMImportError(LlamaCppLLMError):
+    """Raised when the llama-cpp-python binding cannot be imported or the model cannot be loaded."""
+
+
+class LlamaCppLLMAPIError(LlamaCppLLMError):
+    """Raised when inference fails."""
+
+
+class LlamaCppLLMResponseError(LlamaCppLLMError):
+    """Raised when the model output cannot be interpreted."""
+
+
+class LlamaCppLLMContextLengthError(LlamaCppLLMAPIError, ContextOverflowError):
+    """Raised when the prompt does not fit the model's context window (never retried)."""
+
+
+# Loaded models, keyed on everything that affects how the file is loaded.
+# Each entry carries its own lock because a llama.cpp context is not
+# thread-safe.
+_MODELS: Dict[Tuple, Tuple[Any, threading.Lock]] = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def _load_model(
+    model_path: str,
+    n_ctx: int,
+    n_threads: Optional[int],
+    n_gpu_layers: int,
+    prompt_cache_bytes: int,
+) -> Tuple[Any, threading.Lock]:
+    """Load a GGUF model once per process and return ``(model, lock)``."""
+    if not _LLAMA_CPP_AVAILABLE or Llama is None:
+        raise LlamaCppLLMImportError(
+            "llama-cpp-python package not installed. Install with: pip install llama-cpp-python"
+        )
+
+    key = (os.path.abspath(model_path), n_ctx, n_threads, n_gpu_layers, prompt_cache_bytes)
+    entry = _MODELS.get(key)
+    if entry is not None:
+        return entry
+
+    with _MODELS_LOCK:
+        entry = _MODELS.get(key)
+        if entry is not None:
+            return entry
+
+        if not os.path.isfile(model_path):
+            raise LlamaCppLLMImportError(f"Model file not found: {model_path}")
+
+        try:
+            with suppress_stderr():
+                model = Llama(
+                    model_path=model_path,
+                    n_ctx=n_ctx,
+                    n_threads=n_threads,
+                    n_gpu_layers=n_gpu_layers,
+                    verbose=False,
+                )
+                if prompt_cache_bytes > 0 and LlamaRAMCache is not None:
+                    model.set_cache(LlamaRAMCache(capacity_bytes=prompt_cache_bytes))
+        except Exception as exc:
+            raise LlamaCppLLMImportError(
+                f"Failed to load llama.cpp model from {model_path}: {exc}"
+            ) from exc
+
+        entry = (model, threading.Lock())
+        _MODELS[key] = entry
+
+    # The model's own tokenizer gives exact counts to memories and agents
+    name = os.path.basename(model_path)
+    get_tokenizer().register(
+        name, lambda text: len(model.tokenize(text.encode("utf-8"), add_bos=False))
+    )
+    return entry
+
+
+def _build_request(
+    prompt: str,
+    model_path: str,
+    temperature: Optional[float],
+    top_p: Optional[float],
+    max_tokens: int,
+    n_ctx: int,
+    n_threads: Optional[int],
+) -> Dict[str, Any]:
+    """Validate arguments and build the sampling keyword arguments."""
+    # Basic validation
+    if not isinstance(prompt, str) or not prompt.strip():
+        raise ValueError("prompt must be a non-empty string")
+    if not isinstance(model_path, str) or not model_path.strip():
+        raise ValueError("model_path must be a non-empty string")
+    if temperature is not None and not (0.0 <= temperature <= 2.0):
+        raise ValueError("temperature must be between 0.0 and 2.0")
+    if top_p is not None and not (0.0 <= top_p <= 1.0):
+        raise ValueError("top_p must be between 0.0 and 1.0")
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be positive")
+    if n_ctx <= 0:
+        raise ValueError("n_ctx must be positive")
+    if n_threads is not None and n_threads < 1:
+        raise ValueError("n_threads must be >= 1")
+
+    kwargs: Dict[str, Any] = {"max_tokens": max_tokens}
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    if top_p is not None:
+        kwargs["top_p"] = top_p
+    return kwargs
+
+
+def _extract_usage(response: Dict[str, Any]) -> Optional[Dict[str, int]]:
+    """Read token usage from a completion response, if reported."""
+    usage = response.get("usage")
+    if not usage:
+        return None
+    return {
+        "prompt_tokens": usage.get("prompt_tokens", 0) or 0,
+        "completion_tokens": usage.get("completion_tokens", 0) or 0,
+    }
+
+
+def llamacpp_llm(
+    prompt: str,
+    model_path: str,
+    *,
+    n_ctx: int = 4096,
+    n_threads: Optional[int] = None,
+    n_gpu_layers: int = 0,
+    temperature: Optional[float] = None,
+    top_p: Optional[float] = None,
+    max_tokens: int = 1024,
+    chat: bool = True,
+    prompt_cache_bytes: int = 256 * 1024 * 1024,
+    usage_callback: Optional[Callable[[Dict[str, int]], None]] = None,
+) -> str:
+    """Run a GGUF model in-process and return the generated text.
+
+    Args:
+        prompt: The prompt / input text to send to the model. Must be non-empty.
+        model_path: Path to the GGUF model file.
+        n_ctx: Context window size in tokens.
+        n_threads: CPU threads used for inference (default: llama.cpp picks).
+        n_gpu_layers: Layers to offload to a GPU, if the binding was built with one.
+        temperature: Sampling temperature (0.0 to 2.0, optional).
+        top_p: Nucleus sampling threshold (0.0 to 1.0, optional).
+        max_tokens: Maximum tokens to generate.
+        chat: Apply the model's chat template (True) or complete the raw prompt.
+        prompt_cache_bytes: Size of the RAM cache for evaluated prompt prefixes
+            (0 disables it; the prefix of the previous call is always reused).
+        usage_callback: Optional function called with the token usage
+            (``prompt_tokens`` / ``completion_tokens``) after a successful call.
+
+    Returns:
+        The generated text from the model.
+
+    Raises:
+        ValueError: If required arguments are missing or invalid.
+        LlamaCppLLMImportError: If the binding is not installed or the model cannot be loaded.
+        LlamaCppLLMAPIError: If inference fails.
+        LlamaCppLLMContextLengthError: If the prompt does not fit in ``n_ctx``.
+        LlamaCppLLMResponseError: If the model produced no text.
+    """
+
+    kwargs = _build_request(prompt, model_path, temperature, top_p, max_tokens, n_ctx, n_threads)
+    model, lock = _load_model(model_path, n_ctx, n_threads, n_gpu_layers, prompt_cache_bytes)
+
+    try:
+        with lock:
+            if chat:
+                response = model.create_chat_completion(
+                    messages=[{"role": "user", "content": prompt}], **kwargs
+                )
+                text = response["choices"][0]["message"].get("content")
+            else:
+                response = model.create_completion(prompt, **kwargs)
+                text = response["choices"][0].get("text")
+    except LlamaCppLLMError:
+        raise
+    except Exception as exc:
+        if is_context_overflow(exc):
+            raise LlamaCppLLMContextLengthError(
+                f"Prompt exceeds the model's context window: {exc}"
+            ) from exc
+        raise LlamaCppLLMAPIError(f"llama.cpp inference failed: {exc}") from exc
+
+    if not text or not isinstance(text, str):
+        raise LlamaCppLLMResponseError("No valid text content in response")
+
+    if usage_callback is not None:
+        usage = _extract_usage(response)
+        if usage is not None:
+            usage_callback(usage)
+
+    return text.strip()
+
+
+def llamacpp_llm_stream(
+    prompt: str,
+    model_path: str,
+    *,
+    n_ctx: int = 4096,
+    n_threads: Optional[int] = None,
+    n_gpu_layers: int = 0,
+    temperature: Optional[float] = None,
+    top_p: Optional[float] = None,
+    max_tokens: int = 1024,
+    chat: bool = True,
+    prompt_cache_bytes: int = 256 * 1024 * 1024,
+) -> Iterator[str]:
+    """Run a GGUF model in-process and yield the generated text as it is produced.
+
+    Takes the same arguments as ``llamacpp_llm``. The model stays locked for
+    this caller until the stream is exhausted or closed.
+
+    Yields:
+        Chunks of generated text, in order.
+
+    Raises:
+        ValueError: If required arguments are missing or invalid.
+        LlamaCppLLMImportError: If the binding is not installed or the model cannot be loaded.
+        LlamaCppLLMAPIError: If inference fails.
+        LlamaCppLLMContextLengthError: If the prompt does not fit in ``n_ctx``.
+        LlamaCppLLMResponseError: If the model produced no text.
+    """
+
+    kwargs = _build_request(prompt, model_path, temperature, top_p, max_tokens, n_ctx, n_threads)
+    model, lock = _load_model(model_path, n_ctx, n_threads, n_gpu_layers, prompt_cache_bytes)
+
+    received = False
+    with lock:
+        try:
+            if chat:
+                stream = model.create_chat_completion(
+                    messages=[{"role": "user", "content": prompt}], stream=True, **kwargs
+                )
+            else:
+                stream = model.create_completion(prompt, stream=True, **kwargs)
+
+            for chunk in stream:
+                choice = chunk["choices"][0]
+                text = choice.get("delta", {}).get("content") if chat else choice.get("text")
+                if text:
+                    received = True
+                    yield text
+        except LlamaCppLLMError:
+            raise
+        except Exception as exc:
+            if is_context_overflow(exc):
+                raise LlamaCppLLMContextLengthError(
+                    f"Prompt exceeds the model's context window: {exc}"
+                ) from exc
+            raise LlamaCppLLMAPIError(f"llama.cpp inference failed: {exc}") from exc
+
+    if not received:
+        raise LlamaCppLLMResponseError("No valid text content in response")
+
+
+class LlamaCppLLM:
+    """
+    Class-based wrapper for in-process llama.cpp models with generate_response method.
+
+    The model is loaded when the object is created (once per process for a
+    given file and load settings), so the first agent call does not pay the
+    load time.
+
+    Example:
+        >>> llm = LlamaCppLLM(model_path="/models/qwen2.5-7b-instruct.Q4_K_M.gguf", n_threads=8)
+        >>> response = llm.generate_response("What is Python?")
+        >>> print(response)
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        *,
+        n_ctx: int = 4096,
+        n_threads: Optional[int] = None,
+        n_gpu_layers: int = 0,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        max_tokens: int = 1024,
+        chat: bool = True,
+        prompt_cache_bytes: int = 256 * 1024 * 1024,
+    ):
+        """
+        Initialize llama.cpp LLM wrapper and load the model.
+
+        Args:
+            model_path: Path to the GGUF model file
+            n_ctx: Context window size in tokens
+            n_threads: CPU threads used for inference
+            n_gpu_layers: Layers to offload to a GPU
+            temperature: Sampling temperature (0.0 to 2.0)
+            top_p: Nucleus sampling threshold (0.0 to 1.0)
+            max_tokens: Maximum tokens to generate
+            chat: Apply the model's chat template
+            prompt_cache_bytes: RAM cache size for evaluated prompt prefixes (0 disables)
+        """
+        self.model_path = model_path
+        self.model = os.path.basename(model_path)
+        self.n_ctx = n_ctx
+        self.n_threads = n_threads
+        self.n_gpu_layers = n_gpu_layers
+        self.temperature = temperature
+        self.top_p = top_p
+        self.max_tokens = max_tokens
+        self.chat = chat
+        self.prompt_cache_bytes = prompt_cache_bytes
+        # Token usage reported by the most recent generate_response() call
+        self.last_usage: Optional[Dict[str, int]] = None
+
+        _load_model(model_path, n_ctx, n_threads, n_gpu_layers, prompt_cache_bytes)
+
+    def _options(self) -> Dict[str, Any]:
+        return {
+            "n_ctx": self.n_ctx,
+            "n_threads": self.n_threads,
+            "n_gpu_layers": self.n_gpu_layers,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "max_tokens": self.max_tokens,
+            "chat": self.chat,
+            "prompt_cache_bytes": self.prompt_cache_bytes,
+        }
+
+    def generate_response(self, prompt: str) -> str:
+        """
+        Generate a response from the local model.
+
+        Args:
+            prompt: The input prompt text
+
+        Returns:
+            Generated response text
+
+        Raises:
+            ValueError: If prompt is invalid
+            LlamaCppLLMImportError: If the binding is not available
+            LlamaCppLLMAPIError: If inference fails
+            LlamaCppLLMResponseError: If response is invalid
+        """
+        return llamacpp_llm(
+            prompt,
+            self.model_path,
+            usage_callback=usage_recorder(self, prompt, self.model),
+            **self._options(),
+        )
+
+    def generate_response_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Stream a response from the local model chunk by chunk.
+
+        Args:
+            prompt: The input prompt text
+
+        Yields:
+            Chunks of generated text
+
+        Raises:
+            Same exceptions as generate_response()
+        """
+        return llamacpp_llm_stream(prompt, self.model_path, **self._options())
+
+
+__all__ = [
+    "llamacpp_llm",
+    "llamacpp_llm_stream",
+    "LlamaCppLLM",
+    "LlamaCppLLMError",
+    "LlamaCppLLMAPIError",
+    "LlamaCppLLMImportError",
+    "LlamaCppLLMResponseError",
+    "LlamaCppLLMContextLengthError",
+]
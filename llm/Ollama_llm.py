@@ -23,13 +23,18 @@ Example usage:
     ...     print(f"Error: {e}")
 """
 
-from typing import Optional, Any
+from typing import Optional, Any, Callable, Dict, Iterator, List, Sequence
 import os
 import time
 import warnings
 import sys
 from contextlib import contextmanager
 
+from core.context_overflow import ContextOverflowError, is_context_overflow
+from core.tokenizer import usage_recorder
+from core.tracing import add_event
+from .embeddings import embed_in_batches, require_numpy, validate_texts
+
 # Suppress gRPC and other warnings
 os.environ['GRPC_VERBOSITY'] = 'ERROR'
 os.environ['GLOG_minloglevel'] = '2'
@@ -105,6 +110,82 @@ class OllamaLLMResponseError(OllamaLLMError):
     """Raised when the response from the API cannot be interpreted."""
 
 
+class OllamaLLMContextLengthError(OllamaLLMAPIError, ContextOverflowError):
+    """Raised when the prompt does not fit the model's context window (never retried)."""
+
+
+def _create_client(
+    prompt: str,
+    model: str,
+    base_url: Optional[str],
+    max_retries: int,
+    temperature: Optional[float],
+) -> Any:
+    """Validate request arguments and return an initialized Ollama client."""
+    # Basic validation
+    if not isinstance(prompt, str) or not prompt.strip():
+        raise ValueError("prompt must be a non-empty string")
+    if not isinstance(model, str) or not model.strip():
+        raise ValueError("model must be a non-empty string")
+    if not isinstance(max_retries, int) or max_retries < 1:
+        raise ValueError("max_retries must be an integer >= 1")
+    if temperature is not None and not (0.0 <= temperature <= 2.0):
+        raise ValueError("temperature must be between 0.0 and 2.0")
+
+    return _new_client(base_url)
+
+
+def _new_client(base_url: Optional[str]) -> Any:
+    """Resolve the server URL and return an initialized Ollama client."""
+    base_url = base_url or os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
+
+    # Check if Ollama client is available
+    if not _OLLAMA_AVAILABLE or Client is None:
+        raise OllamaLLMImportError(
+            "Ollama package not installed. Install with: pip install ollama"
+        )
+
+    # Initialize client
+    try:
+        return Client(host=base_url)
+    except Exception as exc:
+        raise OllamaLLMImportError(
+            f"Failed to initialize Ollama client with base_url={base_url}"
+        ) from exc
+
+
+def _message_text(message: Any) -> Optional[str]:
+    """Extract message content from a chat response or stream chunk.
+
+    Older clients return plain dicts, newer ones return response objects
+    that support item access but are not dict instances.
+    """
+    if isinstance(message, dict):
+        text = message.get("message", {}).get("content")
+        if not text:
+            # Try alternative format
+            text = message.get("response")
+        return text
+    inner = getattr(message, "message", None)
+    return getattr(inner, "content", None) if inner is not None else None
+
+
+def _extract_usage(response: Any) -> Optional[Dict[str, int]]:
+    """Read token usage (prompt_eval_count / eval_count) from a chat response."""
+    if isinstance(response, dict):
+        prompt_tokens = response.get("prompt_eval_count")
+        completion_tokens = response.get("eval_count")
+    else:
+        prompt_tokens = getattr(response, "prompt_eval_count", None)
+        completion_tokens = getattr(response, "eval_count", None)
+    if prompt_tokens is None and completion_tokens is None:
+        return None
+    return {
+        "prompt_tokens": prompt_tokens or 0,
+        "completion_tokens": completion_tokens or 0,
+    }
+
+
 def ollama_llm(
     prompt: str,
     model: str,
@@ -114,6 +195,7 @@ def ollama_llm(
     timeout: Optional[float] = 60.0,
     backoff_factor: float = 0.5,
     temperature: Optional[float] = None,
+    usage_callback: Optional[Callable[[Dict[str, int]], None]] = None,
 ) -> str:
     """Call an Ollama local model and return the generated text.
 
@@ -126,6 +208,8 @@ def ollama_llm(
         timeout: Optional timeout (seconds) to pass to the underlying client.
         backoff_factor: Base factor for exponential backoff between retries.
         temperature: Sampling temperature (0.0 to 2.0, optional).
+        usage_callback: Optional function called with the reported token usage
+            (``prompt_tokens`` / ``completion_tokens``) after a successful call.
 
     Returns:
         The generated text from the model.
@@ -134,34 +218,11 @@ def ollama_llm(
         ValueError: If required arguments are missing or invalid.
         OllamaLLMImportError: If the Ollama client is not installed.
         OllamaLLMAPIError: If all retry attempts fail.
+        OllamaLLMContextLengthError: If the prompt does not fit the model's context window.
         OllamaLLMResponseError: If a response is returned but contains no text.
     """
 
-    # Basic validation
-    if not isinstance(prompt, str) or not prompt.strip():
-        raise ValueError("prompt must be a non-empty string")
-    if not isinstance(model, str) or not model.strip():
-        raise ValueError("model must be a non-empty string")
-    if not isinstance(max_retries, int) or max_retries < 1:
-        raise ValueError("max_retries must be an integer >= 1")
-    if temperature is not None and not (0.0 <= temperature <= 2.0):
-        raise ValueError("temperature must be between 0.0 and 2.0")
-
-    base_url = base_url or os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
-
-    # Check if Ollama client is available
-    if not _OLLAMA_AVAILABLE or Client is None:
-        raise OllamaLLMImportError(
-            "Ollama package not installed. Install with: pip install ollama"
-        )
-
-    # Initialize client
-    try:
-        client = Client(host=base_url)
-    except Exception as exc:
-        raise OllamaLLMImportError(
-            f"Failed to initialize Ollama client with base_url={base_url}"
-        ) from exc
+    client = _create_client(prompt, model, base_url, max_retries, temperature)
 
     last_exc: Optional[BaseException] = None
 
@@ -184,23 +245,26 @@ def ollama_llm(
                 raise OllamaLLMResponseError("Empty response from Ollama")
             
             # Handle different response formats
-            if isinstance(response, dict):
-                text = response.get("message", {}).get("content")
-                if not text:
-                    # Try alternative format
-                    text = response.get("response")
-            else:
-                text = None
+            text = _message_text(response)
 
             if not text or not isinstance(text, str):
                 raise OllamaLLMResponseError("No valid text content in response")
 
+            if usage_callback is not None:
+                usage = _extract_usage(response)
+                if usage is not None:
+                    usage_callback(usage)
+
             return text.strip()
 
         except OllamaLLMError:
             raise
         except Exception as exc:
             last_exc = exc
+            if is_context_overflow(exc):
+                raise OllamaLLMContextLengthError(
+                    f"Prompt exceeds the model's context window: {exc}"
+                ) from exc
             if attempt == max_retries:
                 raise OllamaLLMAPIError(
                     f"Ollama LLM request failed after {max_retries} attempts: {exc}"
@@ -208,11 +272,158 @@ def ollama_llm(
 
             # Backoff before next retry
             sleep_for = backoff_factor * (2 ** (attempt - 1))
+            add_event("retry", attempt=attempt, error=str(exc), backoff=sleep_for)
             time.sleep(sleep_for)
 
     raise OllamaLLMAPIError("Ollama LLM request failed") from last_exc
 
 
+def ollama_llm_stream(
+    prompt: str,
+    model: str,
+    base_url: Optional[str] = None,
+    *,
+    max_retries: int = 3,
+    timeout: Optional[float] = 60.0,
+    backoff_factor: float = 0.5,
+    temperature: Optional[float] = None,
+) -> Iterator[str]:
+    """Call an Ollama local model and yield the generated text as it streams in.
+
+    Takes the same arguments as ``ollama_llm``. Failures are only retried
+    before the first chunk arrives; once text has been yielded it cannot be
+    taken back, so a later failure is raised immediately.
+
+    Yields:
+        Chunks of generated text, in order.
+
+    Raises:
+        ValueError: If required arguments are missing or invalid.
+        OllamaLLMImportError: If the Ollama client is not installed.
+        OllamaLLMAPIError: If the stream cannot be completed.
+        OllamaLLMResponseError: If the stream ends without any text.
+    """
+
+    client = _create_client(prompt, model, base_url, max_retries, temperature)
+
+    last_exc: Optional[BaseException] = None
+
+    for attempt in range(1, max_retries + 1):
+        received = False
+        try:
+            options = {}
+            if temperature is not None:
+                options["temperature"] = temperature
+
+            stream = client.chat(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                options=options if options else None,
+                stream=True,
+            )
+
+            for chunk in stream:
+                text = _message_text(chunk)
+                if text:
+                    received = True
+                    yield text
+
+            if not received:
+                raise OllamaLLMResponseError("No valid text content in response")
+            return
+
+        except OllamaLLMError:
+            raise
+        except Exception as exc:
+            last_exc = exc
+            if is_context_overflow(exc):
+                raise OllamaLLMContextLengthError(
+                    f"Prompt exceeds the model's context window: {exc}"
+                ) from exc
+            if received or attempt == max_retries:
+                raise OllamaLLMAPIError(
+                    f"Ollama LLM stream failed after {attempt} attempts: {exc}"
+                ) from exc
+
+            # Backoff before next retry
+            sleep_for = backoff_factor * (2 ** (attempt - 1))
+            add_event("retry", attempt=attempt, error=str(exc), backoff=sleep_for)
+            time.sleep(sleep_for)
+
+    raise OllamaLLMAPIError("Ollama LLM stream failed") from last_exc
+
+
+def ollama_embed(
+    texts: Sequence[str],
+    model: str = "nomic-embed-text",
+    base_url: Optional[str] = None,
+    *,
+    batch_size: int = 256,
+    max_concurrency: int = 2,
+    max_retries: int = 3,
+    backoff_factor: float = 0.5,
+) -> Any:
+    """Embed texts with a local Ollama embedding model.
+
+    Uses the batched ``/api/embed`` endpoint, sending up to ``batch_size``
+    texts per request. Older servers without it fall back to one request
+    per text.
+
+    Args:
+        texts: Texts to embed.
+        model: Embedding model identifier (e.g. "nomic-embed-text", "mxbai-embed-large").
+        base_url: Ollama server URL. If omitted, will try OLLAMA_BASE_URL env var
+                  or default to http://localhost:11434.
+        batch_size: Maximum texts per request.
+        max_concurrency: Number of requests to run in parallel.
+        max_retries: Number of attempts per request on transient failures.
+        backoff_factor: Base factor for exponential backoff between retries.
+
+    Returns:
+        Contiguous numpy.float32 array of shape (len(texts), dimensions).
+
+    Raises:
+        ValueError: If required arguments are missing or invalid.
+        OllamaLLMImportError: If the Ollama client or NumPy is not installed.
+        OllamaLLMAPIError: If a request fails after all retries.
+    """
+    require_numpy(OllamaLLMImportError)
+    texts = validate_texts(texts)
+    if not isinstance(model, str) or not model.strip():
+        raise ValueError("model must be a non-empty string")
+    if not isinstance(max_retries, int) or max_retries < 1:
+        raise ValueError("max_retries must be an integer >= 1")
+
+    client = _new_client(base_url)
+    batched = callable(getattr(client, "embed", None))
+
+    def request(batch: List[str]) -> List[Any]:
+        if batched:
+            response = client.embed(model=model, input=batch)
+            if isinstance(response, dict):
+                return response["embeddings"]
+            return response.embeddings
+        vectors = []
+        for text in batch:
+            response = client.embeddings(model=model, prompt=text)
+            vectors.append(response["embedding"])
+        return vectors
+
+    def embed_batch(batch: List[str]) -> List[Any]:
+        for attempt in range(1, max_retries + 1):
+            try:
+                return request(batch)
+            except Exception as exc:
+                if attempt == max_retries:
+                    raise OllamaLLMAPIError(
+                        f"Ollama embedding request failed after {max_retries} attempts: {exc}"
+                    ) from exc
+                time.sleep(backoff_factor * (2 ** (attempt - 1)))
+        return []
+
+    return embed_in_batches(texts, batch_size, embed_batch, max_concurrency)
+
+
 class OllamaLLM:
     """
     Class-based wrapper for Ollama LLM with generate_response method.
@@ -254,6 +465,8 @@ class OllamaLLM:
         self.timeout = timeout
         self.backoff_factor = backoff_factor
         self.temperature = temperature
+        # Token usage reported by the most recent generate_response() call
+        self.last_usage: Optional[Dict[str, int]] = None
     
     def generate_response(self, prompt: str) -> str:
         """
@@ -279,14 +492,67 @@ class OllamaLLM:
             timeout=self.timeout,
             backoff_factor=self.backoff_factor,
             temperature=self.temperature,
+            usage_callback=usage_recorder(self, prompt, self.model),
+        )
+
+    def generate_response_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Stream a response from the Ollama model chunk by chunk.
+        
+        Args:
+            prompt: The input prompt text
+            
+        Yields:
+            Chunks of generated text
+            
+        Raises:
+            Same exceptions as generate_response()
+        """
+        return ollama_llm_stream(
+            prompt=prompt,
+            model=self.model,
+            base_url=self.base_url,
+            max_retries=self.max_retries,
+            timeout=self.timeout,
+            backoff_factor=self.backoff_factor,
+            temperature=self.temperature,
+        )
+
+    def embed(
+        self,
+        texts: Sequence[str],
+        model: str = "nomic-embed-text",
+        batch_size: int = 256,
+    ) -> Any:
+        """
+        Embed texts with a local Ollama embedding model.
+        
+        Args:
+            texts: Texts to embed
+            model: Embedding model identifier
+            batch_size: Maximum texts per request
+            
+        Returns:
+            Contiguous numpy.float32 array of shape (len(texts), dimensions)
+        """
+        return ollama_embed(
+            texts,
+            model=model,
+            base_url=self.base_url,
+            batch_size=batch_size,
+            max_retries=self.max_retries,
+            backoff_factor=self.backoff_factor,
         )
 
 
 __all__ = [
     "ollama_llm",
+    "ollama_llm_stream",
+    "ollama_embed",
     "OllamaLLM",
     "OllamaLLMError",
     "OllamaLLMAPIError",
     "OllamaLLMImportError",
     "OllamaLLMResponseError",
+    "OllamaLLMContextLengthError",
 ]
@@ -0,0 +1,509 @@
+"""Small, robust wrapper around OpenAI-compatible chat servers.
+
+This module provides a single function, ``openai_compatible_llm``, which
+calls any server implementing the OpenAI ``/v1/chat/completions`` API
+(vLLM, llama.cpp server, LM Studio, TGI, LiteLLM, ...) with input
+validation, retries, timeouts and clear exceptions suitable for production
+integration.
+
+Notes:
+- No logging is performed by this module (per project requirement).
+- Only ``requests`` (a core dependency) is needed; the OpenAI SDK is not required.
+- HTTP connections are pooled per base URL and shared by every caller in
+  the process, so concurrent agents keep a continuous-batching server busy
+  without paying a new TCP/TLS handshake per call.
+- Sampling parameters the OpenAI API does not define (``top_k``,
+  ``min_p``, ``repetition_penalty``, ...) are passed through ``extra_body``.
+
+Example usage:
+    >>> from Codemni.llm import openai_compatible_llm, OpenAICompatibleLLMError
+    >>>
+    >>> try:
+    ...     response = openai_compatible_llm(
+    ...         prompt="Explain Python in one sentence",
+    ...         model="Qwen/Qwen2.5-7B-Instruct",
+    ...         base_url="http://localhost:8000/v1",  # or set OPENAI_COMPATIBLE_BASE_URL
+    ...         extra_body={"top_k": 20},
+    ...     )
+    ...     print(response)
+    ... except OpenAICompatibleLLMError as e:
+    ...     print(f"Error: {e}")
+"""
+
+from typing import Optional, Any, Callable, Dict, Iterator, Tuple
+import json
+import os
+import threading
+import time
+
+# Import requests at module level to reduce import overhead
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    _REQUESTS_AVAILABLE = True
+except ImportError:
+    _REQUESTS_AVAILABLE = False
+    requests = None  # type: ignore
+    HTTPAdapter = None  # type: ignore
+
+from core.context_overflow import ContextOverflowError, is_context_overflow
+from core.tokenizer import usage_recorder
+from core.tracing import add_event
+
+
+class OpenAICompatibleLLMError(Exception):
+    """Base exception for errors raised by this module."""
+
+
+class OpenAICompatibleLLMImportError(OpenAICompatibleLLMError):
+    """Raised when requests is missing or the server is not configured (no base URL)."""
+
+
+class OpenAICompatibleLLMAPIError(OpenAICompatibleLLMError):
+    """Raised when the API request fails after retries."""
+
+
+class OpenAICompatibleLLMResponseError(OpenAICompatibleLLMError):
+    """Raised when the response from the API cannot be interpreted."""
+
+
+class OpenAICompatibleLLMContextLengthError(OpenAICompatibleLLMAPIError, ContextOverflowError):
+    """Raised when the prompt does not fit the model's context window (never retried)."""
+
+
+# Status codes worth retrying; other 4xx responses will not change on retry
+_RETRY_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+# One pooled session per (base_url, pool size), shared process-wide
+_SESSIONS: Dict[Tuple[str, int], Any] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def _get_session(base_url: str, pool_maxsize: int) -> Any:
+    """Return the shared keep-alive session for a server."""
+    if not _REQUESTS_AVAILABLE or requests is None:
+        raise OpenAICompatibleLLMImportError(
+            "requests package not installed. Install with: pip install requests"
+        )
+    key = (base_url, pool_maxsize)
+    session = _SESSIONS.get(key)
+    if session is None:
+        with _SESSIONS_LOCK:
+            session = _SESSIONS.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _SESSIONS[key] = session
+    return session
+
+
+def _resolve_base_url(base_url: Optional[str]) -> str:
+    """Resolve the server URL from the argument or environment."""
+    base_url = base_url or os.environ.get("OPENAI_COMPATIBLE_BASE_URL")
+    if not base_url:
+        raise OpenAICompatibleLLMImportError(
+            "No base_url provided and environment variable OPENAI_COMPATIBLE_BASE_URL is not set"
+        )
+    return base_url.rstrip("/")
+
+
+def _build_request(
+    prompt: str,
+    model: str,
+    api_key: Optional[str],
+    headers: Optional[Dict[str, str]],
+    extra_body: Optional[Dict[str, Any]],
+    max_retries: int,
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+    pool_maxsize: int,
+) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """Validate arguments and return ``(headers, body)`` for a chat request."""
+    # Basic validation
+    if not isinstance(prompt, str) or not prompt.strip():
+        raise ValueError("prompt must be a non-empty string")
+    if not isinstance(model, str) or not model.strip():
+        raise ValueError("model must be a non-empty string")
+    if not isinstance(max_retries, int) or max_retries < 1:
+        raise ValueError("max_retries must be an integer >= 1")
+    if temperature is not None and not (0.0 <= temperature <= 2.0):
+        raise ValueError("temperature must be between 0.0 and 2.0")
+    if max_tokens is not None and max_tokens <= 0:
+        raise ValueError("max_tokens must be positive")
+    if pool_maxsize < 1:
+        raise ValueError("pool_maxsize must be >= 1")
+
+    request_headers = {"Content-Type": "application/json"}
+    # Local servers usually accept any key, or none at all
+    api_key = api_key or os.environ.get("OPENAI_COMPATIBLE_API_KEY")
+    if api_key:
+        request_headers["Authorization"] = f"Bearer {api_key}"
+    if headers:
+        request_headers.update(headers)
+
+    body: Dict[str, Any] = {"model": model, "messages": [{"role": "user", "content": prompt}]}
+    if temperature is not None:
+        body["temperature"] = temperature
+    if max_tokens is not None:
+        body["max_tokens"] = max_tokens
+    if extra_body:
+        body.update(extra_body)
+    return request_headers, body
+
+
+def _check_status(response: Any) -> None:
+    """Raise for non-2xx responses; non-retryable ones as OpenAICompatibleLLMAPIError."""
+    if response.status_code < 400:
+        return
+    detail = response.text[:500]
+    if response.status_code in (400, 413) and is_context_overflow(detail):
+        raise OpenAICompatibleLLMContextLengthError(
+            f"Prompt exceeds the model's context window: {detail}"
+        )
+    if response.status_code in _RETRY_STATUS:
+        raise requests.HTTPError(f"HTTP {response.status_code}: {detail}", response=response)
+    raise OpenAICompatibleLLMAPIError(
+        f"OpenAI-compatible server rejected the request (HTTP {response.status_code}): {detail}"
+    )
+
+
+def _extract_usage(data: Dict[str, Any]) -> Optional[Dict[str, int]]:
+    """Read token usage from a chat completion response, if reported."""
+    usage = data.get("usage")
+    if not usage:
+        return None
+    return {
+        "prompt_tokens": usage.get("prompt_tokens", 0) or 0,
+        "completion_tokens": usage.get("completion_tokens", 0) or 0,
+    }
+
+
+def openai_compatible_llm(
+    prompt: str,
+    model: str,
+    base_url: Optional[str] = None,
+    api_key: Optional[str] = None,
+    *,
+    headers: Optional[Dict[str, str]] = None,
+    extra_body: Optional[Dict[str, Any]] = None,
+    max_retries: int = 3,
+    timeout: Optional[float] = 60.0,
+    backoff_factor: float = 0.5,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    pool_maxsize: int = 32,
+    usage_callback: Optional[Callable[[Dict[str, int]], None]] = None,
+) -> str:
+    """Call a model on an OpenAI-compatible server and return the generated text.
+
+    Args:
+        prompt: The prompt / input text to send to the model. Must be non-empty.
+        model: Model identifier as served (e.g. "Qwen/Qwen2.5-7B-Instruct").
+        base_url: Server URL including the API prefix (e.g. "http://localhost:8000/v1").
+            If omitted, will try OPENAI_COMPATIBLE_BASE_URL env var.
+        api_key: Bearer token. If omitted, will try OPENAI_COMPATIBLE_API_KEY env var;
+            no Authorization header is sent when neither is set.
+        headers: Extra HTTP headers sent with every request.
+        extra_body: Extra JSON fields merged into the request body
+            (e.g. {"top_k": 20, "repetition_penalty": 1.05}).
+        max_retries: Number of attempts to make on transient failures.
+        timeout: Optional timeout (seconds) per request.
+        backoff_factor: Base factor for exponential backoff between retries.
+        temperature: Sampling temperature (0.0 to 2.0, optional).
+        max_tokens: Maximum tokens in response (optional).
+        pool_maxsize: Maximum pooled connections kept open to the server.
+        usage_callback: Optional function called with the reported token usage
+            (``prompt_tokens`` / ``completion_tokens``) after a successful call.
+
+    Returns:
+        The generated text from the model.
+
+    Raises:
+        ValueError: If required arguments are missing or invalid.
+        OpenAICompatibleLLMImportError: If no base URL is configured.
+        OpenAICompatibleLLMAPIError: If the request is rejected or all retry attempts fail.
+        OpenAICompatibleLLMContextLengthError: If the prompt does not fit the model's context window.
+        OpenAICompatibleLLMResponseError: If a response is returned but contains no text.
+    """
+
+    request_headers, body = _build_request(
+        prompt, model, api_key, headers, extra_body, max_retries, temperature, max_tokens, pool_maxsize
+    )
+    base_url = _resolve_base_url(base_url)
+    url = base_url + "/chat/completions"
+    session = _get_session(base_url, pool_maxsize)
+
+    last_exc: Optional[BaseException] = None
+
+    for attempt in range(1, max_retries + 1):
+        try:
+            response = session.post(url, json=body, headers=request_headers, timeout=timeout)
+            _check_status(response)
+
+            try:
+                data = response.json()
+            except ValueError as exc:
+                raise OpenAICompatibleLLMResponseError("Response is not valid JSON") from exc
+
+            # Extract text
+            choices = data.get("choices") or []
+            if not choices:
+                raise OpenAICompatibleLLMResponseError("No choices in response")
+
+            text = (choices[0].get("message") or {}).get("content")
+            if not text or not isinstance(text, str):
+                raise OpenAICompatibleLLMResponseError("No valid text content in response")
+
+            if usage_callback is not None:
+                usage = _extract_usage(data)
+                if usage is not None:
+                    usage_callback(usage)
+
+            return text.strip()
+
+        except OpenAICompatibleLLMError:
+            raise
+        except Exception as exc:
+            last_exc = exc
+            if is_context_overflow(exc):
+                raise OpenAICompatibleLLMContextLengthError(
+                    f"Prompt exceeds the model's context window: {exc}"
+                ) from exc
+            if attempt == max_retries:
+                raise OpenAICompatibleLLMAPIError(
+                    f"OpenAI-compatible LLM request failed after {max_retries} attempts: {exc}"
+                ) from exc
+
+            # Backoff before next retry
+            sleep_for = backoff_factor * (2 ** (attempt - 1))
+            add_event("retry", attempt=attempt, error=str(exc), backoff=sleep_for)
+            time.sleep(sleep_for)
+
+    raise OpenAICompatibleLLMAPIError("OpenAI-compatible LLM request failed") from last_exc
+
+
+def _iter_sse_text(response: Any) -> Iterator[str]:
+    """Yield content deltas from a server-sent-events chat completion stream."""
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        payload = line[5:].strip()
+        if payload == "[DONE]":
+            return
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            continue
+        choices = event.get("choices") or []
+        if not choices:
+            continue
+        text = (choices[0].get("delta") or {}).get("content")
+        if text:
+            yield text
+
+
+def openai_compatible_llm_stream(
+    prompt: str,
+    model: str,
+    base_url: Optional[str] = None,
+    api_key: Optional[str] = None,
+    *,
+    headers: Optional[Dict[str, str]] = None,
+    extra_body: Optional[Dict[str, Any]] = None,
+    max_retries: int = 3,
+    timeout: Optional[float] = 60.0,
+    backoff_factor: float = 0.5,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    pool_maxsize: int = 32,
+) -> Iterator[str]:
+    """Call a model on an OpenAI-compatible server and yield text as it streams in.
+
+    Takes the same arguments as ``openai_compatible_llm``. Failures are only
+    retried before the first chunk arrives; once text has been yielded it
+    cannot be taken back, so a later failure is raised immediately.
+
+    Yields:
+        Chunks of generated text, in order.
+
+    Raises:
+        ValueError: If required arguments are missing or invalid.
+        OpenAICompatibleLLMImportError: If no base URL is configured.
+        OpenAICompatibleLLMAPIError: If the stream cannot be completed.
+        OpenAICompatibleLLMResponseError: If the stream ends without any text.
+    """
+
+    request_headers, body = _build_request(
+        prompt, model, api_key, headers, extra_body, max_retries, temperature, max_tokens, pool_maxsize
+    )
+    body["stream"] = True
+    base_url = _resolve_base_url(base_url)
+    url = base_url + "/chat/completions"
+    session = _get_session(base_url, pool_maxsize)
+
+    last_exc: Optional[BaseException] = None
+
+    for attempt in range(1, max_retries + 1):
+        received = False
+        try:
+            with session.post(
+                url, json=body, headers=request_headers, timeout=timeout, stream=True
+            ) as response:
+                _check_status(response)
+                for text in _iter_sse_text(response):
+                    received = True
+                    yield text
+
+            if not received:
+                raise OpenAICompatibleLLMResponseError("No valid text content in response")
+            return
+
+        except OpenAICompatibleLLMError:
+            raise
+        except Exception as exc:
+            last_exc = exc
+            if is_context_overflow(exc):
+                raise OpenAICompatibleLLMContextLengthError(
+                    f"Prompt exceeds the model's context window: {exc}"
+                ) from exc
+            if received or attempt == max_retries:
+                raise OpenAICompatibleLLMAPIError(
+                    f"OpenAI-compatible LLM stream failed after {attempt} attempts: {exc}"
+                ) from exc
+
+            # Backoff before next retry
+            sleep_for = backoff_factor * (2 ** (attempt - 1))
+            add_event("retry", attempt=attempt, error=str(exc), backoff=sleep_for)
+            time.sleep(sleep_for)
+
+    raise OpenAICompatibleLLMAPIError("OpenAI-compatible LLM stream failed") from last_exc
+
+
+class OpenAICompatibleLLM:
+    """
+    Class-based wrapper for OpenAI-compatible servers with generate_response method.
+
+    Works with vLLM, llama.cpp server, LM Studio and any other server that
+    implements the OpenAI chat completions API.
+
+    Example:
+        >>> llm = OpenAICompatibleLLM(
+        ...     model="Qwen/Qwen2.5-7B-Instruct",
+        ...     base_url="http://localhost:8000/v1",
+        ...     extra_body={"top_k": 20},
+        ... )
+        >>> response = llm.generate_response("What is Python?")
+        >>> print(response)
+    """
+
+    def __init__(
+        self,
+        model: str,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        extra_body: Optional[Dict[str, Any]] = None,
+        max_retries: int = 3,
+        timeout: Optional[float] = 60.0,
+        backoff_factor: float = 0.5,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        pool_maxsize: int = 32,
+    ):
+        """
+        Initialize OpenAI-compatible LLM wrapper.
+
+        Args:
+            model: Model identifier as served
+            base_url: Server URL including the API prefix (optional if
+                OPENAI_COMPATIBLE_BASE_URL env var is set)
+            api_key: Bearer token (optional)
+            headers: Extra HTTP headers sent with every request
+            extra_body: Extra JSON fields merged into the request body
+            max_retries: Number of retry attempts on failure
+            timeout: Request timeout in seconds
+            backoff_factor: Exponential backoff factor for retries
+            temperature: Sampling temperature (0.0 to 2.0)
+            max_tokens: Maximum tokens in response
+            pool_maxsize: Maximum pooled connections kept open to the server
+        """
+        self.model = model
+        self.base_url = base_url
+        self.api_key = api_key
+        self.headers = headers
+        self.extra_body = extra_body
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff_factor = backoff_factor
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.pool_maxsize = pool_maxsize
+        # Token usage reported by the most recent generate_response() call
+        self.last_usage: Optional[Dict[str, int]] = None
+
+    def _options(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "base_url": self.base_url,
+            "api_key": self.api_key,
+            "headers": self.headers,
+            "extra_body": self.extra_body,
+            "max_retries": self.max_retries,
+            "timeout": self.timeout,
+            "backoff_factor": self.backoff_factor,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "pool_maxsize": self.pool_maxsize,
+        }
+
+    def generate_response(self, prompt: str) -> str:
+        """
+        Generate a response from the served model.
+
+        Args:
+            prompt: The input prompt text
+
+        Returns:
+            Generated response text
+
+        Raises:
+            ValueError: If prompt is invalid
+            OpenAICompatibleLLMImportError: If no base URL is configured
+            OpenAICompatibleLLMAPIError: If API request fails
+            OpenAICompatibleLLMResponseError: If response is invalid
+        """
+        return openai_compatible_llm(
+            prompt=prompt,
+            usage_callback=usage_recorder(self, prompt, self.model),
+            **self._options(),
+        )
+
+    def generate_response_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Stream a response from the served model chunk by chunk.
+
+        Args:
+            prompt: The input prompt text
+
+        Yields:
+            Chunks of generated text
+
+        Raises:
+            Same exceptions as generate_response()
+        """
+        return openai_compatible_llm_stream(prompt=prompt, **self._options())
+
+
+__all__ = [
+    "openai_compatible_llm",
+    "openai_compatible_llm_stream",
+    "OpenAICompatibleLLM",
+    "OpenAICompatibleLLMError",
+    "OpenAICompatibleLLMAPIError",
+    "OpenAICompatibleLLMImportError",
+    "OpenAICompatibleLLMResponseError",
+    "OpenAICompatibleLLMContextLengthError",
+]
@@ -22,13 +22,19 @@ Example usage:
     ...     print(f"Error: {e}")
 """
 
-from typing import Optional, Any
+from typing import Optional, Any, Callable, Dict, Iterator, List, Sequence
+import asyncio
 import os
 import time
 import warnings
 import sys
 from contextlib import contextmanager
 
+from core.context_overflow import ContextOverflowError, is_context_overflow
+from core.tokenizer import usage_recorder
+from core.tracing import add_event
+from .embeddings import embed_in_batches, require_numpy, validate_texts
+
 # Suppress gRPC and other warnings
 os.environ['GRPC_VERBOSITY'] = 'ERROR'
 os.environ['GLOG_minloglevel'] = '2'
@@ -81,11 +87,12 @@ def suppress_stderr():
 # Import the OpenAI client at module level to reduce import overhead
 try:
     with suppress_stderr():
-        from openai import OpenAI
+        from openai import AsyncOpenAI, OpenAI
     _OPENAI_AVAILABLE = True
 except ImportError:
     _OPENAI_AVAILABLE = False
     OpenAI = None  # type: ignore
+    AsyncOpenAI = None  # type: ignore
 
 
 class OpenAILLMError(Exception):
@@ -104,6 +111,100 @@ class OpenAILLMResponseError(OpenAILLMError):
     """Raised when the response from the API cannot be interpreted."""
 
 
+class OpenAILLMContextLengthError(OpenAILLMAPIError, ContextOverflowError):
+    """Raised when the prompt does not fit the model's context window (never retried)."""
+
+
+def _create_client(
+    prompt: str,
+    model: str,
+    api_key: Optional[str],
+    max_retries: int,
+    timeout: Optional[float],
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+    asynchronous: bool = False,
+    client: Any = None,
+) -> Any:
+    """Validate request arguments and return an initialized OpenAI client (``client`` if given)."""
+    # Basic validation
+    if not isinstance(prompt, str) or not prompt.strip():
+        raise ValueError("prompt must be a non-empty string")
+    if not isinstance(model, str) or not model.strip():
+        raise ValueError("model must be a non-empty string")
+    if not isinstance(max_retries, int) or max_retries < 1:
+        raise ValueError("max_retries must be an integer >= 1")
+    if temperature is not None and not (0.0 <= temperature <= 2.0):
+        raise ValueError("temperature must be between 0.0 and 2.0")
+    if max_tokens is not None and max_tokens <= 0:
+        raise ValueError("max_tokens must be positive")
+
+    if client is not None:
+        return client
+    return _new_client(api_key, timeout, asynchronous)
+
+
+def _new_client(api_key: Optional[str], timeout: Optional[float], asynchronous: bool = False) -> Any:
+    """Resolve the API key and return an initialized OpenAI (or AsyncOpenAI) client."""
+    api_key = api_key or os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        raise OpenAILLMImportError(
+            "No API key provided and environment variable OPENAI_API_KEY is not set"
+        )
+
+    # Check if OpenAI client is available
+    if not _OPENAI_AVAILABLE or OpenAI is None:
+        raise OpenAILLMImportError(
+            "OpenAI package not installed. Install with: pip install openai"
+        )
+
+    # Initialize client
+    try:
+        client_class = AsyncOpenAI if asynchronous else OpenAI
+        return client_class(api_key=api_key, timeout=timeout)
+    except Exception as exc:
+        raise OpenAILLMImportError(
+            "Failed to initialize OpenAI client"
+        ) from exc
+
+
+def _build_request(
+    prompt: str,
+    model: str,
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+) -> dict:
+    """Build the keyword arguments for a chat completion request."""
+    kwargs: dict = {"model": model, "messages": [{"role": "user", "content": prompt}]}
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    if max_tokens is not None:
+        kwargs["max_tokens"] = max_tokens
+    return kwargs
+
+
+def _response_text(response: Any) -> str:
+    """Extract the generated text from a chat completion response."""
+    if not response.choices:
+        raise OpenAILLMResponseError("No choices in response")
+
+    text = response.choices[0].message.content
+    if not text or not isinstance(text, str):
+        raise OpenAILLMResponseError("No valid text content in response")
+    return text.strip()
+
+
+def _extract_usage(response: Any) -> Optional[Dict[str, int]]:
+    """Read token usage from a chat completion response, if reported."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+    }
+
+
 def openai_llm(
     prompt: str,
     model: str,
@@ -114,6 +215,7 @@ def openai_llm(
     backoff_factor: float = 0.5,
     temperature: Optional[float] = None,
     max_tokens: Optional[int] = None,
+    usage_callback: Optional[Callable[[Dict[str, int]], None]] = None,
 ) -> str:
     """Call an OpenAI model and return the generated text.
 
@@ -126,6 +228,8 @@ def openai_llm(
         backoff_factor: Base factor for exponential backoff between retries.
         temperature: Sampling temperature (0.0 to 2.0, optional).
         max_tokens: Maximum tokens in response (optional).
+        usage_callback: Optional function called with the reported token usage
+            (``prompt_tokens`` / ``completion_tokens``) after a successful call.
 
     Returns:
         The generated text from the model.
@@ -134,69 +238,40 @@ def openai_llm(
         ValueError: If required arguments are missing or invalid.
         OpenAILLMImportError: If the OpenAI client is not installed.
         OpenAILLMAPIError: If all retry attempts fail.
+        OpenAILLMContextLengthError: If the prompt does not fit the model's context window.
         OpenAILLMResponseError: If a response is returned but contains no text.
     """
 
-    # Basic validation
-    if not isinstance(prompt, str) or not prompt.strip():
-        raise ValueError("prompt must be a non-empty string")
-    if not isinstance(model, str) or not model.strip():
-        raise ValueError("model must be a non-empty string")
-    if not isinstance(max_retries, int) or max_retries < 1:
-        raise ValueError("max_retries must be an integer >= 1")
-    if temperature is not None and not (0.0 <= temperature <= 2.0):
-        raise ValueError("temperature must be between 0.0 and 2.0")
-    if max_tokens is not None and max_tokens <= 0:
-        raise ValueError("max_tokens must be positive")
-
-    api_key = api_key or os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        raise OpenAILLMImportError(
-            "No API key provided and environment variable OPENAI_API_KEY is not set"
-        )
-
-    # Check if OpenAI client is available
-    if not _OPENAI_AVAILABLE or OpenAI is None:
-        raise OpenAILLMImportError(
-            "OpenAI package not installed. Install with: pip install openai"
-        )
-
-    # Initialize client
-    try:
-        client = OpenAI(api_key=api_key, timeout=timeout)
-    except Exception as exc:
-        raise OpenAILLMImportError(
-            "Failed to initialize OpenAI client"
-        ) from exc
+    client = _create_client(
+        prompt, model, api_key, max_retries, timeout, temperature, max_tokens
+    )
 
     last_exc: Optional[BaseException] = None
 
     for attempt in range(1, max_retries + 1):
         try:
-            # Prepare kwargs
-            kwargs: dict = {"model": model, "messages": [{"role": "user", "content": prompt}]}
-            if temperature is not None:
-                kwargs["temperature"] = temperature
-            if max_tokens is not None:
-                kwargs["max_tokens"] = max_tokens
-
             # Make API request
+            kwargs = _build_request(prompt, model, temperature, max_tokens)
             response = client.chat.completions.create(**kwargs)
 
             # Extract text
-            if not response.choices:
-                raise OpenAILLMResponseError("No choices in response")
-            
-            text = response.choices[0].message.content
-            if not text or not isinstance(text, str):
-                raise OpenAILLMResponseError("No valid text content in response")
+            text = _response_text(response)
 
-            return text.strip()
+            if usage_callback is not None:
+                usage = _extract_usage(response)
+                if usage is not None:
+                    usage_callback(usage)
+
+            return text
 
         except OpenAILLMError:
             raise
         except Exception as exc:
             last_exc = exc
+            if is_context_overflow(exc):
+                raise OpenAILLMContextLengthError(
+                    f"Prompt exceeds the model's context window: {exc}"
+                ) from exc
             if attempt == max_retries:
                 raise OpenAILLMAPIError(
                     f"OpenAI LLM request failed after {max_retries} attempts: {exc}"
@@ -204,11 +279,215 @@ def openai_llm(
 
             # Backoff before next retry
             sleep_for = backoff_factor * (2 ** (attempt - 1))
+            add_event("retry", attempt=attempt, error=str(exc), backoff=sleep_for)
             time.sleep(sleep_for)
 
     raise OpenAILLMAPIError("OpenAI LLM request failed") from last_exc
 
 
+async def openai_llm_async(
+    prompt: str,
+    model: str,
+    api_key: Optional[str] = None,
+    *,
+    max_retries: int = 3,
+    timeout: Optional[float] = 30.0,
+    backoff_factor: float = 0.5,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    usage_callback: Optional[Callable[[Dict[str, int]], None]] = None,
+    client: Any = None,
+) -> str:
+    """Call an OpenAI model with the async client and return the generated text.
+
+    Takes the same arguments and raises the same exceptions as ``openai_llm``;
+    waiting for the response (and backing off between retries) does not
+    block the event loop. Pass ``client`` (an ``AsyncOpenAI``) to reuse its
+    connection pool across calls; it stays open afterwards.
+    """
+
+    client = _create_client(
+        prompt, model, api_key, max_retries, timeout, temperature, max_tokens,
+        asynchronous=True, client=client,
+    )
+
+    last_exc: Optional[BaseException] = None
+
+    for attempt in range(1, max_retries + 1):
+        try:
+            kwargs = _build_request(prompt, model, temperature, max_tokens)
+            response = await client.chat.completions.create(**kwargs)
+            text = _response_text(response)
+
+            if usage_callback is not None:
+                usage = _extract_usage(response)
+                if usage is not None:
+                    usage_callback(usage)
+
+            return text
+
+        except OpenAILLMError:
+            raise
+        except Exception as exc:
+            last_exc = exc
+            if is_context_overflow(exc):
+                raise OpenAILLMContextLengthError(
+                    f"Prompt exceeds the model's context window: {exc}"
+                ) from exc
+            if attempt == max_retries:
+                raise OpenAILLMAPIError(
+                    f"OpenAI LLM request failed after {max_retries} attempts: {exc}"
+                ) from exc
+
+            # Backoff before next retry
+            sleep_for = backoff_factor * (2 ** (attempt - 1))
+            add_event("retry", attempt=attempt, error=str(exc), backoff=sleep_for)
+            await asyncio.sleep(sleep_for)
+
+    raise OpenAILLMAPIError("OpenAI LLM request failed") from last_exc
+
+
+def openai_llm_stream(
+    prompt: str,
+    model: str,
+    api_key: Optional[str] = None,
+    *,
+    max_retries: int = 3,
+    timeout: Optional[float] = 30.0,
+    backoff_factor: float = 0.5,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+) -> Iterator[str]:
+    """Call an OpenAI model and yield the generated text as it streams in.
+
+    Takes the same arguments as ``openai_llm``. Failures are only retried
+    before the first chunk arrives; once text has been yielded it cannot be
+    taken back, so a later failure is raised immediately.
+
+    Yields:
+        Chunks of generated text, in order.
+
+    Raises:
+        ValueError: If required arguments are missing or invalid.
+        OpenAILLMImportError: If the OpenAI client is not installed.
+        OpenAILLMAPIError: If the stream cannot be completed.
+        OpenAILLMResponseError: If the stream ends without any text.
+    """
+
+    client = _create_client(
+        prompt, model, api_key, max_retries, timeout, temperature, max_tokens
+    )
+
+    last_exc: Optional[BaseException] = None
+
+    for attempt in range(1, max_retries + 1):
+        received = False
+        try:
+            kwargs = _build_request(prompt, model, temperature, max_tokens)
+            stream = client.chat.completions.create(stream=True, **kwargs)
+
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                text = getattr(chunk.choices[0].delta, "content", None)
+                if text:
+                    received = True
+                    yield text
+
+            if not received:
+                raise OpenAILLMResponseError("No valid text content in response")
+            return
+
+        except OpenAILLMError:
+            raise
+        except Exception as exc:
+            last_exc = exc
+            if is_context_overflow(exc):
+                raise OpenAILLMContextLengthError(
+                    f"Prompt exceeds the model's context window: {exc}"
+                ) from exc
+            if received or attempt == max_retries:
+                raise OpenAILLMAPIError(
+                    f"OpenAI LLM stream failed after {attempt} attempts: {exc}"
+                ) from exc
+
+            # Backoff before next retry
+            sleep_for = backoff_factor * (2 ** (attempt - 1))
+            add_event("retry", attempt=attempt, error=str(exc), backoff=sleep_for)
+            time.sleep(sleep_for)
+
+    raise OpenAILLMAPIError("OpenAI LLM stream failed") from last_exc
+
+
+def openai_embed(
+    texts: Sequence[str],
+    model: str = "text-embedding-3-small",
+    api_key: Optional[str] = None,
+    *,
+    dimensions: Optional[int] = None,
+    batch_size: int = 2048,
+    max_concurrency: int = 4,
+    max_retries: int = 3,
+    timeout: Optional[float] = 30.0,
+    backoff_factor: float = 0.5,
+) -> Any:
+    """Embed texts with an OpenAI embedding model.
+
+    Texts are split into requests of at most ``batch_size`` inputs (2048 is
+    the API maximum; lower it for very long texts to stay under the
+    per-request token limit) and up to ``max_concurrency`` requests run in
+    parallel. Vectors are requested base64-encoded and decoded straight into
+    the result matrix, so no Python float lists are built.
+
+    Args:
+        texts: Texts to embed.
+        model: Embedding model identifier (e.g. "text-embedding-3-small").
+        api_key: API key to use. If omitted, will try OPENAI_API_KEY env var.
+        dimensions: Optional output dimensionality (text-embedding-3 models).
+        batch_size: Maximum texts per request.
+        max_concurrency: Number of requests to run in parallel.
+        max_retries: Number of attempts per request on transient failures.
+        timeout: Optional timeout (seconds) to pass to the underlying client.
+        backoff_factor: Base factor for exponential backoff between retries.
+
+    Returns:
+        Contiguous numpy.float32 array of shape (len(texts), dimensions).
+
+    Raises:
+        ValueError: If required arguments are missing or invalid.
+        OpenAILLMImportError: If the OpenAI client or NumPy is not installed.
+        OpenAILLMAPIError: If a request fails after all retries.
+    """
+    require_numpy(OpenAILLMImportError)
+    texts = validate_texts(texts)
+    if not isinstance(model, str) or not model.strip():
+        raise ValueError("model must be a non-empty string")
+    if not isinstance(max_retries, int) or max_retries < 1:
+        raise ValueError("max_retries must be an integer >= 1")
+
+    client = _new_client(api_key, timeout)
+
+    def embed_batch(batch: List[str]) -> List[Any]:
+        kwargs: dict = {"model": model, "input": batch, "encoding_format": "base64"}
+        if dimensions is not None:
+            kwargs["dimensions"] = dimensions
+
+        for attempt in range(1, max_retries + 1):
+            try:
+                response = client.embeddings.create(**kwargs)
+                data = sorted(response.data, key=lambda item: item.index)
+                return [item.embedding for item in data]
+            except Exception as exc:
+                if attempt == max_retries:
+                    raise OpenAILLMAPIError(
+                        f"OpenAI embedding request failed after {max_retries} attempts: {exc}"
+                    ) from exc
+                time.sleep(backoff_factor * (2 ** (attempt - 1)))
+        return []
+
+    return embed_in_batches(texts, batch_size, embed_batch, max_concurrency)
+
+
 class OpenAILLM:
     """
     Class-based wrapper for OpenAI LLM with generate_response method.
@@ -253,6 +532,11 @@ class OpenAILLM:
         self.backoff_factor = backoff_factor
         self.temperature = temperature
         self.max_tokens = max_tokens
+        # Token usage reported by the most recent generate_response() call
+        self.last_usage: Optional[Dict[str, int]] = None
+        # AsyncOpenAI client reused by agenerate_response(), and the event loop it was opened on
+        self._async_client: Any = None
+        self._async_client_loop: Optional[asyncio.AbstractEventLoop] = None
     
     def generate_response(self, prompt: str) -> str:
         """
@@ -279,14 +563,121 @@ class OpenAILLM:
             backoff_factor=self.backoff_factor,
             temperature=self.temperature,
             max_tokens=self.max_tokens,
+            usage_callback=usage_recorder(self, prompt, self.model),
+        )
+
+    async def agenerate_response(self, prompt: str) -> str:
+        """
+        Generate a response from the OpenAI model without blocking the event loop.
+        
+        Args:
+            prompt: The input prompt text
+            
+        Returns:
+            Generated response text
+            
+        Raises:
+            Same exceptions as generate_response()
+        """
+        return await openai_llm_async(
+            prompt=prompt,
+            model=self.model,
+            api_key=self.api_key,
+            max_retries=self.max_retries,
+            timeout=self.timeout,
+            backoff_factor=self.backoff_factor,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            usage_callback=usage_recorder(self, prompt, self.model),
+            client=self._get_async_client(),
+        )
+
+    def _get_async_client(self) -> Any:
+        """Return the async client for the running event loop, opening it on first use."""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            # Connections belong to the loop that opened them, so a new loop
+            # (e.g. another asyncio.run()) gets a new client
+            self._async_client = _new_client(self.api_key, self.timeout, asynchronous=True)
+            self._async_client_loop = loop
+        return self._async_client
+
+    async def aclose(self) -> None:
+        """
+        Close the async client used by agenerate_response().
+        
+        Await it on the event loop that made the requests, e.g. at the end of
+        the coroutine passed to asyncio.run(). A later agenerate_response()
+        call opens a new client.
+        """
+        client, self._async_client, self._async_client_loop = self._async_client, None, None
+        if client is not None:
+            await client.close()
+
+    def generate_response_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Stream a response from the OpenAI model chunk by chunk.
+        
+        Args:
+            prompt: The input prompt text
+            
+        Yields:
+            Chunks of generated text
+            
+        Raises:
+            Same exceptions as generate_response()
+        """
+        return openai_llm_stream(
+            prompt=prompt,
+            model=self.model,
+            api_key=self.api_key,
+            max_retries=self.max_retries,
+            timeout=self.timeout,
+            backoff_factor=self.backoff_factor,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+        )
+
+    def embed(
+        self,
+        texts: Sequence[str],
+        model: str = "text-embedding-3-small",
+        dimensions: Optional[int] = None,
+        batch_size: int = 2048,
+    ) -> Any:
+        """
+        Embed texts with an OpenAI embedding model.
+        
+        Args:
+            texts: Texts to embed
+            model: Embedding model identifier
+            dimensions: Optional output dimensionality
+            batch_size: Maximum texts per request
+            
+        Returns:
+            Contiguous numpy.float32 array of shape (len(texts), dimensions)
+        """
+        return openai_embed(
+            texts,
+            model=model,
+            api_key=self.api_key,
+            dimensions=dimensions,
+            batch_size=batch_size,
+            max_retries=self.max_retries,
+            timeout=self.timeout,
+            backoff_factor=self.backoff_factor,
         )
 
 
 __all__ = [
     "openai_llm",
+    "openai_llm_stream",
+    "openai_llm_async",
+    "openai_embed",
     "OpenAILLM",
     "OpenAILLMError",
     "OpenAILLMAPIError",
     "OpenAILLMImportError",
     "OpenAILLMResponseError",
+    "OpenAILLMContextLengthError",
 ]
@@ -2,7 +2,8 @@
 Initialize Codemni LLM package
 
 Production-ready LLM wrappers with robust error handling, retries, and no logging.
-Supports: Google Gemini, OpenAI, Anthropic Claude, Groq, and Ollama.
+Supports: Google Gemini, OpenAI, Anthropic Claude, Groq, Ollama, in-process llama.cpp,
+and any OpenAI-compatible server (vLLM, llama.cpp server, LM Studio).
 
 Each LLM module provides two interfaces:
 1. Function-based: For one-off calls with all parameters
@@ -19,6 +20,8 @@ Available Classes:
 - AnthropicLLM: For Claude models (claude-3-opus, claude-3-sonnet)
 - GroqLLM: For Groq models (llama3-70b-8192, mixtral-8x7b-32768)
 - OllamaLLM: For local Ollama models (llama2, mistral, codellama)
+- LlamaCppLLM: For GGUF models run in-process with llama.cpp (no server)
+- OpenAICompatibleLLM: For OpenAI-compatible servers (vLLM, LM Studio, ...)
 
 Available Functions:
 - openai_llm(): Call OpenAI models
@@ -26,51 +29,152 @@ Available Functions:
 - anthropic_llm(): Call Anthropic Claude models
 - groq_llm(): Call Groq models
 - ollama_llm(): Call local Ollama models
+- llamacpp_llm(): Run a GGUF model in-process
+- openai_compatible_llm(): Call an OpenAI-compatible server
+
+Streaming:
+Every function has a ``*_stream`` variant (e.g. openai_llm_stream()) and every
+class a generate_response_stream(prompt) method that yields text chunks as
+they arrive.
+
+Async:
+openai_llm_async(), anthropic_llm_async() and groq_llm_async() use the SDKs'
+async clients, and OpenAILLM, AnthropicLLM and GroqLLM expose them as
+agenerate_response(prompt). Agents' ainvoke() awaits that method when present
+and runs generate_response() in a worker thread otherwise.
+
+Bulk jobs:
+run_batch() submits many prompts through OpenAIBatchBackend,
+AnthropicBatchBackend or LocalBatchBackend and streams the results back;
+write_jsonl() saves them as JSON Lines.
+
+Record / replay:
+RecordingLLM wraps any LLM and writes every call to a file; ReplayLLM serves
+the recorded responses offline (optionally with the recorded latency) and
+raises PromptDriftError when a prompt no longer matches the recording.
+
+Context overflow:
+Prompts longer than the model's context window raise <Provider>LLMContextLengthError
+immediately instead of being retried. All of them derive from
+core.context_overflow.ContextOverflowError, which the agents catch to compact
+the prompt and retry once.
+
+Embeddings:
+OpenAILLM, GoogleLLM and OllamaLLM provide embed(texts), and LocalEmbedder
+embeds offline. All return a numpy.float32 matrix (requires numpy).
 """
 
 from .Google_llm import (
     google_llm,
+    google_llm_stream,
+    google_embed,
     GoogleLLM,
     GoogleLLMError,
     GoogleLLMAPIError,
     GoogleLLMImportError,
     GoogleLLMResponseError,
+    GoogleLLMContextLengthError,
 )
 
 from .OpenAI_llm import (
     openai_llm,
+    openai_llm_stream,
+    openai_llm_async,
+    openai_embed,
     OpenAILLM,
     OpenAILLMError,
     OpenAILLMAPIError,
     OpenAILLMImportError,
     OpenAILLMResponseError,
+    OpenAILLMContextLengthError,
 )
 
 from .Anthropic_llm import (
     anthropic_llm,
+    anthropic_llm_stream,
+    anthropic_llm_async,
     AnthropicLLM,
     AnthropicLLMError,
     AnthropicLLMAPIError,
     AnthropicLLMImportError,
     AnthropicLLMResponseError,
+    AnthropicLLMContextLengthError,
 )
 
 from .Groq_llm import (
     groq_llm,
+    groq_llm_stream,
+    groq_llm_async,
     GroqLLM,
     GroqLLMError,
     GroqLLMAPIError,
     GroqLLMImportError,
     GroqLLMResponseError,
+    GroqLLMContextLengthError,
 )
 
 from .Ollama_llm import (
     ollama_llm,
+    ollama_llm_stream,
+    ollama_embed,
     OllamaLLM,
     OllamaLLMError,
     OllamaLLMAPIError,
     OllamaLLMImportError,
     OllamaLLMResponseError,
+    OllamaLLMContextLengthError,
+)
+
+from .LlamaCpp_llm import (
+    llamacpp_llm,
+    llamacpp_llm_stream,
+    LlamaCppLLM,
+    LlamaCppLLMError,
+    LlamaCppLLMAPIError,
+    LlamaCppLLMImportError,
+    LlamaCppLLMResponseError,
+    LlamaCppLLMContextLengthError,
+)
+
+from .OpenAICompatible_llm import (
+    openai_compatible_llm,
+    openai_compatible_llm_stream,
+    OpenAICompatibleLLM,
+    OpenAICompatibleLLMError,
+    OpenAICompatibleLLMAPIError,
+    OpenAICompatibleLLMImportError,
+    OpenAICompatibleLLMResponseError,
+    OpenAICompatibleLLMContextLengthError,
+)
+
+from .embeddings import (
+    LocalEmbedder,
+    EmbeddingError,
+    EmbeddingImportError,
+)
+
+from .batch import (
+    BatchBackend,
+    OpenAIBatchBackend,
+    AnthropicBatchBackend,
+    LocalBatchBackend,
+    BatchJob,
+    submit_batch,
+    run_batch,
+    write_jsonl,
+    BatchError,
+    BatchImportError,
+    BatchAPIError,
+    BatchTimeoutError,
+)
+
+from .replay import (
+    RecordingLLM,
+    ReplayLLM,
+    load_recording,
+    ReplayError,
+    PromptDriftError,
+    ReplayExhaustedError,
 )
 
 __version__ = "1.2.2"
@@ -78,37 +182,95 @@ __author__ = "CodexJitin"
 __all__ = [
     # Google Gemini
     "google_llm",
+    "google_llm_stream",
+    "google_embed",
     "GoogleLLM",
     "GoogleLLMError",
     "GoogleLLMAPIError",
     "GoogleLLMImportError",
     "GoogleLLMResponseError",
+    "GoogleLLMContextLengthError",
     # OpenAI
     "openai_llm",
+    "openai_llm_stream",
+    "openai_llm_async",
+    "openai_embed",
     "OpenAILLM",
     "OpenAILLMError",
     "OpenAILLMAPIError",
     "OpenAILLMImportError",
     "OpenAILLMResponseError",
+    "OpenAILLMContextLengthError",
     # Anthropic Claude
     "anthropic_llm",
+    "anthropic_llm_stream",
+    "anthropic_llm_async",
     "AnthropicLLM",
     "AnthropicLLMError",
     "AnthropicLLMAPIError",
     "AnthropicLLMImportError",
     "AnthropicLLMResponseError",
+    "AnthropicLLMContextLengthError",
     # Groq
     "groq_llm",
+    "groq_llm_stream",
+    "groq_llm_async",
     "GroqLLM",
     "GroqLLMError",
     "GroqLLMAPIError",
     "GroqLLMImportError",
     "GroqLLMResponseError",
+    "GroqLLMContextLengthError",
     # Ollama
     "ollama_llm",
+    "ollama_llm_stream",
+    "ollama_embed",
     "OllamaLLM",
     "OllamaLLMError",
     "OllamaLLMAPIError",
     "OllamaLLMImportError",
     "OllamaLLMResponseError",
+    "OllamaLLMContextLengthError",
+    # llama.cpp (in-process)
+    "llamacpp_llm",
+    "llamacpp_llm_stream",
+    "LlamaCppLLM",
+    "LlamaCppLLMError",
+    "LlamaCppLLMAPIError",
+    "LlamaCppLLMImportError",
+    "LlamaCppLLMResponseError",
+    "LlamaCppLLMContextLengthError",
+    # OpenAI-compatible servers
+    "openai_compatible_llm",
+    "openai_compatible_llm_stream",
+    "OpenAICompatibleLLM",
+    "OpenAICompatibleLLMError",
+    "OpenAICompatibleLLMAPIError",
+    "OpenAICompatibleLLMImportError",
+    "OpenAICompatibleLLMResponseError",
+    "OpenAICompatibleLLMContextLengthError",
+    # Embeddings
+    "LocalEmbedder",
+    "EmbeddingError",
+    "EmbeddingImportError",
+    # Bulk batch jobs
+    "BatchBackend",
+    "OpenAIBatchBackend",
+    "AnthropicBatchBackend",
+    "LocalBatchBackend",
+    "BatchJob",
+    "submit_batch",
+    "run_batch",
+    "write_jsonl",
+    "BatchError",
+    "BatchImportError",
+    "BatchAPIError",
+    "BatchTimeoutError",
+    # Record / replay
+    "RecordingLLM",
+    "ReplayLLM",
+    "load_recording",
+    "ReplayError",
+    "PromptDriftError",
+    "ReplayExhaustedError",
 ]
@@ -0,0 +1,614 @@
+"""Bulk prompt jobs through the providers' asynchronous batch APIs.
+
+Non-interactive workloads (nightly re-summarization, evaluation suites)
+do not need an answer within seconds. The OpenAI Batch API and Anthropic
+Message Batches API accept tens of thousands of requests at once, run them
+outside the live rate limits and bill them at a discount. This module
+submits a list of prompts to one of those endpoints, polls until the job
+has ended and streams the results back, optionally into a JSONL file.
+
+Every result is a dict of the same shape, whatever the backend::
+
+    {"custom_id": "request-0", "status": "succeeded", "text": "...",
+     "error": None, "usage": {"prompt_tokens": 12, "completion_tokens": 40}}
+
+``status`` is "succeeded" or "errored"; results arrive in completion order,
+so match them to prompts by ``custom_id``.
+
+Backends:
+- ``OpenAIBatchBackend``: /v1/chat/completions through the Batch API
+- ``AnthropicBatchBackend``: Message Batches
+- ``LocalBatchBackend``: runs any object with ``generate_response`` in a
+  thread pool; a no-network stand-in for tests and development
+
+Example usage:
+    >>> from Codemni.llm import OpenAIBatchBackend, run_batch, write_jsonl
+    >>>
+    >>> backend = OpenAIBatchBackend(model="gpt-4o-mini")
+    >>> prompts = [f"Summarize conversation {i}: ..." for i in range(10000)]
+    >>> write_jsonl(run_batch(prompts, backend, poll_interval=60), "summaries.jsonl")
+"""
+
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import io
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from . import Anthropic_llm, OpenAI_llm
+
+
+class BatchError(Exception):
+    """Base exception for errors raised by this module."""
+
+
+class BatchImportError(BatchError):
+    """Raised when the provider client library cannot be imported or configured."""
+
+
+class BatchAPIError(BatchError):
+    """Raised when a batch cannot be submitted, fails validation or cannot be read."""
+
+
+class BatchTimeoutError(BatchError):
+    """Raised when a batch has not ended before the wait timeout."""
+
+
+# Normalized job states
+IN_PROGRESS = "in_progress"
+ENDED = "ended"
+
+# A prompt: plain text, (custom_id, prompt) pair or {"custom_id": ..., "prompt": ...}
+PromptItem = Union[str, Tuple[str, str], Dict[str, str]]
+
+
+def _normalize_prompts(prompts: Iterable[PromptItem]) -> List[Tuple[str, str]]:
+    """Validate prompts and return ``(custom_id, prompt)`` pairs."""
+    items: List[Tuple[str, str]] = []
+    seen = set()
+    for index, item in enumerate(prompts):
+        if isinstance(item, str):
+            custom_id, prompt = f"request-{index}", item
+        elif isinstance(item, dict):
+            custom_id, prompt = item.get("custom_id", f"request-{index}"), item.get("prompt")
+        elif isinstance(item, (tuple, list)) and len(item) == 2:
+            custom_id, prompt = item
+        else:
+            raise ValueError(f"Unsupported prompt item at index {index}: {item!r}")
+
+        if not isinstance(prompt, str) or not prompt.strip():
+            raise ValueError(f"prompt at index {index} must be a non-empty string")
+        custom_id = str(custom_id)
+        if custom_id in seen:
+            raise ValueError(f"Duplicate custom_id: {custom_id}")
+        seen.add(custom_id)
+        items.append((custom_id, prompt))
+
+    if not items:
+        raise ValueError("prompts must not be empty")
+    return items
+
+
+def _result(
+    custom_id: str,
+    text: Optional[str] = None,
+    error: Optional[str] = None,
+    usage: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
+    """Build a normalized result record."""
+    return {
+        "custom_id": custom_id,
+        "status": "errored" if error is not None else "succeeded",
+        "text": text.strip() if text is not None else None,
+        "error": error,
+        "usage": usage,
+    }
+
+
+class BatchBackend:
+    """
+    Interface implemented by the batch backends.
+
+    A backend splits the submitted requests into as many provider jobs as
+    its limits require and returns their ids; ``status`` and ``results``
+    work on one job id at a time.
+    """
+
+    # Provider limits per job
+    max_requests_per_job: int = 50_000
+    max_bytes_per_job: int = 100 * 1024 * 1024
+
+    def request_body(self, prompt: str) -> Dict[str, Any]:
+        """Build the provider request for one prompt."""
+        raise NotImplementedError
+
+    def submit_job(self, requests: List[Tuple[str, Dict[str, Any]]]) -> str:
+        """Submit one job of ``(custom_id, body)`` requests and return its id."""
+        raise NotImplementedError
+
+    def status(self, job_id: str) -> str:
+        """Return IN_PROGRESS or ENDED; raise BatchAPIError if the job failed."""
+        raise NotImplementedError
+
+    def results(self, job_id: str) -> Iterator[Dict[str, Any]]:
+        """Yield normalized results of an ended job."""
+        raise NotImplementedError
+
+    def submit(self, items: List[Tuple[str, str]]) -> List[str]:
+        """Split ``(custom_id, prompt)`` pairs into jobs within the limits and submit them."""
+        job_ids: List[str] = []
+        chunk: List[Tuple[str, Dict[str, Any]]] = []
+        chunk_bytes = 0
+        for custom_id, prompt in items:
+            body = self.request_body(prompt)
+            size = len(json.dumps(body)) + len(custom_id) + 64
+            if chunk and (len(chunk) >= self.max_requests_per_job or chunk_bytes + size > self.max_bytes_per_job):
+                job_ids.append(self.submit_job(chunk))
+                chunk, chunk_bytes = [], 0
+            chunk.append((custom_id, body))
+            chunk_bytes += size
+        if chunk:
+            job_ids.append(self.submit_job(chunk))
+        return job_ids
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """
+    Batch backend for OpenAI chat completions.
+
+    Requests are uploaded as a JSONL file and processed within the
+    completion window (currently only "24h").
+
+    Example:
+        >>> backend = OpenAIBatchBackend(model="gpt-4o-mini", max_tokens=512)
+    """
+
+    max_requests_per_job = 50_000
+    max_bytes_per_job = 190 * 1024 * 1024
+
+    def __init__(
+        self,
+        model: str,
+        api_key: Optional[str] = None,
+        *,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        completion_window: str = "24h",
+        timeout: Optional[float] = 120.0,
+    ):
+        """
+        Initialize OpenAIBatchBackend.
+
+        Args:
+            model: Model identifier (e.g. "gpt-4o-mini")
+            api_key: API key (optional if OPENAI_API_KEY env var is set)
+            temperature: Sampling temperature (0.0 to 2.0)
+            max_tokens: Maximum tokens per response
+            completion_window: Batch completion window
+            timeout: Timeout in seconds for upload/download requests
+        """
+        if not isinstance(model, str) or not model.strip():
+            raise ValueError("model must be a non-empty string")
+        if temperature is not None and not (0.0 <= temperature <= 2.0):
+            raise ValueError("temperature must be between 0.0 and 2.0")
+        if max_tokens is not None and max_tokens <= 0:
+            raise ValueError("max_tokens must be positive")
+
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.completion_window = completion_window
+        try:
+            self.client = OpenAI_llm._new_client(api_key, timeout)
+        except OpenAI_llm.OpenAILLMImportError as exc:
+            raise BatchImportError(str(exc)) from exc
+
+    def request_body(self, prompt: str) -> Dict[str, Any]:
+        return OpenAI_llm._build_request(prompt, self.model, self.temperature, self.max_tokens)
+
+    def submit_job(self, requests: List[Tuple[str, Dict[str, Any]]]) -> str:
+        lines = [
+            json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body,
+            })
+            for custom_id, body in requests
+        ]
+        payload = ("\n".join(lines) + "\n").encode("utf-8")
+        try:
+            upload = self.client.files.create(
+                file=(f"batch-{uuid.uuid4().hex}.jsonl", io.BytesIO(payload)),
+                purpose="batch",
+            )
+            batch = self.client.batches.create(
+                input_file_id=upload.id,
+                endpoint="/v1/chat/completions",
+                completion_window=self.completion_window,
+            )
+        except Exception as exc:
+            raise BatchAPIError(f"Failed to submit OpenAI batch: {exc}") from exc
+        return batch.id
+
+    def status(self, job_id: str) -> str:
+        try:
+            batch = self.client.batches.retrieve(job_id)
+        except Exception as exc:
+            raise BatchAPIError(f"Failed to retrieve OpenAI batch {job_id}: {exc}") from exc
+
+        if batch.status == "failed":
+            errors = getattr(getattr(batch, "errors", None), "data", None) or []
+            detail = "; ".join(getattr(e, "message", str(e)) for e in errors) or "unknown error"
+            raise BatchAPIError(f"OpenAI batch {job_id} failed: {detail}")
+        # Expired and cancelled batches still return the requests that finished
+        if batch.status in ("completed", "expired", "cancelled"):
+            return ENDED
+        return IN_PROGRESS
+
+    def _read_file(self, file_id: Optional[str]) -> Iterator[Dict[str, Any]]:
+        if not file_id:
+            return
+        # Streamed line by line: result files can be hundreds of MB
+        try:
+            with self.client.files.with_streaming_response.content(file_id) as response:
+                for line in response.iter_lines():
+                    if line.strip():
+                        yield json.loads(line)
+        except Exception as exc:
+            raise BatchAPIError(f"Failed to read OpenAI batch file {file_id}: {exc}") from exc
+
+    def results(self, job_id: str) -> Iterator[Dict[str, Any]]:
+        try:
+            batch = self.client.batches.retrieve(job_id)
+        except Exception as exc:
+            raise BatchAPIError(f"Failed to retrieve OpenAI batch {job_id}: {exc}") from exc
+
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            for record in self._read_file(file_id):
+                custom_id = record.get("custom_id")
+                response = record.get("response") or {}
+                body = response.get("body") or {}
+                if record.get("error") or response.get("status_code") != 200:
+                    error = record.get("error") or body.get("error") or response
+                    yield _result(custom_id, error=json.dumps(error))
+                    continue
+
+                choices = body.get("choices") or []
+                text = (choices[0].get("message") or {}).get("content") if choices else None
+                usage = body.get("usage")
+                if usage:
+                    usage = {
+                        "prompt_tokens": usage.get("prompt_tokens", 0) or 0,
+                        "completion_tokens": usage.get("completion_tokens", 0) or 0,
+                    }
+                if not text:
+                    yield _result(custom_id, error="No valid text content in response", usage=usage)
+                else:
+                    yield _result(custom_id, text=text, usage=usage)
+
+
+class AnthropicBatchBackend(BatchBackend):
+    """
+    Batch backend for Anthropic Message Batches.
+
+    Example:
+        >>> backend = AnthropicBatchBackend(model="claude-3-5-haiku-latest", max_tokens=1024)
+    """
+
+    max_requests_per_job = 100_000
+    max_bytes_per_job = 250 * 1024 * 1024
+
+    def __init__(
+        self,
+        model: str,
+        api_key: Optional[str] = None,
+        *,
+        temperature: Optional[float] = None,
+        max_tokens: int = 4096,
+        timeout: Optional[float] = 120.0,
+    ):
+        """
+        Initialize AnthropicBatchBackend.
+
+        Args:
+            model: Model identifier (e.g. "claude-3-5-haiku-latest")
+            api_key: API key (optional if ANTHROPIC_API_KEY env var is set)
+            temperature: Sampling temperature (0.0 to 1.0)
+            max_tokens: Maximum tokens per response
+            timeout: Timeout in seconds for submit/download requests
+        """
+        if not isinstance(model, str) or not model.strip():
+            raise ValueError("model must be a non-empty string")
+        if temperature is not None and not (0.0 <= temperature <= 1.0):
+            raise ValueError("temperature must be between 0.0 and 1.0")
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be positive")
+
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        try:
+            self.client = Anthropic_llm._new_client(api_key, timeout)
+        except Anthropic_llm.AnthropicLLMImportError as exc:
+            raise BatchImportError(str(exc)) from exc
+
+    def request_body(self, prompt: str) -> Dict[str, Any]:
+        return Anthropic_llm._build_request(prompt, self.model, self.temperature, self.max_tokens)
+
+    def submit_job(self, requests: List[Tuple[str, Dict[str, Any]]]) -> str:
+        try:
+            batch = self.client.messages.batches.create(
+                requests=[{"custom_id": custom_id, "params": body} for custom_id, body in requests]
+            )
+        except Exception as exc:
+            raise BatchAPIError(f"Failed to submit Anthropic batch: {exc}") from exc
+        return batch.id
+
+    def status(self, job_id: str) -> str:
+        try:
+            batch = self.client.messages.batches.retrieve(job_id)
+        except Exception as exc:
+            raise BatchAPIError(f"Failed to retrieve Anthropic batch {job_id}: {exc}") from exc
+        return ENDED if batch.processing_status == "ended" else IN_PROGRESS
+
+    def results(self, job_id: str) -> Iterator[Dict[str, Any]]:
+        try:
+            entries = self.client.messages.batches.results(job_id)
+        except Exception as exc:
+            raise BatchAPIError(f"Failed to download Anthropic batch {job_id}: {exc}") from exc
+
+        for entry in entries:
+            result = entry.result
+            if result.type != "succeeded":
+                error = getattr(result, "error", None)
+                yield _result(entry.custom_id, error=str(error) if error else result.type)
+                continue
+
+            message = result.message
+            text = "".join(
+                getattr(block, "text", "") for block in (message.content or [])
+                if getattr(block, "type", None) == "text"
+            )
+            usage = Anthropic_llm._extract_usage(message)
+            if not text:
+                yield _result(entry.custom_id, error="No valid text content in response", usage=usage)
+            else:
+                yield _result(entry.custom_id, text=text, usage=usage)
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    In-process batch backend running an LLM object in a thread pool.
+
+    Behaves like the provider backends (submit, poll, collect) without any
+    network access, so bulk pipelines can be developed and tested against
+    a fake or local model.
+
+    Example:
+        >>> from Codemni.llm import OllamaLLM
+        >>> backend = LocalBatchBackend(OllamaLLM(model="llama3"), max_concurrency=4)
+    """
+
+    max_requests_per_job = 10_000
+    max_bytes_per_job = 1 << 62
+
+    def __init__(self, llm: Any, max_concurrency: int = 4):
+        """
+        Initialize LocalBatchBackend.
+
+        Args:
+            llm: Object with a generate_response(prompt) method
+            max_concurrency: Number of prompts processed in parallel per job
+        """
+        if not hasattr(llm, "generate_response"):
+            raise ValueError("llm must have a generate_response(prompt) method")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        self.llm = llm
+        self.max_concurrency = max_concurrency
+        self._jobs: Dict[str, List[Tuple[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def request_body(self, prompt: str) -> Dict[str, Any]:
+        return {"prompt": prompt}
+
+    def _run_one(self, prompt: str) -> Dict[str, Any]:
+        try:
+            text = self.llm.generate_response(prompt)
+        except Exception as exc:
+            return {"error": f"{type(exc).__name__}: {exc}"}
+        return {"text": text}
+
+    def submit_job(self, requests: List[Tuple[str, Dict[str, Any]]]) -> str:
+        job_id = f"local-batch-{uuid.uuid4().hex}"
+        pool = ThreadPoolExecutor(
+            max_workers=min(self.max_concurrency, len(requests)),
+            thread_name_prefix="codemni-batch",
+        )
+        futures = [(custom_id, pool.submit(self._run_one, body["prompt"])) for custom_id, body in requests]
+        pool.shutdown(wait=False)
+        with self._lock:
+            self._jobs[job_id] = futures
+        return job_id
+
+    def _futures(self, job_id: str) -> List[Tuple[str, Any]]:
+        with self._lock:
+            futures = self._jobs.get(job_id)
+        if futures is None:
+            raise BatchAPIError(f"Unknown local batch: {job_id}")
+        return futures
+
+    def status(self, job_id: str) -> str:
+        futures = self._futures(job_id)
+        return ENDED if all(future.done() for _, future in futures) else IN_PROGRESS
+
+    def results(self, job_id: str) -> Iterator[Dict[str, Any]]:
+        for custom_id, future in self._futures(job_id):
+            outcome = future.result()
+            if "error" in outcome:
+                yield _result(custom_id, error=outcome["error"])
+            elif not outcome["text"]:
+                yield _result(custom_id, error="No valid text content in response")
+            else:
+                # Usage is not reported: llm.last_usage is shared by the worker threads
+                yield _result(custom_id, text=outcome["text"])
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+
+class BatchJob:
+    """
+    Handle on submitted batch jobs.
+
+    Keep ``job_ids`` to collect the results from another process later:
+    ``BatchJob(backend, saved_ids).results()``.
+    """
+
+    def __init__(self, backend: BatchBackend, job_ids: Sequence[str]):
+        """
+        Initialize BatchJob.
+
+        Args:
+            backend: Backend the jobs were submitted to
+            job_ids: Provider job ids
+        """
+        self.backend = backend
+        self.job_ids = list(job_ids)
+
+    def done(self) -> bool:
+        """Return True once every job has ended."""
+        return all(self.backend.status(job_id) == ENDED for job_id in self.job_ids)
+
+    def results(
+        self,
+        poll_interval: float = 30.0,
+        timeout: Optional[float] = None,
+        on_status: Optional[Callable[[str, str], None]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Wait for the jobs and yield their results.
+
+        Results of a job are streamed as soon as that job ends, without
+        waiting for the other jobs.
+
+        Args:
+            poll_interval: Seconds between status checks
+            timeout: Maximum seconds to wait overall (None waits indefinitely)
+            on_status: Optional callback called with (job_id, status) on each poll
+
+        Yields:
+            Normalized result dicts
+
+        Raises:
+            BatchAPIError: If a job failed or cannot be read
+            BatchTimeoutError: If the jobs have not ended before the timeout
+        """
+        if poll_interval < 0:
+            raise ValueError("poll_interval must be >= 0")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        pending = list(self.job_ids)
+        while pending:
+            for job_id in list(pending):
+                status = self.backend.status(job_id)
+                if on_status is not None:
+                    on_status(job_id, status)
+                if status == ENDED:
+                    pending.remove(job_id)
+                    yield from self.backend.results(job_id)
+
+            if not pending:
+                break
+            if deadline is None:
+                time.sleep(poll_interval)
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise BatchTimeoutError(
+                    f"{len(pending)} batch job(s) still running after {timeout} seconds: {pending}"
+                )
+            # Poll once more at the deadline rather than giving up a poll early
+            time.sleep(min(poll_interval, remaining))
+
+
+def submit_batch(prompts: Iterable[PromptItem], backend: BatchBackend) -> BatchJob:
+    """
+    Submit prompts through a batch backend without waiting.
+
+    Args:
+        prompts: Prompt strings, (custom_id, prompt) pairs or
+            {"custom_id": ..., "prompt": ...} dicts. Plain strings get the
+            custom_id "request-<index>".
+        backend: Backend to submit to
+
+    Returns:
+        BatchJob handle for polling and collecting results
+    """
+    items = _normalize_prompts(prompts)
+    return BatchJob(backend, backend.submit(items))
+
+
+def run_batch(
+    prompts: Iterable[PromptItem],
+    backend: BatchBackend,
+    *,
+    poll_interval: float = 30.0,
+    timeout: Optional[float] = None,
+    on_status: Optional[Callable[[str, str], None]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Submit prompts, wait for the batch and yield the results.
+
+    Args:
+        prompts: Prompts (see submit_batch)
+        backend: Backend to submit to
+        poll_interval: Seconds between status checks
+        timeout: Maximum seconds to wait (None waits indefinitely)
+        on_status: Optional callback called with (job_id, status) on each poll
+
+    Yields:
+        Normalized result dicts, in completion order
+    """
+    job = submit_batch(prompts, backend)
+    yield from job.results(poll_interval=poll_interval, timeout=timeout, on_status=on_status)
+
+
+def write_jsonl(results: Iterable[Dict[str, Any]], destination: Union[str, IO[str]]) -> int:
+    """
+    Write results as JSON Lines while they stream in.
+
+    Args:
+        results: Result dicts (e.g. from run_batch)
+        destination: File path or open text file
+
+    Returns:
+        Number of lines written
+    """
+    if isinstance(destination, str):
+        with open(destination, "w", encoding="utf-8") as handle:
+            return write_jsonl(results, handle)
+
+    count = 0
+    for record in results:
+        destination.write(json.dumps(record, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+__all__ = [
+    "BatchBackend",
+    "OpenAIBatchBackend",
+    "AnthropicBatchBackend",
+    "LocalBatchBackend",
+    "BatchJob",
+    "submit_batch",
+    "run_batch",
+    "write_jsonl",
+    "BatchError",
+    "BatchImportError",
+    "BatchAPIError",
+    "BatchTimeoutError",
+]
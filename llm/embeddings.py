@@ -0,0 +1,228 @@
+"""Embedding helpers and an offline local embedder.
+
+The provider wrappers (``OpenAILLM.embed``, ``GoogleLLM.embed``,
+``OllamaLLM.embed``) share the batching and matrix-building helpers in this
+module. All of them return a contiguous ``numpy.float32`` matrix with one
+row per input text, never lists of Python floats.
+
+``LocalEmbedder`` needs no network or model download: it hashes word and
+word-bigram features into a fixed number of dimensions. It is far weaker
+than a neural embedding model but fast (thousands of texts per second),
+deterministic across processes and good enough for lexical similarity,
+semantic-cache keys and tests.
+
+Example usage:
+    >>> from Codemni.llm import LocalEmbedder
+    >>> embedder = LocalEmbedder(dimensions=256)
+    >>> vectors = embedder.embed(["hello world", "goodbye world"])
+    >>> vectors.shape
+    (2, 256)
+"""
+
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+import base64
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import numpy as np
+    _NUMPY_AVAILABLE = True
+except ImportError:
+    np = None  # type: ignore
+    _NUMPY_AVAILABLE = False
+
+
+class EmbeddingError(Exception):
+    """Base exception for errors raised by the local embedder."""
+
+
+class EmbeddingImportError(EmbeddingError):
+    """Raised when NumPy is not installed."""
+
+
+def require_numpy(error_cls: type = EmbeddingImportError) -> None:
+    """Raise ``error_cls`` if NumPy is not installed."""
+    if not _NUMPY_AVAILABLE:
+        raise error_cls(
+            "NumPy is required for embeddings. Install with: pip install numpy"
+        )
+
+
+def validate_texts(texts: Sequence[str]) -> List[str]:
+    """Validate embedding input and return it as a list."""
+    if isinstance(texts, str):
+        raise ValueError("texts must be a sequence of strings, not a single string")
+    texts = list(texts)
+    for text in texts:
+        if not isinstance(text, str):
+            raise ValueError("every text must be a string")
+    return texts
+
+
+def iter_batches(texts: List[str], batch_size: int) -> Iterator[Tuple[int, List[str]]]:
+    """Yield ``(start_index, batch)`` pairs of at most ``batch_size`` texts."""
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+    for start in range(0, len(texts), batch_size):
+        yield start, texts[start:start + batch_size]
+
+
+def vector_to_array(vector: Any) -> "np.ndarray":
+    """Convert one provider vector (base64 string or list of floats) to float32."""
+    if isinstance(vector, str):
+        return np.frombuffer(base64.b64decode(vector), dtype=np.float32)
+    return np.asarray(vector, dtype=np.float32)
+
+
+def embed_in_batches(
+    texts: List[str],
+    batch_size: int,
+    embed_batch: Callable[[List[str]], List[Any]],
+    max_concurrency: int = 1,
+) -> "np.ndarray":
+    """Embed ``texts`` batch by batch into one contiguous float32 matrix.
+
+    Args:
+        texts: Texts to embed.
+        batch_size: Maximum texts per provider request.
+        embed_batch: Function embedding one batch; returns one vector per text
+            (list of floats, NumPy array or base64-encoded float32 string).
+        max_concurrency: Number of batches to request in parallel.
+
+    Returns:
+        Array of shape ``(len(texts), dimensions)`` and dtype float32.
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    batches = list(iter_batches(texts, batch_size))
+    matrix: Optional["np.ndarray"] = None
+
+    def run(item: Tuple[int, List[str]]) -> Tuple[int, List[Any]]:
+        start, batch = item
+        vectors = embed_batch(batch)
+        if len(vectors) != len(batch):
+            raise ValueError(
+                f"Provider returned {len(vectors)} embeddings for {len(batch)} texts"
+            )
+        return start, vectors
+
+    if max_concurrency > 1 and len(batches) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(batches))) as pool:
+            results = pool.map(run, batches)
+            for start, vectors in results:
+                matrix = _fill(matrix, len(texts), start, vectors)
+    else:
+        for item in batches:
+            start, vectors = run(item)
+            matrix = _fill(matrix, len(texts), start, vectors)
+
+    return matrix
+
+
+def _fill(matrix: Optional["np.ndarray"], rows: int, start: int, vectors: List[Any]) -> "np.ndarray":
+    """Write a batch of vectors into the (lazily allocated) result matrix."""
+    for offset, vector in enumerate(vectors):
+        row = vector_to_array(vector)
+        if matrix is None:
+            matrix = np.empty((rows, row.shape[0]), dtype=np.float32)
+        matrix[start + offset] = row
+    return matrix
+
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class LocalEmbedder:
+    """
+    Offline embedder based on feature hashing.
+
+    Words and adjacent word pairs are hashed (CRC32, stable across runs)
+    into ``dimensions`` buckets with a random sign, then each row is
+    L2-normalized so dot products are cosine similarities.
+
+    Example:
+        >>> embedder = LocalEmbedder()
+        >>> vectors = embedder.embed(["What is Python?", "Explain Python"])
+        >>> float(vectors[0] @ vectors[1])  # cosine similarity
+    """
+
+    def __init__(self, dimensions: int = 512, ngram_range: Tuple[int, int] = (1, 2), lowercase: bool = True):
+        """
+        Initialize LocalEmbedder.
+
+        Args:
+            dimensions: Size of each embedding vector
+            ngram_range: Smallest and largest word n-gram to hash
+            lowercase: Lowercase text before tokenizing
+        """
+        if dimensions < 1:
+            raise ValueError("dimensions must be >= 1")
+        if ngram_range[0] < 1 or ngram_range[1] < ngram_range[0]:
+            raise ValueError("ngram_range must be (min_n, max_n) with 1 <= min_n <= max_n")
+        self.dimensions = dimensions
+        self.ngram_range = ngram_range
+        self.lowercase = lowercase
+
+    def _features(self, text: str) -> List[int]:
+        """Return the hashed feature ids for one text."""
+        if self.lowercase:
+            text = text.lower()
+        words = _TOKEN_RE.findall(text)
+        features = []
+        min_n, max_n = self.ngram_range
+        for n in range(min_n, max_n + 1):
+            for i in range(len(words) - n + 1):
+                gram = words[i] if n == 1 else " ".join(words[i:i + n])
+                features.append(zlib.crc32(gram.encode("utf-8")))
+        return features
+
+    def embed(self, texts: Sequence[str]) -> "np.ndarray":
+        """
+        Embed a batch of texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Contiguous float32 array of shape (len(texts), dimensions)
+        """
+        require_numpy()
+        texts = validate_texts(texts)
+
+        rows: List[int] = []
+        hashes: List[int] = []
+        for row, text in enumerate(texts):
+            features = self._features(text)
+            rows.extend([row] * len(features))
+            hashes.extend(features)
+
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        if hashes:
+            hashed = np.asarray(hashes, dtype=np.uint32)
+            cols = (hashed % self.dimensions).astype(np.intp)
+            signs = np.where(hashed & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(matrix, (np.asarray(rows, dtype=np.intp), cols), signs)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def embed_query(self, text: str) -> "np.ndarray":
+        """
+        Embed a single text.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            float32 vector of length ``dimensions``
+        """
+        return self.embed([text])[0]
+
+
+__all__ = [
+    "LocalEmbedder",
+    "EmbeddingError",
+    "EmbeddingImportError",
+]
@@ -0,0 +1,430 @@
+"""Record LLM calls from real runs and replay them offline.
+
+Profiling the framework's own overhead or regression-testing an agent
+against live providers is slow, costs money and is not deterministic.
+``RecordingLLM`` wraps any LLM object and writes every call (prompt,
+response, latency, token usage) to a JSON Lines file, gzip-compressed when
+the path ends in ``.gz``. ``ReplayLLM`` serves those responses back without
+any network access:
+
+- responses are matched to prompts by hash, so concurrent or reordered
+  calls still get the right answer; a prompt made several times gets its
+  recorded responses in order
+- ``latency_scale`` replays the recorded latencies (1.0), a fraction of
+  them, or none at all (0.0, the default)
+- a prompt that was never recorded is *prompt drift*: by default it raises
+  ``PromptDriftError`` with a diff against the recorded prompt expected at
+  that point; with ``on_drift="sequence"`` the next recorded response is
+  served instead and the drift is reported in ``drifts``
+
+Both work with every agent and with ``ConversationalSummaryMemory`` (its
+summarization calls are recorded like any other), and both provide
+``generate_response``, ``agenerate_response`` and
+``generate_response_stream`` as far as the wrapped LLM does.
+
+Example usage:
+    >>> from Codemni.llm import OpenAILLM, RecordingLLM, ReplayLLM
+    >>>
+    >>> with RecordingLLM(OpenAILLM(model="gpt-4o-mini"), "calc_run.jsonl.gz") as llm:
+    ...     Create_ToolCalling_Agent(llm=llm, ...).invoke("What is 25 * 4?")
+    >>>
+    >>> replay = ReplayLLM("calc_run.jsonl.gz")          # offline, deterministic
+    >>> Create_ToolCalling_Agent(llm=replay, ...).invoke("What is 25 * 4?")
+"""
+
+from typing import Any, Deque, Dict, IO, Iterator, List, Optional
+import asyncio
+import difflib
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from core.tokenizer import report_usage
+
+FORMAT = "codemni-llm-recording"
+FORMAT_VERSION = 1
+# Characters per chunk when replaying a response as a stream
+STREAM_CHUNK_CHARS = 16
+
+
+class ReplayError(Exception):
+    """Base exception for errors raised by this module."""
+
+
+class PromptDriftError(ReplayError):
+    """Raised when a replayed run sends a prompt that was not recorded."""
+
+    def __init__(self, message: str, diff: str = ""):
+        """
+        Initialize PromptDriftError.
+
+        Args:
+            message: Error description
+            diff: Unified diff between the recorded and the actual prompt
+        """
+        super().__init__(message)
+        self.diff = diff
+
+
+class ReplayExhaustedError(ReplayError):
+    """Raised when a replayed run makes more LLM calls than were recorded."""
+
+
+def prompt_key(prompt: str) -> str:
+    """
+    Hash a prompt for matching recorded calls.
+
+    Args:
+        prompt: Prompt text
+
+    Returns:
+        Hex digest identifying the prompt
+    """
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:32]
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")  # type: ignore[return-value]
+    return open(path, mode, encoding="utf-8")
+
+
+def load_recording(path: str) -> List[Dict[str, Any]]:
+    """
+    Read the calls of a recording file.
+
+    Args:
+        path: File written by RecordingLLM
+
+    Returns:
+        Recorded calls in the order they were made; the first one also
+        carries the file ``header`` (format, model)
+
+    Raises:
+        ReplayError: If the file is not a recording
+    """
+    entries: List[Dict[str, Any]] = []
+    header: Optional[Dict[str, Any]] = None
+    with _open(path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "format" in record:
+                if record["format"] != FORMAT or record.get("version") != FORMAT_VERSION:
+                    raise ReplayError(f"{path} is not a version {FORMAT_VERSION} LLM recording")
+                header = header or record
+                continue
+            entries.append(record)
+    if header is None:
+        raise ReplayError(f"{path} is not an LLM recording (no header)")
+    if entries:
+        entries[0]["header"] = header
+    return entries
+
+
+class RecordingLLM:
+    """
+    Wraps an LLM and records every call to a file.
+
+    The wrapper exposes the same methods as the wrapped LLM (so agents pick
+    the same sync, async or streaming path) plus its other attributes, e.g.
+    ``model`` and ``last_usage``. Calls are appended as they finish, so a
+    crashed run keeps everything recorded up to that point; recording
+    into an existing file appends a new session. Failed calls are not
+    recorded.
+    """
+
+    def __init__(self, llm: Any, path: str, store_prompts: bool = True):
+        """
+        Initialize RecordingLLM.
+
+        Args:
+            llm: LLM object with a generate_response(prompt) method
+            path: Recording file (gzip-compressed if it ends in ".gz")
+            store_prompts: Store the prompt text, needed to show a diff when a
+                replayed prompt drifts (False stores only its hash)
+        """
+        self.llm = llm
+        self.path = path
+        self.store_prompts = store_prompts
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._file: Optional[IO[str]] = _open(path, "a")
+        header = {"format": FORMAT, "version": FORMAT_VERSION, "model": getattr(llm, "model", None),
+                  "created": time.time()}
+        self._write(header)
+        # Mirror the wrapped LLM's capabilities so agents take the same code path
+        if hasattr(llm, "agenerate_response"):
+            self.agenerate_response = self._agenerate_response
+        if hasattr(llm, "generate_response_stream"):
+            self.generate_response_stream = self._generate_response_stream
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not found on the wrapper (model, last_usage, embed, ...)
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            if self._file is None:
+                raise ReplayError("Recording is closed")
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def _record(self, prompt: str, response: str, started: float, first_chunk: Optional[float] = None,
+                stream: bool = False) -> None:
+        record: Dict[str, Any] = {
+            "key": prompt_key(prompt),
+            "response": response,
+            "latency": round(time.perf_counter() - started, 6),
+        }
+        if self.store_prompts:
+            record["prompt"] = prompt
+        if first_chunk is not None:
+            record["first_chunk"] = round(first_chunk, 6)
+        if stream:
+            record["stream"] = True
+        usage = getattr(self.llm, "last_usage", None)
+        if usage is not None:
+            record["usage"] = usage
+        self._write(record)
+        self.calls += 1
+
+    def generate_response(self, prompt: str) -> str:
+        """
+        Call the wrapped LLM and record the call.
+
+        Args:
+            prompt: The input prompt text
+
+        Returns:
+            The wrapped LLM's response
+        """
+        started = time.perf_counter()
+        response = self.llm.generate_response(prompt)
+        self._record(prompt, response, started)
+        return response
+
+    async def _agenerate_response(self, prompt: str) -> str:
+        started = time.perf_counter()
+        response = await self.llm.agenerate_response(prompt)
+        self._record(prompt, response, started)
+        return response
+
+    def _generate_response_stream(self, prompt: str) -> Iterator[str]:
+        started = time.perf_counter()
+        first_chunk = None
+        chunks: List[str] = []
+        for chunk in self.llm.generate_response_stream(prompt):
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - started
+            chunks.append(chunk)
+            yield chunk
+        self._record(prompt, "".join(chunks), started, first_chunk, stream=True)
+
+    def close(self) -> None:
+        """Close the recording file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> "RecordingLLM":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"RecordingLLM({self.llm!r}, path={self.path!r}, calls={self.calls})"
+
+
+class ReplayLLM:
+    """
+    Serves recorded responses offline (see the module docstring).
+
+    Thread-safe; ``calls``, ``drifts`` and ``unused()`` show how the run
+    compared to the recording.
+    """
+
+    def __init__(
+        self,
+        recording: Any,
+        latency_scale: float = 0.0,
+        on_drift: str = "error",
+        model: Optional[str] = None,
+    ):
+        """
+        Initialize ReplayLLM.
+
+        Args:
+            recording: Path of a recording file, or a list of calls from load_recording()
+            latency_scale: Multiplier for the recorded latencies (0.0 = respond
+                immediately, 1.0 = as recorded)
+            on_drift: What to do with a prompt that was not recorded: "error"
+                (raise PromptDriftError) or "sequence" (serve the next recorded
+                response in order and report the drift in ``drifts``)
+            model: Model name reported to agents (default: the recorded one)
+
+        Raises:
+            ValueError: If latency_scale or on_drift is invalid
+        """
+        if latency_scale < 0:
+            raise ValueError("latency_scale must be >= 0")
+        if on_drift not in ("error", "sequence"):
+            raise ValueError('on_drift must be "error" or "sequence"')
+
+        self.entries = load_recording(recording) if isinstance(recording, (str, os.PathLike)) else list(recording)
+        header = self.entries[0].get("header", {}) if self.entries else {}
+        self.model = model if model is not None else header.get("model")
+        self.latency_scale = latency_scale
+        self.on_drift = on_drift
+        self.calls = 0
+        self.drifts: List[Dict[str, Any]] = []
+        # Usage recorded with the most recently served response
+        self.last_usage: Optional[Dict[str, int]] = None
+
+        self._lock = threading.Lock()
+        self._by_key: Dict[str, Deque[int]] = {}
+        for index, entry in enumerate(self.entries):
+            self._by_key.setdefault(entry["key"], deque()).append(index)
+        self._served = [False] * len(self.entries)
+        self._next = 0  # first entry not yet served, in recorded order
+
+    def _take(self, prompt: str) -> Dict[str, Any]:
+        """Pick the recorded call answering a prompt."""
+        key = prompt_key(prompt)
+        with self._lock:
+            self.calls += 1
+            indexes = self._by_key.get(key)
+            if indexes:
+                # A prompt repeated more often than recorded gets its last response again
+                index = indexes.popleft() if len(indexes) > 1 else indexes[0]
+            else:
+                while self._next < len(self.entries) and self._served[self._next]:
+                    self._next += 1
+                expected = self.entries[self._next] if self._next < len(self.entries) else None
+                diff = _prompt_diff(expected.get("prompt") if expected else None, prompt)
+                if self.on_drift == "error" or expected is None:
+                    if expected is None:
+                        raise ReplayExhaustedError(
+                            f"Call {self.calls}: prompt was not recorded and no recorded responses are left"
+                        )
+                    raise PromptDriftError(
+                        f"Call {self.calls}: prompt was not recorded (expected recorded call {self._next + 1})",
+                        diff,
+                    )
+                index = self._next
+                self.drifts.append({"call": self.calls, "recorded_call": index + 1, "diff": diff})
+            self._served[index] = True
+            entry = self.entries[index]
+            self.last_usage = entry.get("usage")
+            if self.last_usage is not None:
+                report_usage(self.last_usage)
+            return entry
+
+    def _delay(self, entry: Dict[str, Any]) -> float:
+        return entry.get("latency", 0.0) * self.latency_scale
+
+    def generate_response(self, prompt: str) -> str:
+        """
+        Return the recorded response to a prompt.
+
+        Args:
+            prompt: The input prompt text
+
+        Returns:
+            Recorded response text
+
+        Raises:
+            PromptDriftError: If the prompt was not recorded (on_drift="error")
+            ReplayExhaustedError: If no recorded response is left to serve
+        """
+        entry = self._take(prompt)
+        delay = self._delay(entry)
+        if delay:
+            time.sleep(delay)
+        return entry["response"]
+
+    async def agenerate_response(self, prompt: str) -> str:
+        """
+        Async version of generate_response(); the simulated latency does not block the event loop.
+
+        Args:
+            prompt: The input prompt text
+
+        Returns:
+            Recorded response text
+        """
+        entry = self._take(prompt)
+        delay = self._delay(entry)
+        if delay:
+            await asyncio.sleep(delay)
+        return entry["response"]
+
+    def generate_response_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Stream the recorded response in small chunks.
+
+        With a latency_scale, the first chunk arrives after the recorded
+        time to first chunk and the rest are spread over the remaining time.
+
+        Args:
+            prompt: The input prompt text
+
+        Yields:
+            Chunks of the recorded response
+        """
+        entry = self._take(prompt)
+        response = entry["response"]
+        chunks = [response[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(response), STREAM_CHUNK_CHARS)] or [""]
+        total = self._delay(entry)
+        first = min(entry.get("first_chunk", 0.0) * self.latency_scale, total)
+        step = (total - first) / len(chunks)
+        for i, chunk in enumerate(chunks):
+            delay = first if i == 0 else step
+            if delay:
+                time.sleep(delay)
+            yield chunk
+
+    def unused(self) -> List[int]:
+        """
+        Get the recorded calls that were never served.
+
+        Returns:
+            1-based positions of unserved calls in the recording
+        """
+        with self._lock:
+            return [index + 1 for index, served in enumerate(self._served) if not served]
+
+    def drift_report(self) -> str:
+        """
+        Describe every drifted prompt.
+
+        Returns:
+            Diffs of the drifted prompts, or an empty string if none drifted
+        """
+        parts = [f"Call {drift['call']} (recorded call {drift['recorded_call']}):\n{drift['diff']}"
+                 for drift in self.drifts]
+        return "\n\n".join(parts)
+
+    def __repr__(self) -> str:
+        return f"ReplayLLM(calls={self.calls}, recorded={len(self.entries)}, drifts={len(self.drifts)})"
+
+
+def _prompt_diff(recorded: Optional[str], actual: str, max_lines: int = 40) -> str:
+    if recorded is None:
+        return "(recorded prompt not stored; record with store_prompts=True to see a diff)"
+    lines = list(difflib.unified_diff(
+        recorded.splitlines(), actual.splitlines(), "recorded", "actual", lineterm="", n=1
+    ))
+    if len(lines) > max_lines:
+        lines = lines[:max_lines] + [f"... ({len(lines) - max_lines} more diff lines)"]
+    return "\n".join(lines)
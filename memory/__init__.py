@@ -9,18 +9,23 @@ Available Memory Types:
 - ConversationalWindowMemory: Stores only the last N messages
 - ConversationalSummaryMemory: Summarizes old messages to save tokens
 - ConversationalTokenBufferMemory: Limits memory based on token count
+
+Sessions:
+- SessionMemoryManager: One memory per session ID, so one agent can serve many users
 """
 
 from .conversational_buffer_memory import ConversationalBufferMemory
 from .conversational_window_memory import ConversationalWindowMemory
 from .conversational_summary_memory import ConversationalSummaryMemory
 from .conversational_token_buffer_memory import ConversationalTokenBufferMemory
+from .session_manager import SessionMemoryManager
 
 __all__ = [
     "ConversationalBufferMemory",
     "ConversationalWindowMemory",
     "ConversationalSummaryMemory",
     "ConversationalTokenBufferMemory",
+    "SessionMemoryManager",
 ]
 
 __version__ = "1.2.2"
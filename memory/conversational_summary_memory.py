@@ -7,6 +7,8 @@ Best for: Very long conversations where full history would exceed token limits.
 
 from typing import List, Dict, Optional
 
+from core.tracing import span
+
 
 class ConversationalSummaryMemory:
     """
@@ -102,7 +104,10 @@ class ConversationalSummaryMemory:
 Summary:"""
             
             try:
-                new_summary = self.llm.generate_response(prompt)
+                with span("memory.summarize", "llm", messages=len(to_summarize), prompt_chars=len(prompt)) as summarize:
+                    new_summary = self.llm.generate_response(prompt)
+                    if summarize is not None:
+                        summarize.set(response_chars=len(str(new_summary)))
                 
                 # Update summary
                 if self.summary:
@@ -7,6 +7,8 @@ Best for: Managing memory within specific token budgets for API calls.
 
 from typing import List, Dict, Optional
 
+from core.tokenizer import TokenizerService, get_tokenizer
+
 
 class ConversationalTokenBufferMemory:
     """
@@ -21,13 +23,18 @@ class ConversationalTokenBufferMemory:
         >>> memory.add_ai_message("Hi there!")
         >>> print(memory.get_token_count())
         ~50  # Approximate token count
+        
+        # Exact counts for a specific model (uses tiktoken when installed)
+        >>> memory = ConversationalTokenBufferMemory(max_tokens=1000, model="gpt-4")
     """
     
     def __init__(
         self, 
         max_tokens: int = 2000,
         tokens_per_message: int = 4,  # Overhead per message
-        return_messages: bool = True
+        return_messages: bool = True,
+        model: Optional[str] = None,
+        tokenizer: Optional[TokenizerService] = None
     ):
         """
         Initialize ConversationalTokenBufferMemory.
@@ -36,6 +43,9 @@ class ConversationalTokenBufferMemory:
             max_tokens: Maximum number of tokens to keep in memory
             tokens_per_message: Estimated overhead tokens per message
             return_messages: If True, returns list of message dicts
+            model: Model the history is sent to, used to pick the tokenizer.
+                   If omitted, a calibrated characters-per-token estimate is used.
+            tokenizer: TokenizerService to count with (defaults to the shared one)
         """
         if max_tokens < 1:
             raise ValueError("max_tokens must be at least 1")
@@ -43,34 +53,52 @@ class ConversationalTokenBufferMemory:
         self.max_tokens = max_tokens
         self.tokens_per_message = tokens_per_message
         self.return_messages = return_messages
+        self.model = model
+        self.tokenizer = tokenizer or get_tokenizer()
         self.messages: List[Dict[str, str]] = []
+        self._message_tokens: List[int] = []
         self.current_tokens = 0
     
     def _estimate_tokens(self, text: str) -> int:
         """
-        Estimate token count for text.
+        Count tokens for text.
         
-        Simple estimation: ~4 characters per token on average.
-        For accurate counting, integrate with tiktoken library.
+        Uses the tokenizer service: exact counts when a tokenizer is
+        available for the model, otherwise a characters-per-token estimate
+        calibrated from the usage reported by the LLM wrappers.
         
         Args:
-            text: Text to estimate tokens for
+            text: Text to count tokens for
             
         Returns:
-            Estimated token count
+            Token count including per-message overhead
         """
-        return len(text) // 4 + self.tokens_per_message
+        return self.tokenizer.count(text, self.model) + self.tokens_per_message
     
     def _calculate_message_tokens(self, message: Dict[str, str]) -> int:
         """Calculate tokens for a single message."""
         return self._estimate_tokens(message["content"])
     
+    def _append(self, msg: Dict[str, str]) -> None:
+        """Store a message with its token count and prune to the limit."""
+        tokens = self._calculate_message_tokens(msg)
+        self.messages.append(msg)
+        self._message_tokens.append(tokens)
+        self.current_tokens += tokens
+        self._prune_old_messages()
+    
     def _prune_old_messages(self) -> None:
         """Remove oldest messages to fit within token limit."""
-        while self.messages and self.current_tokens > self.max_tokens:
-            removed_message = self.messages.pop(0)
-            removed_tokens = self._calculate_message_tokens(removed_message)
-            self.current_tokens -= removed_tokens
+        # Count the messages to drop first, then remove them with one slice
+        # deletion: popping from the front one at a time is quadratic when a
+        # lower limit prunes a long history
+        drop = 0
+        while drop < len(self.messages) and self.current_tokens > self.max_tokens:
+            self.current_tokens -= self._message_tokens[drop]
+            drop += 1
+        if drop:
+            del self.messages[:drop]
+            del self._message_tokens[:drop]
     
     def add_user_message(self, message: str) -> None:
         """
@@ -79,12 +107,7 @@ class ConversationalTokenBufferMemory:
         Args:
             message: The user's message content
         """
-        msg = {"role": "user", "content": message}
-        tokens = self._calculate_message_tokens(msg)
-        
-        self.messages.append(msg)
-        self.current_tokens += tokens
-        self._prune_old_messages()
+        self._append({"role": "user", "content": message})
     
     def add_ai_message(self, message: str) -> None:
         """
@@ -93,12 +116,7 @@ class ConversationalTokenBufferMemory:
         Args:
             message: The AI's response content
         """
-        msg = {"role": "assistant", "content": message}
-        tokens = self._calculate_message_tokens(msg)
-        
-        self.messages.append(msg)
-        self.current_tokens += tokens
-        self._prune_old_messages()
+        self._append({"role": "assistant", "content": message})
     
     def add_message(self, role: str, content: str) -> None:
         """
@@ -108,12 +126,7 @@ class ConversationalTokenBufferMemory:
             role: Message role (user, assistant, system, etc.)
             content: Message content
         """
-        msg = {"role": role, "content": content}
-        tokens = self._calculate_message_tokens(msg)
-        
-        self.messages.append(msg)
-        self.current_tokens += tokens
-        self._prune_old_messages()
+        self._append({"role": role, "content": content})
     
     def get_history(self) -> List[Dict[str, str]]:
         """
@@ -159,6 +172,7 @@ class ConversationalTokenBufferMemory:
     def clear(self) -> None:
         """Clear all memory."""
         self.messages.clear()
+        self._message_tokens.clear()
         self.current_tokens = 0
     
     def get_message_count(self) -> int:
@@ -222,7 +236,8 @@ class ConversationalTokenBufferMemory:
             "max_tokens": self.max_tokens,
             "current_tokens": self.current_tokens,
             "tokens_per_message": self.tokens_per_message,
-            "return_messages": self.return_messages
+            "return_messages": self.return_messages,
+            "model": self.model
         }
     
     def load_from_dict(self, data: Dict) -> None:
@@ -234,9 +249,12 @@ class ConversationalTokenBufferMemory:
         """
         self.messages = data.get("messages", [])
         self.max_tokens = data.get("max_tokens", 2000)
-        self.current_tokens = data.get("current_tokens", 0)
         self.tokens_per_message = data.get("tokens_per_message", 4)
         self.return_messages = data.get("return_messages", True)
+        self.model = data.get("model", self.model)
+        # Recount with the current tokenizer rather than trusting stored totals
+        self._message_tokens = [self._calculate_message_tokens(msg) for msg in self.messages]
+        self.current_tokens = sum(self._message_tokens)
     
     def __len__(self) -> int:
         """Return the number of messages."""
@@ -0,0 +1,252 @@
+"""
+Session Memory Manager
+
+Keeps one memory per session so a single agent instance can serve many
+users concurrently: ``agent.invoke(query, session_id="user-42")``.
+Best for: Chat servers and APIs where each user has their own conversation.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+from .conversational_buffer_memory import ConversationalBufferMemory
+
+
+class _Session:
+    """Memory of one session with its lock."""
+
+    __slots__ = ("memory", "lock", "async_lock", "last_used", "active")
+
+    def __init__(self, memory: Any):
+        self.memory = memory
+        self.lock = threading.Lock()
+        self.async_lock: Optional[asyncio.Lock] = None
+        self.last_used = time.monotonic()
+        self.active = 0
+
+
+class SessionMemoryManager:
+    """
+    Creates and holds one memory per session ID.
+
+    Memories are created on first use by ``memory_factory``. Idle sessions
+    are kept in an LRU: beyond ``max_sessions`` the least recently used one
+    is evicted, and with ``idle_ttl`` sessions unused for that long are
+    evicted too. A session that is currently in use is never evicted.
+
+    Each session has its own lock, so two requests for the same session run
+    one after the other while requests for different sessions never wait
+    for each other. Serve a given session either from threads (``session``)
+    or from one event loop (``asession``), not both at once.
+
+    Example:
+        >>> sessions = SessionMemoryManager(lambda: ConversationalWindowMemory(window_size=20),
+        ...                                 max_sessions=10000, idle_ttl=3600)
+        >>> agent = Create_ToolCalling_Agent(llm=llm, sessions=sessions)
+        >>> agent.invoke("My name is Alice", session_id="alice")
+        >>> agent.invoke("What is my name?", session_id="alice")
+        'Your name is Alice.'
+    """
+
+    def __init__(
+        self,
+        memory_factory: Callable[[], Any] = ConversationalBufferMemory,
+        max_sessions: Optional[int] = 1000,
+        idle_ttl: Optional[float] = None,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+    ):
+        """
+        Initialize SessionMemoryManager.
+
+        Args:
+            memory_factory: Zero-argument callable creating the memory of a new session
+            max_sessions: Maximum sessions kept (None = unlimited)
+            idle_ttl: Seconds after which an unused session is evicted (None = never)
+            on_evict: Optional callback (session_id, memory) called when a session
+                     is evicted, e.g. to persist its history
+        """
+        if max_sessions is not None and max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1 or None")
+        if idle_ttl is not None and idle_ttl <= 0:
+            raise ValueError("idle_ttl must be positive or None")
+
+        self.memory_factory = memory_factory
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.on_evict = on_evict
+        self.evictions = 0
+        self._sessions: "OrderedDict[Hashable, _Session]" = OrderedDict()
+        # Guards the session table only; never held while a memory is in use
+        self._lock = threading.Lock()
+
+    def _checkout(self, session_id: Hashable) -> _Session:
+        """Get (or create) a session and mark it in use."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                evicted = self._use(session_id, session)
+        if session is None:
+            # Build the memory without holding the table lock; if another
+            # request created the session meanwhile, use that one
+            memory = self.memory_factory()
+            with self._lock:
+                session = self._sessions.get(session_id)
+                if session is None:
+                    session = self._sessions[session_id] = _Session(memory)
+                evicted = self._use(session_id, session)
+        self._notify(evicted)
+        return session
+
+    def _use(self, session_id: Hashable, session: _Session) -> List[tuple]:
+        """Mark a session in use (caller holds the table lock); returns the evicted sessions."""
+        self._sessions.move_to_end(session_id)
+        session.active += 1
+        session.last_used = time.monotonic()
+        return self._evict_idle()
+
+    def _checkin(self, session_id: Hashable, session: _Session) -> None:
+        with self._lock:
+            session.active -= 1
+            session.last_used = time.monotonic()
+            # Keep the table in last-used order (unless the session was evicted meanwhile)
+            if self._sessions.get(session_id) is session:
+                self._sessions.move_to_end(session_id)
+
+    def _evict_idle(self) -> List[tuple]:
+        """Evict expired and excess idle sessions (caller holds the table lock)."""
+        now = time.monotonic()
+        excess = len(self._sessions) - self.max_sessions if self.max_sessions is not None else 0
+        victims = []
+        for session_id, session in self._sessions.items():
+            if session.active:
+                continue
+            expired = self.idle_ttl is not None and now - session.last_used > self.idle_ttl
+            if not expired and excess <= 0:
+                # The table is in last-used order, so every later session is newer
+                break
+            victims.append((session_id, session.memory))
+            excess -= 1
+        for session_id, _ in victims:
+            del self._sessions[session_id]
+        self.evictions += len(victims)
+        return victims
+
+    def _notify(self, evicted: List[tuple]) -> None:
+        if self.on_evict is not None:
+            for session_id, memory in evicted:
+                self.on_evict(session_id, memory)
+
+    @contextmanager
+    def session(self, session_id: Hashable) -> Iterator[Any]:
+        """
+        Use a session's memory exclusively (blocking).
+
+        Args:
+            session_id: Session identifier
+
+        Yields:
+            The session's memory
+        """
+        session = self._checkout(session_id)
+        try:
+            with session.lock:
+                yield session.memory
+        finally:
+            self._checkin(session_id, session)
+
+    @asynccontextmanager
+    async def asession(self, session_id: Hashable):
+        """
+        Use a session's memory exclusively without blocking the event loop.
+
+        Args:
+            session_id: Session identifier
+
+        Yields:
+            The session's memory
+        """
+        session = self._checkout(session_id)
+        try:
+            if session.async_lock is None:
+                session.async_lock = asyncio.Lock()
+            async with session.async_lock:
+                yield session.memory
+        finally:
+            self._checkin(session_id, session)
+
+    def get(self, session_id: Hashable) -> Any:
+        """
+        Get a session's memory without locking it (created if missing).
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            The session's memory
+        """
+        session = self._checkout(session_id)
+        self._checkin(session_id, session)
+        return session.memory
+
+    def evict(self, session_id: Hashable) -> bool:
+        """
+        Remove a session and its memory.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            True if the session existed
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        self._notify([(session_id, session.memory)])
+        return True
+
+    def clear(self) -> None:
+        """Remove all sessions."""
+        with self._lock:
+            evicted = [(session_id, session.memory) for session_id, session in self._sessions.items()]
+            self._sessions.clear()
+        self._notify(evicted)
+
+    def session_ids(self) -> List[Hashable]:
+        """
+        Get the IDs of all held sessions.
+
+        Returns:
+            Session IDs from least to most recently used
+        """
+        with self._lock:
+            return list(self._sessions)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get session counters.
+
+        Returns:
+            Dict with sessions (held), active (in use) and evictions
+        """
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "active": sum(1 for session in self._sessions.values() if session.active),
+                "evictions": self.evictions,
+            }
+
+    def __contains__(self, session_id: Hashable) -> bool:
+        with self._lock:
+            return session_id in self._sessions
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def __repr__(self) -> str:
+        return f"SessionMemoryManager(sessions={len(self)}, max_sessions={self.max_sessions})"